@@ -0,0 +1,360 @@
+"""Spawn admission control with a queue for spawns over a limit.
+
+Before a spawn starts, :meth:`AdmissionController.admit` checks the number of
+teammates per team and on the host, per-provider concurrency (provider taken
+from ``ModelInfo.provider``) and two opt-in host guards: the 1-minute load
+average per CPU from ``/proc/loadavg`` and ``MemAvailable`` from
+``/proc/meminfo``. Spawns that do not fit are queued instead of failing and
+started by :meth:`AdmissionController.dispatch`, which the server runs in
+the background whenever a slot may have freed up (a teammate was removed, a
+spawn finished) and on a fixed interval for the host guards.
+
+Teammates are counted from live per-team tallies that the server refreshes
+with :meth:`AdmissionController.refresh_team` whenever a team's membership
+changes; a team is read once more only the first time a spawn for it is
+admitted (e.g. a team from an earlier server session). Teammates whose
+process a health sweep found dead (:meth:`AdmissionController.observe`) are
+not counted until they are seen alive again. Host load is read once per
+admission or dispatch step, outside the controller's lock.
+
+The queue is FIFO by default; in ``priority`` order higher ``priority``
+values go first and ties stay FIFO. A queued entry is never overtaken by a
+new spawn that it could itself take the slot from.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Callable, Literal, NamedTuple
+
+from opencode_teams import teams
+from opencode_teams.models import AgentHealthStatus, ModelInfo
+
+DISPATCH_INTERVAL_SECONDS = 5.0
+HISTORY_SIZE = 20
+
+
+class QueuedSpawn(NamedTuple):
+    queue_id: str
+    team_name: str
+    name: str
+    provider: str
+    priority: int
+    enqueued_at: float
+    reason: str
+    launch: Callable[[], object]
+
+
+class _Usage(NamedTuple):
+    per_team: Counter
+    per_provider: Counter
+    host: int
+    load: float | None  # 1-minute load average per CPU
+    available_mb: float | None
+
+
+def provider_of(model: str, models: list[ModelInfo]) -> str:
+    """Provider of a resolved ``provider/model`` string ("" if unknown)."""
+    for info in models:
+        if info.full_model_string == model:
+            return info.provider
+    return model.split("/", 1)[0] if "/" in model else ""
+
+
+def read_host_load() -> tuple[float | None, float | None]:
+    """Return (1-minute load average per CPU, MemAvailable in MB) from /proc.
+
+    Either value is None where /proc is unavailable (non-Linux hosts).
+    """
+    load = None
+    try:
+        with open("/proc/loadavg") as f:
+            load = float(f.read().split()[0]) / (os.cpu_count() or 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    available = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) / 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    return load, available
+
+
+class AdmissionController:
+    """Spawn limits and the queue of spawns waiting for a slot."""
+
+    def __init__(self, base_dir: Path | None = None, models: list[ModelInfo] | None = None) -> None:
+        self._base_dir = base_dir
+        self._models = models or []  # For provider_of, as used when admitting spawns
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._queue: list[QueuedSpawn] = []
+        self._in_flight: Counter = Counter()  # (team_name, provider) -> spawns in progress
+        self._members: dict[str, dict[str, str]] = {}  # team_name -> teammate -> provider
+        self._dead: dict[str, set[str]] = {}  # team_name -> teammates found dead
+        self._counted: set[str] = set()  # Teams whose members are in self._members
+        self._history: deque[dict] = deque(maxlen=HISTORY_SIZE)
+        self.max_agents_per_team: int | None = None
+        self.max_agents_per_host: int | None = None
+        self.provider_limits: dict[str, int] = {}
+        self.max_load_per_cpu: float | None = None
+        self.min_available_memory_mb: float | None = None
+        self.order: Literal["fifo", "priority"] = "fifo"
+        self.wake = threading.Event()
+
+    # -- limits --------------------------------------------------------------
+
+    def refresh_team(self, team_name: str) -> None:
+        """Re-count a team's teammates after members were added or removed."""
+        try:
+            config = teams.read_config(team_name, self._base_dir)
+            providers = {m.name: provider_of(m.model, self._models) for m in config.teammates}
+        except (FileNotFoundError, ValueError):
+            providers = {}  # Deleted or unreadable; nothing running we can count
+        with self._lock:
+            self._counted.add(team_name)
+            if providers:
+                self._members[team_name] = providers
+            else:
+                self._members.pop(team_name, None)
+        self.wake.set()
+
+    def observe(self, team_name: str, statuses: list[AgentHealthStatus]) -> None:
+        """Stop counting teammates a health sweep of the team found dead.
+
+        They count again once a later sweep sees them alive (e.g. restarted).
+        """
+        dead = {s.agent_name for s in statuses if s.status == "dead"}
+        with self._lock:
+            if dead == self._dead.get(team_name, set()):
+                return
+            if dead:
+                self._dead[team_name] = dead
+            else:
+                self._dead.pop(team_name, None)
+        self.wake.set()
+
+    def _host_load(self) -> tuple[float | None, float | None]:
+        # Called without self._lock; /proc is only read if a guard is set
+        if self.max_load_per_cpu is None and self.min_available_memory_mb is None:
+            return None, None
+        return read_host_load()
+
+    def _usage(self, host_load: tuple[float | None, float | None]) -> _Usage:
+        # Caller holds self._lock
+        per_team: Counter = Counter()
+        per_provider: Counter = Counter()
+        for team_name, providers in self._members.items():
+            dead = self._dead.get(team_name, set())
+            for name, provider in providers.items():
+                if name not in dead:
+                    per_team[team_name] += 1
+                    per_provider[provider] += 1
+        for (team_name, provider), count in self._in_flight.items():
+            per_team[team_name] += count
+            per_provider[provider] += count
+        return _Usage(per_team, per_provider, sum(per_team.values()), *host_load)
+
+    def _blocked_reason(self, team_name: str, provider: str, usage: _Usage) -> str | None:
+        # Caller holds self._lock
+        if self.max_agents_per_team is not None and usage.per_team[team_name] >= self.max_agents_per_team:
+            return f"team {team_name!r} is at its limit of {self.max_agents_per_team} agents"
+        if self.max_agents_per_host is not None and usage.host >= self.max_agents_per_host:
+            return f"host is at its limit of {self.max_agents_per_host} agents"
+        limit = self.provider_limits.get(provider)
+        if limit is not None and usage.per_provider[provider] >= limit:
+            return f"provider {provider!r} is at its limit of {limit} concurrent agents"
+        load, available = usage.load, usage.available_mb
+        if self.max_load_per_cpu is not None and load is not None and load > self.max_load_per_cpu:
+            return f"host load is {load:.2f} per CPU (limit {self.max_load_per_cpu})"
+        if (
+            self.min_available_memory_mb is not None
+            and available is not None
+            and available < self.min_available_memory_mb
+        ):
+            return f"only {available:.0f} MB memory available (minimum {self.min_available_memory_mb})"
+        return None
+
+    def _ordered(self) -> list[QueuedSpawn]:
+        # Caller holds self._lock; the queue itself is kept in arrival order
+        if self.order == "priority":
+            return sorted(self._queue, key=lambda q: -q.priority)
+        return list(self._queue)
+
+    def _next_admissible(self, usage: _Usage) -> QueuedSpawn | None:
+        # Caller holds self._lock
+        for entry in self._ordered():
+            if self._blocked_reason(entry.team_name, entry.provider, usage) is None:
+                return entry
+        return None
+
+    def admit(self, team_name: str, provider: str) -> str | None:
+        """Reserve a slot for a spawn starting now.
+
+        Returns:
+            None if admitted (call :meth:`release` once the spawn has finished),
+            otherwise the reason the spawn has to be queued.
+        """
+        if team_name not in self._counted:
+            self.refresh_team(team_name)
+        host_load = self._host_load()
+        with self._lock:
+            usage = self._usage(host_load)
+            if self._next_admissible(usage) is not None:
+                return "earlier queued spawns are waiting for the free slot"
+            reason = self._blocked_reason(team_name, provider, usage)
+            if reason is None:
+                self._in_flight[(team_name, provider)] += 1
+            return reason
+
+    def release(self, team_name: str, provider: str) -> None:
+        """End a reservation from :meth:`admit`; wakes the dispatcher."""
+        with self._lock:
+            self._in_flight[(team_name, provider)] -= 1
+            if self._in_flight[(team_name, provider)] <= 0:
+                del self._in_flight[(team_name, provider)]
+        self.wake.set()
+
+    # -- queue ---------------------------------------------------------------
+
+    def enqueue(
+        self,
+        team_name: str,
+        name: str,
+        provider: str,
+        launch: Callable[[], object],
+        reason: str,
+        priority: int = 0,
+    ) -> QueuedSpawn:
+        """Queue a spawn; ``launch`` is called from :meth:`dispatch` once admitted.
+
+        Raises:
+            ValueError: If ``name`` is already queued for ``team_name``.
+        """
+        with self._lock:
+            if any(q.team_name == team_name and q.name == name for q in self._queue):
+                raise ValueError(f"{name!r} is already queued for team {team_name!r}")
+            entry = QueuedSpawn(
+                queue_id=f"q{next(self._seq)}",
+                team_name=team_name,
+                name=name,
+                provider=provider,
+                priority=priority,
+                enqueued_at=time.time(),
+                reason=reason,
+                launch=launch,
+            )
+            self._queue.append(entry)
+        self.wake.set()
+        return entry
+
+    def position(self, queue_id: str) -> int | None:
+        """1-based position of a queued spawn in dispatch order (None if not queued)."""
+        with self._lock:
+            for i, entry in enumerate(self._ordered(), start=1):
+                if entry.queue_id == queue_id:
+                    return i
+        return None
+
+    def is_queued(self, team_name: str, name: str) -> bool:
+        with self._lock:
+            return any(q.team_name == team_name and q.name == name for q in self._queue)
+
+    def cancel(self, queue_id: str) -> bool:
+        """Drop a queued spawn. Returns False if it is not (or no longer) queued."""
+        with self._lock:
+            for i, entry in enumerate(self._queue):
+                if entry.queue_id == queue_id:
+                    del self._queue[i]
+                    return True
+        return False
+
+    def forget_team(self, team_name: str) -> int:
+        """Drop every queued spawn for a deleted team. Returns the number dropped."""
+        with self._lock:
+            self._members.pop(team_name, None)
+            self._dead.pop(team_name, None)
+            self._counted.discard(team_name)
+            before = len(self._queue)
+            self._queue = [q for q in self._queue if q.team_name != team_name]
+            return before - len(self._queue)
+
+    def dispatch(self) -> int:
+        """Start queued spawns, in queue order, while limits allow.
+
+        Returns:
+            Number of queued spawns started (including ones whose launch failed).
+        """
+        started = 0
+        while True:
+            host_load = self._host_load() if self._queue else (None, None)
+            with self._lock:
+                entry = self._next_admissible(self._usage(host_load)) if self._queue else None
+                if entry is None:
+                    return started
+                self._queue.remove(entry)
+                self._in_flight[(entry.team_name, entry.provider)] += 1
+            record = {
+                "queueId": entry.queue_id,
+                "teamName": entry.team_name,
+                "name": entry.name,
+                "waitedSeconds": round(time.time() - entry.enqueued_at, 1),
+            }
+            try:
+                entry.launch()
+                record["status"] = "spawned"
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                self.release(entry.team_name, entry.provider)
+            with self._lock:
+                self._history.append(record)
+            started += 1
+
+    def status(self, team_name: str | None = None) -> dict:
+        now = time.time()
+        load, available = read_host_load()
+        with self._lock:
+            queued = [
+                {
+                    "queueId": q.queue_id,
+                    "teamName": q.team_name,
+                    "name": q.name,
+                    "provider": q.provider,
+                    "priority": q.priority,
+                    "position": i,
+                    "waitingSeconds": round(now - q.enqueued_at, 1),
+                    "reason": q.reason,
+                }
+                for i, q in enumerate(self._ordered(), start=1)
+                if team_name is None or q.team_name == team_name
+            ]
+            recent = [
+                r for r in self._history if team_name is None or r["teamName"] == team_name
+            ]
+            return {
+                "queued": queued,
+                "recent": recent,
+                "limits": {
+                    "maxAgentsPerTeam": self.max_agents_per_team,
+                    "maxAgentsPerHost": self.max_agents_per_host,
+                    "providerLimits": dict(self.provider_limits),
+                    "maxLoadPerCpu": self.max_load_per_cpu,
+                    "minAvailableMemoryMb": self.min_available_memory_mb,
+                    "order": self.order,
+                },
+                "host": {
+                    "loadPerCpu": None if load is None else round(load, 2),
+                    "availableMemoryMb": None if available is None else round(available),
+                },
+            }
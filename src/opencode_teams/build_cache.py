@@ -0,0 +1,102 @@
+"""Team-wide shared caches for package managers and compilers.
+
+Agents spawned with ``build_cache=True`` get environment variables that
+point uv, pip, npm, pnpm, ccache, sccache and Go at per-tool directories
+under ``<team dir>/cache/``. The first agent to install a dependency or
+compile a file fills the cache; every other agent of the team (in its own
+worktree or not) then reuses it instead of downloading and building again.
+All of these tools lock their caches for concurrent use; yarn classic does
+not, so it is left out.
+
+The variables are stored in the member's ``env`` and passed to the agent
+process, so its tool calls and a supervisor restart inherit them. Caches go
+to the trash together with the team directory on ``team_delete``.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from opencode_teams import teams
+
+# Environment variable -> cache subdirectory
+CACHE_ENV = {
+    "UV_CACHE_DIR": "uv",
+    "PIP_CACHE_DIR": "pip",
+    "npm_config_cache": "npm",
+    "npm_config_store_dir": "pnpm-store",  # pnpm reads its settings from npm_config_*
+    "CCACHE_DIR": "ccache",
+    "SCCACHE_DIR": "sccache",
+    "GOMODCACHE": "go/mod",
+    "GOCACHE": "go/build",
+}
+# Go makes its module cache read-only by default, which would leave the team
+# directory undeletable (see teams.purge_trash) for anyone but root
+GO_MODCACHE_FLAG = "-modcacherw"
+
+
+def cache_root(team_name: str, base_dir: Path | None = None) -> Path:
+    teams_dir = (base_dir / "teams") if base_dir else teams.TEAMS_DIR
+    return teams_dir / team_name / "cache"
+
+
+def cache_env(team_name: str, base_dir: Path | None = None) -> dict[str, str]:
+    """Environment for an agent that uses the team's cache; creates the directories."""
+    root = cache_root(team_name, base_dir)
+    env = {}
+    for var, subdir in CACHE_ENV.items():
+        path = root / subdir
+        path.mkdir(parents=True, exist_ok=True)
+        env[var] = str(path)
+    goflags = os.environ.get("GOFLAGS", "").split()
+    if GO_MODCACHE_FLAG not in goflags:
+        goflags.append(GO_MODCACHE_FLAG)
+    env["GOFLAGS"] = " ".join(goflags)
+    return env
+
+
+def _tree_usage(path: Path, seen: set[tuple[int, int]]) -> tuple[int, int]:
+    """(bytes on disk, files) under ``path``; hard links are counted once."""
+    used = files = 0
+    pending = [path]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue  # Removed while walking, or unreadable
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(Path(entry.path))
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key in seen:
+                    continue
+                seen.add(key)
+                files += 1
+                blocks = getattr(st, "st_blocks", None)
+                used += blocks * 512 if blocks is not None else st.st_size
+    return used, files
+
+
+def disk_usage(team_name: str, base_dir: Path | None = None) -> dict:
+    """Disk space used by the team's cache, in total and per tool."""
+    root = cache_root(team_name, base_dir)
+    seen: set[tuple[int, int]] = set()
+    tools = {}
+    for var, subdir in CACHE_ENV.items():
+        used, files = _tree_usage(root / subdir, seen)
+        tools[subdir] = {"envVar": var, "bytes": used, "files": files}
+    total = sum(t["bytes"] for t in tools.values())
+    return {
+        "path": str(root),
+        "exists": root.is_dir(),
+        "totalBytes": total,
+        "totalMb": round(total / (1024 * 1024), 1),
+        "tools": tools,
+    }
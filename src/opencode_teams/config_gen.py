@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 import textwrap
 from pathlib import Path
 from typing import Any
@@ -9,6 +10,8 @@ import yaml
 
 
 OPENCODE_JSON_SCHEMA = "https://opencode-files.s3.amazonaws.com/schemas/opencode.json"
+INLINE_PROMPT_MAX_BYTES_ENV_VAR = "OPENCODE_TEAMS_INLINE_PROMPT_MAX_BYTES"
+DEFAULT_INLINE_PROMPT_MAX_BYTES = 2048
 
 
 def generate_agent_config(
@@ -19,6 +22,8 @@ def generate_agent_config(
     model: str,
     role_instructions: str = "",
     custom_instructions: str = "",
+    worktree_branch: str = "",
+    worktree_base: str = "",
 ) -> str:
     """Generate OpenCode agent config markdown with YAML frontmatter and system prompt.
 
@@ -32,6 +37,9 @@ def generate_agent_config(
             Injected between Identity and Communication Protocol sections.
         custom_instructions: Optional user-provided instructions per spawn.
             Wrapped with "# Additional Instructions" heading.
+        worktree_branch: Branch of the agent's own git worktree, if it has one.
+            Adds a "# Git Worktree" section on committing and merge readiness.
+        worktree_base: Branch the worktree branch was created from.
 
     Returns:
         Complete markdown config string with frontmatter and body
@@ -117,6 +125,16 @@ def generate_agent_config(
             f"# Additional Instructions\n\n{custom_instructions.strip()}"
         )
 
+    # Section 4b: Git worktree (agents spawned with worktree=True)
+    if worktree_branch:
+        body_parts.append(textwrap.dedent(f"""\
+            # Git Worktree
+
+            You work in your own git worktree on branch `{worktree_branch}`, created from `{worktree_base}`. Other teammates have their own worktrees, so your builds and tests do not disturb theirs.
+
+            - Commit your changes to `{worktree_branch}` as you go; do not switch branches or touch other worktrees.
+            - When your work is committed and complete, call `opencode-teams_report_merge_ready(team_name="{team_name}", agent_name="{name}", summary="<what changed>")`. If it reports conflicts with `{worktree_base}`, merge `{worktree_base}` into your branch, resolve them, commit and report again."""))
+
     # Section 5: Workflow
     body_parts.append(textwrap.dedent(f"""\
         # Workflow
@@ -153,6 +171,68 @@ def generate_agent_config(
     return config
 
 
+def generate_standby_config(
+    slot: str, model: str, pool_team: str, wait_ms: int = 600_000
+) -> str:
+    """Generate the agent config for a warm-pool standby agent.
+
+    A standby agent has no identity yet: it long-polls its pool inbox and
+    takes on whatever identity the first message assigns (see
+    ``generate_assignment_message``). It waits in a single poll, since every
+    further turn would be another billed model request.
+
+    Args:
+        slot: Standby agent name (also its pool inbox name)
+        model: Model string the agent runs with
+        pool_team: Directory name of the pool's inboxes (passed as team_name)
+        wait_ms: How long the single poll blocks
+
+    Returns:
+        Complete markdown config string with frontmatter and body
+    """
+    config = generate_agent_config(
+        agent_id=f"{slot}@{pool_team}", name=slot, team_name=pool_team,
+        color="", model=model,
+    )
+    frontmatter = config.split("---\n", 2)[1]
+    body = textwrap.dedent(f"""\
+        # Standby
+
+        You are a pre-started team agent waiting for an assignment. You have no name or team yet.
+
+        1. Call `opencode-teams_poll_inbox(team_name="{pool_team}", agent_name="{slot}", timeout_ms={wait_ms})` once. Do nothing else while waiting.
+        2. If it returns no message, stop without any further tool calls; the pool replaces you.
+        3. The first message you receive assigns your name, team and instructions. From then on you ARE that agent: follow its instructions exactly and use its team_name and agent name in every `opencode-teams_*` call.""")
+    return f"---\n{frontmatter}---\n\n{body}\n"
+
+
+def generate_assignment_message(
+    agent_id: str,
+    name: str,
+    team_name: str,
+    color: str,
+    model: str,
+    role_instructions: str = "",
+    custom_instructions: str = "",
+) -> str:
+    """Generate the message that hands a standby agent its identity.
+
+    Contains the same system prompt body ``generate_agent_config`` would
+    produce for a cold spawn, followed by a pointer to the agent's inbox,
+    where its initial prompt is waiting.
+    """
+    config = generate_agent_config(
+        agent_id=agent_id, name=name, team_name=team_name, color=color, model=model,
+        role_instructions=role_instructions, custom_instructions=custom_instructions,
+    )
+    body = config.split("---\n", 2)[2].strip()
+    return (
+        f"{body}\n\n# Start\n\n"
+        f"Your first message from team-lead is in your inbox: call "
+        f'`opencode-teams_read_inbox(team_name="{team_name}", agent_name="{name}")` now.'
+    )
+
+
 def cleanup_agent_config(project_dir: Path, name: str) -> None:
     """Clean up agent config file when agent is killed or removed.
 
@@ -162,6 +242,50 @@ def cleanup_agent_config(project_dir: Path, name: str) -> None:
     """
     config_file = project_dir / ".opencode" / "agents" / f"{name}.md"
     config_file.unlink(missing_ok=True)
+    prompt_file_path(project_dir, name).unlink(missing_ok=True)
+
+
+def prompt_file_path(project_dir: Path, name: str) -> Path:
+    """Where a prompt too long for the command line is saved (see ``launch_prompt``)."""
+    return project_dir / ".opencode" / "prompts" / f"{name}.md"
+
+
+def _inline_prompt_max_bytes() -> int:
+    try:
+        value = os.environ.get(INLINE_PROMPT_MAX_BYTES_ENV_VAR, DEFAULT_INLINE_PROMPT_MAX_BYTES)
+        return max(0, int(value))
+    except ValueError:
+        return DEFAULT_INLINE_PROMPT_MAX_BYTES
+
+
+def launch_prompt(project_dir: Path, name: str, prompt: str) -> str:
+    """The message argument for an agent's ``opencode run`` command.
+
+    Prompts up to ``$OPENCODE_TEAMS_INLINE_PROMPT_MAX_BYTES`` (UTF-8, default
+    2048; 0 sends every prompt through a file) are returned unchanged. Longer
+    ones are written to ``prompt_file_path`` and replaced by a short
+    instruction to read that file, so the command line stays the same size
+    however large the prompt is. Called by the spawn step, which passes the
+    result to the command builders.
+
+    Args:
+        project_dir: Directory the agent's config is written to, so
+            ``cleanup_agent_config`` removes the file along with it
+        name: Agent name (used for the filename)
+        prompt: The agent's initial prompt
+
+    Returns:
+        The prompt itself, or the instruction pointing at its file
+    """
+    if len(prompt.encode("utf-8")) <= _inline_prompt_max_bytes():
+        return prompt
+    path = prompt_file_path(project_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(prompt, encoding="utf-8")
+    return (
+        f"You are {name}. Your assignment from team-lead is in {path}. "
+        "Read that whole file before doing anything else, then carry it out."
+    )
 
 
 def write_agent_config(
@@ -0,0 +1,199 @@
+"""Headless backend: ``opencode run --format json`` without a terminal.
+
+The agent runs as a direct child process of the server. A reader thread
+streams its stdout (one JSON event per line) into a per-agent log and
+records when events arrive, so health checks can use the process handle for
+liveness and event arrival for progress instead of scraping a pane.
+
+The log is appended to and never rotated: ``metrics`` reads it
+incrementally, and the health sweep empties it once it outgrows
+``$OPENCODE_TEAMS_OUTPUT_LOG_MAX_BYTES`` after its events were counted (see
+:func:`metrics.truncate_logs`), as for tmux pane logs.
+
+Headless agents live as long as the server: once the reader goes away, the
+agent's next write fails and it exits.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from opencode_teams import launcher
+from opencode_teams.models import TeammateMember
+
+class HeadlessAgent:
+    """A running headless agent and what its event stream has shown so far."""
+
+    def __init__(self, agent_id: str, proc: subprocess.Popen, log_path: Path) -> None:
+        self.agent_id = agent_id
+        self.proc = proc
+        self.log_path = log_path
+        self.started_at = time.time()
+        self.events = 0
+        self.last_event_at: float | None = None
+        self.last_event_type: str | None = None
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    def poll(self) -> int | None:
+        """Exit code, or None while the process is running."""
+        return self.proc.poll()
+
+    def _on_line(self, line: str) -> None:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return  # Not an event (e.g. stray stderr output); logged only
+        if not isinstance(event, dict):
+            return
+        self.events += 1
+        self.last_event_at = time.time()
+        self.last_event_type = event.get("type")
+
+
+_agents: dict[str, HeadlessAgent] = {}
+_agents_lock = threading.Lock()
+
+
+def build_headless_command(
+    member: TeammateMember, opencode_binary: str, timeout_seconds: int, message: str | None = None
+) -> list[str]:
+    """Argument list for ``opencode run`` (the headless twin of ``build_opencode_run_command``)."""
+    cmd = [
+        opencode_binary, "run",
+        "--agent", member.name,
+        "--model", member.model,
+        "--format", "json",
+        member.prompt if message is None else message,
+    ]
+    if member.resources is not None:
+        cmd = [*launcher.build_launcher_prefix(member.resources, member.cgroup), *cmd]
+    timeout_bin = shutil.which("timeout")
+    if timeout_bin:
+        cmd = [timeout_bin, str(timeout_seconds), *cmd]
+    return cmd
+
+
+def _open_log(agent_id: str, log_path: Path) -> logging.Logger:
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    logger = logging.getLogger(f"opencode_teams.headless.{agent_id}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    # Append mode, so writes continue at the new end after truncate_logs empties the file
+    handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    return logger
+
+
+def _pump(agent: HeadlessAgent, logger: logging.Logger) -> None:
+    try:
+        for raw in agent.proc.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip("\n")
+            logger.info(line)
+            agent._on_line(line)
+    except (OSError, ValueError):
+        pass  # Pipe closed
+    finally:
+        agent.proc.wait()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+
+
+def launch(
+    member: TeammateMember,
+    opencode_binary: str,
+    log_path: Path,
+    timeout_seconds: int,
+    message: str | None = None,
+) -> HeadlessAgent:
+    """Start a headless agent and begin streaming its events to ``log_path``.
+
+    ``message`` is the ``opencode run`` message (see ``config_gen.launch_prompt``);
+    defaults to ``member.prompt``.
+
+    Raises:
+        OSError: If the process cannot be started.
+    """
+    proc = subprocess.Popen(
+        build_headless_command(member, opencode_binary, timeout_seconds, message),
+        cwd=member.cwd,
+        env={**os.environ, **member.env} if member.env else None,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,  # Own process group, so stop() reaches children
+    )
+    agent = HeadlessAgent(member.agent_id, proc, log_path)
+    logger = _open_log(member.agent_id, log_path)
+    threading.Thread(
+        target=_pump, args=(agent, logger), daemon=True,
+        name=f"headless-{member.agent_id}",
+    ).start()
+    with _agents_lock:
+        _agents[member.agent_id] = agent
+    return agent
+
+
+def get_agent(agent_id: str) -> HeadlessAgent | None:
+    with _agents_lock:
+        return _agents.get(agent_id)
+
+
+def rebind(old_agent_id: str, new_agent_id: str) -> bool:
+    """Track a running agent under a new ID (a warm-pool standby taking on an identity).
+
+    Returns:
+        False if ``old_agent_id`` is not tracked by this server.
+    """
+    with _agents_lock:
+        agent = _agents.pop(old_agent_id, None)
+        if agent is None:
+            return False
+        agent.agent_id = new_agent_id
+        _agents[new_agent_id] = agent
+    return True
+
+
+def stop(agent_id: str, timeout: float = 5.0) -> bool:
+    """Terminate a headless agent's process group (SIGTERM, then SIGKILL).
+
+    Returns:
+        False if no such agent is tracked by this server.
+    """
+    with _agents_lock:
+        agent = _agents.pop(agent_id, None)
+    if agent is None:
+        return False
+    if agent.poll() is None:
+        _signal_group(agent.proc, signal.SIGTERM)
+        try:
+            agent.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _signal_group(agent.proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+            agent.proc.wait()
+    return True
+
+
+def _signal_group(proc: subprocess.Popen, sig: int) -> None:
+    try:
+        os.killpg(proc.pid, sig)
+    except (OSError, AttributeError):
+        try:
+            proc.send_signal(sig)
+        except OSError:
+            pass  # Already gone
@@ -0,0 +1,147 @@
+"""Background agent health monitoring with a cached status table.
+
+The server lifespan runs a loop that calls :meth:`HealthMonitor.sweep` for
+the active team on an adaptive interval: every ``MIN_INTERVAL_SECONDS``
+shortly after a spawn or whenever a status changed, backing off to
+``MAX_INTERVAL_SECONDS`` while the team is stable. The health tools read the
+latest statuses from the monitor instead of querying tmux on every call.
+
+Hung-detection state (content hash and last change time per agent) is kept
+in memory and written to ``health.json`` only when it changes.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+from opencode_teams import spawner, teams
+from opencode_teams.models import AgentHealthStatus
+
+MIN_INTERVAL_SECONDS = 2.0
+MAX_INTERVAL_SECONDS = 30.0
+FAST_WINDOW_SECONDS = spawner.DEFAULT_GRACE_PERIOD_SECONDS
+MAX_CACHE_AGE_SECONDS = 2 * MAX_INTERVAL_SECONDS
+
+
+class HealthMonitor:
+    """Status table and hung-detection state for the teams a server manages."""
+
+    def __init__(self, base_dir: Path | None = None) -> None:
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+        self._statuses: dict[str, dict[str, tuple[float, AgentHealthStatus]]] = {}
+        self._states: dict[str, dict] = {}
+        self._interval = MIN_INTERVAL_SECONDS
+        self._fast_until = 0.0
+        self.wake = threading.Event()
+
+    # -- scheduling --------------------------------------------------------
+
+    def next_interval(self) -> float:
+        """Seconds the background loop should wait before the next sweep."""
+        if time.monotonic() < self._fast_until:
+            return MIN_INTERVAL_SECONDS
+        return self._interval
+
+    def notify_spawn(self) -> None:
+        """Sweep at the fast interval while newly spawned agents start up."""
+        self._fast_until = time.monotonic() + FAST_WINDOW_SECONDS
+        self._interval = MIN_INTERVAL_SECONDS
+        self.wake.set()
+
+    # -- hung-detection state ------------------------------------------------
+
+    def _state(self, team_name: str) -> dict:
+        # Caller holds self._lock
+        state = self._states.get(team_name)
+        if state is None:
+            state = spawner.load_health_state(team_name, self._base_dir)
+            self._states[team_name] = state
+        return state
+
+    def agent_state(self, team_name: str, agent_name: str) -> dict:
+        """Return ``{"hash": ..., "last_change_time": ...}`` for one agent (may be empty)."""
+        with self._lock:
+            return dict(self._state(team_name).get(agent_name, {}))
+
+    def record(self, team_name: str, statuses: list[AgentHealthStatus]) -> bool:
+        """Store fresh statuses and persist hung-detection state if it changed.
+
+        Returns:
+            True if any agent's status differs from the previously stored one.
+        """
+        now = time.time()
+        with self._lock:
+            state = self._state(team_name)
+            table = self._statuses.setdefault(team_name, {})
+            state_changed = False
+            status_changed = False
+            for status in statuses:
+                name = status.agent_name
+                current_hash = status.last_content_hash
+                if current_hash is not None and state.get(name, {}).get("hash") != current_hash:
+                    state[name] = {"hash": current_hash, "last_change_time": now}
+                    state_changed = True
+                previous = table.get(name)
+                if previous is None or previous[1].status != status.status:
+                    status_changed = True
+                table[name] = (now, status)
+            if state_changed:
+                spawner.save_health_state(team_name, state, self._base_dir)
+        return status_changed
+
+    # -- sweeping and lookups ----------------------------------------------
+
+    def sweep(self, team_name: str) -> list[AgentHealthStatus]:
+        """Check every teammate of ``team_name`` and update the table.
+
+        Raises:
+            FileNotFoundError: If the team does not exist.
+        """
+        members = list(teams.read_config(team_name, self._base_dir).teammates)
+        with self._lock:
+            state = dict(self._state(team_name))
+        statuses = spawner.check_agents_health(members, state)
+        changed = self.record(team_name, statuses)
+        with self._lock:
+            # Drop agents that have left the team
+            table = self._statuses.get(team_name, {})
+            for name in set(table) - {m.name for m in members}:
+                del table[name]
+        self._interval = (
+            MIN_INTERVAL_SECONDS if changed
+            else min(MAX_INTERVAL_SECONDS, self._interval * 2)
+        )
+        return statuses
+
+    def cached(
+        self, team_name: str, agent_name: str, max_age: float = MAX_CACHE_AGE_SECONDS
+    ) -> tuple[AgentHealthStatus, float] | None:
+        """Return ``(status, age_seconds)`` if a recent enough status is cached."""
+        with self._lock:
+            entry = self._statuses.get(team_name, {}).get(agent_name)
+        if entry is None:
+            return None
+        age = time.time() - entry[0]
+        if age > max_age:
+            return None
+        return entry[1], age
+
+    def cached_team(
+        self, team_name: str, agent_names: list[str], max_age: float = MAX_CACHE_AGE_SECONDS
+    ) -> list[tuple[AgentHealthStatus, float]] | None:
+        """Return cached statuses for exactly ``agent_names``, or None if any is missing or stale."""
+        results = []
+        for name in agent_names:
+            entry = self.cached(team_name, name, max_age)
+            if entry is None:
+                return None
+            results.append(entry)
+        return results
+
+    def forget(self, team_name: str) -> None:
+        with self._lock:
+            self._statuses.pop(team_name, None)
+            self._states.pop(team_name, None)
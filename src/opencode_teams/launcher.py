@@ -0,0 +1,200 @@
+"""Resource-limiting launcher for agent processes.
+
+``python -m opencode_teams.launcher [options] -- command ...`` applies a
+teammate's :class:`~opencode_teams.models.ResourceLimits` to its own process
+and then execs ``command``, so the agent and everything its tools start
+inherit them: nice level, I/O priority (via ``ionice``), ``RLIMIT_AS`` and
+``RLIMIT_NPROC``, CPU affinity, and placement in a cgroup v2 group with
+``memory.max`` / ``cpu.max``.
+
+Every setting is best effort: one that cannot be applied (no cgroup
+delegation, no ``ionice`` binary, not Linux) is reported on stderr and the
+command still starts. This module must stay cheap to import; it runs in
+front of every limited agent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from opencode_teams.models import ResourceLimits
+
+CGROUP_ROOT_ENV_VAR = "OPENCODE_TEAMS_CGROUP_ROOT"
+CGROUP_MOUNT = Path("/sys/fs/cgroup")
+CPU_MAX_PERIOD_US = 100_000
+_IONICE_CLASSES = {"realtime": "1", "best-effort": "2", "idle": "3"}
+
+
+def launcher_args(limits: ResourceLimits, cgroup_path: str = "") -> list[str]:
+    """Command-line options for this launcher that apply ``limits``."""
+    args: list[str] = []
+    if limits.nice is not None:
+        args += ["--nice", str(limits.nice)]
+    if limits.ionice_class is not None:
+        args += ["--ionice-class", limits.ionice_class]
+    if limits.ionice_level is not None:
+        args += ["--ionice-level", str(limits.ionice_level)]
+    if limits.memory_limit_mb is not None:
+        args += ["--memory-mb", str(limits.memory_limit_mb)]
+    if limits.max_processes is not None:
+        args += ["--max-procs", str(limits.max_processes)]
+    if limits.cpu_affinity:
+        args += ["--cpus", ",".join(str(c) for c in limits.cpu_affinity)]
+    if cgroup_path:
+        args += ["--cgroup", cgroup_path]
+        if limits.cgroup_memory_max_mb is not None:
+            args += ["--cgroup-memory-mb", str(limits.cgroup_memory_max_mb)]
+        if limits.cgroup_cpu_max is not None:
+            args += ["--cgroup-cpus", str(limits.cgroup_cpu_max)]
+    return args
+
+
+def build_launcher_prefix(limits: ResourceLimits, cgroup_path: str = "") -> list[str]:
+    """Argument list to put in front of an agent command to run it under ``limits``."""
+    return [sys.executable, "-m", "opencode_teams.launcher", *launcher_args(limits, cgroup_path), "--"]
+
+
+def agent_cgroup_path(team_name: str, agent_name: str) -> str:
+    """cgroup v2 directory for an agent, or "" if cgroup v2 is not available.
+
+    Agents get their own group next to the server's (in the parent of the
+    server's cgroup, which systemd delegates to the user for user sessions),
+    or under ``$OPENCODE_TEAMS_CGROUP_ROOT`` when set.
+    """
+    root = os.environ.get(CGROUP_ROOT_ENV_VAR)
+    if not root:
+        try:
+            own = Path("/proc/self/cgroup").read_text()
+        except OSError:
+            return ""
+        rel = next((line[3:] for line in own.splitlines() if line.startswith("0::")), None)
+        if rel is None or not (CGROUP_MOUNT / "cgroup.controllers").exists():
+            return ""
+        root = str((CGROUP_MOUNT / rel.lstrip("/")).parent)
+    leaf = re.sub(r"[^A-Za-z0-9_-]", "_", f"opencode-teams-{team_name}-{agent_name}")
+    return str(Path(root) / leaf)
+
+
+def remove_cgroup(path: str) -> None:
+    """Remove an agent's (empty) cgroup directory; best effort."""
+    if not path:
+        return
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass  # Still has processes, already gone, or not ours to remove
+
+
+def _warn(message: str) -> None:
+    print(f"opencode-teams launcher: {message}", file=sys.stderr)
+
+
+def _join_cgroup(path: Path, memory_mb: int | None, cpus: float | None) -> None:
+    try:
+        path.mkdir(exist_ok=True)
+    except OSError as e:
+        _warn(f"cannot create cgroup {path}: {e}")
+        return
+    wanted = []
+    if memory_mb is not None:
+        wanted.append("+memory")
+    if cpus is not None:
+        wanted.append("+cpu")
+    if wanted:
+        try:
+            (path.parent / "cgroup.subtree_control").write_text(" ".join(wanted))
+        except OSError:
+            pass  # Already enabled, or not delegated (the writes below will say)
+    settings = []
+    if memory_mb is not None:
+        settings.append(("memory.max", str(memory_mb * 1024 * 1024)))
+    if cpus is not None:
+        settings.append(("cpu.max", f"{int(cpus * CPU_MAX_PERIOD_US)} {CPU_MAX_PERIOD_US}"))
+    settings.append(("cgroup.procs", str(os.getpid())))
+    for name, value in settings:
+        try:
+            (path / name).write_text(value)
+        except OSError as e:
+            _warn(f"cannot write {path / name}: {e}")
+
+
+def apply_limits(args: argparse.Namespace) -> None:
+    """Apply the parsed limits to the current process (best effort)."""
+    if args.cgroup:
+        _join_cgroup(Path(args.cgroup), args.cgroup_memory_mb, args.cgroup_cpus)
+    if args.nice is not None:
+        try:
+            # ResourceLimits.nice is a level, not an increment to the server's own
+            os.setpriority(os.PRIO_PROCESS, 0, args.nice)
+        except OSError as e:
+            _warn(f"cannot set nice {args.nice}: {e}")
+    if args.ionice_class is not None or args.ionice_level is not None:
+        ionice = shutil.which("ionice")
+        if ionice is None:
+            _warn("ionice not found; I/O priority unchanged")
+        else:
+            cmd = [ionice, "-c", _IONICE_CLASSES[args.ionice_class or "best-effort"]]
+            if args.ionice_level is not None and args.ionice_class != "idle":
+                cmd += ["-n", str(args.ionice_level)]
+            result = subprocess.run([*cmd, "-p", str(os.getpid())], capture_output=True, text=True)
+            if result.returncode != 0:
+                _warn(f"ionice failed: {result.stderr.strip()}")
+    try:
+        import resource
+    except ImportError:
+        resource = None  # Windows
+    for value, name in ((args.memory_mb, "RLIMIT_AS"), (args.max_procs, "RLIMIT_NPROC")):
+        if value is None:
+            continue
+        if resource is None or not hasattr(resource, name):
+            _warn(f"{name} is not supported on this platform")
+            continue
+        limit = value * 1024 * 1024 if name == "RLIMIT_AS" else value
+        try:
+            resource.setrlimit(getattr(resource, name), (limit, limit))
+        except (OSError, ValueError) as e:
+            _warn(f"cannot set {name}: {e}")
+    if args.cpus:
+        if not hasattr(os, "sched_setaffinity"):
+            _warn("CPU affinity is not supported on this platform")
+        else:
+            try:
+                os.sched_setaffinity(0, {int(c) for c in args.cpus.split(",")})
+            except (OSError, ValueError) as e:
+                _warn(f"cannot set CPU affinity {args.cpus}: {e}")
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m opencode_teams.launcher")
+    parser.add_argument("--nice", type=int)
+    parser.add_argument("--ionice-class", choices=sorted(_IONICE_CLASSES))
+    parser.add_argument("--ionice-level", type=int)
+    parser.add_argument("--memory-mb", type=int)
+    parser.add_argument("--max-procs", type=int)
+    parser.add_argument("--cpus")
+    parser.add_argument("--cgroup")
+    parser.add_argument("--cgroup-memory-mb", type=int)
+    parser.add_argument("--cgroup-cpus", type=float)
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parser().parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        _parser().error("no command given")
+    apply_limits(args)
+    os.execvp(command[0], command)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,11 @@ import json
 import time
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable
 
 from pydantic import BaseModel
 
+from opencode_teams import registry
 from opencode_teams._filelock import file_lock
 from opencode_teams.models import (
     InboxMessage,
@@ -61,14 +63,19 @@ def read_inbox(
             else:
                 result = list(all_msgs)
 
+            newly_read = 0
             if result:
                 for m in all_msgs:
                     if m in result:
+                        if not m.read:
+                            newly_read += 1
                         m.read = True
                 serialized = [m.model_dump(by_alias=True, exclude_none=True) for m in all_msgs]
                 path.write_text(json.dumps(serialized))
 
-            return result
+        if newly_read:
+            registry.adjust_unread(team_name, -newly_read, base_dir=base_dir)
+        return result
     else:
         raw_list = json.loads(path.read_text())
         all_msgs = [InboxMessage.model_validate(entry) for entry in raw_list]
@@ -78,6 +85,35 @@ def read_inbox(
         return list(all_msgs)
 
 
+def mark_read(
+    team_name: str,
+    agent_name: str,
+    match: Callable[[InboxMessage], bool],
+    base_dir: Path | None = None,
+) -> int:
+    """Mark the unread messages for which ``match`` is true as read, leaving the rest unread.
+
+    Returns:
+        Number of messages marked.
+    """
+    path = inbox_path(team_name, agent_name, base_dir)
+    if not path.exists():
+        return 0
+    with file_lock(path.parent / ".lock"):
+        all_msgs = [InboxMessage.model_validate(e) for e in json.loads(path.read_text())]
+        marked = 0
+        for m in all_msgs:
+            if not m.read and match(m):
+                m.read = True
+                marked += 1
+        if marked:
+            serialized = [m.model_dump(by_alias=True, exclude_none=True) for m in all_msgs]
+            path.write_text(json.dumps(serialized))
+    if marked:
+        registry.adjust_unread(team_name, -marked, base_dir=base_dir)
+    return marked
+
+
 def append_message(
     team_name: str,
     agent_name: str,
@@ -92,6 +128,9 @@ def append_message(
         raw_list.append(message.model_dump(by_alias=True, exclude_none=True))
         path.write_text(json.dumps(raw_list))
 
+    if not message.read:
+        registry.adjust_unread(team_name, 1, base_dir=base_dir)
+
 
 def send_plain_message(
     team_name: str,
@@ -0,0 +1,286 @@
+"""Per-agent token, cost and latency accounting.
+
+Every backend runs ``opencode run --format json``, so each agent's
+``output/<agent>.log`` (the pane pipe for tmux, the reader thread for
+headless) is a stream of JSON events. :func:`collect` reads each log from
+where the previous call stopped and folds the new events into running
+totals:
+
+- ``step_start`` opens a model request;
+- the first ``text``/``reasoning``/``tool_use`` event after it gives the
+  time to first token;
+- ``step_finish`` closes the request and carries its token counts and cost;
+- ``error`` is counted.
+
+Totals and the read cursor for every agent are stored in ``metrics.json``
+next to the team config, so repeated calls only parse new output. Departed
+agents keep their totals.
+
+Output logs grow for as long as the agent runs; the health sweep calls
+:func:`truncate_logs` to empty those over ``$OPENCODE_TEAMS_OUTPUT_LOG_MAX_BYTES``
+once their events are counted.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from opencode_teams import teams
+from opencode_teams._filelock import file_lock
+from opencode_teams.models import AgentMetrics
+
+_FIRST_TOKEN_EVENTS = ("text", "reasoning", "tool_use")
+
+OUTPUT_LOG_MAX_BYTES_ENV_VAR = "OPENCODE_TEAMS_OUTPUT_LOG_MAX_BYTES"
+DEFAULT_OUTPUT_LOG_MAX_BYTES = 16 * 1024 * 1024
+
+_SUMMED_FIELDS = (
+    "requests", "errors", "input_tokens", "output_tokens", "reasoning_tokens",
+    "cache_read_tokens", "cache_write_tokens", "cost", "step_latency_ms_total",
+    "timed_steps", "first_token_ms_total", "first_token_samples",
+)
+
+
+def metrics_path(team_name: str, base_dir: Path | None = None) -> Path:
+    teams_dir = (base_dir / "teams") if base_dir else teams.TEAMS_DIR
+    return teams_dir / team_name / "metrics.json"
+
+
+def _new_cursor() -> dict:
+    return {"offset": 0, "inode": None, "stepStartedAt": None, "firstTokenSeen": False}
+
+
+def load_metrics(team_name: str, base_dir: Path | None = None) -> dict:
+    """Return ``{"agents": {name: AgentMetrics}, "cursors": {name: dict}}``."""
+    path = metrics_path(team_name, base_dir)
+    try:
+        raw = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {"agents": {}, "cursors": {}}
+    return {
+        "agents": {
+            name: AgentMetrics.model_validate({**data, "agentName": name})
+            for name, data in raw.get("agents", {}).items()
+        },
+        "cursors": raw.get("cursors", {}),
+    }
+
+
+def _save_metrics(team_name: str, data: dict, base_dir: Path | None = None) -> None:
+    path = metrics_path(team_name, base_dir)
+    payload = {
+        "agents": {
+            name: m.model_dump(by_alias=True, exclude={"agent_name"})
+            for name, m in data["agents"].items()
+        },
+        "cursors": data["cursors"],
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        os.write(fd, json.dumps(payload, separators=(",", ":")).encode())
+        os.close(fd)
+        fd = -1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if fd >= 0:
+            os.close(fd)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _parse_event(line: bytes) -> dict | None:
+    # Pane logs can carry terminal noise (\r, escape sequences) around the JSON
+    start = line.find(b"{")
+    if start < 0:
+        return None
+    try:
+        event = json.loads(line[start:].strip().decode("utf-8", errors="replace"))
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def _int(value) -> int:
+    return int(value) if isinstance(value, (int, float)) else 0
+
+
+def apply_event(metrics: AgentMetrics, cursor: dict, event: dict) -> AgentMetrics:
+    """Fold one JSON event into ``metrics``; ``cursor`` tracks the open step."""
+    kind = event.get("type")
+    ts = event.get("timestamp")
+    ts = ts if isinstance(ts, (int, float)) else None
+    started = cursor.get("stepStartedAt")
+    update: dict = {}
+
+    if kind == "step_start":
+        cursor["stepStartedAt"] = ts
+        cursor["firstTokenSeen"] = False
+    elif kind in _FIRST_TOKEN_EVENTS:
+        if not cursor.get("firstTokenSeen"):
+            cursor["firstTokenSeen"] = True
+            if started is not None and ts is not None:
+                update["first_token_ms_total"] = metrics.first_token_ms_total + int(ts - started)
+                update["first_token_samples"] = metrics.first_token_samples + 1
+    elif kind == "step_finish":
+        part = event.get("part") if isinstance(event.get("part"), dict) else event
+        tokens = part.get("tokens") if isinstance(part.get("tokens"), dict) else {}
+        cache = tokens.get("cache") if isinstance(tokens.get("cache"), dict) else {}
+        update.update(
+            requests=metrics.requests + 1,
+            input_tokens=metrics.input_tokens + _int(tokens.get("input")),
+            output_tokens=metrics.output_tokens + _int(tokens.get("output")),
+            reasoning_tokens=metrics.reasoning_tokens + _int(tokens.get("reasoning")),
+            cache_read_tokens=metrics.cache_read_tokens + _int(cache.get("read")),
+            cache_write_tokens=metrics.cache_write_tokens + _int(cache.get("write")),
+        )
+        cost = part.get("cost")
+        if isinstance(cost, (int, float)):
+            update["cost"] = metrics.cost + cost
+        if started is not None and ts is not None:
+            latency = int(ts - started)
+            update["step_latency_ms_total"] = metrics.step_latency_ms_total + latency
+            update["step_latency_ms_max"] = max(metrics.step_latency_ms_max, latency)
+            update["timed_steps"] = metrics.timed_steps + 1
+        cursor["stepStartedAt"] = None
+        cursor["firstTokenSeen"] = False
+    elif kind == "error":
+        update["errors"] = metrics.errors + 1
+
+    return metrics.model_copy(update=update) if update else metrics
+
+
+def consume_log(log_path: Path, metrics: AgentMetrics, cursor: dict) -> AgentMetrics:
+    """Fold the complete lines appended to ``log_path`` since ``cursor`` into ``metrics``.
+
+    A log that shrank (truncation) or was replaced (rotation) is read again
+    from the start; a request that was open carries on in the new content.
+    """
+    try:
+        st = log_path.stat()
+    except OSError:
+        return metrics
+    if cursor.get("inode") != st.st_ino or st.st_size < cursor.get("offset", 0):
+        cursor.update(offset=0, inode=st.st_ino)
+    offset = cursor["offset"]
+    if st.st_size == offset:
+        return metrics
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(st.st_size - offset)
+    end = chunk.rfind(b"\n")
+    if end < 0:
+        return metrics  # No complete line yet
+    for line in chunk[:end].split(b"\n"):
+        event = _parse_event(line)
+        if event is not None:
+            metrics = apply_event(metrics, cursor, event)
+    cursor["offset"] = offset + end + 1
+    return metrics
+
+
+def collect(
+    team_name: str, base_dir: Path | None = None, truncate: frozenset[str] = frozenset()
+) -> list[AgentMetrics]:
+    """Parse new output for every teammate and return all agents' totals.
+
+    The logs of the agents named in ``truncate`` are emptied once read.
+
+    Raises:
+        FileNotFoundError: If the team does not exist.
+    """
+    config = teams.read_config(team_name, base_dir)
+    path = metrics_path(team_name, base_dir)
+    with file_lock(path.with_suffix(".lock")):
+        data = load_metrics(team_name, base_dir)
+        changed = False
+        for member in config.teammates:
+            if not member.output_log:
+                continue
+            metrics = data["agents"].get(member.name) or AgentMetrics(agent_name=member.name)
+            metrics = metrics.model_copy(update={"model": member.model})
+            cursor = data["cursors"].setdefault(member.name, _new_cursor())
+            before = dict(cursor)
+            updated = consume_log(Path(member.output_log), metrics, cursor)
+            if member.name in truncate:
+                try:
+                    # The pane pipe (cat >>) and the headless log both append,
+                    # so they go on writing at the new end
+                    os.truncate(member.output_log, 0)
+                    cursor["offset"] = 0
+                except OSError:
+                    pass  # Gone or unwritable; tried again on the next sweep
+            if updated != data["agents"].get(member.name) or cursor != before:
+                changed = True
+            data["agents"][member.name] = updated
+        if changed:
+            _save_metrics(team_name, data, base_dir)
+    return list(data["agents"].values())
+
+
+def output_log_max_bytes() -> int:
+    try:
+        value = os.environ.get(OUTPUT_LOG_MAX_BYTES_ENV_VAR, DEFAULT_OUTPUT_LOG_MAX_BYTES)
+        return max(0, int(value))
+    except ValueError:
+        return DEFAULT_OUTPUT_LOG_MAX_BYTES
+
+
+def truncate_logs(
+    team_name: str, base_dir: Path | None = None, max_bytes: int | None = None
+) -> list[str]:
+    """Empty the output logs of ``team_name`` that grew past ``max_bytes``.
+
+    Each log's complete lines are folded into the totals first, under the
+    metrics lock, so only output written between that read and the
+    truncation is lost. ``max_bytes`` defaults to
+    ``$OPENCODE_TEAMS_OUTPUT_LOG_MAX_BYTES`` (16 MiB; 0 disables).
+
+    Returns:
+        Names of the agents whose logs were emptied.
+
+    Raises:
+        FileNotFoundError: If the team does not exist.
+    """
+    limit = output_log_max_bytes() if max_bytes is None else max_bytes
+    if not limit:
+        return []
+    oversized = []
+    for member in teams.read_config(team_name, base_dir).teammates:
+        if not member.output_log:
+            continue
+        try:
+            if os.stat(member.output_log).st_size > limit:
+                oversized.append(member.name)
+        except OSError:
+            continue
+    if oversized:
+        collect(team_name, base_dir, truncate=frozenset(oversized))
+    return oversized
+
+
+def by_model(agent_metrics: list[AgentMetrics]) -> dict[str, AgentMetrics]:
+    """Sum per-agent totals by model (``agent_name`` is left empty)."""
+    totals: dict[str, AgentMetrics] = {}
+    for m in agent_metrics:
+        current = totals.get(m.model) or AgentMetrics(agent_name="", model=m.model)
+        update = {field: getattr(current, field) + getattr(m, field) for field in _SUMMED_FIELDS}
+        update["step_latency_ms_max"] = max(current.step_latency_ms_max, m.step_latency_ms_max)
+        totals[m.model] = current.model_copy(update=update)
+    return totals
+
+
+def summarize(metrics: AgentMetrics) -> dict:
+    """Dump ``metrics`` with averaged latencies added (milliseconds, None without samples)."""
+    data = metrics.model_dump(by_alias=True)
+    data["avgStepLatencyMs"] = (
+        metrics.step_latency_ms_total / metrics.timed_steps if metrics.timed_steps else None
+    )
+    data["avgTimeToFirstTokenMs"] = (
+        metrics.first_token_ms_total / metrics.first_token_samples
+        if metrics.first_token_samples else None
+    )
+    return data
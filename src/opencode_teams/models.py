@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import time
 import uuid
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any, Literal
 
 from typing import Annotated, Union
 
-from pydantic import BaseModel, Discriminator, Field, Tag
+from pydantic import BaseModel, Discriminator, Field, PrivateAttr, Tag
 
 COLOR_PALETTE: list[str] = [
     "blue", "green", "yellow", "purple",
@@ -27,6 +29,52 @@ class LeadMember(BaseModel):
     subscriptions: list = Field(default_factory=list)
 
 
+class ResourceLimits(BaseModel):
+    """Per-agent resource settings, applied by ``opencode_teams.launcher``.
+
+    ``memory_limit_mb`` is ``RLIMIT_AS`` (virtual address space) and
+    ``max_processes`` is ``RLIMIT_NPROC`` (counted per user, not per agent);
+    the cgroup settings cap actual memory use and CPU time per agent where a
+    cgroup v2 group can be created.
+    """
+
+    model_config = {"populate_by_name": True}
+
+    nice: int | None = Field(default=None, ge=-20, le=19)
+    ionice_class: Literal["realtime", "best-effort", "idle"] | None = Field(
+        alias="ioniceClass", default=None
+    )
+    ionice_level: int | None = Field(alias="ioniceLevel", default=None, ge=0, le=7)
+    memory_limit_mb: int | None = Field(alias="memoryLimitMb", default=None, gt=0)
+    max_processes: int | None = Field(alias="maxProcesses", default=None, gt=0)
+    cpu_affinity: list[int] | None = Field(alias="cpuAffinity", default=None)
+    cgroup_memory_max_mb: int | None = Field(alias="cgroupMemoryMaxMb", default=None, gt=0)
+    cgroup_cpu_max: float | None = Field(alias="cgroupCpuMax", default=None, gt=0)  # In CPUs
+
+    @property
+    def wants_cgroup(self) -> bool:
+        return self.cgroup_memory_max_mb is not None or self.cgroup_cpu_max is not None
+
+
+class RestartPolicy(BaseModel):
+    """Opt-in supervisor policy: restart a teammate whose process died.
+
+    A death within ``crash_loop_seconds`` of a (re)start is a quick death;
+    after ``n`` quick deaths in a row the restart waits
+    ``backoff_seconds * 2**n`` (at most ``max_backoff_seconds``).
+    ``crash_loop_limit`` quick deaths in a row stop the supervisor, as does
+    using up ``max_restarts``.
+    """
+
+    model_config = {"populate_by_name": True}
+
+    max_restarts: int = Field(alias="maxRestarts", default=3, ge=0)
+    backoff_seconds: float = Field(alias="backoffSeconds", default=5.0, gt=0)
+    max_backoff_seconds: float = Field(alias="maxBackoffSeconds", default=300.0, gt=0)
+    crash_loop_seconds: float = Field(alias="crashLoopSeconds", default=60.0, ge=0)
+    crash_loop_limit: int = Field(alias="crashLoopLimit", default=3, ge=1)
+
+
 class TeammateMember(BaseModel):
     model_config = {"populate_by_name": True}
 
@@ -44,6 +92,17 @@ class TeammateMember(BaseModel):
     backend_type: str = Field(alias="backendType", default="tmux")
     process_id: int = Field(alias="processId", default=0)
     is_active: bool = Field(alias="isActive", default=False)
+    output_log: str = Field(alias="outputLog", default="")
+    tmux_session: str = Field(alias="tmuxSession", default="")
+    tmux_window: str = Field(alias="tmuxWindow", default="")  # Window index in tmux_session
+    resources: ResourceLimits | None = None
+    cgroup: str = ""  # cgroup v2 directory the launcher placed the agent in
+    restart_policy: RestartPolicy | None = Field(alias="restartPolicy", default=None)
+    restart_count: int = Field(alias="restartCount", default=0)
+    worktree: str = ""  # Root of the agent's own git worktree ("" = shared project directory)
+    branch: str = ""  # Branch checked out in ``worktree``
+    base_branch: str = Field(alias="baseBranch", default="")  # What ``branch`` was created from
+    env: dict[str, str] = Field(default_factory=dict)  # Extra environment for the agent process
 
 
 def _discriminate_member(v: Any) -> str:
@@ -64,7 +123,15 @@ MemberUnion = Annotated[
 
 
 class TeamConfig(BaseModel):
-    model_config = {"populate_by_name": True}
+    """Team configuration as stored in ``config.json``.
+
+    Frozen (with a tuple of members) so that instances handed out by the
+    config cache in ``teams.read_config`` can be shared safely. Members must
+    not be mutated in place either; derive modified copies with
+    ``model_copy(update=...)``.
+    """
+
+    model_config = {"populate_by_name": True, "frozen": True}
 
     name: str
     description: str = ""
@@ -72,7 +139,46 @@ class TeamConfig(BaseModel):
     lead_agent_id: str = Field(alias="leadAgentId")
     lead_session_id: str = Field(alias="leadSessionId")
     project_dir: str | None = Field(alias="projectDir", default=None)
-    members: list[MemberUnion]
+    members: tuple[MemberUnion, ...]
+
+    # Name index over ``members``, built once per members tuple. The tuple it
+    # was built from is kept so copies made with ``model_copy(update=...)``
+    # notice their members changed and rebuild.
+    _indexed_members: tuple | None = PrivateAttr(default=None)
+    _member_index: Mapping[str, LeadMember | TeammateMember] = PrivateAttr(
+        default_factory=dict
+    )
+    _teammates: tuple[TeammateMember, ...] = PrivateAttr(default=())
+
+    def model_post_init(self, __context: Any) -> None:
+        self._build_member_index()
+
+    def _build_member_index(self) -> None:
+        members = self.members
+        self._member_index = MappingProxyType({m.name: m for m in members})
+        self._teammates = tuple(m for m in members if isinstance(m, TeammateMember))
+        self._indexed_members = members
+
+    @property
+    def member_index(self) -> Mapping[str, LeadMember | TeammateMember]:
+        """Read-only mapping of member name to member."""
+        if self._indexed_members is not self.members:
+            self._build_member_index()
+        return self._member_index
+
+    @property
+    def teammates(self) -> tuple[TeammateMember, ...]:
+        """All non-lead members, in join order."""
+        if self._indexed_members is not self.members:
+            self._build_member_index()
+        return self._teammates
+
+    def get_member(self, name: str) -> LeadMember | TeammateMember | None:
+        return self.member_index.get(name)
+
+    def get_teammate(self, name: str) -> TeammateMember | None:
+        member = self.member_index.get(name)
+        return member if isinstance(member, TeammateMember) else None
 
 
 class TaskFile(BaseModel):
@@ -153,11 +259,64 @@ class TeamDeleteResult(BaseModel):
     team_name: str
 
 
+class TeamSummary(BaseModel):
+    """Registry entry summarizing one team (see ``registry.py``)."""
+
+    model_config = {"populate_by_name": True}
+
+    name: str
+    created_at: int = Field(alias="createdAt", default=0)
+    member_count: int = Field(alias="memberCount", default=0)
+    task_counts: dict[str, int] = Field(alias="taskCounts", default_factory=dict)
+    unread_count: int = Field(alias="unreadCount", default=0)
+    last_activity: int = Field(alias="lastActivity", default=0)
+
+
 class SpawnResult(BaseModel):
     agent_id: str
     name: str
     team_name: str
     message: str = "The agent is now running and will receive instructions via mailbox."
+    status: Literal["running", "queued"] = "running"
+    queue_id: str | None = None
+    queue_position: int | None = None
+    timings: dict[str, float] | None = None  # Milliseconds per spawn step (see spawner.SpawnTimer)
+    backend: str | None = None  # Backend the agent runs on (backend="auto" resolved)
+    warning: str | None = None
+
+
+class TeammateSpec(BaseModel):
+    """One teammate in a batch spawn request (``spawn_team`` / ``spawner.spawn_many``)."""
+
+    name: str
+    prompt: str
+    instructions: str = ""
+    model: str = "auto"
+    reasoning_effort: Literal["none", "low", "medium", "high", "xhigh"] | None = None
+    prefer_speed: bool = False
+    plan_mode_required: bool = False
+    resources: ResourceLimits | None = None
+    restart_policy: RestartPolicy | None = None
+    worktree: bool = False
+    build_cache: bool = False
+
+
+class SpawnTeamResult(BaseModel):
+    team_name: str
+    spawned: list[SpawnResult]
+    queued: list[SpawnResult] = Field(default_factory=list)
+    failed: dict[str, str] = Field(default_factory=dict)
+    backend: str | None = None  # Backend the agents run on (backend="auto" resolved)
+    warning: str | None = None
+
+
+class TeamShutdownResult(BaseModel):
+    team_name: str
+    graceful: list[str]  # Approved the shutdown request before the deadline
+    forced: list[str]  # Killed at the deadline
+    tasks_released: int
+    queued_dropped: int
+    elapsed_seconds: float
 
 
 class SendMessageResult(BaseModel):
@@ -176,6 +335,30 @@ class AgentHealthStatus(BaseModel):
     status: Literal["alive", "dead", "hung", "unknown"]
     last_content_hash: str | None = Field(alias="lastContentHash", default=None)
     detail: str = ""
+    age_seconds: float | None = Field(alias="ageSeconds", default=None)
+    exit_code: int | None = Field(alias="exitCode", default=None)  # Of a dead process, where known
+
+
+class AgentMetrics(BaseModel):
+    """Running token, cost and latency totals for one agent (see ``metrics``)."""
+
+    model_config = {"populate_by_name": True}
+
+    agent_name: str = Field(alias="agentName")
+    model: str = ""
+    requests: int = 0
+    errors: int = 0
+    input_tokens: int = Field(alias="inputTokens", default=0)
+    output_tokens: int = Field(alias="outputTokens", default=0)
+    reasoning_tokens: int = Field(alias="reasoningTokens", default=0)
+    cache_read_tokens: int = Field(alias="cacheReadTokens", default=0)
+    cache_write_tokens: int = Field(alias="cacheWriteTokens", default=0)
+    cost: float = 0.0
+    step_latency_ms_total: int = Field(alias="stepLatencyMsTotal", default=0)
+    step_latency_ms_max: int = Field(alias="stepLatencyMsMax", default=0)
+    timed_steps: int = Field(alias="timedSteps", default=0)
+    first_token_ms_total: int = Field(alias="firstTokenMsTotal", default=0)
+    first_token_samples: int = Field(alias="firstTokenSamples", default=0)
 
 
 class ModelInfo(BaseModel):
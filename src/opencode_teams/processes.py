@@ -0,0 +1,251 @@
+"""Registry of agent processes the server started with ``Popen``.
+
+The desktop and Windows terminal backends only hand a PID back to the
+caller. Without the ``Popen`` handle nobody waits on the child, so exited
+agents linger as zombies, and ``os.kill(pid, 0)`` keeps reporting them
+alive. :func:`track` keeps the handle; a daemon reaper thread waits for
+exits (on a pidfd per child where Linux provides ``os.pidfd_open``,
+otherwise by polling every ``REAP_INTERVAL_SECONDS``) and records each exit
+code for health checks.
+
+:func:`terminate` stops a whole process tree: SIGTERM to the child's
+process group, then SIGKILL once ``timeout`` has passed (``taskkill /T``
+on Windows), so grandchildren such as language servers and test runners go
+with it. That needs the ``Popen`` handle, which proves the PID still
+belongs to our child. PIDs this server did not start (e.g. from an earlier
+server process) may have been reused since, so only that single PID is
+signalled, as before process trees were handled.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+REAP_INTERVAL_SECONDS = 1.0
+TERMINATE_TIMEOUT_SECONDS = 5.0
+MAX_EXITED = 256  # Exited entries kept for health checks, oldest dropped first
+
+
+class TrackedProcess:
+    """A child process and, once reaped, how it ended."""
+
+    __slots__ = ("proc", "pid", "started_at", "returncode", "exited_at", "pidfd")
+
+    def __init__(self, proc: subprocess.Popen) -> None:
+        self.proc = proc
+        self.pid = proc.pid
+        self.started_at = time.time()
+        self.returncode: int | None = None
+        self.exited_at: float | None = None
+        self.pidfd: int | None = None
+
+
+_lock = threading.Lock()
+_tracked: OrderedDict[int, TrackedProcess] = OrderedDict()
+_reaper: threading.Thread | None = None
+_wake_r: int | None = None
+_wake_w: int | None = None
+
+
+def _open_pidfd(pid: int) -> int | None:
+    if not hasattr(os, "pidfd_open"):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        return None  # Kernel without pidfd support, or already reaped
+
+
+def _close_pidfd(entry: TrackedProcess) -> None:
+    if entry.pidfd is not None:
+        try:
+            os.close(entry.pidfd)
+        except OSError:
+            pass
+        entry.pidfd = None
+
+
+def _ensure_reaper() -> None:
+    # Caller holds _lock
+    global _reaper, _wake_r, _wake_w
+    if _reaper is not None and _reaper.is_alive():
+        return
+    if _wake_r is None and sys.platform != "win32":
+        _wake_r, _wake_w = os.pipe()
+        os.set_blocking(_wake_r, False)
+    _reaper = threading.Thread(target=_reap_loop, name="opencode-teams-reaper", daemon=True)
+    _reaper.start()
+
+
+def _wake() -> None:
+    if _wake_w is not None:
+        try:
+            os.write(_wake_w, b"x")
+        except OSError:
+            pass  # Pipe full: the reaper is already due to wake
+
+
+def _reap_loop() -> None:
+    while True:
+        with _lock:
+            fds = [e.pidfd for e in _tracked.values() if e.returncode is None and e.pidfd is not None]
+        if _wake_r is not None:
+            try:
+                select.select([_wake_r, *fds], [], [], REAP_INTERVAL_SECONDS)
+            except (OSError, ValueError):
+                time.sleep(REAP_INTERVAL_SECONDS)
+            try:
+                while os.read(_wake_r, 512):
+                    pass
+            except OSError:
+                pass  # Drained
+        else:
+            time.sleep(REAP_INTERVAL_SECONDS)
+        reap()
+
+
+def track(proc: subprocess.Popen) -> int:
+    """Keep ``proc``'s handle so its exit is reaped and recorded. Returns its PID."""
+    entry = TrackedProcess(proc)
+    entry.pidfd = _open_pidfd(proc.pid)
+    with _lock:
+        previous = _tracked.pop(entry.pid, None)
+        if previous is not None:
+            _close_pidfd(previous)  # PID reused after an earlier child was reaped
+        _tracked[entry.pid] = entry
+        _ensure_reaper()
+    _wake()
+    return entry.pid
+
+
+def reap() -> list[tuple[int, int]]:
+    """Collect the exit status of every tracked child that has exited.
+
+    Returns:
+        ``(pid, returncode)`` for each child reaped by this call.
+    """
+    with _lock:
+        running = [e for e in _tracked.values() if e.returncode is None]
+    reaped = []
+    for entry in running:
+        code = entry.proc.poll()
+        if code is None:
+            continue
+        with _lock:
+            entry.returncode = code
+            entry.exited_at = time.time()
+            _close_pidfd(entry)
+        reaped.append((entry.pid, code))
+    if reaped:
+        with _lock:
+            exited = [pid for pid, e in _tracked.items() if e.returncode is not None]
+            for pid in exited[:max(0, len(exited) - MAX_EXITED)]:
+                del _tracked[pid]
+    return reaped
+
+
+def lookup(pid: int) -> TrackedProcess | None:
+    """The tracked child with this PID (None if this server did not start it)."""
+    with _lock:
+        return _tracked.get(pid)
+
+
+def exit_code(pid: int) -> int | None:
+    """Exit code of a tracked child, reaping it if it has just exited.
+
+    Returns None while the child runs or if ``pid`` is not tracked; use
+    :func:`lookup` to tell the two apart.
+    """
+    entry = lookup(pid)
+    if entry is None:
+        return None
+    if entry.returncode is None:
+        reap()
+    return entry.returncode
+
+
+def _leads_group(pid: int) -> bool:
+    try:
+        return os.getpgid(pid) == pid
+    except (OSError, AttributeError):
+        return False
+
+
+def _send(pid: int, sig: int, group: bool) -> bool:
+    try:
+        if group:
+            os.killpg(pid, sig)
+        else:
+            os.kill(pid, sig)
+        return True
+    except (OSError, SystemError):
+        return False  # Already gone
+
+
+def _gone(pid: int, entry: TrackedProcess | None) -> bool:
+    if entry is not None:
+        return entry.proc.poll() is not None
+    try:
+        os.kill(pid, 0)
+        return False
+    except (OSError, SystemError):
+        return True
+
+
+def terminate(pid: int, timeout: float = TERMINATE_TIMEOUT_SECONDS) -> None:
+    """Stop ``pid``: SIGTERM, then SIGKILL after ``timeout``.
+
+    The process tree goes with it only if ``pid`` is a tracked child; an
+    untracked PID is signalled on its own. Does not raise if the process is
+    already gone.
+    """
+    if pid <= 0:
+        return
+    entry = lookup(pid)
+    if entry is not None and entry.proc.poll() is not None:
+        reap()
+        return  # Reaped already; the PID may belong to another process by now
+    if sys.platform == "win32":
+        tree = ["/T"] if entry is not None else []
+        subprocess.run(
+            ["taskkill", *tree, "/F", "/PID", str(pid)],
+            capture_output=True,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+    else:
+        group = entry is not None and _leads_group(pid)
+        if not _send(pid, signal.SIGTERM, group):
+            reap()
+            return
+        deadline = time.monotonic() + timeout
+        while not _gone(pid, entry) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if group:
+            # Grandchildren can outlive the leader; the group goes in any case
+            _send(pid, signal.SIGKILL, True)
+        elif not _gone(pid, entry):
+            _send(pid, signal.SIGKILL, False)
+    if entry is not None:
+        try:
+            entry.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass  # Unkillable (e.g. stuck in D state); the reaper keeps trying
+    reap()
+
+
+def status() -> dict:
+    with _lock:
+        running = sum(1 for e in _tracked.values() if e.returncode is None)
+        return {
+            "tracked": len(_tracked),
+            "running": running,
+            "exited": len(_tracked) - running,
+            "pidfd": hasattr(os, "pidfd_open"),
+        }
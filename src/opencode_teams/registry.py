@@ -0,0 +1,219 @@
+"""Global team registry.
+
+Maintains ``~/.opencode-teams/registry.json``, a single summary file with one
+entry per team (creation time, member count, task counts by status, unread
+inbox total, last activity). Write paths in ``teams``, ``tasks`` and
+``messaging`` update it incrementally so listing teams never has to open
+per-team files. Teams missing from the registry are scanned from disk once
+and the result is stored.
+
+Registry updates are best-effort: a failure to update the summary never fails
+the underlying team, task or message operation.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from opencode_teams import teams
+from opencode_teams._filelock import file_lock
+from opencode_teams.models import TeamConfig, TeamSummary
+
+REGISTRY_VERSION = 3  # 3: task and unread counts back in registry.json
+
+_TASK_STATUSES = ("pending", "in_progress", "completed")
+
+
+def _base_dir(base_dir: Path | None = None) -> Path:
+    return base_dir if base_dir else teams.TEAMS_DIR.parent
+
+
+def registry_path(base_dir: Path | None = None) -> Path:
+    return _base_dir(base_dir) / "registry.json"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _unread_in(inbox: Path) -> int:
+    try:
+        msgs = json.loads(inbox.read_text())
+    except (OSError, ValueError):
+        return 0
+    return sum(1 for m in msgs if not m.get("read", False))
+
+
+def _scan_team(name: str, base_dir: Path | None = None) -> dict | None:
+    """Build a registry entry for one team from its on-disk files.
+
+    Only used to seed entries missing from the registry (teams created before
+    the registry existed); regular updates are incremental.
+    """
+    root = _base_dir(base_dir)
+    config_path = root / "teams" / name / "config.json"
+    try:
+        raw_config = json.loads(config_path.read_text())
+        mtime = config_path.stat().st_mtime
+    except (OSError, ValueError):
+        return None
+
+    entry = {
+        "name": name,
+        "createdAt": raw_config.get("createdAt", 0),
+        "memberCount": len(raw_config.get("members", [])),
+        "taskCounts": {s: 0 for s in _TASK_STATUSES},
+        "unreadCount": 0,
+        "lastActivity": int(mtime * 1000),
+    }
+    for f in (root / "tasks" / name).glob("*.json"):
+        try:
+            int(f.stem)
+            status = json.loads(f.read_text()).get("status", "pending")
+        except (ValueError, OSError):
+            continue
+        if status in entry["taskCounts"]:
+            entry["taskCounts"][status] += 1
+    for f in (root / "teams" / name / "inboxes").glob("*.json"):
+        entry["unreadCount"] += _unread_in(f)
+    return entry
+
+
+def _load(base_dir: Path | None = None) -> dict:
+    path = registry_path(base_dir)
+    if path.exists():
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") == REGISTRY_VERSION:
+                return data
+        except ValueError:
+            pass
+    # Missing or unreadable registry: rebuild once from the team directories
+    entries = {}
+    teams_dir = _base_dir(base_dir) / "teams"
+    if teams_dir.is_dir():
+        for team_dir in teams_dir.iterdir():
+            entry = _scan_team(team_dir.name, base_dir)
+            if entry is not None:
+                entries[team_dir.name] = entry
+    return {"version": REGISTRY_VERSION, "teams": entries}
+
+
+def _store(data: dict, base_dir: Path | None = None) -> None:
+    path = registry_path(base_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        os.write(fd, json.dumps(data).encode())
+        os.close(fd)
+        fd = -1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if fd >= 0:
+            os.close(fd)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _update(
+    team_name: str,
+    fn: Callable[[dict], None] | None,
+    base_dir: Path | None = None,
+) -> None:
+    """Apply ``fn`` to a team's entry under the registry lock (``None`` removes it)."""
+    lock_path = _base_dir(base_dir) / ".registry.lock"
+    try:
+        with file_lock(lock_path):
+            data = _load(base_dir)
+            entries = data["teams"]
+            if fn is None:
+                if entries.pop(team_name, None) is None:
+                    return
+            else:
+                entry = entries.get(team_name)
+                if entry is None:
+                    # Seed from disk, where the change being recorded already is;
+                    # skip names that are not (or no longer) teams
+                    entry = _scan_team(team_name, base_dir)
+                    if entry is None:
+                        return
+                    entries[team_name] = entry
+                else:
+                    fn(entry)
+                entry["lastActivity"] = _now_ms()
+            _store(data, base_dir)
+    except (OSError, ValueError):
+        pass  # Best effort: the registry is a derived summary
+
+
+def record_config(team_name: str, config: TeamConfig, base_dir: Path | None = None) -> None:
+    """Record creation time and member count after a team config write."""
+    def _apply(entry: dict) -> None:
+        entry["createdAt"] = config.created_at
+        entry["memberCount"] = len(config.members)
+
+    _update(team_name, _apply, base_dir)
+
+
+def adjust_task_counts(
+    team_name: str, deltas: dict[str, int], base_dir: Path | None = None
+) -> None:
+    """Apply per-status task count deltas (e.g. ``{"pending": -1, "in_progress": 1}``)."""
+    def _apply(entry: dict) -> None:
+        counts = entry.setdefault("taskCounts", {})
+        for status, delta in deltas.items():
+            counts[status] = max(0, counts.get(status, 0) + delta)
+
+    _update(team_name, _apply, base_dir)
+
+
+def adjust_unread(team_name: str, delta: int, base_dir: Path | None = None) -> None:
+    """Apply a delta to the team's total unread inbox message count."""
+    def _apply(entry: dict) -> None:
+        entry["unreadCount"] = max(0, entry.get("unreadCount", 0) + delta)
+
+    _update(team_name, _apply, base_dir)
+
+
+def forget_members(team_name: str, names: Iterable[str], base_dir: Path | None = None) -> None:
+    """Stop counting the unread messages of members removed from the team."""
+    inboxes = _base_dir(base_dir) / "teams" / team_name / "inboxes"
+    unread = sum(_unread_in(inboxes / f"{name}.json") for name in names)
+    if unread:
+        adjust_unread(team_name, -unread, base_dir)
+
+
+def unregister_team(team_name: str, base_dir: Path | None = None) -> None:
+    _update(team_name, None, base_dir)
+
+
+def _read(base_dir: Path | None = None) -> dict:
+    """Read the registry, rebuilding and storing it once if missing or outdated."""
+    try:
+        data = json.loads(registry_path(base_dir).read_text())
+    except (OSError, ValueError):
+        data = {}
+    if data.get("version") != REGISTRY_VERSION:
+        lock_path = _base_dir(base_dir) / ".registry.lock"
+        with file_lock(lock_path):
+            data = _load(base_dir)
+            _store(data, base_dir)
+    return data
+
+
+def list_team_summaries(base_dir: Path | None = None) -> list[TeamSummary]:
+    """Return all registered teams, most recently active first."""
+    summaries = [TeamSummary.model_validate(e) for e in _read(base_dir)["teams"].values()]
+    summaries.sort(key=lambda s: s.last_activity, reverse=True)
+    return summaries
+
+
+def get_team_summary(team_name: str, base_dir: Path | None = None) -> TeamSummary | None:
+    entry = _read(base_dir)["teams"].get(team_name)
+    return TeamSummary.model_validate(entry) if entry is not None else None
@@ -0,0 +1,246 @@
+"""Per-agent CPU, memory and I/O usage sampled from /proc.
+
+Each agent's process tree is walked from its ``process_id`` (desktop and
+headless backends) or its tmux pane's ``#{pane_pid}``, following
+``/proc/<pid>/task/<tid>/children``. For every process in the tree the
+sampler reads ``stat`` (CPU ticks, including reaped children), ``status``
+(``VmRSS``) and ``io`` (bytes read and written; unreadable for processes of
+other users). CPU% is the tick delta between two samples of the same agent
+over the wall time between them, so the first sample of an agent has none.
+
+The server lifespan samples the active team every ``interval`` seconds; each
+agent keeps the last ``history_size`` samples in a ring buffer.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+
+from opencode_teams import spawner, teams
+from opencode_teams.models import TeammateMember
+
+INTERVAL_ENV_VAR = "OPENCODE_TEAMS_RESOURCE_SAMPLE_INTERVAL"
+DEFAULT_INTERVAL_SECONDS = 10.0
+DEFAULT_HISTORY_SIZE = 30
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = 100  # Linux default; /proc is unavailable elsewhere anyway
+
+
+class TreeUsage(NamedTuple):
+    """Summed usage of a process and its live descendants at one instant."""
+
+    processes: int
+    cpu_seconds: float  # utime + stime (+ cutime + cstime of reaped children)
+    rss_kb: int
+    read_bytes: int | None  # None if no process's io file was readable
+    write_bytes: int | None
+
+
+class ResourceSample(NamedTuple):
+    timestamp: float
+    pid: int
+    processes: int
+    cpu_percent: float | None
+    rss_mb: float
+    read_bytes: int | None
+    write_bytes: int | None
+    cpu_seconds: float
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": round(self.timestamp, 3),
+            "pid": self.pid,
+            "processes": self.processes,
+            "children": self.processes - 1,
+            "cpuPercent": None if self.cpu_percent is None else round(self.cpu_percent, 1),
+            "rssMb": round(self.rss_mb, 1),
+            "readBytes": self.read_bytes,
+            "writeBytes": self.write_bytes,
+        }
+
+
+def _read_stat_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        data = f.read()
+    # comm (field 2) may contain spaces; the remaining fields follow its ")"
+    fields = data[data.rindex(")") + 2:].split()
+    utime, stime, cutime, cstime = (int(v) for v in fields[11:15])
+    return (utime + stime + cutime + cstime) / _CLOCK_TICKS
+
+
+def _read_rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0  # Kernel threads and zombies have no VmRSS
+
+
+def _read_io(pid: int) -> tuple[int, int] | None:
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            values = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(values["read_bytes"]), int(values["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None  # Other user's process, or io accounting disabled
+
+
+def _children(pid: int) -> list[int]:
+    children: list[int] = []
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return children
+
+
+def process_tree_usage(pid: int) -> TreeUsage | None:
+    """Usage of ``pid`` and its descendants, or None if ``pid`` is gone or /proc is unavailable."""
+    processes = 0
+    cpu = 0.0
+    rss = 0
+    read_bytes = write_bytes = 0
+    io_seen = False
+    pending = [pid]
+    seen: set[int] = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            cpu += _read_stat_seconds(current)
+            rss += _read_rss_kb(current)
+        except (OSError, ValueError, IndexError):
+            if current == pid:
+                return None
+            continue  # Exited while walking the tree
+        processes += 1
+        io = _read_io(current)
+        if io is not None:
+            io_seen = True
+            read_bytes += io[0]
+            write_bytes += io[1]
+        pending.extend(_children(current))
+    return TreeUsage(
+        processes=processes,
+        cpu_seconds=cpu,
+        rss_kb=rss,
+        read_bytes=read_bytes if io_seen else None,
+        write_bytes=write_bytes if io_seen else None,
+    )
+
+
+def agent_root_pid(member: TeammateMember, panes: dict[str, spawner.PaneState] | None) -> int | None:
+    """Root process of an agent: its own PID, or the PID running in its tmux pane."""
+    if member.process_id:
+        return member.process_id
+    if member.tmux_pane_id and panes:
+        pane = panes.get(member.tmux_pane_id)
+        if pane is not None and not pane.dead:
+            return pane.pid
+    return None
+
+
+def _interval_from_env() -> float:
+    try:
+        return max(1.0, float(os.environ.get(INTERVAL_ENV_VAR, DEFAULT_INTERVAL_SECONDS)))
+    except ValueError:
+        return DEFAULT_INTERVAL_SECONDS
+
+
+class ResourceMonitor:
+    """Ring buffers of resource samples per agent, for the teams a server manages."""
+
+    def __init__(
+        self,
+        base_dir: Path | None = None,
+        interval: float | None = None,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ) -> None:
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+        self._history: dict[str, dict[str, deque[ResourceSample]]] = {}
+        self.interval = _interval_from_env() if interval is None else interval
+        self.history_size = history_size
+        self.wake = threading.Event()
+
+    def sample(self, team_name: str) -> dict[str, ResourceSample | None]:
+        """Take one sample of every teammate of ``team_name``.
+
+        Returns:
+            Mapping of agent name to its new sample, or None for agents whose
+            process could not be found.
+
+        Raises:
+            FileNotFoundError: If the team does not exist.
+        """
+        members = list(teams.read_config(team_name, self._base_dir).teammates)
+        panes = None
+        if any(not m.process_id and m.tmux_pane_id for m in members):
+            panes = spawner.list_pane_states()
+        usages = {}
+        for member in members:
+            pid = agent_root_pid(member, panes)
+            usage = process_tree_usage(pid) if pid else None
+            usages[member.name] = (pid, usage)
+        now = time.time()
+        samples: dict[str, ResourceSample | None] = {}
+        with self._lock:
+            table = self._history.setdefault(team_name, {})
+            for name in set(table) - set(usages):
+                del table[name]  # Left the team
+            for name, (pid, usage) in usages.items():
+                if usage is None:
+                    samples[name] = None
+                    continue
+                history = table.get(name)
+                if history is None or history.maxlen != self.history_size:
+                    history = deque(history or (), maxlen=self.history_size)
+                    table[name] = history
+                cpu_percent = None
+                previous = history[-1] if history else None
+                if previous is not None and previous.pid == pid and now > previous.timestamp:
+                    used = max(0.0, usage.cpu_seconds - previous.cpu_seconds)
+                    cpu_percent = 100.0 * used / (now - previous.timestamp)
+                sample = ResourceSample(
+                    timestamp=now,
+                    pid=pid,
+                    processes=usage.processes,
+                    cpu_percent=cpu_percent,
+                    rss_mb=usage.rss_kb / 1024,
+                    read_bytes=usage.read_bytes,
+                    write_bytes=usage.write_bytes,
+                    cpu_seconds=usage.cpu_seconds,
+                )
+                history.append(sample)
+                samples[name] = sample
+        return samples
+
+    def latest(self, team_name: str, agent_name: str) -> ResourceSample | None:
+        with self._lock:
+            history = self._history.get(team_name, {}).get(agent_name)
+            return history[-1] if history else None
+
+    def history(self, team_name: str, agent_name: str) -> list[ResourceSample]:
+        with self._lock:
+            return list(self._history.get(team_name, {}).get(agent_name, ()))
+
+    def forget(self, team_name: str) -> None:
+        """Drop all history for a deleted team."""
+        with self._lock:
+            self._history.pop(team_name, None)
@@ -1,5 +1,8 @@
 import asyncio
+import json
+import os
 import sys
+import threading
 import time
 import traceback
 import uuid
@@ -11,18 +14,31 @@ from fastmcp import Context, FastMCP
 from fastmcp.exceptions import ToolError
 from fastmcp.server.lifespan import lifespan
 
-from opencode_teams import messaging, tasks, teams
+from opencode_teams import (
+    build_cache, headless, messaging, metrics, processes, registry, tasks, teams, tmux_control,
+    worktrees,
+)
+from opencode_teams.admission import DISPATCH_INTERVAL_SECONDS, AdmissionController, provider_of
+from opencode_teams.health_monitor import HealthMonitor
 from opencode_teams.model_discovery import discover_models, resolve_model_string
+from opencode_teams.resource_monitor import ResourceMonitor
+from opencode_teams.supervisor import Supervisor
 from opencode_teams.task_analysis import infer_model_preference
+from opencode_teams.warm_pool import MAINTAIN_INTERVAL_SECONDS, WarmPool
 from opencode_teams.models import (
     AgentHealthStatus,
     COLOR_PALETTE,
     InboxMessage,
     ModelPreference,
+    ResourceLimits,
+    RestartPolicy,
     SendMessageResult,
     ShutdownApproved,
     SpawnResult,
+    SpawnTeamResult,
+    TeamShutdownResult,
     TeammateMember,
+    TeammateSpec,
 )
 from opencode_teams.spawner import (
     check_process_alive,
@@ -35,27 +51,168 @@ from opencode_teams.spawner import (
     kill_desktop_process,
     kill_tmux_pane,
     launch_desktop_app,
-    load_health_state,
-    save_health_state,
+    release_agent_resources,
+    resolve_spec_model,
+    spawn_latency_summary,
+    spawn_many,
     spawn_teammate,
+    spawn_timings,
+    stop_agent_processes,
+    _validate_agent_name,
 )
 
 
-@lifespan
-async def app_lifespan(server):
-    import logging
-    logger = logging.getLogger("opencode-teams")
+# team_shutdown: how often the lead inbox is checked for approvals
+SHUTDOWN_POLL_INTERVAL_SECONDS = 0.5
 
-    _log_activity("SERVER STARTING - lifespan begin")
+# agent_resources: gap between two samples when an agent has no earlier sample
+RESOURCE_FIRST_SAMPLE_WINDOW_SECONDS = 0.5
+
+# Background trash purging (see teams.delete_team / teams.purge_trash)
+TRASH_PURGE_INTERVAL_SECONDS = 300
+TRASH_PURGE_FILES_PER_SECOND = 500
+
+
+async def _trash_purger(wake: threading.Event, stop: threading.Event) -> None:
+    """Reclaim space from deleted teams without blocking tool calls.
 
-    opencode_binary = None
+    Runs once at startup (sweeping trash left behind by crashes), then again
+    whenever ``team_delete`` sets ``wake`` or the interval elapses.
+    """
+    while not stop.is_set():
+        try:
+            removed = await asyncio.to_thread(
+                teams.purge_trash,
+                max_files_per_second=TRASH_PURGE_FILES_PER_SECOND,
+                stop=stop,
+            )
+            if removed:
+                _log_activity(f"Trash purge removed {removed} entries")
+        except Exception as e:
+            _log_activity(f"Trash purge failed: {type(e).__name__}: {e}")
+        await asyncio.to_thread(wake.wait, TRASH_PURGE_INTERVAL_SECONDS)
+        wake.clear()
+
+
+async def _health_sweeper(
+    monitor: HealthMonitor, state: dict[str, Any], stop: threading.Event
+) -> None:
+    """Sweep the active team's health on the monitor's adaptive interval.
+
+    Dead teammates with a restart policy are handed to the supervisor, which
+    is also woken for restarts whose backoff has elapsed, and no longer count
+    towards admission limits. Oversized tmux pane logs are emptied once their
+    metrics are counted.
+    """
+    supervisor: Supervisor | None = state.get("supervisor")
+    while not stop.is_set():
+        interval = monitor.next_interval()
+        due = supervisor.seconds_until_due() if supervisor is not None else None
+        await asyncio.to_thread(monitor.wake.wait, interval if due is None else min(interval, due))
+        monitor.wake.clear()
+        if stop.is_set():
+            break
+        team_name = state.get("active_team")
+        if team_name:
+            try:
+                statuses = await asyncio.to_thread(monitor.sweep, team_name)
+                if supervisor is not None:
+                    await asyncio.to_thread(supervisor.observe, team_name, statuses)
+                if state.get("admission") is not None:
+                    state["admission"].observe(team_name, statuses)
+                await asyncio.to_thread(metrics.truncate_logs, team_name)
+            except FileNotFoundError:
+                pass  # Team deleted between sweeps
+            except Exception as e:
+                _log_activity(f"Health sweep failed: {type(e).__name__}: {e}")
+        if supervisor is None:
+            continue
+        try:
+            restarted = await asyncio.to_thread(supervisor.run_due)
+            if restarted:
+                _log_activity(f"Supervisor restarted {restarted} teammate(s)")
+                monitor.notify_spawn()
+        except Exception as e:
+            _log_activity(f"Supervisor restart failed: {type(e).__name__}: {e}")
+
+
+async def _resource_sampler(
+    monitor: ResourceMonitor, state: dict[str, Any], stop: threading.Event
+) -> None:
+    """Sample the active team's process trees every ``monitor.interval`` seconds."""
+    while not stop.is_set():
+        await asyncio.to_thread(monitor.wake.wait, monitor.interval)
+        monitor.wake.clear()
+        team_name = state.get("active_team")
+        if stop.is_set() or not team_name:
+            continue
+        try:
+            await asyncio.to_thread(monitor.sample, team_name)
+        except FileNotFoundError:
+            pass  # Team deleted between samples
+        except Exception as e:
+            _log_activity(f"Resource sampling failed: {type(e).__name__}: {e}")
+
+
+async def _warm_pool_maintainer(pool: WarmPool, stop: threading.Event) -> None:
+    """Expire and refill warm-pool standbys; claims and reconfiguration wake it early."""
+    while not stop.is_set():
+        await asyncio.to_thread(pool.wake.wait, MAINTAIN_INTERVAL_SECONDS)
+        pool.wake.clear()
+        if stop.is_set():
+            break
+        try:
+            started = await asyncio.to_thread(pool.maintain)
+            if started:
+                _log_activity(f"Warm pool started {started} standby agent(s)")
+        except Exception as e:
+            _log_activity(f"Warm pool maintenance failed: {type(e).__name__}: {e}")
+
+
+async def _spawn_dispatcher(controller: AdmissionController, stop: threading.Event) -> None:
+    """Start queued spawns when a slot may have freed up, and periodically for the host guards."""
+    while not stop.is_set():
+        await asyncio.to_thread(controller.wake.wait, DISPATCH_INTERVAL_SECONDS)
+        controller.wake.clear()
+        if stop.is_set():
+            break
+        try:
+            started = await asyncio.to_thread(controller.dispatch)
+            if started:
+                _log_activity(f"Spawn queue started {started} queued spawn(s)")
+        except Exception as e:
+            _log_activity(f"Spawn queue dispatch failed: {type(e).__name__}: {e}")
+
+
+def _check_opencode_binary(state: dict[str, Any]) -> None:
+    """Discover and validate the opencode binary off the startup path.
+
+    Validation is usually served from the on-disk version cache; on a cache
+    miss it runs ``opencode --version`` without holding up server startup.
+    """
+    import logging
     try:
         opencode_binary = discover_opencode_binary()
-        _log_activity(f"OpenCode binary found: {opencode_binary}")
     except (FileNotFoundError, RuntimeError) as e:
         # Log but don't fail - the error will be reported when tools are called
-        logger.warning(f"OpenCode binary not available: {e}")
+        logging.getLogger("opencode-teams").warning(f"OpenCode binary not available: {e}")
         _log_activity(f"OpenCode binary not found: {e}")
+        return
+    state["opencode_binary"] = opencode_binary
+    if state.get("warm_pool") is not None:
+        state["warm_pool"].opencode_binary = opencode_binary
+        state["warm_pool"].wake.set()
+    if state.get("supervisor") is not None:
+        state["supervisor"].opencode_binary = opencode_binary
+    _log_activity(f"OpenCode binary found: {opencode_binary}")
+
+
+@lifespan
+async def app_lifespan(server):
+    import logging
+    logger = logging.getLogger("opencode-teams")
+
+    _log_activity("SERVER STARTING - lifespan begin")
 
     # Discover available models from OpenCode config
     available_models = discover_models()
@@ -68,16 +225,61 @@ async def app_lifespan(server):
     else:
         _log_activity(f"Discovered {len(available_models)} models")
 
+    trash_wake = threading.Event()
+    trash_stop = threading.Event()
+    purger = asyncio.create_task(_trash_purger(trash_wake, trash_stop))
+
+    # Inside tmux, route tmux commands over one persistent control-mode client
+    if os.environ.get("TMUX") and is_tmux_available():
+        tmux_control.enable(default_pane=os.environ.get("TMUX_PANE"))
+
     session_id = str(uuid.uuid4())
+    health_monitor = HealthMonitor(base_dir=teams.TEAMS_DIR.parent)
+    health_stop = threading.Event()
+    state = {
+        "opencode_binary": None,  # Set by the binary check thread
+        "session_id": session_id,
+        "active_team": None,
+        "available_models": available_models,
+        "trash_wake": trash_wake,
+        "health_monitor": health_monitor,
+        "supervisor": Supervisor(None, base_dir=teams.TEAMS_DIR.parent),
+    }
+    sweeper = asyncio.create_task(_health_sweeper(health_monitor, state, health_stop))
+    resource_monitor = ResourceMonitor(base_dir=teams.TEAMS_DIR.parent)
+    state["resource_monitor"] = resource_monitor
+    sampler = asyncio.create_task(_resource_sampler(resource_monitor, state, health_stop))
+    admission = AdmissionController(base_dir=teams.TEAMS_DIR.parent, models=available_models)
+    state["admission"] = admission
+    dispatcher = asyncio.create_task(_spawn_dispatcher(admission, health_stop))
+    warm_pool = WarmPool(None, base_dir=teams.TEAMS_DIR.parent)
+    state["warm_pool"] = warm_pool
+    maintainer = asyncio.create_task(_warm_pool_maintainer(warm_pool, health_stop))
+    binary_check = threading.Thread(
+        target=_check_opencode_binary, args=(state,), name="opencode-binary-check", daemon=True
+    )
+    state["opencode_binary_check"] = binary_check
+    binary_check.start()
     _log_activity(f"SERVER READY - session_id={session_id}")
     try:
-        yield {
-            "opencode_binary": opencode_binary,
-            "session_id": session_id,
-            "active_team": None,
-            "available_models": available_models,
-        }
+        yield state
     finally:
+        # No awaits here: lifespan teardown may run inside a cancelled scope.
+        # The purge and sweep threads notice their stop events and exit on their own.
+        trash_stop.set()
+        trash_wake.set()
+        purger.cancel()
+        health_stop.set()
+        health_monitor.wake.set()
+        sweeper.cancel()
+        resource_monitor.wake.set()
+        sampler.cancel()
+        admission.wake.set()
+        dispatcher.cancel()
+        warm_pool.wake.set()
+        maintainer.cancel()
+        warm_pool.shutdown()
+        tmux_control.shutdown()
         _log_activity("SERVER SHUTTING DOWN - lifespan end")
 
 
@@ -97,6 +299,8 @@ Do NOT create your own coordination frameworks or agent patterns.
 - `team_create(team_name, description)` — Create a new team. Always do this first.
 - `team_delete(team_name)` — Delete a team (remove all members first).
 - `read_config(team_name)` — Read team config and members.
+- `list_teams()` — List all teams with member/task/unread summaries.
+- `team_stats(team_name)` — Summary counts for one team.
 - `server_status()` — Check MCP server health.
 
 ### Model Discovery
@@ -107,9 +311,28 @@ Do NOT create your own coordination frameworks or agent patterns.
   - `model="auto"` (default): Selects best model based on preferences.
   - `reasoning_effort`: "none", "low", "medium", "high", "xhigh" — guides auto-selection.
   - `prefer_speed=True`: Prefer faster models over more capable ones.
+  - `backend`: "auto", "tmux", "windows_terminal", "desktop", or "headless" (no terminal; JSON events logged per agent).
+  - `restart_policy`: {maxRestarts, backoffSeconds, maxBackoffSeconds, crashLoopSeconds, crashLoopLimit} restarts the agent if it dies (tmux/headless).
+  - `resources`: {nice, ioniceClass, ioniceLevel, memoryLimitMb, maxProcesses, cpuAffinity, cgroupMemoryMaxMb, cgroupCpuMax} per-agent limits (tmux/headless).
+  - `worktree=True`: run in its own git worktree on branch `opencode-teams/<team>/<name>`, removed when the agent is stopped.
+  - `build_cache=True`: share the team's uv/pip/npm/pnpm/ccache/sccache/Go caches, so dependencies are downloaded and built once per team.
+  - Over an admission limit the spawn is queued (`status="queued"`) and starts automatically later; `priority` orders the queue.
+- `spawn_team(team_name, members, backend)` — Spawn several agents concurrently; `members` is a list of spawn_teammate-style entries.
+- `spawn_queue(team_name?)` — Spawns waiting for an admission slot, recent queued starts, limits and host load.
+- `cancel_queued_spawn(queue_id)` — Drop a queued spawn.
+- `configure_admission(max_agents_per_team?, max_agents_per_host?, provider_limits?, max_load_per_cpu?, min_available_memory_mb?, order?)` — Set spawn admission limits.
+- `configure_warm_pool(model, size, backend?, idle_timeout_seconds?, memory_budget_mb?)` — Keep `size` idle agents pre-started for a model so spawn_teammate starts almost instantly.
 - `force_kill_teammate(team_name, agent_name)` — Force-stop an agent.
-- `check_agent_health(team_name, agent_name)` — Check if agent is alive/dead/hung.
-- `check_all_agents_health(team_name)` — Check health of all agents.
+- `team_shutdown(team_name, deadline_seconds?, reason?)` — Ask every teammate to shut down, force-kill the rest at the deadline, and remove them all.
+- `check_agent_health(team_name, agent_name, fresh?)` — Check if agent is alive/dead/hung.
+- `check_all_agents_health(team_name, fresh?)` — Check health of all agents.
+  - Both return the background monitor's latest result (with `ageSeconds`); polling them is cheap. `fresh=True` checks immediately.
+- `agent_metrics(team_name)` — Tokens, cost, request count and latency per agent and per model.
+- `supervisor_status(team_name?)` — Pending automatic restarts, given-up and finished agents, and recent restart events.
+- `agent_resources(team_name, history?)` — CPU%, resident memory, I/O bytes and process count per agent.
+- `worktree_status(team_name)` — Commits ahead/behind, uncommitted files and merge conflicts of each worktree agent's branch.
+- `report_merge_ready(team_name, agent_name, summary)` — (worktree agents) Tell team-lead your branch is committed and merges cleanly.
+- `build_cache_usage(team_name)` — Disk space used by the team's shared build cache, per tool.
 
 ### Messaging
 - `send_message(team_name, type, recipient, content, summary, sender)` — Send messages.
@@ -128,7 +351,7 @@ Do NOT create your own coordination frameworks or agent patterns.
 3. `task_create` — create tasks for the work
 4. `spawn_teammate` — spawn agents with task-specific `instructions` tailored to the problem
 5. `check_all_agents_health` + `read_inbox` — monitor progress
-6. `send_message(type="shutdown_request")` — shut down agents when done
+6. `team_shutdown(team_name)` — shut down all agents when done
 7. `team_delete` — clean up
 
 Agent configs are generated dynamically per-spawn and purged on shutdown/kill.
@@ -153,8 +376,15 @@ def server_status(ctx: Context) -> dict:
         "server": "opencode-teams",
         "session_id": ls.get("session_id", "unknown"),
         "active_team": ls.get("active_team"),
-        "opencode_binary": ls.get("opencode_binary") or "not found",
+        "opencode_binary": ls.get("opencode_binary") or (
+            "checking" if _binary_check_pending(ls) else "not found"
+        ),
         "available_models_count": len(models),
+        "config_cache": teams.config_cache_stats(),
+        "tmux_control": tmux_control.status(),
+        "warm_pool": ls["warm_pool"].status() if ls.get("warm_pool") else None,
+        "processes": processes.status(),
+        "spawn_latency": spawn_latency_summary(),
     }
 
 
@@ -212,15 +442,193 @@ def team_create(
 @mcp.tool
 def team_delete(team_name: str, ctx: Context) -> dict:
     """Delete a team and all its data. Fails if any teammates are still active.
-    Removes both team config and task directories."""
+    Team config and task directories are moved to trash immediately and
+    purged in the background."""
     try:
         result = teams.delete_team(team_name)
     except (RuntimeError, FileNotFoundError) as e:
         raise ToolError(str(e))
-    _get_lifespan(ctx)["active_team"] = None
+    ls = _get_lifespan(ctx)
+    ls["active_team"] = None
+    if ls.get("trash_wake") is not None:
+        ls["trash_wake"].set()
+    if ls.get("health_monitor") is not None:
+        ls["health_monitor"].forget(team_name)
+    if ls.get("resource_monitor") is not None:
+        ls["resource_monitor"].forget(team_name)
+    if ls.get("supervisor") is not None:
+        ls["supervisor"].forget(team_name)
+    if ls.get("admission") is not None:
+        ls["admission"].forget_team(team_name)
     return result.model_dump()
 
 
+@mcp.tool
+def list_teams() -> list[dict]:
+    """List all known teams, most recently active first. Each entry has name,
+    createdAt, memberCount, taskCounts (by status), unreadCount and lastActivity.
+    Served from the global team registry without opening per-team files."""
+    return [s.model_dump(by_alias=True) for s in registry.list_team_summaries()]
+
+
+@mcp.tool
+def team_stats(team_name: str) -> dict:
+    """Get the registry summary for one team: member count, task counts by
+    status, total unread inbox messages and last activity time."""
+    summary = registry.get_team_summary(team_name)
+    if summary is None:
+        raise ToolError(f"Team {team_name!r} not found")
+    return summary.model_dump(by_alias=True)
+
+
+def _binary_check_pending(ls: dict[str, Any]) -> bool:
+    check = ls.get("opencode_binary_check")
+    return check is not None and check.is_alive()
+
+
+def _require_opencode_binary(ls: dict[str, Any]) -> str:
+    if ls.get("opencode_binary") is None and _binary_check_pending(ls):
+        # Waiting here would tie up the tool call (and a worker thread) for
+        # as long as a cold ``opencode --version`` takes
+        raise ToolError(
+            "The OpenCode binary is still being validated (server_status shows "
+            "opencode_binary='checking'); retry in a few seconds."
+        )
+    opencode_binary = ls.get("opencode_binary")
+    if opencode_binary is None:
+        raise ToolError(
+            "OpenCode binary not found or version too old. "
+            "Please ensure opencode CLI v1.1.52+ is installed and on PATH. "
+            "Install with: npm install -g opencode@latest"
+        )
+    return opencode_binary
+
+
+HEADLESS_FALLBACK_WARNING = (
+    "Neither tmux nor the OpenCode desktop app was found, so backend='auto' started "
+    "the agent headless: it has no terminal and its output goes to "
+    "output/<agent>.log. Pass backend='headless' to choose this explicitly."
+)
+
+
+def _backend_warning(backend: str, effective_backend: str) -> str | None:
+    """Warning for a spawn result when ``auto`` fell back to running headless."""
+    if backend == "auto" and effective_backend == "headless":
+        _log_activity("No tmux or desktop app found; backend='auto' falls back to headless")
+        return HEADLESS_FALLBACK_WARNING
+    return None
+
+
+def _resolve_backend(backend: str) -> tuple[str, str | None]:
+    """Resolve ``backend`` ("auto" or explicit) to (backend_type, desktop_binary)."""
+    effective_backend = backend
+    if backend == "auto":
+        if is_tmux_available():
+            effective_backend = "tmux"
+        elif is_windows():
+            # On Windows without tmux, use windows_terminal (new PowerShell windows)
+            effective_backend = "windows_terminal"
+        else:
+            # On non-Windows without tmux, fall back to the desktop app, or
+            # run headless when there is none (e.g. build boxes without a display);
+            # callers report that fallback with _backend_warning
+            try:
+                return "desktop", discover_desktop_binary()
+            except FileNotFoundError:
+                return "headless", None
+
+    # Validate tmux availability before attempting spawn
+    if effective_backend == "tmux" and not is_tmux_available():
+        raise ToolError(
+            "tmux is not available on this system. "
+            "Either install tmux, use backend='windows_terminal' (Windows only), "
+            "backend='headless' to run without a terminal, "
+            "or use backend='desktop' to spawn via the OpenCode desktop app."
+        )
+
+    # Desktop binary discovery
+    desktop_binary = None
+    if effective_backend == "desktop":
+        try:
+            desktop_binary = discover_desktop_binary()
+        except FileNotFoundError as e:
+            raise ToolError(str(e))
+    return effective_backend, desktop_binary
+
+
+def _backfill_project_dir(team_name: str) -> None:
+    # Backfill project_dir on team config if not already set (pre-existing teams)
+    try:
+        teams.update_config(
+            team_name,
+            lambda c: c if c.project_dir is not None
+            else c.model_copy(update={"project_dir": str(Path.cwd())}),
+        )
+    except Exception:
+        pass  # Best effort
+
+
+def _notify_spawn(ls: dict[str, Any], team_name: str) -> None:
+    if ls.get("health_monitor") is not None:
+        ls["health_monitor"].notify_spawn()
+    if ls.get("admission") is not None:
+        ls["admission"].refresh_team(team_name)
+
+
+def _notify_slot_freed(ls: dict[str, Any], team_name: str) -> None:
+    if ls.get("admission") is not None:
+        ls["admission"].refresh_team(team_name)  # Also wakes the dispatcher
+
+
+def _forget_supervised(ls: dict[str, Any], team_name: str, agent_name: str) -> None:
+    if ls.get("supervisor") is not None:
+        ls["supervisor"].forget_agent(team_name, agent_name)
+
+
+def _check_new_names(team_name: str, names: list[str], controller: AdmissionController) -> None:
+    # Queued spawns register their member only when they start, so names are
+    # checked up front against the team and the queue.
+    try:
+        for name in names:
+            _validate_agent_name(name)
+    except ValueError as e:
+        raise ToolError(str(e))
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ToolError(f"Duplicate agent names in batch: {', '.join(duplicates)}")
+    try:
+        existing = teams.read_config(team_name).member_index
+    except FileNotFoundError:
+        raise ToolError(f"Team {team_name!r} not found")
+    for name in names:
+        if name in existing:
+            raise ToolError(f"Member {name!r} already exists in team {team_name!r}")
+        if controller.is_queued(team_name, name):
+            raise ToolError(f"{name!r} is already queued for team {team_name!r}")
+
+
+def _queued_result(
+    controller: AdmissionController,
+    entry,
+    backend: str | None = None,
+    warning: str | None = None,
+) -> SpawnResult:
+    return SpawnResult(
+        agent_id=f"{entry.name}@{entry.team_name}",
+        name=entry.name,
+        team_name=entry.team_name,
+        status="queued",
+        queue_id=entry.queue_id,
+        queue_position=controller.position(entry.queue_id),
+        message=(
+            f"Queued: {entry.reason}. The agent starts automatically when a slot "
+            "frees up; check spawn_queue for progress."
+        ),
+        backend=backend,
+        warning=warning,
+    )
+
+
 @mcp.tool(name="spawn_teammate")
 def spawn_teammate_tool(
     team_name: str,
@@ -232,7 +640,12 @@ def spawn_teammate_tool(
     reasoning_effort: str | None = None,  # Preference: "none", "low", "medium", "high", "xhigh"
     prefer_speed: bool = False,  # Prefer faster models over more capable ones
     plan_mode_required: bool = False,
-    backend: str = "auto",  # "auto", "tmux", "windows_terminal", or "desktop"
+    backend: str = "auto",  # "auto", "tmux", "windows_terminal", "desktop", or "headless"
+    priority: int = 0,  # Queue order when order="priority" (higher first)
+    resources: ResourceLimits | None = None,  # nice/ionice, rlimits, CPU affinity, cgroup caps
+    restart_policy: RestartPolicy | None = None,  # Restart automatically if the agent dies
+    worktree: bool = False,  # Run in its own git worktree and branch of the project
+    build_cache: bool = False,  # Use the team's shared package manager and compiler caches
 ) -> dict:
     """Spawn a new OpenCode teammate with dynamically generated configuration.
 
@@ -244,10 +657,51 @@ def spawn_teammate_tool(
     Use `reasoning_effort` and `prefer_speed` to guide automatic model selection.
 
     Backend options:
-    - 'auto' (default): Uses tmux if available, windows_terminal on Windows, otherwise desktop app
+    - 'auto' (default): Uses tmux if available, windows_terminal on Windows, otherwise
+      the desktop app, or headless if no desktop app is installed (the result's
+      `backend` says which, with a `warning` for the headless fallback)
     - 'tmux': Spawn in a tmux pane (requires tmux installed)
     - 'windows_terminal': Spawn in a new PowerShell window (Windows only)
     - 'desktop': Launch the OpenCode desktop app (GUI, requires manual interaction)
+    - 'headless': Run `opencode run --format json` directly with no terminal; events
+      are logged per agent and drive health checks
+
+    If a warm pool is configured for the resolved model and backend (see
+    configure_warm_pool), an idle pre-started agent takes on this teammate's
+    identity instead of a new process being started.
+
+    `resources` (tmux and headless only) runs the agent under a launcher that
+    applies nice/ionice levels, RLIMIT_AS (memoryLimitMb) and RLIMIT_NPROC
+    (maxProcesses), a CPU affinity set and, where a cgroup v2 group can be
+    created, memory.max (cgroupMemoryMaxMb) and cpu.max (cgroupCpuMax, in CPUs).
+
+    `restart_policy` (tmux and headless only) has the supervisor restart the
+    agent under the same name when health checks find it dead, with
+    exponential backoff, a restart budget and crash-loop detection. The new
+    process is given its in_progress tasks and unread messages to resume
+    from; the lead is messaged on each restart and when the supervisor gives up.
+
+    `worktree` creates a git worktree of the project for the agent (under the
+    team directory) on its own branch, opencode-teams/<team>/<name>, so
+    parallel agents do not edit, build or test in each other's files. The
+    agent commits there and calls report_merge_ready when done; see
+    worktree_status. When the agent is killed or shut down, uncommitted work
+    is committed to its branch and the worktree removed; the branch is kept
+    if it has commits the base branch lacks.
+
+    `build_cache` points the agent's uv, pip, npm, pnpm, ccache, sccache and
+    Go caches at directories shared by the team (under the team directory),
+    so a dependency downloaded or a file compiled by one agent is reused by
+    the others, worktree or not. See build_cache_usage for its size.
+
+    Spawns that would exceed an admission limit (see configure_admission) are
+    queued instead of failing: the result has status='queued' with a queueId,
+    and the agent starts automatically once a slot frees up.
+
+    The result's `timings` gives the duration of each spawn step in
+    milliseconds (validate, inbox/agentConfig/opencodeJson, which run
+    concurrently within prepare, launch, register, total); server_status
+    reports averages over recent spawns as spawn_latency.
 
     Agent configs are created on spawn and purged on shutdown/kill.
     Use `instructions` to tailor the agent's role and behavior for the specific task.
@@ -256,13 +710,7 @@ def spawn_teammate_tool(
     autonomously. Names must be unique within the team."""
     _log_activity(f"TOOL CALL: spawn_teammate team={team_name} name={name} model={model}")
     ls = _get_lifespan(ctx)
-    opencode_binary = ls.get("opencode_binary")
-    if opencode_binary is None:
-        raise ToolError(
-            "OpenCode binary not found or version too old. "
-            "Please ensure opencode CLI v1.1.52+ is installed and on PATH. "
-            "Install with: npm install -g opencode@latest"
-        )
+    opencode_binary = _require_opencode_binary(ls)
 
     # Build preference for model selection
     # Infer from prompt; explicit params override inferred values
@@ -280,65 +728,265 @@ def spawn_teammate_tool(
     except ValueError as e:
         raise ToolError(str(e))
 
-    # Resolve backend: auto-detect best option
-    effective_backend = backend
-    if backend == "auto":
-        if is_tmux_available():
-            effective_backend = "tmux"
-        elif is_windows():
-            # On Windows without tmux, use windows_terminal (new PowerShell windows)
-            effective_backend = "windows_terminal"
-        else:
-            # On non-Windows without tmux, fall back to desktop app
-            effective_backend = "desktop"
-
-    # Validate tmux availability before attempting spawn
-    if effective_backend == "tmux" and not is_tmux_available():
-        raise ToolError(
-            "tmux is not available on this system. "
-            "Either install tmux, use backend='windows_terminal' (Windows only), "
-            "or use backend='desktop' to spawn via the OpenCode desktop app."
+    effective_backend, desktop_binary = _resolve_backend(backend)
+    warning = _backend_warning(backend, effective_backend)
+    _backfill_project_dir(team_name)
+    project_dir = Path.cwd()
+
+    def _launch() -> TeammateMember:
+        warm_agent = None
+        if ls.get("warm_pool") is not None and not (resources or worktree or build_cache):
+            warm_agent = ls["warm_pool"].claim(resolved_model, effective_backend, project_dir)
+        member = spawn_teammate(
+            team_name=team_name,
+            name=name,
+            prompt=prompt,
+            opencode_binary=opencode_binary,
+            model=resolved_model,
+            subagent_type="general-purpose",
+            role_instructions="",  # No predefined templates; use dynamic instructions
+            custom_instructions=instructions,
+            backend_type=effective_backend,
+            desktop_binary=desktop_binary,
+            plan_mode_required=plan_mode_required,
+            project_dir=project_dir,
+            warm_agent=warm_agent,
+            resources=resources,
+            restart_policy=restart_policy,
+            worktree=worktree,
+            build_cache=build_cache,
         )
-
-    # Desktop binary discovery
-    desktop_binary = None
-    if effective_backend == "desktop":
-        try:
-            desktop_binary = discover_desktop_binary()
-        except FileNotFoundError as e:
-            raise ToolError(str(e))
-
-    # Backfill project_dir on team config if not already set (pre-existing teams)
+        _notify_spawn(ls, team_name)
+        _log_activity(
+            f"TOOL DONE: spawn_teammate agent_id={member.agent_id} warm={warm_agent is not None}"
+        )
+        return member
+
+    controller: AdmissionController | None = ls.get("admission")
+    provider = provider_of(resolved_model, available_models)
+    if controller is not None:
+        _check_new_names(team_name, [name], controller)
+        reason = controller.admit(team_name, provider)
+        if reason is not None:
+            entry = controller.enqueue(team_name, name, provider, _launch, reason, priority)
+            _log_activity(f"TOOL DONE: spawn_teammate queued {entry.queue_id} name={name}: {reason}")
+            return _queued_result(controller, entry, effective_backend, warning).model_dump()
     try:
-        config = teams.read_config(team_name)
-        if config.project_dir is None:
-            config.project_dir = str(Path.cwd())
-            teams.write_config(team_name, config)
-    except Exception:
-        pass  # Best effort
-
-    member = spawn_teammate(
-        team_name=team_name,
-        name=name,
-        prompt=prompt,
-        opencode_binary=opencode_binary,
-        model=resolved_model,
-        subagent_type="general-purpose",
-        role_instructions="",  # No predefined templates; use dynamic instructions
-        custom_instructions=instructions,
-        backend_type=effective_backend,
-        desktop_binary=desktop_binary,
-        plan_mode_required=plan_mode_required,
-        project_dir=Path.cwd(),
-    )
-    _log_activity(f"TOOL DONE: spawn_teammate agent_id={member.agent_id}")
+        member = _launch()
+    except ValueError as e:
+        raise ToolError(str(e))
+    finally:
+        if controller is not None:
+            controller.release(team_name, provider)
+    timings = spawn_timings(team_name, member.name)
     return SpawnResult(
         agent_id=member.agent_id,
         name=member.name,
         team_name=team_name,
+        timings=timings["steps"] | {"total": timings["totalMs"]} if timings else None,
+        backend=effective_backend,
+        warning=warning,
     ).model_dump()
 
 
+@mcp.tool
+def spawn_team(
+    team_name: str,
+    members: list[TeammateSpec],
+    ctx: Context,
+    backend: str = "auto",  # "auto", "tmux", "windows_terminal", "desktop", or "headless"
+    priority: int = 0,  # Queue order for members that have to wait for a slot
+) -> dict:
+    """Spawn several teammates at once. Each entry in `members` takes the same
+    name/prompt/instructions/model/reasoning_effort/prefer_speed/plan_mode_required/
+    resources/restart_policy/worktree/build_cache fields as spawn_teammate.
+
+    Setup is shared (one model discovery, one team config transaction, one
+    opencode.json update) and agents are launched concurrently. All names are
+    validated before anything is spawned; launch failures are reported per
+    agent in `failed` and do not roll back teammates that started. Members
+    over an admission limit are returned in `queued` and start automatically
+    once slots free up."""
+    names = [m.name for m in members]
+    _log_activity(f"TOOL CALL: spawn_team team={team_name} names={names}")
+    ls = _get_lifespan(ctx)
+    opencode_binary = _require_opencode_binary(ls)
+    effective_backend, desktop_binary = _resolve_backend(backend)
+    warning = _backend_warning(backend, effective_backend)
+    _backfill_project_dir(team_name)
+    models = ls.get("available_models", [])
+    project_dir = Path.cwd()
+
+    def _spawn(specs: list[TeammateSpec]) -> tuple[list[TeammateMember], dict[str, str]]:
+        spawned, failed = spawn_many(
+            team_name,
+            specs,
+            opencode_binary,
+            models=models,
+            backend_type=effective_backend,
+            desktop_binary=desktop_binary,
+            project_dir=project_dir,
+        )
+        if spawned:
+            _notify_spawn(ls, team_name)
+        return spawned, failed
+
+    def _launch_queued(spec: TeammateSpec) -> TeammateMember:
+        spawned, failed = _spawn([spec])
+        if failed:
+            raise RuntimeError(failed[spec.name])
+        _log_activity(f"Queued spawn started agent_id={spawned[0].agent_id}")
+        return spawned[0]
+
+    controller: AdmissionController | None = ls.get("admission")
+    admitted: list[tuple[TeammateSpec, str]] = []
+    waiting: list[tuple[TeammateSpec, str, str]] = []
+    if controller is None:
+        admitted = [(spec, "") for spec in members]
+    else:
+        _check_new_names(team_name, names, controller)
+        for spec in members:
+            try:
+                provider = provider_of(resolve_spec_model(spec, models), models)
+            except ValueError:
+                provider = ""  # spawn_many reports the unresolvable model
+            reason = controller.admit(team_name, provider)
+            if reason is None:
+                admitted.append((spec, provider))
+            else:
+                waiting.append((spec, provider, reason))
+
+    try:
+        spawned, failed = _spawn([spec for spec, _ in admitted]) if admitted else ([], {})
+    except (ValueError, FileNotFoundError) as e:
+        raise ToolError(str(e))
+    finally:
+        if controller is not None:
+            for spec, provider in admitted:
+                controller.release(team_name, provider)
+    queued = [
+        _queued_result(controller, controller.enqueue(
+            team_name, spec.name, provider,
+            lambda spec=spec: _launch_queued(spec), reason, priority,
+        ))
+        for spec, provider, reason in waiting
+    ]
+    _log_activity(
+        f"TOOL DONE: spawn_team spawned={len(spawned)} queued={len(queued)} failed={sorted(failed)}"
+    )
+    return SpawnTeamResult(
+        team_name=team_name,
+        spawned=[
+            SpawnResult(agent_id=m.agent_id, name=m.name, team_name=team_name)
+            for m in spawned
+        ],
+        queued=queued,
+        failed=failed,
+        backend=effective_backend,
+        warning=warning,
+    ).model_dump()
+
+
+@mcp.tool
+def spawn_queue(ctx: Context, team_name: str | None = None) -> dict:
+    """Show spawns waiting for an admission slot, in the order they will
+    start (position, waitingSeconds, reason), the last queued spawns that
+    started or failed, the current limits and host load/available memory."""
+    controller: AdmissionController | None = _get_lifespan(ctx).get("admission")
+    if controller is None:
+        raise ToolError("Spawn admission control is not available in this server session")
+    return controller.status(team_name)
+
+
+@mcp.tool
+def cancel_queued_spawn(queue_id: str, ctx: Context) -> dict:
+    """Remove a spawn from the admission queue before it starts."""
+    controller: AdmissionController | None = _get_lifespan(ctx).get("admission")
+    if controller is None or not controller.cancel(queue_id):
+        raise ToolError(f"No queued spawn with id {queue_id!r}")
+    return {"success": True, "message": f"Queued spawn {queue_id} cancelled."}
+
+
+@mcp.tool
+def configure_admission(
+    ctx: Context,
+    max_agents_per_team: int | None = None,
+    max_agents_per_host: int | None = None,
+    provider_limits: dict[str, int] | None = None,
+    max_load_per_cpu: float | None = None,
+    min_available_memory_mb: float | None = None,
+    order: Literal["fifo", "priority"] | None = None,
+) -> dict:
+    """Set spawn admission limits; omitted arguments keep their current value
+    and 0 removes a limit. Counts are of teammates this server has spawned
+    that were not removed or found dead by a health sweep: per team, on the
+    host (all of its teams) and per provider (e.g. {"openai": 10}, replacing
+    the previous provider limits).
+    Host guards, off unless set: 1-minute load average per CPU and minimum
+    available memory (from /proc). `order` is "fifo" or "priority".
+    Spawns over a limit are queued. Returns the spawn queue status."""
+    controller: AdmissionController | None = _get_lifespan(ctx).get("admission")
+    if controller is None:
+        raise ToolError("Spawn admission control is not available in this server session")
+    if max_agents_per_team is not None:
+        controller.max_agents_per_team = max_agents_per_team or None
+    if max_agents_per_host is not None:
+        controller.max_agents_per_host = max_agents_per_host or None
+    if provider_limits is not None:
+        controller.provider_limits = {p: n for p, n in provider_limits.items() if n}
+    if max_load_per_cpu is not None:
+        controller.max_load_per_cpu = max_load_per_cpu or None
+    if min_available_memory_mb is not None:
+        controller.min_available_memory_mb = min_available_memory_mb or None
+    if order is not None:
+        controller.order = order
+    controller.wake.set()  # Raised limits may admit queued spawns
+    return controller.status()
+
+
+@mcp.tool
+def configure_warm_pool(
+    model: str,
+    size: int,
+    ctx: Context,
+    backend: str = "auto",  # "auto", "tmux", or "headless"
+    idle_timeout_seconds: float | None = None,
+    memory_budget_mb: float | None = None,
+) -> dict:
+    """Keep `size` idle agents pre-started for `model` so spawn_teammate can
+    hand one its identity instead of starting OpenCode from scratch. Standbys
+    start in the current project directory and are refilled in the background
+    after each claim; size=0 removes the pool.
+
+    `idle_timeout_seconds` and `memory_budget_mb` apply to all pools: standbys
+    idle longer than the timeout are replaced, and no standby is started while
+    the pools' resident memory would exceed the budget. Each standby is a live
+    model session waiting in one long poll_inbox call, so an unclaimed standby
+    costs about one model request per idle timeout. Returns warm pool status."""
+    ls = _get_lifespan(ctx)
+    _require_opencode_binary(ls)
+    pool: WarmPool | None = ls.get("warm_pool")
+    if pool is None:
+        raise ToolError("Warm pool is not available in this server session")
+    try:
+        resolved_model = resolve_model_string(model, ls.get("available_models", []))
+    except ValueError as e:
+        raise ToolError(str(e))
+    effective_backend, _ = _resolve_backend(backend)
+    if idle_timeout_seconds is not None:
+        pool.idle_timeout = idle_timeout_seconds
+    if memory_budget_mb is not None:
+        pool.memory_budget_mb = memory_budget_mb
+    try:
+        pool.configure(resolved_model, effective_backend, size, Path.cwd())
+    except ValueError as e:
+        raise ToolError(str(e))
+    _log_activity(
+        f"TOOL DONE: configure_warm_pool model={resolved_model} backend={effective_backend} size={size}"
+    )
+    return pool.status()
+
+
 @mcp.tool
 def send_message(
     team_name: str,
@@ -365,14 +1013,10 @@ def send_message(
         if not recipient:
             raise ToolError("Message recipient must not be empty")
         config = teams.read_config(team_name)
-        member_names = {m.name for m in config.members}
-        if recipient not in member_names:
+        if recipient not in config.member_index:
             raise ToolError(f"Recipient {recipient!r} is not a member of team {team_name!r}")
-        target_color = None
-        for m in config.members:
-            if m.name == recipient and isinstance(m, TeammateMember):
-                target_color = m.color
-                break
+        target = config.get_teammate(recipient)
+        target_color = target.color if target else None
         messaging.send_plain_message(
             team_name, sender, recipient, content, summary=summary, color=target_color,
         )
@@ -393,12 +1037,11 @@ def send_message(
             raise ToolError("Broadcast summary must not be empty")
         config = teams.read_config(team_name)
         count = 0
-        for m in config.members:
-            if isinstance(m, TeammateMember):
-                messaging.send_plain_message(
-                    team_name, "team-lead", m.name, content, summary=summary, color=None,
-                )
-                count += 1
+        for m in config.teammates:
+            messaging.send_plain_message(
+                team_name, "team-lead", m.name, content, summary=summary, color=None,
+            )
+            count += 1
         return SendMessageResult(
             success=True,
             message=f"Broadcast sent to {count} teammate(s)",
@@ -410,8 +1053,7 @@ def send_message(
         if recipient == "team-lead":
             raise ToolError("Cannot send shutdown request to team-lead")
         config = teams.read_config(team_name)
-        member_names = {m.name for m in config.members}
-        if recipient not in member_names:
+        if recipient not in config.member_index:
             raise ToolError(f"Recipient {recipient!r} is not a member of team {team_name!r}")
         req_id = messaging.send_shutdown_request(team_name, recipient, reason=content)
         return SendMessageResult(
@@ -423,12 +1065,7 @@ def send_message(
 
     elif type == "shutdown_response":
         if approve:
-            config = teams.read_config(team_name)
-            member = None
-            for m in config.members:
-                if isinstance(m, TeammateMember) and m.name == sender:
-                    member = m
-                    break
+            member = teams.read_config(team_name).get_teammate(sender)
             pane_id = member.tmux_pane_id if member else ""
             backend = member.backend_type if member else "tmux"
             payload = ShutdownApproved(
@@ -458,8 +1095,7 @@ def send_message(
         if not recipient:
             raise ToolError("Plan approval recipient must not be empty")
         config = teams.read_config(team_name)
-        member_names = {m.name for m in config.members}
-        if recipient not in member_names:
+        if recipient not in config.member_index:
             raise ToolError(f"Recipient {recipient!r} is not a member of team {team_name!r}")
         if approve:
             messaging.send_plain_message(
@@ -574,22 +1210,21 @@ def read_config(team_name: str) -> dict:
 
 
 @mcp.tool
-def force_kill_teammate(team_name: str, agent_name: str) -> dict:
+def force_kill_teammate(team_name: str, agent_name: str, ctx: Context) -> dict:
     """Forcibly kill a teammate. For tmux backend, kills the tmux pane.
-    For desktop backend, terminates the desktop process. Removes member
-    from config and resets their tasks."""
-    config = teams.read_config(team_name)
-    member = None
-    for m in config.members:
-        if isinstance(m, TeammateMember) and m.name == agent_name:
-            member = m
-            break
+    For desktop, windows_terminal and headless backends, terminates the
+    process and its process tree. Removes member from config and resets
+    their tasks."""
+    member = teams.read_config(team_name).get_teammate(agent_name)
     if member is None:
         raise ToolError(f"Teammate {agent_name!r} not found in team {team_name!r}")
 
-    if member.backend_type == "desktop":
+    if member.backend_type in ("desktop", "windows_terminal"):
         if member.process_id:
             kill_desktop_process(member.process_id)
+    elif member.backend_type == "headless":
+        if not headless.stop(member.agent_id) and member.process_id:
+            kill_desktop_process(member.process_id)
     else:
         if member.tmux_pane_id:
             kill_tmux_pane(member.tmux_pane_id)
@@ -598,6 +1233,9 @@ def force_kill_teammate(team_name: str, agent_name: str) -> dict:
     teams.remove_member(team_name, agent_name)
     tasks.reset_owner_tasks(team_name, agent_name)
     cleanup_agent_config(project_dir, agent_name)
+    release_agent_resources(member)
+    _forget_supervised(_get_lifespan(ctx), team_name, agent_name)
+    _notify_slot_freed(_get_lifespan(ctx), team_name)
     return {"success": True, "message": f"{agent_name} has been stopped."}
 
 
@@ -623,107 +1261,345 @@ async def poll_inbox(
 
 
 @mcp.tool
-def process_shutdown_approved(team_name: str, agent_name: str) -> dict:
+def process_shutdown_approved(team_name: str, agent_name: str, ctx: Context) -> dict:
     """Process a teammate's shutdown by removing them from config and resetting
     their tasks. Call this after confirming shutdown_approved in the lead inbox."""
     if agent_name == "team-lead":
         raise ToolError("Cannot process shutdown for team-lead")
+    member = teams.read_config(team_name).get_teammate(agent_name)
     project_dir = teams.get_project_dir(team_name)
     teams.remove_member(team_name, agent_name)
     tasks.reset_owner_tasks(team_name, agent_name)
     cleanup_agent_config(project_dir, agent_name)
+    if member is not None:
+        release_agent_resources(member)
+    _forget_supervised(_get_lifespan(ctx), team_name, agent_name)
+    _notify_slot_freed(_get_lifespan(ctx), team_name)
     return {"success": True, "message": f"{agent_name} removed from team."}
 
 
+def _send_shutdown_requests(
+    team_name: str, members: list[TeammateMember], reason: str
+) -> dict[str, str]:
+    """Ask each member to shut down; returns request id -> member name."""
+    return {
+        messaging.send_shutdown_request(team_name, m.name, reason=reason): m.name
+        for m in members
+    }
+
+
+def _take_shutdown_approvals(team_name: str, requests: dict[str, str]) -> set[str]:
+    """Names whose approval of one of ``requests`` is unread in the lead inbox.
+
+    Matching approvals are marked read; other messages are left alone.
+    """
+    def _approver(msg: InboxMessage) -> str | None:
+        try:
+            data = json.loads(msg.text)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and data.get("type") == "shutdown_approved":
+            return requests.get(data.get("requestId"))
+        return None
+
+    unread = messaging.read_inbox(team_name, "team-lead", unread_only=True, mark_as_read=False)
+    approved = {name for name in map(_approver, unread) if name}
+    if approved:
+        messaging.mark_read(team_name, "team-lead", lambda m: _approver(m) is not None)
+    return approved
+
+
+@mcp.tool
+async def team_shutdown(
+    team_name: str,
+    ctx: Context,
+    deadline_seconds: float = 60.0,
+    reason: str = "",
+) -> dict:
+    """Shut down every teammate of a team in one call and bounded time.
+
+    Sends each teammate a shutdown request (with `reason`), waits up to
+    `deadline_seconds` for their approvals in the lead inbox, then stops all
+    agent processes in parallel: those that approved are listed in
+    `graceful`, the rest in `forced`. All teammates are then removed in one
+    config update and their tasks released in one pass (unfinished tasks
+    go back to pending). Queued spawns for the team are dropped and
+    automatic restarts stop. The team itself is kept; use team_delete next."""
+    if deadline_seconds < 0:
+        raise ToolError("deadline_seconds must be >= 0")
+    try:
+        config = await asyncio.to_thread(teams.read_config, team_name)
+    except FileNotFoundError:
+        raise ToolError(f"Team {team_name!r} not found")
+    members = list(config.teammates)
+    _log_activity(f"TOOL CALL: team_shutdown team={team_name} members={len(members)}")
+    ls = _get_lifespan(ctx)
+    started = time.monotonic()
+    queued_dropped = ls["admission"].forget_team(team_name) if ls.get("admission") else 0
+    if ls.get("supervisor") is not None:
+        ls["supervisor"].drain(team_name)
+
+    # Everything blocking runs in threads: this tool shares the event loop
+    # with the background sweeps and every other async tool
+    requests = await asyncio.to_thread(_send_shutdown_requests, team_name, members, reason)
+    approved: set[str] = set()
+    deadline = started + deadline_seconds
+    while members:
+        approved |= await asyncio.to_thread(_take_shutdown_approvals, team_name, requests)
+        if len(approved) == len(members) or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(min(SHUTDOWN_POLL_INTERVAL_SECONDS, max(0.0, deadline - time.monotonic())))
+
+    await asyncio.to_thread(stop_agent_processes, members)
+    names = [m.name for m in members]
+    released = 0
+    if names:
+        await asyncio.to_thread(teams.remove_members, team_name, names)
+        released = await asyncio.to_thread(tasks.reset_owners_tasks, team_name, names)
+    await asyncio.gather(*(asyncio.to_thread(release_agent_resources, m) for m in members))
+    if ls.get("supervisor") is not None:
+        ls["supervisor"].forget(team_name)
+    _notify_slot_freed(ls, team_name)
+    result = TeamShutdownResult(
+        team_name=team_name,
+        graceful=[n for n in names if n in approved],
+        forced=[n for n in names if n not in approved],
+        tasks_released=released,
+        queued_dropped=queued_dropped,
+        elapsed_seconds=round(time.monotonic() - started, 2),
+    )
+    _log_activity(
+        f"TOOL DONE: team_shutdown team={team_name} graceful={len(result.graceful)} "
+        f"forced={len(result.forced)}"
+    )
+    return result.model_dump()
+
+
+def _health_monitor(ctx: Context) -> HealthMonitor:
+    monitor = _get_lifespan(ctx).get("health_monitor")
+    if monitor is None:
+        monitor = HealthMonitor()
+    return monitor
+
+
+def _with_age(status: AgentHealthStatus, age: float) -> dict:
+    return status.model_copy(update={"age_seconds": round(age, 1)}).model_dump(
+        by_alias=True, exclude_none=True
+    )
+
+
 @mcp.tool
 def check_agent_health(
     team_name: str,
     agent_name: str,
+    ctx: Context,
+    fresh: bool = False,
 ) -> dict:
     """Check health status of a specific agent. Returns status: 'alive', 'dead',
     'hung', or 'unknown'. Dead means the tmux pane no longer exists. Hung means
     the pane is alive but has produced no new output for over 120 seconds.
+    Returns the background monitor's latest result (ageSeconds says how old it
+    is); pass fresh=True to check right now.
     Use force_kill_teammate to kill dead or hung agents."""
-    config = teams.read_config(team_name)
-    member = None
-    for m in config.members:
-        if isinstance(m, TeammateMember) and m.name == agent_name:
-            member = m
-            break
+    member = teams.read_config(team_name).get_teammate(agent_name)
     if member is None:
         raise ToolError(f"Agent {agent_name!r} not found in team {team_name!r}")
 
-    # Load previous health state for hung detection
-    health_state = load_health_state(team_name)
-    agent_state = health_state.get(agent_name, {})
-    previous_hash = agent_state.get("hash")
-    last_change_time = agent_state.get("last_change_time")
+    monitor = _health_monitor(ctx)
+    if not fresh:
+        cached = monitor.cached(team_name, agent_name)
+        if cached is not None:
+            return _with_age(*cached)
 
+    # Previous health state for hung detection
+    agent_state = monitor.agent_state(team_name, agent_name)
     result = check_single_agent_health(
         member,
-        previous_hash=previous_hash,
-        last_change_time=last_change_time,
+        previous_hash=agent_state.get("hash"),
+        last_change_time=agent_state.get("last_change_time"),
     )
-
-    # Update health state
-    if result.last_content_hash is not None:
-        if result.last_content_hash != previous_hash:
-            health_state[agent_name] = {
-                "hash": result.last_content_hash,
-                "last_change_time": time.time(),
-            }
-        elif agent_name not in health_state:
-            health_state[agent_name] = {
-                "hash": result.last_content_hash,
-                "last_change_time": time.time(),
-            }
-    save_health_state(team_name, health_state)
-
-    return result.model_dump(by_alias=True, exclude_none=True)
+    monitor.record(team_name, [result])
+    return _with_age(result, 0.0)
 
 
 @mcp.tool
 def check_all_agents_health(
     team_name: str,
+    ctx: Context,
+    fresh: bool = False,
 ) -> list[dict]:
     """Check health of all teammates in the team. Returns a list of health
-    status objects. Each includes agentName, paneId, status, and detail.
-    Useful for monitoring team health. Automatically persists health state
-    for hung detection across calls."""
-    config = teams.read_config(team_name)
-    health_state = load_health_state(team_name)
-    results = []
-
-    for m in config.members:
-        if not isinstance(m, TeammateMember):
+    status objects. Each includes agentName, paneId, status, detail and
+    ageSeconds. Useful for monitoring team health. Results come from the
+    background health monitor when it has a recent sweep of every teammate;
+    pass fresh=True to sweep right now."""
+    monitor = _health_monitor(ctx)
+    names = [m.name for m in teams.read_config(team_name).teammates]
+    if not fresh:
+        cached = monitor.cached_team(team_name, names)
+        if cached is not None:
+            return [_with_age(status, age) for status, age in cached]
+    return [_with_age(status, 0.0) for status in monitor.sweep(team_name)]
+
+
+@mcp.tool
+def agent_metrics(team_name: str) -> dict:
+    """Token, cost and latency totals parsed from each agent's JSON event
+    log. Returns {"agents": [...], "models": [...]}: per agent (and summed per
+    model) requests, errors, input/output/reasoning/cache tokens, cost,
+    avgStepLatencyMs, stepLatencyMsMax and avgTimeToFirstTokenMs. Only output
+    written since the previous call is parsed."""
+    try:
+        agents = metrics.collect(team_name)
+    except FileNotFoundError:
+        raise ToolError(f"Team {team_name!r} not found")
+    models = []
+    for totals in metrics.by_model(agents).values():
+        summary = metrics.summarize(totals)
+        del summary["agentName"]
+        models.append(summary)
+    return {"agents": [metrics.summarize(m) for m in agents], "models": models}
+
+
+@mcp.tool
+def supervisor_status(ctx: Context, team_name: str | None = None) -> dict:
+    """Automatic restarts of teammates spawned with a restart_policy. Returns
+    pending restarts (inSeconds, streak of quick deaths, reason), teammates
+    the supervisor gave up on (crash loop or restart budget used up),
+    teammates not restarted because they finished (exit code 0 or approved
+    shutdown) and recent
+    scheduled/restarted/failed/gave_up/finished events. Only the active team's
+    teammates are watched."""
+    supervisor = _get_lifespan(ctx).get("supervisor")
+    if supervisor is None:
+        return {"pending": [], "gaveUp": [], "recent": []}
+    return supervisor.status(team_name)
+
+
+@mcp.tool
+def agent_resources(team_name: str, ctx: Context, history: bool = False) -> dict:
+    """CPU, memory and I/O use of each teammate's process tree (the agent and
+    everything it started), sampled from /proc. Per agent: pid, processes,
+    children, cpuPercent (since the previous sample), rssMb, readBytes,
+    writeBytes and ageSeconds; status "not running" if no process was found.
+    The active team is sampled in the background; other teams, or samples
+    older than the sampling interval, are sampled now. Pass history=True for
+    each agent's recent samples, oldest first. Linux only."""
+    monitor = _get_lifespan(ctx).get("resource_monitor")
+    if monitor is None:
+        monitor = ResourceMonitor()
+    try:
+        names = [m.name for m in teams.read_config(team_name).teammates]
+        now = time.time()
+        latest = {name: monitor.latest(team_name, name) for name in names}
+        if any(s is None or now - s.timestamp > monitor.interval for s in latest.values()):
+            samples = monitor.sample(team_name)
+            if any(s is not None and s.cpu_percent is None for s in samples.values()):
+                # First sample of an agent: take a second one for a CPU reading
+                time.sleep(RESOURCE_FIRST_SAMPLE_WINDOW_SECONDS)
+                samples = monitor.sample(team_name)
+            latest = samples
+    except FileNotFoundError:
+        raise ToolError(f"Team {team_name!r} not found")
+    agents = []
+    now = time.time()
+    for name in names:
+        sample = latest.get(name)
+        if sample is None:
+            agents.append({"agentName": name, "status": "not running"})
             continue
-        agent_state = health_state.get(m.name, {})
-        previous_hash = agent_state.get("hash")
-        last_change_time = agent_state.get("last_change_time")
-
-        status = check_single_agent_health(
-            m,
-            previous_hash=previous_hash,
-            last_change_time=last_change_time,
+        entry = {"agentName": name, "status": "running", **sample.to_dict()}
+        entry["ageSeconds"] = round(now - entry.pop("timestamp"), 1)
+        if history:
+            entry["history"] = [s.to_dict() for s in monitor.history(team_name, name)]
+        agents.append(entry)
+    running = [a for a in agents if a["status"] == "running"]
+    return {
+        "intervalSeconds": monitor.interval,
+        "agents": agents,
+        "totals": {
+            "cpuPercent": round(sum(a["cpuPercent"] or 0 for a in running), 1),
+            "rssMb": round(sum(a["rssMb"] for a in running), 1),
+            "processes": sum(a["processes"] for a in running),
+        },
+    }
+
+
+@mcp.tool
+def worktree_status(team_name: str) -> list[dict]:
+    """Branch status of each teammate that runs in its own git worktree:
+    commits ahead of and behind its base branch, uncommitted files, files
+    that would conflict when merged into the base (null if git is older than
+    2.38), and ready (committed, has commits, merges cleanly)."""
+    try:
+        members = [m for m in teams.read_config(team_name).teammates if m.worktree]
+    except FileNotFoundError:
+        raise ToolError(f"Team {team_name!r} not found")
+    statuses = []
+    for member in members:
+        try:
+            statuses.append(worktrees.merge_status(member))
+        except RuntimeError as e:
+            statuses.append({"name": member.name, "worktree": member.worktree, "error": str(e)})
+    return statuses
+
+
+@mcp.tool
+def report_merge_ready(team_name: str, agent_name: str, summary: str = "") -> dict:
+    """Tell team-lead that your worktree branch is ready to be merged.
+    Only for teammates spawned with worktree=True. Fails, listing what to fix,
+    if you have uncommitted changes, no commits beyond the base branch, or
+    changes that conflict with the base branch."""
+    try:
+        member = teams.read_config(team_name).get_teammate(agent_name)
+    except FileNotFoundError:
+        raise ToolError(f"Team {team_name!r} not found")
+    if member is None:
+        raise ToolError(f"Teammate {agent_name!r} not found in team {team_name!r}")
+    try:
+        status = worktrees.merge_status(member)
+    except (ValueError, RuntimeError) as e:
+        raise ToolError(str(e))
+    problems = []
+    if status["uncommittedFiles"]:
+        problems.append(f"commit or discard your changes to {', '.join(status['uncommittedFiles'])}")
+    if status["ahead"] == 0:
+        problems.append(f"{status['branch']} has no commits beyond {status['base']}")
+    if status["conflicts"]:
+        problems.append(
+            f"merge {status['base']} into your branch and resolve the conflicts in "
+            f"{', '.join(status['conflicts'])}"
         )
+    if problems:
+        raise ToolError("Not ready to merge: " + "; ".join(problems))
+    text = (
+        f"{agent_name}'s branch {status['branch']} is ready to merge into {status['base']}: "
+        f"{status['ahead']} commit(s), {status['behind']} behind, no conflicts."
+    )
+    if summary:
+        text += f"\n\n{summary}"
+    messaging.send_plain_message(
+        team_name, agent_name, "team-lead", text,
+        summary=f"{agent_name}: {status['branch']} ready to merge",
+        color=member.color,
+    )
+    _log_activity(f"TOOL DONE: report_merge_ready {agent_name} branch={status['branch']}")
+    return {"success": True, **status}
+
 
-        # Update health state for this agent
-        if status.last_content_hash is not None:
-            if status.last_content_hash != previous_hash:
-                health_state[m.name] = {
-                    "hash": status.last_content_hash,
-                    "last_change_time": time.time(),
-                }
-            elif m.name not in health_state:
-                health_state[m.name] = {
-                    "hash": status.last_content_hash,
-                    "last_change_time": time.time(),
-                }
-
-        results.append(status.model_dump(by_alias=True, exclude_none=True))
-
-    save_health_state(team_name, health_state)
-    return results
+@mcp.tool
+def build_cache_usage(team_name: str) -> dict:
+    """Disk space used by the team's shared build cache (see spawn_teammate's
+    build_cache), in total and per tool, with the number of files and the
+    environment variable that points each tool at it. Hard-linked files are
+    counted once."""
+    if not teams.team_exists(team_name):
+        raise ToolError(f"Team {team_name!r} not found")
+    users = [
+        m.name for m in teams.read_config(team_name).teammates
+        if build_cache.CACHE_ENV.keys() & m.env.keys()
+    ]
+    return {**build_cache.disk_usage(team_name), "agents": users}
 
 
 def _get_log_dir() -> Path:
@@ -7,20 +7,52 @@ import os
 import re
 import shlex
 import shutil
-import signal
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-
-from opencode_teams import messaging, teams
+from typing import Callable, Iterator, NamedTuple
+
+from opencode_teams import (
+    build_cache,
+    headless,
+    launcher,
+    messaging,
+    processes,
+    registry,
+    teams,
+    tmux_control,
+    worktrees,
+)
+from opencode_teams._filelock import file_lock
 from opencode_teams.config_gen import (
     cleanup_agent_config,
     generate_agent_config,
+    generate_assignment_message,
+    generate_standby_config,
+    launch_prompt,
     write_agent_config,
     ensure_opencode_json,
 )
-from opencode_teams.models import AgentHealthStatus, COLOR_PALETTE, InboxMessage, TeammateMember
+from opencode_teams.model_discovery import discover_models, resolve_model_string
+from opencode_teams.models import (
+    AgentHealthStatus,
+    COLOR_PALETTE,
+    InboxMessage,
+    ModelInfo,
+    ModelPreference,
+    ResourceLimits,
+    RestartPolicy,
+    TeamConfig,
+    TeammateMember,
+    TeammateSpec,
+)
+from opencode_teams.task_analysis import infer_model_preference
 from opencode_teams.teams import _VALID_NAME_RE
 
 
@@ -40,7 +72,28 @@ def is_windows() -> bool:
 
 # OpenCode binary discovery and configuration constants
 MINIMUM_OPENCODE_VERSION = (1, 1, 52)
+# Validated binaries, keyed by path and checked against (mtime, size); see
+# validate_opencode_version_cached. Shared by every server on the host.
+VERSION_CACHE_FILENAME = "opencode-version.json"
 SPAWN_TIMEOUT_SECONDS = 300
+RESTARTABLE_BACKENDS = ("tmux", "headless")  # Backends the supervisor can relaunch
+DEFAULT_SPAWN_CONCURRENCY = 8
+SPAWN_TIMINGS_HISTORY = 50  # Recent spawns whose step durations are kept
+
+# Inbox directory (under the teams dir) of warm-pool standby agents. Not a
+# valid team name, so it can never collide with a real team.
+WARM_POOL_DIR = ".warm-pool"
+STANDBY_PROMPT = "You are on standby. Follow your agent instructions and wait for your assignment."
+
+# tmux pane placement: "current" splits the server's own window until it holds
+# PANES_PER_WINDOW panes, then overflows into a dedicated per-team session;
+# "session" always uses the dedicated session. Default: "current" inside tmux.
+TMUX_PLACEMENT_ENV_VAR = "OPENCODE_TEAMS_TMUX_PLACEMENT"
+PANES_PER_WINDOW_ENV_VAR = "OPENCODE_TEAMS_PANES_PER_WINDOW"
+DEFAULT_PANES_PER_WINDOW = 6
+TEAM_SESSION_PREFIX = "opencode-teams-"
+# Size of detached team sessions, so tiled windows have room for their panes
+TEAM_SESSION_SIZE = ("240", "64")
 
 # Desktop app binary discovery constants
 DESKTOP_BINARY_ENV_VAR = "OPENCODE_DESKTOP_BINARY"
@@ -70,39 +123,241 @@ DESKTOP_BINARY_NAMES: dict[str, list[str]] = {
 
 def assign_color(team_name: str, base_dir: Path | None = None) -> str:
     config = teams.read_config(team_name, base_dir)
-    count = sum(1 for m in config.members if isinstance(m, TeammateMember))
-    return COLOR_PALETTE[count % len(COLOR_PALETTE)]
+    return COLOR_PALETTE[len(config.teammates) % len(COLOR_PALETTE)]
 
 
 def build_opencode_run_command(
     member: TeammateMember,
     opencode_binary: str,
     timeout_seconds: int = SPAWN_TIMEOUT_SECONDS,
+    message: str | None = None,
 ) -> str:
     """Build the shell command to run an OpenCode agent in a tmux pane.
 
     Constructs a command with cd, timeout wrapping, and opencode run flags.
-    Does NOT include any Claude Code flags or environment variables.
+    Does NOT include any Claude Code flags or environment variables; only
+    the member's own ``env`` is set.
 
     Args:
         member: The teammate member with name, model, prompt, and cwd.
         opencode_binary: Path to the opencode binary.
         timeout_seconds: Maximum seconds before the process is killed (default: 300).
+        message: The ``opencode run`` message, as returned by
+            ``config_gen.launch_prompt`` in the spawn step; defaults to ``member.prompt``.
 
     Returns:
         Shell command string suitable for tmux split-window.
     """
+    limits = ""
+    if member.resources is not None:
+        limits = shlex.join(launcher.build_launcher_prefix(member.resources, member.cgroup)) + " "
+    env = "".join(f"{k}={shlex.quote(v)} " for k, v in member.env.items())
     return (
         f"cd {shlex.quote(member.cwd)} && "
+        f"{env}"
         f"timeout {timeout_seconds} "
+        f"{limits}"
         f"{shlex.quote(opencode_binary)} run "
         f"--agent {shlex.quote(member.name)} "
         f"--model {shlex.quote(member.model)} "
         f"--format json "
-        f"{shlex.quote(member.prompt)}"
+        f"{shlex.quote(member.prompt if message is None else message)}"
     )
 
 
+def output_log_path(team_name: str, agent_name: str, base_dir: Path | None = None) -> Path:
+    """Path of the file a tmux agent's pane output is piped to."""
+    teams_dir = (base_dir / "teams") if base_dir else teams.TEAMS_DIR
+    return teams_dir / team_name / "output" / f"{agent_name}.log"
+
+
+def build_output_pipe_prefix(log_path: Path) -> str:
+    """Shell prefix that pipes the pane's output to ``log_path``.
+
+    Runs inside the new pane (which knows its own ``$TMUX_PANE``), so starting
+    the pipe costs no extra tmux round trip at spawn time. The log's size and
+    mtime then act as an output byte counter for hung detection. ``cat >>``
+    appends, so the health sweep can empty the log in place
+    (``metrics.truncate_logs``) without restarting the pipe.
+    """
+    pipe_cmd = f"cat >> {shlex.quote(str(log_path))}"
+    return f'tmux pipe-pane -o -t "$TMUX_PANE" {shlex.quote(pipe_cmd)} 2>/dev/null; '
+
+
+def _validate_agent_name(name: str) -> None:
+    if not _VALID_NAME_RE.match(name):
+        raise ValueError(f"Invalid agent name: {name!r}. Use only letters, numbers, hyphens, underscores.")
+    if len(name) > 64:
+        raise ValueError(f"Agent name too long ({len(name)} chars, max 64)")
+    if name == "team-lead":
+        raise ValueError("Agent name 'team-lead' is reserved")
+
+
+def _deliver_initial_prompt(
+    team_name: str, member: TeammateMember, base_dir: Path | None = None
+) -> None:
+    messaging.ensure_inbox(team_name, member.name, base_dir)
+    initial_msg = InboxMessage(
+        from_="team-lead",
+        text=member.prompt,
+        timestamp=messaging.now_iso(),
+        read=False,
+    )
+    messaging.append_message(team_name, member.name, initial_msg, base_dir)
+
+
+def _discard_inbox(team_name: str, name: str, base_dir: Path | None = None) -> None:
+    """Drop the inbox of a member that never joined the team, unread counts included."""
+    try:
+        registry.forget_members(team_name, [name], base_dir)
+        messaging.inbox_path(team_name, name, base_dir).unlink(missing_ok=True)
+    except Exception:
+        pass  # Best effort cleanup
+
+
+def _launch_backend(
+    member: TeammateMember,
+    opencode_binary: str,
+    backend_type: str,
+    desktop_binary: str | None = None,
+    output_log: Path | None = None,
+    timeout_seconds: int = SPAWN_TIMEOUT_SECONDS,
+    message: str | None = None,
+) -> TeammateMember:
+    """Start the agent process and return a copy of ``member`` with its pane ID or PID.
+
+    For tmux, ``output_log`` (if given) receives the pane's output via
+    ``pipe-pane``; for headless it is the agent's event log.
+    ``message`` is the ``launch_prompt`` result for ``member.prompt``.
+    """
+    if backend_type == "desktop":
+        if not desktop_binary:
+            raise ValueError("desktop_binary is required when backend_type='desktop'")
+        pid = launch_desktop_app(desktop_binary, member.cwd, member.env)
+        return member.model_copy(update={"process_id": pid, "backend_type": "desktop"})
+    if backend_type == "headless":
+        if output_log is None:
+            raise ValueError("output_log is required when backend_type='headless'")
+        agent = headless.launch(member, opencode_binary, output_log, timeout_seconds, message)
+        return member.model_copy(update={
+            "process_id": agent.pid,
+            "backend_type": "headless",
+            "output_log": str(output_log),
+        })
+    if backend_type == "windows_terminal":
+        pid = spawn_windows_terminal(member, opencode_binary, message=message)
+        return member.model_copy(update={"process_id": pid, "backend_type": "windows_terminal"})
+    cmd = build_opencode_run_command(member, opencode_binary, timeout_seconds, message)
+    update = {}
+    if output_log is not None:
+        output_log.parent.mkdir(parents=True, exist_ok=True)
+        cmd = build_output_pipe_prefix(output_log) + cmd
+        update["output_log"] = str(output_log)
+    team_name = member.agent_id.partition("@")[2]
+    pane_id, session, window = place_tmux_pane(team_name, cmd)
+    update.update(tmux_pane_id=pane_id, tmux_session=session, tmux_window=window)
+    return member.model_copy(update=update)
+
+
+_spawn_lock = threading.Lock()
+_spawning: set[tuple[str, str]] = set()  # (team, name) of spawns not yet registered
+_spawn_timings: deque[dict] = deque(maxlen=SPAWN_TIMINGS_HISTORY)
+
+
+class SpawnTimer:
+    """Wall-clock duration of each step of one spawn, in milliseconds.
+
+    Steps may run on different threads; each step name is written once.
+    """
+
+    def __init__(self) -> None:
+        self.steps: dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 2)
+
+
+def _record_spawn_timings(team_name: str, name: str, warm: bool, timer: SpawnTimer) -> None:
+    record = {
+        "teamName": team_name,
+        "name": name,
+        "warm": warm,
+        "at": round(time.time(), 3),
+        "steps": dict(timer.steps),
+        "totalMs": timer.total_ms(),
+    }
+    with _spawn_lock:
+        _spawn_timings.append(record)
+
+
+def spawn_timings(team_name: str, name: str) -> dict | None:
+    """Step durations of the most recent successful spawn of ``name`` (None if not recorded)."""
+    with _spawn_lock:
+        for record in reversed(_spawn_timings):
+            if record["teamName"] == team_name and record["name"] == name:
+                return record
+    return None
+
+
+def spawn_latency_summary() -> dict:
+    """Average and maximum duration per step over the last ``SPAWN_TIMINGS_HISTORY`` spawns."""
+    with _spawn_lock:
+        records = list(_spawn_timings)
+    durations: dict[str, list[float]] = {}
+    for record in records:
+        for step, ms in (*record["steps"].items(), ("total", record["totalMs"])):
+            durations.setdefault(step, []).append(ms)
+    return {
+        "spawns": len(records),
+        "steps": {
+            step: {"avgMs": round(sum(values) / len(values), 2), "maxMs": max(values)}
+            for step, values in durations.items()
+        },
+    }
+
+
+def _reserve_names(team_name: str, names: list[str], base_dir: Path | None) -> list[str]:
+    """Claim ``names`` for spawns in progress and pick their colors.
+
+    Returns:
+        The color for each new member, in ``names`` order.
+
+    Raises:
+        ValueError: If a name is taken in the team or by a concurrent spawn.
+    """
+    config = teams.read_config(team_name, base_dir)
+    for name in names:
+        if name in config.member_index:
+            raise ValueError(f"Member {name!r} already exists in team {team_name!r}")
+    with _spawn_lock:
+        for name in names:
+            if (team_name, name) in _spawning:
+                raise ValueError(f"{name!r} is already being spawned in team {team_name!r}")
+        in_flight = sum(1 for t, _ in _spawning if t == team_name)
+        _spawning.update((team_name, name) for name in names)
+    offset = len(config.teammates) + in_flight
+    return [COLOR_PALETTE[(offset + i) % len(COLOR_PALETTE)] for i in range(len(names))]
+
+
+def _reserve_name(team_name: str, name: str, base_dir: Path | None) -> str:
+    """Claim ``name`` for a spawn in progress and return its color (see :func:`_reserve_names`)."""
+    return _reserve_names(team_name, [name], base_dir)[0]
+
+
+def _release_name(team_name: str, name: str) -> None:
+    with _spawn_lock:
+        _spawning.discard((team_name, name))
+
+
 def spawn_teammate(
     team_name: str,
     name: str,
@@ -119,124 +374,653 @@ def spawn_teammate(
     plan_mode_required: bool = False,
     base_dir: Path | None = None,
     project_dir: Path | None = None,
+    warm_agent: TeammateMember | None = None,
+    resources: ResourceLimits | None = None,
+    restart_policy: RestartPolicy | None = None,
+    worktree: bool = False,
+    build_cache: bool = False,
 ) -> TeammateMember:
-    if not _VALID_NAME_RE.match(name):
-        raise ValueError(f"Invalid agent name: {name!r}. Use only letters, numbers, hyphens, underscores.")
-    if len(name) > 64:
-        raise ValueError(f"Agent name too long ({len(name)} chars, max 64)")
-    if name == "team-lead":
-        raise ValueError("Agent name 'team-lead' is reserved")
+    """Register, configure and launch one teammate.
+
+    The spawn runs as a pipeline: the name is reserved (and the color picked)
+    from one cached config read; the inbox with the initial prompt, the agent
+    config and ``opencode.json`` are written concurrently; the backend is
+    launched; and the member is added to the team config in a single write.
+    Each step's duration is kept for :func:`spawn_timings`.
+
+    If ``warm_agent`` (a standby from ``start_standby_agent``, claimed by the
+    caller for the same model and backend) is given, it takes on the new
+    identity instead of a new process being launched. ``resources`` are
+    applied through ``opencode_teams.launcher`` (tmux and headless only) and
+    cannot be combined with a warm agent, which is already running.
+    ``restart_policy`` lets the server's supervisor restart the agent if it
+    dies (tmux and headless only; see :func:`restart_teammate`). With
+    ``worktree`` the agent runs in its own git worktree and branch of the
+    project (see :mod:`opencode_teams.worktrees`). With ``build_cache`` its
+    package managers and compilers use the team's shared cache (see
+    :mod:`opencode_teams.build_cache`).
 
-    color = assign_color(team_name, base_dir)
-    now_ms = int(time.time() * 1000)
+    Raises:
+        ValueError: If the name is invalid or taken, or ``resources``,
+            ``restart_policy``, ``worktree`` or ``build_cache`` cannot be
+            applied.
+    """
+    timer = SpawnTimer()
+    with timer.step("validate"):
+        _validate_agent_name(name)
+        _check_resources(resources, backend_type, warm_agent)
+        _check_restart_policy(restart_policy, backend_type)
+        if worktree and warm_agent is not None:
+            raise ValueError("A warm agent already runs in the project directory, not a worktree")
+        if build_cache and warm_agent is not None:
+            raise ValueError("A warm agent is already running without the shared build cache")
+        color = _reserve_name(team_name, name, base_dir)
+
+    try:
+        # Translate model alias to full provider/model string for OpenCode CLI
+        resolved_model = translate_model(model)
+        project = project_dir or Path.cwd()
+        tree = None
+        if worktree:
+            with timer.step("worktree"):
+                tree = worktrees.create(project, team_name, name, base_dir)
+            project = Path(tree.cwd)
+        member = TeammateMember(
+            agent_id=f"{name}@{team_name}",
+            name=name,
+            agent_type=subagent_type,
+            model=resolved_model,
+            prompt=prompt,
+            color=color,
+            plan_mode_required=plan_mode_required,
+            joined_at=int(time.time() * 1000),
+            tmux_pane_id="",
+            cwd=tree.cwd if tree else cwd or str(Path.cwd()),
+            backend_type=backend_type,
+            is_active=False,
+            resources=resources,
+            cgroup=_cgroup_for(team_name, name, resources),
+            restart_policy=restart_policy,
+            worktree=tree.path if tree else "",
+            branch=tree.branch if tree else "",
+            base_branch=tree.base if tree else "",
+            env=_build_cache_env(team_name, base_dir, build_cache),
+        )
+        agent_settings = dict(
+            agent_id=member.agent_id,
+            name=name,
+            team_name=team_name,
+            color=color,
+            model=resolved_model,
+            role_instructions=role_instructions,
+            custom_instructions=custom_instructions,
+        )
+
+        def _timed(step: str, fn: Callable[[], object]) -> None:
+            with timer.step(step):
+                fn()
+
+        # The three writes touch different files; the agent reads them only once it runs
+        prepare = [
+            ("inbox", lambda: _deliver_initial_prompt(team_name, member, base_dir)),
+            ("agentConfig", lambda: write_agent_config(project, name, generate_agent_config(
+                **agent_settings, worktree_branch=member.branch, worktree_base=member.base_branch,
+            ))),
+        ]
+        if warm_agent is None:
+            prepare.append(("opencodeJson", lambda: ensure_opencode_json(
+                project, mcp_server_command="uv run opencode-teams"
+            )))
+        launched = None
+        try:
+            # opencode.json and the agent config both land under the project; create it first
+            project.mkdir(parents=True, exist_ok=True)
+            with timer.step("prepare"), ThreadPoolExecutor(max_workers=len(prepare)) as pool:
+                for future in [pool.submit(_timed, step, fn) for step, fn in prepare]:
+                    future.result()
+
+            with timer.step("launch"):
+                if warm_agent is not None:
+                    launched = _adopt_standby_agent(
+                        member, warm_agent, project, base_dir,
+                        assignment=generate_assignment_message(**agent_settings),
+                    )
+                else:
+                    launched = _launch_backend(
+                        member, opencode_binary, backend_type, desktop_binary,
+                        output_log=output_log_path(team_name, name, base_dir),
+                        message=launch_prompt(project, name, prompt),
+                    )
+
+            with timer.step("register"):
+                teams.add_member(team_name, launched, base_dir)
+
+        except Exception:
+            # Rollback: nothing is in the team config yet; stop the process and drop its config
+            if warm_agent is not None:
+                # A half-assigned standby cannot go back to the pool
+                stop_agent_process(warm_agent)
+            elif launched is not None:
+                stop_agent_process(launched)
+                release_agent_resources(launched)
+            try:
+                cleanup_agent_config(project, name)
+            except Exception:
+                pass  # Best effort cleanup
+            _discard_inbox(team_name, name, base_dir)
+            _remove_worktree(member)
+            raise
+    finally:
+        _release_name(team_name, name)
+
+    _record_spawn_timings(team_name, name, warm_agent is not None, timer)
+    return launched
+
+
+def _check_resources(
+    resources: ResourceLimits | None, backend_type: str, warm_agent: TeammateMember | None = None
+) -> None:
+    if resources is None:
+        return
+    if backend_type not in ("tmux", "headless"):
+        raise ValueError(f"Resource limits are not supported with backend {backend_type!r}")
+    if warm_agent is not None:
+        raise ValueError("Resource limits cannot be applied to an already running warm agent")
+
+
+def _check_restart_policy(policy: RestartPolicy | None, backend_type: str) -> None:
+    if policy is not None and backend_type not in RESTARTABLE_BACKENDS:
+        raise ValueError(f"Automatic restarts are not supported with backend {backend_type!r}")
+
+
+def _cgroup_for(team_name: str, name: str, resources: ResourceLimits | None) -> str:
+    if resources is None or not resources.wants_cgroup:
+        return ""
+    return launcher.agent_cgroup_path(team_name, name)
+
+
+def _build_cache_env(team_name: str, base_dir: Path | None, enabled: bool) -> dict[str, str]:
+    return build_cache.cache_env(team_name, base_dir) if enabled else {}
+
+
+def _remove_worktree(member: TeammateMember) -> None:
+    try:
+        worktrees.remove(member)
+    except Exception:
+        pass  # Best effort; the worktree and branch stay for the lead to clean up
+
+
+def release_agent_resources(member: TeammateMember) -> None:
+    """Remove an agent's cgroup and git worktree once it has stopped (best effort)."""
+    launcher.remove_cgroup(member.cgroup)
+    _remove_worktree(member)
 
-    # Translate model alias to full provider/model string for OpenCode CLI
-    resolved_model = translate_model(model)
 
+def start_standby_agent(
+    slot: str,
+    model: str,
+    opencode_binary: str,
+    *,
+    backend_type: str = "tmux",
+    project_dir: Path | None = None,
+    timeout_seconds: int = SPAWN_TIMEOUT_SECONDS,
+    wait_seconds: float = SPAWN_TIMEOUT_SECONDS,
+    base_dir: Path | None = None,
+) -> TeammateMember:
+    """Launch a warm-pool standby agent named ``slot``.
+
+    The standby waits on its inbox in ``WARM_POOL_DIR``, in one ``poll_inbox``
+    call of ``wait_seconds``, until ``spawn_teammate(warm_agent=...)`` hands
+    it an identity. Only the tmux and headless backends are supported (both
+    run ``opencode run``).
+
+    Raises:
+        ValueError: If ``slot`` is invalid or the backend cannot host standbys.
+    """
+    _validate_agent_name(slot)
+    if backend_type not in ("tmux", "headless"):
+        raise ValueError(f"Backend {backend_type!r} does not support warm agents")
+    project = project_dir or Path.cwd()
     member = TeammateMember(
-        agent_id=f"{name}@{team_name}",
-        name=name,
-        agent_type=subagent_type,
-        model=resolved_model,
-        prompt=prompt,
-        color=color,
-        plan_mode_required=plan_mode_required,
-        joined_at=now_ms,
+        agent_id=f"{slot}@{WARM_POOL_DIR}",
+        name=slot,
+        agent_type="general-purpose",
+        model=model,
+        prompt=STANDBY_PROMPT,
+        color="",
+        joined_at=int(time.time() * 1000),
         tmux_pane_id="",
-        cwd=cwd or str(Path.cwd()),
+        cwd=str(project),
         backend_type=backend_type,
         is_active=False,
     )
+    messaging.ensure_inbox(WARM_POOL_DIR, slot, base_dir)
+    write_agent_config(project, slot, generate_standby_config(
+        slot, model, WARM_POOL_DIR, wait_ms=int(wait_seconds * 1000),
+    ))
+    try:
+        ensure_opencode_json(project, mcp_server_command="uv run opencode-teams")
+        return _launch_backend(
+            member, opencode_binary, backend_type,
+            output_log=output_log_path(WARM_POOL_DIR, slot, base_dir),
+            timeout_seconds=timeout_seconds,
+            message=launch_prompt(project, slot, STANDBY_PROMPT),
+        )
+    except Exception:
+        cleanup_standby_agent(slot, project, base_dir)
+        raise
 
-    project = project_dir or Path.cwd()
 
-    teams.add_member(team_name, member, base_dir)
+def cleanup_standby_agent(slot: str, project_dir: Path, base_dir: Path | None = None) -> None:
+    """Remove a standby's agent config and pool inbox (best effort)."""
+    try:
+        cleanup_agent_config(project_dir, slot)
+    except Exception:
+        pass  # Best effort cleanup
+    try:
+        messaging.inbox_path(WARM_POOL_DIR, slot, base_dir).unlink(missing_ok=True)
+    except Exception:
+        pass  # Best effort cleanup
 
+
+def _adopt_standby_agent(
+    member: TeammateMember,
+    standby: TeammateMember,
+    project_dir: Path,
+    base_dir: Path | None,
+    assignment: str,
+) -> TeammateMember:
+    messaging.append_message(
+        WARM_POOL_DIR,
+        standby.name,
+        InboxMessage(from_="team-lead", text=assignment, timestamp=messaging.now_iso(), read=False),
+        base_dir,
+    )
+    if standby.backend_type == "headless":
+        headless.rebind(standby.agent_id, member.agent_id)
+    # OpenCode read the standby's agent config at startup; it is no longer needed
     try:
-        messaging.ensure_inbox(team_name, name, base_dir)
-        initial_msg = InboxMessage(
-            from_="team-lead",
-            text=prompt,
-            timestamp=messaging.now_iso(),
-            read=False,
-        )
-        messaging.append_message(team_name, name, initial_msg, base_dir)
+        cleanup_agent_config(project_dir, standby.name)
+    except Exception:
+        pass  # Best effort cleanup
+    return member.model_copy(update={
+        "tmux_pane_id": standby.tmux_pane_id,
+        "tmux_session": standby.tmux_session,
+        "tmux_window": standby.tmux_window,
+        "process_id": standby.process_id,
+        "backend_type": standby.backend_type,
+        "output_log": standby.output_log,
+        "cwd": standby.cwd,
+    })
+
+
+def stop_agent_process(member: TeammateMember) -> None:
+    """Stop an agent's process by backend (best effort; config is left alone)."""
+    try:
+        if member.backend_type == "headless":
+            headless.stop(member.agent_id)
+        elif member.backend_type in ("desktop", "windows_terminal"):
+            if member.process_id:
+                kill_desktop_process(member.process_id)
+        elif member.tmux_pane_id:
+            kill_tmux_pane(member.tmux_pane_id)
+    except Exception:
+        pass  # Already gone
 
-        # Generate agent config for OpenCode
-        config_content = generate_agent_config(
-            agent_id=member.agent_id,
-            name=name,
-            team_name=team_name,
-            color=color,
-            model=resolved_model,
-            role_instructions=role_instructions,
-            custom_instructions=custom_instructions,
+
+def stop_agent_processes(
+    members: list[TeammateMember], max_workers: int = DEFAULT_SPAWN_CONCURRENCY
+) -> None:
+    """Stop several agents' processes concurrently (best effort, see :func:`stop_agent_process`)."""
+    if not members:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(members)))) as pool:
+        list(pool.map(stop_agent_process, members))
+
+
+def _agent_config_dir(team_name: str, member: TeammateMember, base_dir: Path | None) -> Path:
+    """Directory whose ``.opencode/`` holds the member's agent config and prompt file."""
+    return Path(member.cwd) if member.worktree else teams.get_project_dir(team_name, base_dir)
+
+
+def restart_teammate(
+    team_name: str,
+    member: TeammateMember,
+    opencode_binary: str,
+    prompt: str,
+    base_dir: Path | None = None,
+    timeout_seconds: int = SPAWN_TIMEOUT_SECONDS,
+) -> TeammateMember:
+    """Start a new process for a teammate whose previous one has died.
+
+    The teammate keeps its name, color, inbox, tasks and agent config; only
+    the process is replaced. ``prompt`` is what the new process starts with
+    (the stored ``member.prompt`` is left as the original assignment) and
+    ``restart_count`` is incremented.
+
+    Raises:
+        ValueError: If the backend cannot be restarted.
+    """
+    if member.backend_type not in RESTARTABLE_BACKENDS:
+        raise ValueError(f"Cannot restart an agent with backend {member.backend_type!r}")
+    stop_agent_process(member)  # Reap what is left, e.g. a dead pane
+    fresh = member.model_copy(update={"prompt": prompt, "tmux_pane_id": "", "process_id": 0})
+    launched = _launch_backend(
+        fresh, opencode_binary, member.backend_type,
+        output_log=output_log_path(team_name, member.name, base_dir),
+        timeout_seconds=timeout_seconds,
+        message=launch_prompt(_agent_config_dir(team_name, member, base_dir), member.name, prompt),
+    )
+    restarted = launched.model_copy(
+        update={"prompt": member.prompt, "restart_count": member.restart_count + 1}
+    )
+    teams.replace_member(team_name, restarted, base_dir)
+    return restarted
+
+
+def resolve_spec_model(spec: TeammateSpec, models: list[ModelInfo]) -> str:
+    """Resolve a batch spec's model, inferring preferences from its prompt."""
+    explicit = None
+    if spec.reasoning_effort or spec.prefer_speed:
+        explicit = ModelPreference(
+            reasoning_effort=spec.reasoning_effort,
+            prefer_speed=spec.prefer_speed,
         )
-        write_agent_config(project, name, config_content)
-        ensure_opencode_json(project, mcp_server_command="uv run opencode-teams")
+    preference = infer_model_preference(spec.prompt, explicit=explicit)
+    return resolve_model_string(spec.model, models, preference)
 
-        if backend_type == "desktop":
-            if not desktop_binary:
-                raise ValueError("desktop_binary is required when backend_type='desktop'")
-            pid = launch_desktop_app(desktop_binary, member.cwd)
-            config = teams.read_config(team_name, base_dir)
-            for m in config.members:
-                if isinstance(m, TeammateMember) and m.name == name:
-                    m.process_id = pid
-                    m.backend_type = "desktop"
-                    break
-            teams.write_config(team_name, config, base_dir)
-            member.process_id = pid
-        elif backend_type == "windows_terminal":
-            pid = spawn_windows_terminal(member, opencode_binary)
-            config = teams.read_config(team_name, base_dir)
-            for m in config.members:
-                if isinstance(m, TeammateMember) and m.name == name:
-                    m.process_id = pid
-                    m.backend_type = "windows_terminal"
-                    break
-            teams.write_config(team_name, config, base_dir)
-            member.process_id = pid
-        else:
-            cmd = build_opencode_run_command(member, opencode_binary)
-            result = subprocess.run(
-                ["tmux", "split-window", "-dP", "-F", "#{pane_id}", cmd],
-                capture_output=True,
-                text=True,
-                check=True,
+
+def spawn_many(
+    team_name: str,
+    specs: list[TeammateSpec],
+    opencode_binary: str,
+    *,
+    models: list[ModelInfo] | None = None,
+    subagent_type: str = "general-purpose",
+    backend_type: str = "tmux",
+    desktop_binary: str | None = None,
+    cwd: str | None = None,
+    base_dir: Path | None = None,
+    project_dir: Path | None = None,
+    max_workers: int = DEFAULT_SPAWN_CONCURRENCY,
+) -> tuple[list[TeammateMember], dict[str, str]]:
+    """Spawn several teammates with shared setup and concurrent launches.
+
+    All names are validated and every model is resolved (against a single
+    discovery pass) before anything is written. The names are then reserved
+    as in :func:`spawn_teammate`, worktrees, inboxes and agent configs are
+    prepared, ``opencode.json`` is updated once and backends are launched on
+    a bounded thread pool. Only the members that started are added to the
+    team, in one config transaction; a failed launch never enters the config
+    and its inbox, agent config and worktree are removed.
+
+    Args:
+        team_name: Team to add the teammates to.
+        specs: One entry per teammate (name, prompt, instructions, model prefs).
+        opencode_binary: Path to the opencode binary.
+        models: Available models for resolution. Discovered once if None.
+        max_workers: Maximum concurrent backend launches.
+
+    Returns:
+        Tuple of (launched members in spec order, ``{name: error}`` for failures).
+
+    Raises:
+        ValueError: If any name is invalid, duplicated, or already in the team,
+            or a model cannot be resolved.
+    """
+    names = [spec.name for spec in specs]
+    for name in names:
+        _validate_agent_name(name)
+    for spec in specs:
+        _check_resources(spec.resources, backend_type)
+        _check_restart_policy(spec.restart_policy, backend_type)
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate agent names in batch: {', '.join(duplicates)}")
+    if not specs:
+        return [], {}
+
+    if models is None:
+        models = discover_models()
+    resolved_models = [resolve_spec_model(spec, models) for spec in specs]
+
+    now_ms = int(time.time() * 1000)
+    project = project_dir or Path.cwd()
+    cache_env = _build_cache_env(team_name, base_dir, any(spec.build_cache for spec in specs))
+    colors = _reserve_names(team_name, names, base_dir)
+    try:
+        members = [
+            TeammateMember(
+                agent_id=f"{spec.name}@{team_name}",
+                name=spec.name,
+                agent_type=subagent_type,
+                model=resolved_models[i],
+                resources=spec.resources,
+                cgroup=_cgroup_for(team_name, spec.name, spec.resources),
+                restart_policy=spec.restart_policy,
+                prompt=spec.prompt,
+                color=colors[i],
+                plan_mode_required=spec.plan_mode_required,
+                joined_at=now_ms,
+                tmux_pane_id="",
+                cwd=cwd or str(Path.cwd()),
+                backend_type=backend_type,
+                is_active=False,
+                env=cache_env if spec.build_cache else {},
             )
-            pane_id = result.stdout.strip()
-            config = teams.read_config(team_name, base_dir)
-            for m in config.members:
-                if isinstance(m, TeammateMember) and m.name == name:
-                    m.tmux_pane_id = pane_id
-                    break
-            teams.write_config(team_name, config, base_dir)
-            member.tmux_pane_id = pane_id
+            for i, spec in enumerate(specs)
+        ]
 
-    except Exception:
-        # Rollback: remove member from config and agent config if spawn fails
         try:
-            teams.remove_member(team_name, name, base_dir)
+            # --- Phase 1: worktrees, inboxes, agent configs and prompt files, one opencode.json update ---
+            messages: dict[str, str] = {}
+            for i, spec in enumerate(specs):
+                member_project = project
+                if spec.worktree:
+                    tree = worktrees.create(project, team_name, spec.name, base_dir)
+                    members[i] = members[i].model_copy(update={
+                        "cwd": tree.cwd, "worktree": tree.path, "branch": tree.branch, "base_branch": tree.base,
+                    })
+                    member_project = Path(tree.cwd)
+                    ensure_opencode_json(member_project, mcp_server_command="uv run opencode-teams")
+                member = members[i]
+                _deliver_initial_prompt(team_name, member, base_dir)
+                messages[member.name] = launch_prompt(member_project, member.name, member.prompt)
+                write_agent_config(member_project, member.name, generate_agent_config(
+                    agent_id=member.agent_id,
+                    name=member.name,
+                    team_name=team_name,
+                    color=member.color,
+                    model=member.model,
+                    custom_instructions=spec.instructions,
+                    worktree_branch=member.branch,
+                    worktree_base=member.base_branch,
+                ))
+            if not all(spec.worktree for spec in specs):
+                ensure_opencode_json(project, mcp_server_command="uv run opencode-teams")
         except Exception:
-            pass  # Best effort cleanup
+            _rollback_batch(team_name, members, project, base_dir)
+            raise
+
+        # --- Phase 2: launch backends concurrently ---
+        launched: dict[str, TeammateMember] = {}
+        failures: dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(members)))) as pool:
+            futures = {
+                pool.submit(
+                    _launch_backend, m, opencode_binary, backend_type, desktop_binary,
+                    output_log_path(team_name, m.name, base_dir),
+                    message=messages[m.name],
+                ): m.name
+                for m in members
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    launched[name] = future.result()
+                except Exception as e:
+                    failures[name] = f"{type(e).__name__}: {e}"
+
+        # --- Phase 3: register the members that started in one transaction ---
+        started = [launched[n] for n in names if n in launched]
+
+        def _register(config: TeamConfig) -> TeamConfig:
+            taken = [m.name for m in started if m.name in config.member_index]
+            if taken:
+                raise ValueError(f"Member(s) already exist in team {team_name!r}: {', '.join(taken)}")
+            return config.model_copy(update={"members": (*config.members, *started)})
+
+        try:
+            if started:
+                teams.update_config(team_name, _register, base_dir)
+        except Exception:
+            # Nothing is in the team config; stop the processes and drop what they had
+            stop_agent_processes(started)
+            for member in started:
+                release_agent_resources(member)
+            _rollback_batch(team_name, members, project, base_dir)
+            raise
+        _rollback_batch(team_name, [m for m in members if m.name in failures], project, base_dir)
+        return started, failures
+    finally:
+        for name in names:
+            _release_name(team_name, name)
+
+
+def _rollback_batch(
+    team_name: str, members: list[TeammateMember], project: Path, base_dir: Path | None = None
+) -> None:
+    """Remove the agent configs, inboxes and worktrees of batch members that never joined."""
+    for member in members:
         try:
-            cleanup_agent_config(project, name)
+            cleanup_agent_config(project, member.name)
         except Exception:
             pass  # Best effort cleanup
-        raise
+        _discard_inbox(team_name, member.name, base_dir)
+        _remove_worktree(member)
 
-    return member
+
+def _run_tmux(args: list[str], **kwargs) -> subprocess.CompletedProcess:
+    """Run ``tmux <args>`` over the control-mode connection if one is open.
+
+    Falls back to ``subprocess.run(["tmux", *args], **kwargs)`` when control
+    mode is disabled or the command could not be sent over it.
+    """
+    client = tmux_control.get_client()
+    if client is not None:
+        try:
+            return client.run(args, timeout=kwargs.get("timeout"), check=kwargs.get("check", False))
+        except tmux_control.ControlModeUnavailable:
+            pass  # Not sent; use a one-off tmux process instead
+    return subprocess.run(["tmux", *args], **kwargs)
 
 
 def kill_tmux_pane(pane_id: str) -> None:
-    subprocess.run(["tmux", "kill-pane", "-t", pane_id], check=False)
+    _run_tmux(["kill-pane", "-t", pane_id], check=False)
+
+
+# Printed by split-window/new-window/new-session -P; the session name goes last
+# because it is the only field that may contain spaces.
+_NEW_PANE_FORMAT = "#{pane_id} #{window_index} #{session_name}"
+
+# Serializes placement so that concurrent spawns (spawn_many) do not race to
+# create the same session or overfill the same window.
+_placement_lock = threading.Lock()
+
+
+def team_session_name(team_name: str) -> str:
+    """Name of the dedicated tmux session holding ``team_name``'s overflow panes."""
+    return TEAM_SESSION_PREFIX + re.sub(r"[^A-Za-z0-9_-]", "_", team_name)
+
+
+def _panes_per_window() -> int:
+    try:
+        return max(1, int(os.environ.get(PANES_PER_WINDOW_ENV_VAR, DEFAULT_PANES_PER_WINDOW)))
+    except ValueError:
+        return DEFAULT_PANES_PER_WINDOW
+
+
+def _parse_new_pane(stdout: str) -> tuple[str, str, str]:
+    parts = stdout.strip().split(" ", 2)
+    parts += [""] * (3 - len(parts))
+    pane_id, window, session = parts
+    return pane_id, session, window
+
+
+def _current_window_has_room(limit: int) -> bool:
+    result = _run_tmux(
+        ["display-message", "-p", "#{window_panes}"],
+        capture_output=True, text=True, timeout=5,
+    )
+    if result.returncode != 0:
+        return False  # No current window (server not started from inside tmux)
+    count = result.stdout.strip()
+    return not count.isdigit() or int(count) < limit
+
+
+def _place_in_team_session(team_name: str, cmd: str, limit: int) -> tuple[str, str, str]:
+    session = team_session_name(team_name)
+    result = _run_tmux(
+        ["list-windows", "-t", f"={session}", "-F", "#{window_index} #{window_panes}"],
+        capture_output=True, text=True, timeout=5,
+    )
+    if result.returncode != 0:
+        result = _run_tmux(
+            ["new-session", "-dP", "-F", _NEW_PANE_FORMAT, "-s", session, "-n", f"{team_name}-0",
+             "-x", TEAM_SESSION_SIZE[0], "-y", TEAM_SESSION_SIZE[1], cmd],
+            capture_output=True, text=True, check=True,
+        )
+        return _parse_new_pane(result.stdout)
+    windows = [line.split() for line in result.stdout.splitlines()]
+    for index, panes in windows:
+        if int(panes) < limit:
+            target = f"={session}:{index}"
+            result = _run_tmux(
+                ["split-window", "-dP", "-F", _NEW_PANE_FORMAT, "-t", target, cmd],
+                capture_output=True, text=True, check=True,
+            )
+            _run_tmux(["select-layout", "-t", target, "tiled"], check=False)
+            return _parse_new_pane(result.stdout)
+    result = _run_tmux(
+        ["new-window", "-dP", "-F", _NEW_PANE_FORMAT, "-t", f"={session}:",
+         "-n", f"{team_name}-{len(windows)}", cmd],
+        capture_output=True, text=True, check=True,
+    )
+    return _parse_new_pane(result.stdout)
+
+
+def place_tmux_pane(team_name: str, cmd: str) -> tuple[str, str, str]:
+    """Start ``cmd`` in a new tmux pane for ``team_name``'s agent.
+
+    Windows hold at most ``OPENCODE_TEAMS_PANES_PER_WINDOW`` panes (default
+    ``DEFAULT_PANES_PER_WINDOW``), which keeps tmux clear of "no space for
+    new pane" and keeps redraws cheap. See ``TMUX_PLACEMENT_ENV_VAR`` for
+    where panes go; dedicated team windows use the ``tiled`` layout.
+
+    Returns:
+        (pane_id, session_name, window_index) of the new pane.
+    """
+    limit = _panes_per_window()
+    default_mode = "current" if os.environ.get("TMUX") else "session"
+    with _placement_lock:
+        if os.environ.get(TMUX_PLACEMENT_ENV_VAR, default_mode) == "current" \
+                and _current_window_has_room(limit):
+            try:
+                result = _run_tmux(
+                    ["split-window", "-dP", "-F", _NEW_PANE_FORMAT, cmd],
+                    capture_output=True, text=True, check=True,
+                )
+                return _parse_new_pane(result.stdout)
+            except subprocess.CalledProcessError:
+                pass  # Window too small for another pane; overflow to the team session
+        return _place_in_team_session(team_name, cmd, limit)
 
 
 def build_windows_terminal_command(
     member: TeammateMember,
     opencode_binary: str,
     timeout_seconds: int = SPAWN_TIMEOUT_SECONDS,
+    message: str | None = None,
 ) -> list[str]:
     """Build the command to run an OpenCode agent in a new Windows terminal.
 
@@ -246,12 +1030,13 @@ def build_windows_terminal_command(
         member: The teammate member with name, model, prompt, and cwd.
         opencode_binary: Path to the opencode binary.
         timeout_seconds: Maximum seconds before the process is killed (default: 300).
+        message: The ``opencode run`` message; defaults to ``member.prompt``.
 
     Returns:
         Command list for subprocess.Popen.
     """
     # Escape single quotes for PowerShell single-quoted strings (' → '')
-    escaped_prompt = member.prompt.replace("'", "''")
+    escaped_prompt = (member.prompt if message is None else message).replace("'", "''")
     escaped_cwd = member.cwd.replace("'", "''")
     escaped_binary = opencode_binary.replace("'", "''")
 
@@ -296,6 +1081,7 @@ def spawn_windows_terminal(
     member: TeammateMember,
     opencode_binary: str,
     timeout_seconds: int = SPAWN_TIMEOUT_SECONDS,
+    message: str | None = None,
 ) -> int:
     """Spawn an OpenCode agent in a new Windows terminal window.
 
@@ -305,11 +1091,12 @@ def spawn_windows_terminal(
         member: The teammate member with name, model, prompt, and cwd.
         opencode_binary: Path to the opencode binary.
         timeout_seconds: Maximum seconds before the process is killed.
+        message: The ``opencode run`` message; defaults to ``member.prompt``.
 
     Returns:
         PID of the spawned process (note: this is the PowerShell process PID).
     """
-    cmd = build_windows_terminal_command(member, opencode_binary, timeout_seconds)
+    cmd = build_windows_terminal_command(member, opencode_binary, timeout_seconds, message)
 
     # Use subprocess.Popen with CREATE_NEW_CONSOLE to spawn in a new visible window.
     # Do NOT redirect stdin/stdout/stderr — with CREATE_NEW_CONSOLE, the new console
@@ -318,10 +1105,11 @@ def spawn_windows_terminal(
     proc = subprocess.Popen(
         cmd,
         cwd=member.cwd,
+        env={**os.environ, **member.env} if member.env else None,
         creationflags=subprocess.CREATE_NEW_CONSOLE,
     )
 
-    return proc.pid
+    return processes.track(proc)
 
 
 # cleanup_agent_config is re-exported from config_gen for backward compatibility
@@ -331,6 +1119,20 @@ def spawn_windows_terminal(
 
 DEFAULT_HUNG_TIMEOUT_SECONDS = 120
 DEFAULT_GRACE_PERIOD_SECONDS = 60
+DEFAULT_HEALTH_CONCURRENCY = 8
+
+_LIST_PANES_FORMAT = (
+    "#{pane_id} #{pane_dead} #{pane_pid} #{window_activity} #{window_panes} #{pane_pipe}"
+)
+
+
+class PaneState(NamedTuple):
+    pane_id: str
+    dead: bool
+    pid: int | None
+    activity: int | None  # Epoch seconds of the last activity in the pane's window
+    window_panes: int | None = None
+    piped: bool | None = None  # Whether pipe-pane is active for the pane
 
 
 def check_pane_alive(pane_id: str) -> bool:
@@ -347,8 +1149,8 @@ def check_pane_alive(pane_id: str) -> bool:
     if not pane_id:
         return False
     try:
-        result = subprocess.run(
-            ["tmux", "display-message", "-p", "-t", pane_id, "#{pane_dead}"],
+        result = _run_tmux(
+            ["display-message", "-p", "-t", pane_id, "#{pane_dead}"],
             capture_output=True,
             text=True,
             timeout=5,
@@ -360,7 +1162,65 @@ def check_pane_alive(pane_id: str) -> bool:
     return result.stdout.strip() == "0"
 
 
-def capture_pane_content_hash(pane_id: str) -> str | None:
+def list_pane_states() -> dict[str, PaneState] | None:
+    """Fetch the state of every tmux pane with one ``tmux list-panes -a`` call.
+
+    Returns:
+        Mapping of pane ID to :class:`PaneState` (empty if no tmux server is
+        running), or None if tmux could not be queried.
+    """
+    try:
+        result = _run_tmux(
+            ["list-panes", "-a", "-F", _LIST_PANES_FORMAT],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    if result.returncode != 0:
+        if "no server running" in (result.stderr or ""):
+            return {}
+        return None
+    panes: dict[str, PaneState] = {}
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        pane_id, dead, pid, activity = parts[:4]
+        window_panes = parts[4] if len(parts) > 4 else ""
+        panes[pane_id] = PaneState(
+            pane_id=pane_id,
+            dead=dead == "1",
+            pid=int(pid) if pid.isdigit() else None,
+            activity=int(activity) if activity.isdigit() else None,
+            window_panes=int(window_panes) if window_panes.isdigit() else None,
+            piped=(parts[5] == "1") if len(parts) > 5 else None,
+        )
+    return panes
+
+
+def activity_signature(member: TeammateMember, pane: PaneState | None = None) -> str | None:
+    """Cheap progress signature for hung detection, without capturing the pane.
+
+    Uses, in order: the size and mtime of the agent's ``pipe-pane`` output log
+    (a byte counter that also sees output scrolled off-screen), then
+    ``window_activity`` when the pane has its window to itself. Returns None
+    when neither is available, in which case callers hash the pane content.
+    """
+    if member.output_log and (pane is None or pane.piped is not False):
+        try:
+            st = os.stat(member.output_log)
+        except OSError:
+            st = None
+        if st is not None:
+            return f"bytes:{st.st_size}:{st.st_mtime_ns}"
+    if pane is not None and pane.window_panes == 1 and pane.activity is not None:
+        return f"activity:{pane.activity}"
+    return None
+
+
+def capture_pane_content_hash(pane_id: str, control_mode: bool = True) -> str | None:
     """Capture visible pane content and return its SHA-256 hex digest.
 
     Uses ``tmux capture-pane -p`` (visible content only -- no ``-S-`` flag
@@ -368,19 +1228,21 @@ def capture_pane_content_hash(pane_id: str) -> str | None:
 
     Args:
         pane_id: tmux pane identifier (e.g. ``%42``).
+        control_mode: Send the command over the control-mode connection if
+            one is open. Concurrent captures pass False: the connection runs
+            one command at a time, so they would queue behind each other.
 
     Returns:
         64-character hex digest of the pane content, or None on failure.
     """
     if not pane_id:
         return None
+    args = ["capture-pane", "-p", "-t", pane_id]
     try:
-        result = subprocess.run(
-            ["tmux", "capture-pane", "-p", "-t", pane_id],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
+        if control_mode:
+            result = _run_tmux(args, capture_output=True, text=True, timeout=5)
+        else:
+            result = subprocess.run(["tmux", *args], capture_output=True, text=True, timeout=5)
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return None
     if result.returncode != 0:
@@ -417,7 +1279,21 @@ def save_health_state(team_name: str, state: dict, base_dir: Path | None = None)
     teams_dir = (base_dir / "teams") if base_dir else teams.TEAMS_DIR
     health_path = teams_dir / team_name / "health.json"
     health_path.parent.mkdir(parents=True, exist_ok=True)
-    health_path.write_text(json.dumps(state, indent=2))
+    data = json.dumps(state, indent=2)
+
+    # Atomic write: the lead's tools and the background sweep read it concurrently
+    fd, tmp_path = tempfile.mkstemp(dir=health_path.parent, suffix=".tmp")
+    try:
+        os.write(fd, data.encode())
+        os.close(fd)
+        fd = -1
+        os.replace(tmp_path, health_path)
+    except BaseException:
+        if fd >= 0:
+            os.close(fd)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
 
 def check_single_agent_health(
@@ -426,6 +1302,9 @@ def check_single_agent_health(
     last_change_time: float | None,
     hung_timeout: int = DEFAULT_HUNG_TIMEOUT_SECONDS,
     grace_period: int = DEFAULT_GRACE_PERIOD_SECONDS,
+    pane_dead: bool | None = None,
+    pane_state: PaneState | None = None,
+    capture_via_control: bool = True,
 ) -> AgentHealthStatus:
     """Determine the health status of a single agent.
 
@@ -439,6 +1318,11 @@ def check_single_agent_health(
         hung_timeout: Seconds of unchanged content before declaring hung.
         grace_period: Seconds after spawn during which the agent is not
             considered hung (allows for startup time).
+        pane_dead: Pane liveness already fetched by a batched sweep (see
+            :func:`check_agents_health`). If None, the pane is queried.
+        pane_state: The pane's entry from the same sweep, used for the
+            cheap activity signature (see :func:`activity_signature`).
+        capture_via_control: Passed to :func:`capture_pane_content_hash`.
 
     Returns:
         AgentHealthStatus with the determined status and detail.
@@ -448,11 +1332,16 @@ def check_single_agent_health(
         pid = member.process_id
         backend_label = "Desktop" if member.backend_type == "desktop" else "Windows terminal"
         if not check_process_alive(pid):
+            code = processes.exit_code(pid)
             return AgentHealthStatus(
                 agent_name=member.name,
                 pane_id=str(pid),
                 status="dead",
-                detail=f"{backend_label} process is no longer running",
+                detail=(
+                    f"{backend_label} process is no longer running"
+                    + ("" if code is None else f" (exit code {code})")
+                ),
+                exit_code=code,
             )
         return AgentHealthStatus(
             agent_name=member.name,
@@ -461,11 +1350,45 @@ def check_single_agent_health(
             detail=f"{backend_label} process is running",
         )
 
-    # Tmux backend: existing logic (unchanged)
+    # Headless backend: process handle for liveness, event arrival for progress
+    if member.backend_type == "headless":
+        pid_label = str(member.process_id)
+        agent = headless.get_agent(member.agent_id)
+        exit_code = None
+        if agent is not None:
+            exit_code = agent.poll()
+            alive = exit_code is None
+            dead_detail = f"Headless process exited with code {exit_code}"
+            signature = f"events:{agent.events}"
+        else:
+            # Started by an earlier server process: fall back to PID and log file
+            alive = check_process_alive(member.process_id)
+            dead_detail = "Headless process is no longer running"
+            signature = activity_signature(member)
+        if not alive:
+            return AgentHealthStatus(
+                agent_name=member.name, pane_id=pid_label, status="dead", detail=dead_detail,
+                exit_code=exit_code,
+            )
+        if signature is None:
+            return AgentHealthStatus(
+                agent_name=member.name, pane_id=pid_label, status="alive",
+                detail="Headless process is running",
+            )
+        return _progress_status(
+            member, pid_label, signature, previous_hash, last_change_time,
+            hung_timeout, grace_period, active_detail="Headless process is running",
+        )
+
+    # Tmux backend
     pane_id = member.tmux_pane_id
 
     # Step 1: pane liveness
-    if not check_pane_alive(pane_id):
+    if pane_dead is None:
+        alive = check_pane_alive(pane_id)
+    else:
+        alive = bool(pane_id) and not pane_dead
+    if not alive:
         return AgentHealthStatus(
             agent_name=member.name,
             pane_id=pane_id,
@@ -473,8 +1396,11 @@ def check_single_agent_health(
             detail="Pane is missing or dead",
         )
 
-    # Step 2: capture content hash
-    current_hash = capture_pane_content_hash(pane_id)
+    # Step 2: progress signature -- output byte counter or window activity
+    # when available, otherwise a hash of the visible pane content
+    current_hash = activity_signature(member, pane_state)
+    if current_hash is None:
+        current_hash = capture_pane_content_hash(pane_id, control_mode=capture_via_control)
     if current_hash is None:
         return AgentHealthStatus(
             agent_name=member.name,
@@ -483,6 +1409,23 @@ def check_single_agent_health(
             detail="Failed to capture pane content",
         )
 
+    return _progress_status(
+        member, pane_id, current_hash, previous_hash, last_change_time,
+        hung_timeout, grace_period, active_detail="Pane is active",
+    )
+
+
+def _progress_status(
+    member: TeammateMember,
+    pane_id: str,
+    current_hash: str,
+    previous_hash: str | None,
+    last_change_time: float | None,
+    hung_timeout: int,
+    grace_period: int,
+    active_detail: str,
+) -> AgentHealthStatus:
+    """Grace period and hung detection for a live agent with a progress signature."""
     # Step 3: grace period -- recently spawned agents are always "alive"
     age_seconds = (time.time() * 1000 - member.joined_at) / 1000
     if age_seconds < grace_period:
@@ -501,12 +1444,18 @@ def check_single_agent_health(
         and last_change_time is not None
         and time.time() - last_change_time >= hung_timeout
     ):
+        signal_kind = (
+            "Output" if current_hash.startswith(("bytes:", "activity:", "events:")) else "Content"
+        )
         return AgentHealthStatus(
             agent_name=member.name,
             pane_id=pane_id,
             status="hung",
             last_content_hash=current_hash,
-            detail=f"Content unchanged for {time.time() - last_change_time:.0f}s (threshold: {hung_timeout}s)",
+            detail=(
+                f"{signal_kind} unchanged for "
+                f"{time.time() - last_change_time:.0f}s (threshold: {hung_timeout}s)"
+            ),
         )
 
     # Step 5: alive
@@ -515,10 +1464,60 @@ def check_single_agent_health(
         pane_id=pane_id,
         status="alive",
         last_content_hash=current_hash,
-        detail="Pane is active",
+        detail=active_detail,
     )
 
 
+def check_agents_health(
+    members: list[TeammateMember],
+    health_state: dict,
+    hung_timeout: int = DEFAULT_HUNG_TIMEOUT_SECONDS,
+    grace_period: int = DEFAULT_GRACE_PERIOD_SECONDS,
+    max_workers: int = DEFAULT_HEALTH_CONCURRENCY,
+) -> list[AgentHealthStatus]:
+    """Check several agents using one batched tmux liveness query.
+
+    Liveness for every tmux pane comes from a single :func:`list_pane_states`
+    call; the per-agent checks (progress signature for live panes, process
+    checks for desktop backends) then run concurrently, so one slow pane does
+    not hold up the rest. If the batched query fails, each check queries its own
+    pane as before. Pane captures made in parallel bypass the tmux control-mode
+    connection, which would serialize them.
+
+    Args:
+        members: Teammates to check.
+        health_state: Persisted state from :func:`load_health_state`; read only.
+
+    Returns:
+        One AgentHealthStatus per member, in the same order.
+    """
+    if not members:
+        return []
+    panes = None
+    if any(m.backend_type == "tmux" for m in members):
+        panes = list_pane_states()
+    workers = max(1, min(max_workers, len(members)))
+
+    def _check(member: TeammateMember) -> AgentHealthStatus:
+        agent_state = health_state.get(member.name, {})
+        kwargs = {"capture_via_control": workers == 1}
+        if panes is not None and member.backend_type == "tmux":
+            pane = panes.get(member.tmux_pane_id)
+            kwargs["pane_dead"] = pane is None or pane.dead
+            kwargs["pane_state"] = pane
+        return check_single_agent_health(
+            member,
+            previous_hash=agent_state.get("hash"),
+            last_change_time=agent_state.get("last_change_time"),
+            hung_timeout=hung_timeout,
+            grace_period=grace_period,
+            **kwargs,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_check, members))
+
+
 # OpenCode binary discovery and configuration functions
 
 
@@ -538,7 +1537,7 @@ def discover_opencode_binary() -> str:
             "Could not find 'opencode' binary on PATH. "
             "Install from https://opencode.ai"
         )
-    validate_opencode_version(path)
+    validate_opencode_version_cached(path)
     return path
 
 
@@ -586,7 +1585,7 @@ def discover_desktop_binary() -> str:
     )
 
 
-def launch_desktop_app(binary_path: str, cwd: str) -> int:
+def launch_desktop_app(binary_path: str, cwd: str, env: dict[str, str] | None = None) -> int:
     """Launch OpenCode Desktop and return its PID.
 
     Uses subprocess.Popen for direct process creation to get the actual
@@ -596,6 +1595,7 @@ def launch_desktop_app(binary_path: str, cwd: str) -> int:
     Args:
         binary_path: Path to the desktop binary.
         cwd: Working directory (project root).
+        env: Variables added to the server's environment for the app.
 
     Returns:
         PID of the launched desktop process.
@@ -603,6 +1603,8 @@ def launch_desktop_app(binary_path: str, cwd: str) -> int:
     kwargs: dict = {
         "cwd": cwd,
     }
+    if env:
+        kwargs["env"] = {**os.environ, **env}
 
     if sys.platform == "win32":
         kwargs["creationflags"] = (
@@ -612,15 +1614,16 @@ def launch_desktop_app(binary_path: str, cwd: str) -> int:
         kwargs["start_new_session"] = True
 
     proc = subprocess.Popen([binary_path], **kwargs)
-    return proc.pid
+    return processes.track(proc)
 
 
 def check_process_alive(pid: int) -> bool:
     """Check whether a process with the given PID is still running.
 
-    Cross-platform: uses os.kill(pid, 0) which sends no signal but
-    checks process existence. Raises OSError if the process does not
-    exist.
+    For children this server started (see :mod:`opencode_teams.processes`)
+    the tracked handle decides, so an exited child is not mistaken for a
+    live one while it is a zombie. Otherwise uses os.kill(pid, 0), which
+    sends no signal but checks process existence.
 
     Args:
         pid: Process ID to check.
@@ -630,6 +1633,8 @@ def check_process_alive(pid: int) -> bool:
     """
     if pid <= 0:
         return False
+    if processes.lookup(pid) is not None:
+        return processes.exit_code(pid) is None
     try:
         os.kill(pid, 0)
         return True
@@ -638,23 +1643,18 @@ def check_process_alive(pid: int) -> bool:
 
 
 def kill_desktop_process(pid: int) -> None:
-    """Terminate a desktop process by PID.
+    """Terminate a desktop or Windows terminal agent and its process tree.
 
-    Sends SIGTERM on POSIX or calls TerminateProcess on Windows.
+    Sends SIGTERM to the process group, escalating to SIGKILL if it has not
+    exited in time (``taskkill /T /F`` on Windows), and reaps the child. A
+    PID this server did not start is signalled on its own (see
+    ``processes.terminate``).
     Does not raise if the process is already dead.
 
     Args:
         pid: Process ID to terminate.
     """
-    if pid <= 0:
-        return
-    try:
-        if sys.platform == "win32":
-            os.kill(pid, signal.SIGTERM)
-        else:
-            os.kill(pid, signal.SIGTERM)
-    except (OSError, SystemError):
-        pass  # Process already dead
+    processes.terminate(pid)
 
 
 def validate_opencode_version(binary_path: str) -> str:
@@ -709,6 +1709,86 @@ def validate_opencode_version(binary_path: str) -> str:
     return version_str
 
 
+def _version_cache_path() -> Path:
+    return teams.TEAMS_DIR.parent / VERSION_CACHE_FILENAME
+
+
+def _binary_signature(binary_path: str) -> dict | None:
+    try:
+        st = os.stat(binary_path)
+    except OSError:
+        return None
+    return {"mtimeNs": st.st_mtime_ns, "size": st.st_size}
+
+
+def _read_version_cache() -> dict:
+    try:
+        data = json.loads(_version_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def cached_opencode_version(binary_path: str) -> str | None:
+    """Version recorded for ``binary_path`` by an earlier validation, if still valid.
+
+    The entry only counts while the binary's mtime and size are unchanged
+    (an upgrade in place invalidates it) and the version still meets
+    ``MINIMUM_OPENCODE_VERSION``.
+    """
+    signature = _binary_signature(binary_path)
+    if signature is None:
+        return None
+    entry = _read_version_cache().get(binary_path)
+    if not isinstance(entry, dict) or {k: entry.get(k) for k in signature} != signature:
+        return None
+    version = entry.get("version", "")
+    try:
+        if tuple(int(x) for x in version.split(".")) < MINIMUM_OPENCODE_VERSION:
+            return None
+    except ValueError:
+        return None
+    return version
+
+
+def validate_opencode_version_cached(binary_path: str) -> str:
+    """``validate_opencode_version`` that skips ``--version`` for known binaries.
+
+    Successful validations are recorded on disk keyed by (path, mtime,
+    size), so every server process on the host after the first one (each
+    agent starts its own) starts without a subprocess. Failures are not
+    cached.
+
+    Raises:
+        RuntimeError: As ``validate_opencode_version``.
+    """
+    version = cached_opencode_version(binary_path)
+    if version is not None:
+        return version
+    version = validate_opencode_version(binary_path)
+    signature = _binary_signature(binary_path)
+    if signature is None:
+        return version
+    path = _version_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(path.parent / ".version-cache.lock"):
+            data = _read_version_cache()
+            data[binary_path] = {**signature, "version": version}
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+    except OSError:
+        pass  # Best effort: the next start validates again
+    return version
+
+
 def translate_model(
     model_alias: str,
     models: list | None = None,
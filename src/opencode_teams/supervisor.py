@@ -0,0 +1,320 @@
+"""Supervisor: automatic restart of dead teammates that opted in.
+
+Teammates spawned with a :class:`~opencode_teams.models.RestartPolicy` are
+watched through the health monitor's sweeps. When one is reported ``dead``
+(for example because the ``timeout`` wrapper ended a long task, exit code
+124) a restart is scheduled with exponential backoff, and :meth:`Supervisor.run_due` starts a
+new process under the same name via :func:`spawner.restart_teammate`. The new
+process is told it was restarted and given its ``in_progress`` tasks and
+unread inbox messages as resume context; the inbox itself is left untouched.
+
+A death within ``crash_loop_seconds`` of a start extends the agent's crash
+streak (which doubles the backoff); any other death resets it. When the
+streak reaches ``crash_loop_limit``, or ``max_restarts`` is used up, the
+supervisor gives up: the agent's tasks go back to pending and the team lead
+is told. The team lead also gets a message on every restart.
+
+An agent that finished is not restarted: one that exited with code 0 or
+approved a shutdown request since it was last started. Where the exit code
+is unknown (a tmux pane closes with its command), only the approval counts.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+
+from opencode_teams import messaging, spawner, tasks, teams
+from opencode_teams.models import AgentHealthStatus, RestartPolicy, TeammateMember
+
+HISTORY_SIZE = 50
+MAX_RESUME_MESSAGES = 10
+MAX_RESUME_MESSAGE_CHARS = 500
+
+
+class PendingRestart(NamedTuple):
+    due: float
+    streak: int
+    reason: str
+
+
+def backoff_delay(policy: RestartPolicy, streak: int) -> float:
+    """Seconds to wait before the restart following ``streak`` quick deaths in a row."""
+    return min(policy.max_backoff_seconds, policy.backoff_seconds * 2 ** streak)
+
+
+def build_resume_prompt(
+    team_name: str,
+    member: TeammateMember,
+    reason: str,
+    base_dir: Path | None = None,
+) -> str:
+    """The original assignment plus what a restarted agent needs to pick up its work."""
+    policy = member.restart_policy or RestartPolicy()
+    lines = [
+        member.prompt,
+        "",
+        "---",
+        f"You are {member.name}, restarted by the team supervisor after your previous "
+        f"process stopped ({reason}); this is restart {member.restart_count + 1} of "
+        f"{policy.max_restarts}. Continue from where you left off instead of starting over.",
+    ]
+    try:
+        owned = [
+            t for t in tasks.list_tasks(team_name, base_dir)
+            if t.owner == member.name and t.status == "in_progress"
+        ]
+    except ValueError:
+        owned = []
+    if owned:
+        lines += ["", "Your tasks still in progress:"]
+        lines += [f"- #{t.id} {t.subject}: {t.description}" for t in owned]
+    unread = messaging.read_inbox(
+        team_name, member.name, unread_only=True, mark_as_read=False, base_dir=base_dir
+    )
+    if unread:
+        lines += ["", f"Unread messages in your inbox ({len(unread)}; read them with read_inbox):"]
+        for msg in unread[-MAX_RESUME_MESSAGES:]:
+            text = msg.summary or msg.text
+            if len(text) > MAX_RESUME_MESSAGE_CHARS:
+                text = text[:MAX_RESUME_MESSAGE_CHARS] + "..."
+            lines.append(f"- from {msg.from_}: {text}")
+    return "\n".join(lines)
+
+
+def _approved_shutdown_since(
+    team_name: str, name: str, since: float, base_dir: Path | None = None
+) -> bool:
+    """Whether ``name`` sent the lead a ``shutdown_approved`` after epoch ``since``."""
+    for msg in messaging.read_inbox(team_name, "team-lead", mark_as_read=False, base_dir=base_dir):
+        if msg.from_ != name:
+            continue
+        try:
+            data = json.loads(msg.text)
+            sent = datetime.fromisoformat(msg.timestamp).timestamp()
+        except ValueError:
+            continue
+        if isinstance(data, dict) and data.get("type") == "shutdown_approved" and sent >= since:
+            return True
+    return False
+
+
+def finished_reason(
+    team_name: str,
+    member: TeammateMember,
+    status: AgentHealthStatus,
+    started: float,
+    base_dir: Path | None = None,
+) -> str | None:
+    """Why a dead teammate needs no restart (None if it died abnormally)."""
+    if status.exit_code == 0:
+        return "exited normally (code 0)"
+    if _approved_shutdown_since(team_name, member.name, started, base_dir):
+        return "approved a shutdown request"
+    return None
+
+
+class Supervisor:
+    """Restart schedule and crash-loop state for supervised teammates."""
+
+    def __init__(self, opencode_binary: str | None = None, base_dir: Path | None = None) -> None:
+        self.opencode_binary = opencode_binary  # None until the server has validated it
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, str], PendingRestart] = {}
+        self._streaks: dict[tuple[str, str], int] = {}
+        self._started: dict[tuple[str, str], float] = {}
+        self._gave_up: dict[tuple[str, str], str] = {}
+        self._finished: dict[tuple[str, str], str] = {}  # Dead but done; not restarted
+        self._draining: set[str] = set()
+        self._history: deque[dict] = deque(maxlen=HISTORY_SIZE)
+
+    def _record(self, team_name: str, name: str, event: str, detail: str) -> None:
+        # Caller holds self._lock
+        self._history.append({
+            "teamName": team_name,
+            "name": name,
+            "event": event,
+            "detail": detail,
+            "at": round(time.time(), 3),
+        })
+
+    def _give_up(self, team_name: str, member: TeammateMember, why: str) -> None:
+        with self._lock:
+            self._gave_up[(team_name, member.name)] = why
+            self._record(team_name, member.name, "gave_up", why)
+        try:
+            tasks.reset_owner_tasks(team_name, member.name, self._base_dir)
+        except Exception:
+            pass  # Best effort; the lead is told either way
+        messaging.send_plain_message(
+            team_name, "supervisor", "team-lead",
+            f"Stopped restarting {member.name}: {why}. Its tasks were returned to pending; "
+            f"use force_kill_teammate to remove it or spawn a replacement.",
+            summary=f"{member.name} not restarted: {why}",
+            base_dir=self._base_dir,
+        )
+
+    def observe(self, team_name: str, statuses: list[AgentHealthStatus]) -> None:
+        """Schedule restarts for supervised teammates the health sweep found dead."""
+        with self._lock:
+            if team_name in self._draining:
+                return
+        config = teams.read_config(team_name, self._base_dir)
+        members = {m.name: m for m in config.teammates}
+        dead = {s.agent_name: s for s in statuses if s.status == "dead"}
+        now = time.time()
+        candidates: list[tuple[TeammateMember, AgentHealthStatus, float]] = []
+        with self._lock:
+            for name, status in dead.items():
+                member = members.get(name)
+                key = (team_name, name)
+                if member is None or member.restart_policy is None:
+                    continue
+                if key in self._pending or key in self._gave_up or key in self._finished:
+                    continue
+                candidates.append((member, status, self._started.get(key, member.joined_at / 1000)))
+        # The lead inbox is read outside the lock
+        finished = {
+            member.name: why for member, status, started in candidates
+            if (why := finished_reason(team_name, member, status, started, self._base_dir))
+        }
+        give_up: list[tuple[TeammateMember, str]] = []
+        with self._lock:
+            # Forget agents that left the team
+            for key in [k for k in (*self._pending, *self._streaks, *self._started, *self._gave_up,
+                                    *self._finished)
+                        if k[0] == team_name and k[1] not in members]:
+                for table in self._tables():
+                    table.pop(key, None)
+            for member, status, started in candidates:
+                name = member.name
+                key = (team_name, name)
+                if key in self._pending or key in self._gave_up or key in self._finished:
+                    continue
+                if name in finished:
+                    self._finished[key] = finished[name]
+                    self._record(team_name, name, "finished", finished[name])
+                    continue
+                policy = member.restart_policy
+                quick = now - started < policy.crash_loop_seconds
+                streak = self._streaks.get(key, 0) + 1 if quick else 0
+                self._streaks[key] = streak
+                reason = status.detail or "process died"
+                if streak >= policy.crash_loop_limit:
+                    give_up.append((member, f"crash loop ({policy.crash_loop_limit} deaths within "
+                                            f"{policy.crash_loop_seconds:g}s of starting)"))
+                elif member.restart_count >= policy.max_restarts:
+                    give_up.append((member, f"restart budget of {policy.max_restarts} used up"))
+                else:
+                    delay = backoff_delay(policy, streak)
+                    self._pending[key] = PendingRestart(now + delay, streak, reason)
+                    self._record(team_name, name, "scheduled", f"{reason}; restart in {delay:g}s")
+        for member, why in give_up:
+            self._give_up(team_name, member, why)
+
+    def seconds_until_due(self) -> float | None:
+        """Seconds until the next scheduled restart (None if none is scheduled)."""
+        with self._lock:
+            if not self._pending:
+                return None
+            return max(0.0, min(p.due for p in self._pending.values()) - time.time())
+
+    def run_due(self) -> int:
+        """Restart every teammate whose backoff has elapsed.
+
+        Returns:
+            Number of teammates restarted.
+        """
+        if self.opencode_binary is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            due = [(key, p) for key, p in self._pending.items() if p.due <= now]
+            for key, _ in due:
+                del self._pending[key]
+        restarted = 0
+        for (team_name, name), pending in due:
+            try:
+                member = teams.read_config(team_name, self._base_dir).get_teammate(name)
+            except (FileNotFoundError, ValueError):
+                continue  # Team deleted while the restart was pending
+            if member is None or member.restart_policy is None:
+                continue  # Killed or removed by the lead meanwhile
+            try:
+                prompt = build_resume_prompt(team_name, member, pending.reason, self._base_dir)
+                member = spawner.restart_teammate(
+                    team_name, member, self.opencode_binary, prompt, self._base_dir
+                )
+            except Exception as e:
+                with self._lock:
+                    self._started[(team_name, name)] = time.time()
+                    self._record(team_name, name, "failed", f"{type(e).__name__}: {e}")
+                continue  # Counts as a quick death when the next sweep sees it dead
+            with self._lock:
+                self._started[(team_name, name)] = time.time()
+                self._record(team_name, name, "restarted", f"restart {member.restart_count}")
+            restarted += 1
+            messaging.send_plain_message(
+                team_name, "supervisor", "team-lead",
+                f"Restarted {name} after it died ({pending.reason}); restart "
+                f"{member.restart_count} of {member.restart_policy.max_restarts}.",
+                summary=f"{name} restarted",
+                base_dir=self._base_dir,
+            )
+        return restarted
+
+    def _tables(self) -> tuple[dict, ...]:
+        return (self._pending, self._streaks, self._started, self._gave_up, self._finished)
+
+    def forget_agent(self, team_name: str, name: str) -> None:
+        """Drop a teammate's state once it has been killed or shut down."""
+        with self._lock:
+            for table in self._tables():
+                table.pop((team_name, name), None)
+
+    def forget(self, team_name: str) -> None:
+        """Drop all state for a deleted (or fully shut down) team."""
+        with self._lock:
+            self._draining.discard(team_name)
+            for table in self._tables():
+                for key in [k for k in table if k[0] == team_name]:
+                    del table[key]
+
+    def drain(self, team_name: str) -> None:
+        """Stop restarting a team's teammates while it shuts down, until :meth:`forget`."""
+        self.forget(team_name)
+        with self._lock:
+            self._draining.add(team_name)
+
+    def status(self, team_name: str | None = None) -> dict:
+        now = time.time()
+        with self._lock:
+            pending = [
+                {
+                    "teamName": t,
+                    "name": n,
+                    "inSeconds": round(max(0.0, p.due - now), 1),
+                    "streak": p.streak,
+                    "reason": p.reason,
+                }
+                for (t, n), p in self._pending.items()
+                if team_name is None or t == team_name
+            ]
+            gave_up = [
+                {"teamName": t, "name": n, "reason": why}
+                for (t, n), why in self._gave_up.items()
+                if team_name is None or t == team_name
+            ]
+            finished = [
+                {"teamName": t, "name": n, "reason": why}
+                for (t, n), why in self._finished.items()
+                if team_name is None or t == team_name
+            ]
+            recent = [e for e in self._history if team_name is None or e["teamName"] == team_name]
+        return {"pending": pending, "gaveUp": gave_up, "finished": finished, "recent": recent}
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 from collections import deque
+from collections.abc import Iterable
 from pathlib import Path
 
+from opencode_teams import registry
 from opencode_teams._filelock import file_lock
 from opencode_teams.models import TaskFile
 from opencode_teams.teams import team_exists
@@ -88,6 +90,7 @@ def create_task(
         fpath = team_dir / f"{task_id}.json"
         fpath.write_text(json.dumps(task.model_dump(by_alias=True, exclude_none=True)))
 
+    registry.adjust_task_counts(team_name, {"pending": 1}, base_dir=base_dir)
     return task
 
 
@@ -121,6 +124,7 @@ def update_task(
     with file_lock(lock_path):
         # --- Phase 1: Read ---
         task = TaskFile(**json.loads(fpath.read_text()))
+        previous_status = task.status
 
         # --- Phase 2: Validate (no disk writes) ---
         pending_edges: dict[str, set[str]] = {}
@@ -282,6 +286,13 @@ def update_task(
             )
             _flush_pending_writes(pending_writes)
 
+    if task.status == "deleted":
+        status_deltas = {previous_status: -1}
+    elif task.status != previous_status:
+        status_deltas = {previous_status: -1, task.status: 1}
+    else:
+        status_deltas = {}
+    registry.adjust_task_counts(team_name, status_deltas, base_dir=base_dir)
     return task
 
 
@@ -305,9 +316,25 @@ def list_tasks(
 def reset_owner_tasks(
     team_name: str, agent_name: str, base_dir: Path | None = None
 ) -> None:
+    reset_owners_tasks(team_name, [agent_name], base_dir)
+
+
+def reset_owners_tasks(
+    team_name: str, agent_names: Iterable[str], base_dir: Path | None = None
+) -> int:
+    """Release every task owned by any of ``agent_names`` in one pass.
+
+    Unfinished tasks go back to pending; completed ones keep their status.
+
+    Returns:
+        Number of tasks whose owner was cleared.
+    """
+    names = set(agent_names)
     team_dir = _tasks_dir(base_dir) / team_name
     lock_path = team_dir / ".lock"
 
+    released = 0
+    reopened = 0
     with file_lock(lock_path):
         for f in team_dir.glob("*.json"):
             try:
@@ -315,10 +342,19 @@ def reset_owner_tasks(
             except ValueError:
                 continue
             task = TaskFile(**json.loads(f.read_text()))
-            if task.owner == agent_name:
+            if task.owner in names:
+                if task.status == "in_progress":
+                    reopened += 1
                 if task.status != "completed":
                     task.status = "pending"
                 task.owner = None
+                released += 1
                 f.write_text(
                     json.dumps(task.model_dump(by_alias=True, exclude_none=True))
                 )
+
+    if reopened:
+        registry.adjust_task_counts(
+            team_name, {"in_progress": -reopened, "pending": reopened}, base_dir=base_dir
+        )
+    return released
@@ -4,10 +4,16 @@ import json
 import os
 import re
 import shutil
+import stat
 import tempfile
+import threading
 import time
+import uuid
 from pathlib import Path
+from typing import Callable, Iterable
 
+from opencode_teams import registry
+from opencode_teams._filelock import file_lock
 from opencode_teams.models import (
     LeadMember,
     TeamConfig,
@@ -22,6 +28,13 @@ TASKS_DIR = BASE_DIR / "tasks"
 
 _VALID_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
 
+# Process-level cache of validated team configs, keyed by config path.
+# Each entry stores the (mtime_ns, size, inode) signature it was read at so
+# external writers (other agents' MCP servers) invalidate it automatically.
+_config_cache: dict[Path, tuple[tuple[int, int, int], TeamConfig]] = {}
+_config_cache_lock = threading.Lock()
+_config_cache_stats = {"hits": 0, "misses": 0}
+
 
 def _teams_dir(base_dir: Path | None = None) -> Path:
     return (base_dir / "teams") if base_dir else TEAMS_DIR
@@ -31,6 +44,10 @@ def _tasks_dir(base_dir: Path | None = None) -> Path:
     return (base_dir / "tasks") if base_dir else TASKS_DIR
 
 
+def _trash_dir(base_dir: Path | None = None) -> Path:
+    return _teams_dir(base_dir).parent / ".trash"
+
+
 def team_exists(name: str, base_dir: Path | None = None) -> bool:
     config_path = _teams_dir(base_dir) / name / "config.json"
     return config_path.exists()
@@ -82,7 +99,7 @@ def create_team(
     )
 
     config_path = team_dir / "config.json"
-    config_path.write_text(json.dumps(config.model_dump(by_alias=True), indent=2))
+    write_config(name, config, base_dir=base_dir)
 
     return TeamCreateResult(
         team_name=name,
@@ -91,14 +108,39 @@ def create_team(
     )
 
 
+def _stat_signature(st: os.stat_result) -> tuple[int, int, int]:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
 def read_config(name: str, base_dir: Path | None = None) -> TeamConfig:
+    """Read a team config, served from the process-level cache when unchanged.
+
+    The returned ``TeamConfig`` is shared between callers and frozen; use
+    ``model_copy(update=...)`` to derive a modified config.
+    """
     config_path = _teams_dir(base_dir) / name / "config.json"
+    signature = _stat_signature(config_path.stat())
+
+    with _config_cache_lock:
+        cached = _config_cache.get(config_path)
+        if cached is not None and cached[0] == signature:
+            _config_cache_stats["hits"] += 1
+            return cached[1]
+        _config_cache_stats["misses"] += 1
+
     raw = json.loads(config_path.read_text())
-    return TeamConfig.model_validate(raw)
+    config = TeamConfig.model_validate(raw)
+
+    # Re-stat after reading: only cache if the file did not change underneath us
+    if _stat_signature(config_path.stat()) == signature:
+        with _config_cache_lock:
+            _config_cache[config_path] = (signature, config)
+    return config
 
 
 def write_config(name: str, config: TeamConfig, base_dir: Path | None = None) -> None:
     config_dir = _teams_dir(base_dir) / name
+    config_path = config_dir / "config.json"
     data = json.dumps(config.model_dump(by_alias=True), indent=2)
 
     # NOTE(victor): atomic write to avoid partial reads from concurrent agents
@@ -107,27 +149,79 @@ def write_config(name: str, config: TeamConfig, base_dir: Path | None = None) ->
         os.write(fd, data.encode())
         os.close(fd)
         fd = -1
-        os.replace(tmp_path, config_dir / "config.json")
+        os.replace(tmp_path, config_path)
     except BaseException:
         if fd >= 0:
             os.close(fd)
         if os.path.exists(tmp_path):
             os.unlink(tmp_path)
+        with _config_cache_lock:
+            _config_cache.pop(config_path, None)
         raise
 
+    with _config_cache_lock:
+        try:
+            _config_cache[config_path] = (_stat_signature(config_path.stat()), config)
+        except OSError:
+            _config_cache.pop(config_path, None)
+
+    registry.record_config(name, config, base_dir=base_dir)
+
+
+def update_config(
+    name: str,
+    fn: Callable[[TeamConfig], TeamConfig],
+    base_dir: Path | None = None,
+) -> TeamConfig:
+    """Transactionally read-modify-write a team config.
+
+    Holds the team's config lock while reading the current config, applying
+    ``fn`` and writing the result, so concurrent membership updates from
+    parallel spawns cannot overwrite each other. ``fn`` receives the current
+    (frozen) config and returns the new one; returning the same instance
+    skips the write. Exceptions raised by ``fn`` abort without writing.
+
+    Returns:
+        The config as stored after the update.
+    """
+    lock_path = _teams_dir(base_dir) / name / ".lock"
+    with file_lock(lock_path):
+        config = read_config(name, base_dir=base_dir)
+        updated = fn(config)
+        if updated is not config:
+            write_config(name, updated, base_dir=base_dir)
+        return updated
+
+
+def config_cache_stats() -> dict[str, int]:
+    """Return hit/miss counters and current size of the team config cache."""
+    with _config_cache_lock:
+        return {**_config_cache_stats, "entries": len(_config_cache)}
+
+
+def clear_config_cache() -> None:
+    """Drop all cached team configs and reset the hit/miss counters."""
+    with _config_cache_lock:
+        _config_cache.clear()
+        _config_cache_stats["hits"] = 0
+        _config_cache_stats["misses"] = 0
+
 
 def delete_team(name: str, base_dir: Path | None = None) -> TeamDeleteResult:
     config = read_config(name, base_dir=base_dir)
 
-    non_lead = [m for m in config.members if isinstance(m, TeammateMember)]
+    non_lead = config.teammates
     if non_lead:
         raise RuntimeError(
             f"Cannot delete team {name!r}: {len(non_lead)} non-lead member(s) still present. "
             "Remove all teammates before deleting."
         )
 
-    shutil.rmtree(_teams_dir(base_dir) / name)
-    shutil.rmtree(_tasks_dir(base_dir) / name)
+    _move_to_trash(_teams_dir(base_dir) / name, f"{name}-teams", base_dir)
+    _move_to_trash(_tasks_dir(base_dir) / name, f"{name}-tasks", base_dir)
+    with _config_cache_lock:
+        _config_cache.pop(_teams_dir(base_dir) / name / "config.json", None)
+    registry.unregister_team(name, base_dir=base_dir)
 
     return TeamDeleteResult(
         success=True,
@@ -136,13 +230,95 @@ def delete_team(name: str, base_dir: Path | None = None) -> TeamDeleteResult:
     )
 
 
+def _move_to_trash(path: Path, label: str, base_dir: Path | None = None) -> None:
+    """Atomically rename ``path`` into the trash area for background purging.
+
+    Falls back to a synchronous ``rmtree`` when the rename is not possible
+    (e.g. the trash area is on a different filesystem).
+    """
+    if not path.exists():
+        return
+    trash = _trash_dir(base_dir)
+    trash.mkdir(parents=True, exist_ok=True)
+    target = trash / f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}-{label}"
+    try:
+        os.rename(path, target)
+    except OSError:
+        shutil.rmtree(path)
+
+
+def _remove_trash_entry(path: str, is_dir: bool) -> bool:
+    remove = os.rmdir if is_dir else os.unlink
+    try:
+        remove(path)
+    except FileNotFoundError:
+        return False
+    except PermissionError:
+        try:
+            parent = os.path.dirname(path)
+            os.chmod(parent, os.stat(parent).st_mode | stat.S_IWUSR | stat.S_IXUSR)
+            remove(path)
+        except OSError:
+            return False  # Not ours to delete; left in the trash
+    except OSError:
+        return False  # E.g. a directory that still holds a skipped entry
+    return True
+
+
+def purge_trash(
+    base_dir: Path | None = None,
+    *,
+    max_files_per_second: float | None = None,
+    stop: threading.Event | None = None,
+) -> int:
+    """Delete everything in the trash area left by ``delete_team``.
+
+    Removes files one at a time, sleeping as needed to stay under
+    ``max_files_per_second`` so large team directories do not saturate disk
+    I/O. Returns early (leaving the rest for the next run) when ``stop`` is set.
+    Read-only directories (e.g. a Go module cache) are made writable first;
+    entries that still cannot be removed are skipped.
+
+    Returns:
+        Number of files and directories removed.
+    """
+    trash = _trash_dir(base_dir)
+    if not trash.is_dir():
+        return 0
+
+    removed = 0
+    started = time.monotonic()
+    for root, dirs, files in os.walk(trash, topdown=False):
+        for entry in [*files, *dirs]:
+            if stop is not None and stop.is_set():
+                return removed
+            path = os.path.join(root, entry)
+            if not _remove_trash_entry(path, entry in dirs and not os.path.islink(path)):
+                continue
+            removed += 1
+            if max_files_per_second:
+                ahead = removed / max_files_per_second - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+    return removed
+
+
 def add_member(name: str, member: TeammateMember, base_dir: Path | None = None) -> None:
-    config = read_config(name, base_dir=base_dir)
-    existing_names = {m.name for m in config.members}
-    if member.name in existing_names:
-        raise ValueError(f"Member {member.name!r} already exists in team {name!r}")
-    config.members.append(member)
-    write_config(name, config, base_dir=base_dir)
+    def _add(config: TeamConfig) -> TeamConfig:
+        if member.name in config.member_index:
+            raise ValueError(f"Member {member.name!r} already exists in team {name!r}")
+        return config.model_copy(update={"members": (*config.members, member)})
+
+    update_config(name, _add, base_dir=base_dir)
+
+
+def replace_member(name: str, member: TeammateMember, base_dir: Path | None = None) -> None:
+    """Replace the stored member with the same name (e.g. to record a pane ID or PID)."""
+    def _replace(config: TeamConfig) -> TeamConfig:
+        members = tuple(member if m.name == member.name else m for m in config.members)
+        return config.model_copy(update={"members": members})
+
+    update_config(name, _replace, base_dir=base_dir)
 
 
 def get_project_dir(team_name: str, base_dir: Path | None = None) -> Path:
@@ -154,16 +330,32 @@ def get_project_dir(team_name: str, base_dir: Path | None = None) -> Path:
 
 
 def remove_member(team_name: str, agent_name: str, base_dir: Path | None = None) -> None:
-    if agent_name == "team-lead":
+    remove_members(team_name, [agent_name], base_dir)
+
+
+def remove_members(
+    team_name: str, agent_names: Iterable[str], base_dir: Path | None = None
+) -> None:
+    """Remove several members in one config transaction."""
+    names = set(agent_names)
+    if "team-lead" in names:
         raise ValueError("Cannot remove team-lead from team")
-    config = read_config(team_name, base_dir=base_dir)
-    config.members = [m for m in config.members if m.name != agent_name]
-    write_config(team_name, config, base_dir=base_dir)
+    removed: set[str] = set()
+
+    def _remove(c: TeamConfig) -> TeamConfig:
+        removed.clear()
+        removed.update(m.name for m in c.members if m.name in names)
+        return c.model_copy(update={"members": tuple(m for m in c.members if m.name not in names)})
+
+    config = update_config(team_name, _remove, base_dir=base_dir)
+    # Their unread messages will not be read any more
+    registry.forget_members(team_name, removed, base_dir=base_dir)
 
-    # Best-effort cleanup of agent config file in the target project
+    # Best-effort cleanup of agent config files in the target project
     try:
         from opencode_teams.config_gen import cleanup_agent_config
         project = Path(config.project_dir) if config.project_dir else Path.cwd()
-        cleanup_agent_config(project, agent_name)
+        for agent_name in names:
+            cleanup_agent_config(project, agent_name)
     except Exception:
         pass
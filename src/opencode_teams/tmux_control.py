@@ -0,0 +1,265 @@
+"""Persistent tmux control-mode connection.
+
+A single ``tmux -C attach-session`` client is kept open for the server's
+lifetime and tmux commands are written to it one line at a time, so each
+operation costs a pipe round trip instead of a fork/exec. Replies are framed
+by ``%begin``/``%end`` (or ``%error``) lines; asynchronous notifications
+outside a reply block are ignored.
+
+The connection is opt-in (see :func:`enable`, called from the server
+lifespan when running inside tmux). Callers use :func:`get_client` and fall
+back to a plain ``subprocess.run`` when it returns None or raises
+:class:`ControlModeUnavailable`. A dropped connection is re-established on a
+later call, at most once per ``RECONNECT_BACKOFF_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import IO
+
+CONTROL_MODE_ENV_VAR = "OPENCODE_TEAMS_TMUX_CONTROL"
+CONNECT_TIMEOUT_SECONDS = 5.0
+DEFAULT_COMMAND_TIMEOUT_SECONDS = 5.0
+RECONNECT_BACKOFF_SECONDS = 5.0
+
+# Commands that act relative to the "current" pane. A CLI client resolves that
+# from $TMUX_PANE; a control client would use its own active pane instead.
+_PANE_RELATIVE_COMMANDS = frozenset({"split-window", "display-message"})
+
+
+class ControlModeUnavailable(RuntimeError):
+    """The command was not sent; the caller should fall back to a subprocess."""
+
+
+def quote_arg(arg: str) -> str:
+    """Quote one argument for the tmux command parser."""
+    escaped = arg.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$")
+    return f'"{escaped}"'
+
+
+def read_replies(stream: IO[str], replies: queue.Queue) -> None:
+    """Parse control-mode output from ``stream`` into ``replies``.
+
+    Each command reply is queued as ``(ok, lines)``. ``None`` is queued when
+    the stream ends so that a waiting caller wakes up.
+    """
+    block: str | None = None
+    lines: list[str] = []
+    for raw in stream:
+        line = raw.rstrip("\n")
+        if block is None:
+            if line.startswith("%begin "):
+                parts = line.split()
+                block = parts[2] if len(parts) > 2 else ""
+                lines = []
+            continue  # Notifications (%output, %window-add, ...) are ignored
+        if line.startswith(("%end ", "%error ")):
+            parts = line.split()
+            if (parts[2] if len(parts) > 2 else "") == block:
+                replies.put((line.startswith("%end "), lines))
+                block = None
+                continue
+        lines.append(line)
+    replies.put(None)
+
+
+class TmuxControlClient:
+    """One ``tmux -C`` connection; commands are serialized over it."""
+
+    def __init__(self, default_pane: str | None = None, socket_name: str | None = None) -> None:
+        self._default_pane = default_pane
+        self._socket_name = socket_name
+        self._proc: subprocess.Popen | None = None
+        self._replies: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _base_command(self) -> list[str]:
+        cmd = ["tmux"]
+        if self._socket_name:
+            cmd += ["-L", self._socket_name]
+        return cmd
+
+    def connect(self) -> None:
+        """Start the control client and wait for its attach reply.
+
+        Raises:
+            ControlModeUnavailable: If tmux cannot be started or does not answer.
+        """
+        cmd = self._base_command() + ["-C", "attach-session"]
+        if self._default_pane:
+            cmd += ["-t", self._default_pane]
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+        except OSError as e:
+            raise ControlModeUnavailable(str(e)) from e
+        replies: queue.Queue = queue.Queue()
+        threading.Thread(
+            target=read_replies, args=(proc.stdout, replies), daemon=True,
+            name="tmux-control-reader",
+        ).start()
+        self._proc = proc
+        self._replies = replies
+        try:
+            reply = replies.get(timeout=CONNECT_TIMEOUT_SECONDS)
+        except queue.Empty:
+            reply = None
+        if reply is None or not reply[0]:
+            self._close()
+            raise ControlModeUnavailable("tmux control client did not attach")
+        # Stop tmux from streaming pane output to us (tmux >= 3.2; an error
+        # reply on older versions is harmless).
+        try:
+            self.run(["refresh-client", "-f", "no-output"])
+        except (ControlModeUnavailable, subprocess.TimeoutExpired):
+            pass
+
+    def run(
+        self,
+        args: list[str],
+        *,
+        timeout: float | None = None,
+        check: bool = False,
+    ) -> subprocess.CompletedProcess:
+        """Run one tmux command and return a ``CompletedProcess``-shaped result.
+
+        Mirrors ``subprocess.run(["tmux", *args], capture_output=True, text=True)``:
+        an ``%error`` reply gives ``returncode=1`` with the message on stderr
+        (or ``CalledProcessError`` when ``check`` is set).
+
+        Raises:
+            ControlModeUnavailable: If the command could not be sent.
+            subprocess.TimeoutExpired: If no reply arrived within ``timeout``;
+                the connection is dropped so a late reply cannot be misread.
+        """
+        argv = ["tmux", *args]
+        if any("\n" in a for a in args):
+            raise ControlModeUnavailable("control mode commands cannot contain newlines")
+        if args and args[0] in _PANE_RELATIVE_COMMANDS and "-t" not in args and self._default_pane:
+            args = [args[0], "-t", self._default_pane, *args[1:]]
+        wait = timeout if timeout is not None else DEFAULT_COMMAND_TIMEOUT_SECONDS
+        with self._lock:
+            if not self.connected:
+                raise ControlModeUnavailable("tmux control client is not connected")
+            try:
+                self._proc.stdin.write(" ".join(quote_arg(a) for a in args) + "\n")
+                self._proc.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._close()
+                raise ControlModeUnavailable(str(e)) from e
+            try:
+                reply = self._replies.get(timeout=wait)
+            except queue.Empty:
+                self._close()
+                raise subprocess.TimeoutExpired(argv, wait)
+            if reply is None:
+                self._close()
+
+        if reply is None:
+            ok, lines = False, ["tmux control connection closed"]
+        else:
+            ok, lines = reply
+        text = "\n".join(lines) + ("\n" if lines else "")
+        if ok:
+            return subprocess.CompletedProcess(argv, 0, text, "")
+        if check:
+            raise subprocess.CalledProcessError(1, argv, "", text)
+        return subprocess.CompletedProcess(argv, 1, "", text)
+
+    def _close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()  # EOF on stdin detaches the control client
+            proc.wait(timeout=1)
+        except Exception:
+            try:
+                proc.kill()
+            except Exception:
+                pass  # Best effort
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_manager_lock = threading.Lock()
+_client: TmuxControlClient | None = None
+_enabled = False
+_default_pane: str | None = None
+_socket_name: str | None = None
+_last_attempt = 0.0
+_stats = {"connects": 0, "failures": 0}
+
+
+def enable(default_pane: str | None = None, socket_name: str | None = None) -> None:
+    """Allow :func:`get_client` to open a control-mode connection on demand.
+
+    Setting ``OPENCODE_TEAMS_TMUX_CONTROL=0`` keeps the subprocess path.
+    """
+    global _enabled, _default_pane, _socket_name, _last_attempt
+    if os.environ.get(CONTROL_MODE_ENV_VAR, "1") == "0":
+        return
+    with _manager_lock:
+        _enabled = True
+        _default_pane = default_pane
+        _socket_name = socket_name
+        _last_attempt = 0.0
+
+
+def shutdown() -> None:
+    """Close the connection and go back to the subprocess path."""
+    global _client, _enabled
+    with _manager_lock:
+        _enabled = False
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+def get_client() -> TmuxControlClient | None:
+    """Return a connected client, reconnecting if needed, or None to fall back."""
+    global _client, _last_attempt
+    if not _enabled:
+        return None
+    with _manager_lock:
+        if _client is not None and _client.connected:
+            return _client
+        now = time.monotonic()
+        if now - _last_attempt < RECONNECT_BACKOFF_SECONDS:
+            return None
+        _last_attempt = now
+        client = TmuxControlClient(_default_pane, _socket_name)
+        try:
+            client.connect()
+        except ControlModeUnavailable:
+            _stats["failures"] += 1
+            _client = None
+            return None
+        _stats["connects"] += 1
+        _client = client
+        return client
+
+
+def status() -> dict:
+    return {
+        "enabled": _enabled,
+        "connected": _client is not None and _client.connected,
+        **_stats,
+    }
@@ -0,0 +1,230 @@
+"""Warm pool of pre-launched standby agents.
+
+Starting a teammate costs an ``opencode`` process start, the agent's own MCP
+server start and config loading before it does anything useful. A pool keeps
+``size`` standby agents per (model, backend) already running and waiting on
+an inbox in ``spawner.WARM_POOL_DIR``. ``spawn_teammate`` claims one when it
+can and hands it its identity and instructions through that inbox; the
+server's maintenance loop then refills the pool in the background.
+
+Standbys idle longer than ``idle_timeout`` are stopped and replaced, and no
+new standby is started while the pool's measured (or assumed) memory use
+would exceed ``memory_budget_mb``. Standbys are launched with
+``idle_timeout`` added to the usual run timeout, so a claimed agent always
+gets at least the run time a cold spawn would.
+
+A standby is a live model session, so waiting is billed per model request.
+It therefore makes a single ``poll_inbox`` call that blocks for longer than
+``idle_timeout`` instead of polling in a loop: an unclaimed standby costs
+its first request plus, once replaced, one for each ``idle_timeout`` it
+sits in the pool. Keep pools small and the timeout long.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import NamedTuple
+
+from opencode_teams import headless, spawner
+from opencode_teams.resource_monitor import agent_root_pid, process_tree_usage
+from opencode_teams.models import TeammateMember
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 600
+DEFAULT_MEMORY_BUDGET_MB = 2048
+ASSUMED_AGENT_MEMORY_MB = 400
+MAINTAIN_INTERVAL_SECONDS = 15.0
+
+
+class PoolKey(NamedTuple):
+    model: str
+    backend_type: str
+
+
+class WarmAgent(NamedTuple):
+    member: TeammateMember
+    project_dir: Path
+    started_at: float
+
+
+class WarmPool:
+    """Standby agents per (model, backend) for one server."""
+
+    def __init__(
+        self,
+        opencode_binary: str | None,
+        base_dir: Path | None = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+    ) -> None:
+        self.opencode_binary = opencode_binary  # None until the server has validated it
+        self._base_dir = base_dir
+        self._lock = threading.Lock()
+        self._targets: dict[PoolKey, tuple[int, Path]] = {}
+        self._idle: dict[PoolKey, list[WarmAgent]] = {}
+        self._stats = {"claims": 0, "misses": 0, "started": 0, "expired": 0, "failed": 0}
+        self.idle_timeout = idle_timeout
+        self.memory_budget_mb = memory_budget_mb
+        self.wake = threading.Event()
+
+    def configure(
+        self, model: str, backend_type: str, size: int, project_dir: Path | None = None
+    ) -> None:
+        """Keep ``size`` standbys for (model, backend); 0 removes the pool on the next pass.
+
+        Raises:
+            ValueError: If ``size`` is negative or the backend cannot host standbys.
+        """
+        if size < 0:
+            raise ValueError("Pool size must be >= 0")
+        if backend_type not in ("tmux", "headless"):
+            raise ValueError(f"Backend {backend_type!r} does not support warm agents")
+        key = PoolKey(model, backend_type)
+        with self._lock:
+            if size:
+                self._targets[key] = (size, project_dir or Path.cwd())
+            else:
+                self._targets.pop(key, None)
+        self.wake.set()
+
+    def claim(
+        self, model: str, backend_type: str, project_dir: Path | None = None
+    ) -> TeammateMember | None:
+        """Take an idle standby for (model, backend) in ``project_dir``, if one is running."""
+        key = PoolKey(model, backend_type)
+        project = project_dir or Path.cwd()
+        with self._lock:
+            if key not in self._targets and key not in self._idle:
+                return None
+            candidates = [w for w in self._idle.get(key, []) if w.project_dir == project]
+        claimed = None
+        for warm in candidates:
+            # Probed outside the lock: a tmux call must not stall other claims
+            if not self._alive(warm.member):
+                continue  # maintain() retires it
+            with self._lock:
+                idle = self._idle.get(key, [])
+                if warm in idle:  # Not claimed or retired meanwhile
+                    idle.remove(warm)
+                    claimed = warm
+                    break
+        with self._lock:
+            self._stats["claims" if claimed else "misses"] += 1
+        self.wake.set()
+        return claimed.member if claimed else None
+
+    @staticmethod
+    def _alive(member: TeammateMember) -> bool:
+        if member.backend_type == "headless":
+            agent = headless.get_agent(member.agent_id)
+            return agent is not None and agent.poll() is None
+        return spawner.check_pane_alive(member.tmux_pane_id)
+
+    def _memory_mb(self, warm: WarmAgent) -> float:
+        panes = None if warm.member.process_id else spawner.list_pane_states()
+        pid = agent_root_pid(warm.member, panes)
+        usage = process_tree_usage(pid) if pid else None
+        return ASSUMED_AGENT_MEMORY_MB if usage is None else usage.rss_kb / 1024
+
+    def _retire(self, warm: WarmAgent) -> None:
+        spawner.stop_agent_process(warm.member)
+        spawner.cleanup_standby_agent(warm.member.name, warm.project_dir, self._base_dir)
+
+    def maintain(self) -> int:
+        """Expire idle or dead standbys and top pools up within the memory budget.
+
+        Returns:
+            Number of standbys started.
+        """
+        with self._lock:
+            probe = [w for agents in self._idle.values() for w in agents]
+        dead = {w.member.name for w in probe if not self._alive(w.member)}
+        now = time.time()
+        retired: list[WarmAgent] = []
+        with self._lock:
+            for key in list(self._idle):
+                target = self._targets.get(key)
+                keep = []
+                for warm in self._idle[key]:
+                    expired = now - warm.started_at > self.idle_timeout
+                    if expired or target is None or warm.member.name in dead:
+                        retired.append(warm)
+                        if expired:
+                            self._stats["expired"] += 1
+                    else:
+                        keep.append(warm)
+                # Shrink to a lowered target, oldest first
+                excess = len(keep) - (target[0] if target else 0)
+                if excess > 0:
+                    retired.extend(keep[:excess])
+                    keep = keep[excess:]
+                self._idle[key] = keep
+                if not keep:
+                    del self._idle[key]
+            wanted = [
+                (key, project)
+                for key, (size, project) in self._targets.items()
+                for _ in range(size - len(self._idle.get(key, [])))
+            ]
+            idle = [w for agents in self._idle.values() for w in agents]
+        for warm in retired:
+            self._retire(warm)
+
+        used = sum(self._memory_mb(w) for w in idle)
+        per_agent = used / len(idle) if idle else ASSUMED_AGENT_MEMORY_MB
+        started = 0
+        for key, project in wanted:
+            if self.opencode_binary is None or used + per_agent > self.memory_budget_mb:
+                break
+            slot = f"warm-{uuid.uuid4().hex[:8]}"
+            try:
+                member = spawner.start_standby_agent(
+                    slot, key.model, self.opencode_binary,
+                    backend_type=key.backend_type,
+                    project_dir=project,
+                    timeout_seconds=int(spawner.SPAWN_TIMEOUT_SECONDS + self.idle_timeout),
+                    wait_seconds=self.idle_timeout + MAINTAIN_INTERVAL_SECONDS,
+                    base_dir=self._base_dir,
+                )
+            except Exception:
+                with self._lock:
+                    self._stats["failed"] += 1
+                break  # Try again on the next pass
+            with self._lock:
+                self._idle.setdefault(key, []).append(WarmAgent(member, project, time.time()))
+                self._stats["started"] += 1
+            used += per_agent
+            started += 1
+        return started
+
+    def status(self) -> dict:
+        now = time.time()
+        with self._lock:
+            pools = []
+            for key in sorted(set(self._targets) | set(self._idle)):
+                idle = self._idle.get(key, [])
+                pools.append({
+                    "model": key.model,
+                    "backend": key.backend_type,
+                    "size": self._targets.get(key, (0, None))[0],
+                    "idle": len(idle),
+                    "oldestIdleSeconds": round(now - min(w.started_at for w in idle), 1) if idle else None,
+                })
+            return {
+                "pools": pools,
+                "idleTimeoutSeconds": self.idle_timeout,
+                "memoryBudgetMb": self.memory_budget_mb,
+                **self._stats,
+            }
+
+    def shutdown(self) -> None:
+        """Stop every idle standby (claimed agents are left running)."""
+        with self._lock:
+            idle = [w for agents in self._idle.values() for w in agents]
+            self._idle.clear()
+            self._targets.clear()
+        for warm in idle:
+            self._retire(warm)
+
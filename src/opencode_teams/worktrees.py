@@ -0,0 +1,183 @@
+"""Per-agent git worktrees for conflict-free parallel editing.
+
+A teammate spawned with ``worktree=True`` runs in its own ``git worktree``
+under ``<team dir>/worktrees/<agent>``, on branch
+``opencode-teams/<team>/<agent>`` created from whatever the project has
+checked out. Parallel agents then edit, build and test without touching each
+other's files or incremental build outputs. Their agent config and
+``opencode.json`` are written into the worktree, where OpenCode looks for
+them.
+
+:func:`merge_status` compares a worktree's branch with its base: commits
+ahead and behind, uncommitted files, and whether it merges cleanly (from
+``git merge-tree --write-tree``, git 2.38+). :func:`remove` runs when the
+agent is torn down: uncommitted changes are first committed to the branch so
+no work is lost, the worktree is removed, and the branch is deleted only if
+it holds nothing the base lacks.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+from pathlib import Path
+from typing import NamedTuple
+
+from opencode_teams import teams
+from opencode_teams.models import TeammateMember
+
+BRANCH_PREFIX = "opencode-teams"
+GIT_TIMEOUT_SECONDS = 60
+# Written into the worktree by the spawn itself; never part of the agent's changes
+GENERATED_PATHS = (".opencode/agents/", ".opencode/prompts/", "opencode.json")
+
+
+class Worktree(NamedTuple):
+    path: str  # Worktree root
+    cwd: str  # Where the agent runs: the project directory's counterpart inside ``path``
+    branch: str
+    base: str  # Branch (or commit, if the project was detached) ``branch`` was created from
+
+
+def _git(cwd: str | Path, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        ["git", "-C", str(cwd), *args],
+        capture_output=True, text=True, timeout=GIT_TIMEOUT_SECONDS,
+    )
+    if check and result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip() or result.stdout.strip()}")
+    return result
+
+
+def worktree_path(team_name: str, agent_name: str, base_dir: Path | None = None) -> Path:
+    teams_dir = (base_dir / "teams") if base_dir else teams.TEAMS_DIR
+    return teams_dir / team_name / "worktrees" / agent_name
+
+
+def branch_name(team_name: str, agent_name: str) -> str:
+    return f"{BRANCH_PREFIX}/{re.sub(r'[^A-Za-z0-9_-]', '_', team_name)}/{agent_name}"
+
+
+def create(
+    project_dir: Path, team_name: str, agent_name: str, base_dir: Path | None = None
+) -> Worktree:
+    """Add a worktree for an agent on its own branch.
+
+    If the agent's branch already exists (a teammate of the same name worked
+    here before), the worktree checks it out and continues from it.
+
+    Raises:
+        ValueError: If ``project_dir`` is not in a git repository with a commit.
+        RuntimeError: If git fails to add the worktree.
+    """
+    top = _git(project_dir, "rev-parse", "--show-toplevel", check=False)
+    if top.returncode != 0:
+        raise ValueError(f"{project_dir} is not in a git repository; worktree mode needs one")
+    toplevel = Path(top.stdout.strip())
+    head = _git(toplevel, "symbolic-ref", "--quiet", "--short", "HEAD", check=False)
+    if head.returncode == 0:
+        base = head.stdout.strip()
+    else:
+        commit = _git(toplevel, "rev-parse", "--verify", "--quiet", "HEAD", check=False)
+        if commit.returncode != 0:
+            raise ValueError(f"Repository {toplevel} has no commits to branch from")
+        base = commit.stdout.strip()
+
+    path = worktree_path(team_name, agent_name, base_dir)
+    if path.exists():
+        # Left over from a server that died before tearing the agent down
+        _git(toplevel, "worktree", "remove", "--force", str(path), check=False)
+    _git(toplevel, "worktree", "prune", check=False)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    branch = branch_name(team_name, agent_name)
+    exists = _git(toplevel, "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}", check=False)
+    if exists.returncode == 0:
+        _git(toplevel, "worktree", "add", str(path), branch)
+    else:
+        _git(toplevel, "worktree", "add", "-b", branch, str(path), base)
+
+    relative = Path(project_dir).resolve().relative_to(toplevel.resolve())
+    return Worktree(str(path), str(path / relative), branch, base)
+
+
+def _generated(member: TeammateMember) -> tuple[str, ...]:
+    relative = Path(member.cwd).relative_to(member.worktree).as_posix()
+    prefix = "" if relative == "." else relative + "/"
+    return tuple(prefix + p for p in GENERATED_PATHS)
+
+
+def _uncommitted(member: TeammateMember) -> list[str]:
+    status = _git(member.worktree, "status", "--porcelain", "--untracked-files=all")
+    generated = _generated(member)
+    return [
+        line[3:] for line in status.stdout.splitlines()
+        if line and not line[3:].startswith(generated)
+    ]
+
+
+def merge_status(member: TeammateMember) -> dict:
+    """How an agent's branch stands against its base.
+
+    ``ready`` means everything is committed, the branch has commits the base
+    lacks, and it merges without conflicts. ``conflicts`` is None where git
+    is too old for ``merge-tree --write-tree``.
+
+    Raises:
+        ValueError: If the agent has no worktree.
+        RuntimeError: If git fails (e.g. the worktree was deleted by hand).
+    """
+    if not member.worktree:
+        raise ValueError(f"{member.name!r} does not run in a worktree")
+    uncommitted = _uncommitted(member)
+    counts = _git(member.worktree, "rev-list", "--left-right", "--count",
+                  f"{member.base_branch}...{member.branch}")
+    behind, ahead = (int(n) for n in counts.stdout.split())
+    conflicts: list[str] | None = None
+    merge = _git(member.worktree, "merge-tree", "--write-tree", "--name-only", "--no-messages",
+                 member.base_branch, member.branch, check=False)
+    if merge.returncode in (0, 1):
+        conflicts = merge.stdout.splitlines()[1:] if merge.returncode == 1 else []
+    return {
+        "name": member.name,
+        "worktree": member.worktree,
+        "branch": member.branch,
+        "base": member.base_branch,
+        "ahead": ahead,
+        "behind": behind,
+        "uncommittedFiles": uncommitted,
+        "conflicts": conflicts,
+        "ready": not uncommitted and ahead > 0 and conflicts == [],
+    }
+
+
+def remove(member: TeammateMember) -> bool:
+    """Tear down an agent's worktree once its process has stopped.
+
+    Uncommitted changes, apart from the files the spawn generated, are
+    committed to the agent's branch (as the agent) before the worktree is
+    removed.
+
+    Returns:
+        True if the branch was kept because it has commits the base lacks.
+    """
+    if not member.worktree:
+        return False
+    if not Path(member.worktree).is_dir():
+        return True  # Removed by hand; leave the branch for the lead to look at
+    if _uncommitted(member):
+        excludes = [f":(top,exclude){p}" for p in _generated(member)]
+        _git(member.worktree, "add", "--all", "--", ":/", *excludes)
+        _git(
+            member.worktree,
+            "-c", f"user.name={member.name}",
+            "-c", f"user.email={member.agent_id}.opencode-teams",
+            "commit", "--quiet", "--no-verify",
+            "-m", f"Uncommitted work of {member.name}, saved when it was stopped",
+        )
+    ahead = _git(member.worktree, "rev-list", "--count", f"{member.base_branch}..{member.branch}")
+    repo = _git(member.worktree, "rev-parse", "--path-format=absolute", "--git-common-dir")
+    _git(member.worktree, "worktree", "remove", "--force", member.worktree)
+    keep = int(ahead.stdout.strip() or 0) > 0
+    if not keep:
+        _git(repo.stdout.strip(), "branch", "--delete", "--force", member.branch, check=False)
+    return keep
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from opencode_teams import admission, teams
+from opencode_teams.admission import AdmissionController, provider_of, read_host_load
+from opencode_teams.models import AgentHealthStatus, ModelInfo, TeammateMember
+
+TEAM = "adm-team"
+
+
+def _make_teammate(name: str, model: str = "openai/gpt-5.2") -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{TEAM}",
+        name=name,
+        agent_type="general-purpose",
+        model=model,
+        prompt="Do stuff",
+        color="blue",
+        joined_at=int(time.time() * 1000),
+        tmux_pane_id="%1",
+        cwd="/tmp",
+    )
+
+
+@pytest.fixture
+def controller(tmp_base_dir: Path, monkeypatch) -> AdmissionController:
+    monkeypatch.setattr(admission, "read_host_load", lambda: (None, None))
+    teams.create_team(TEAM, "sess-1", base_dir=tmp_base_dir)
+    return AdmissionController(base_dir=tmp_base_dir)
+
+
+def _add(
+    controller: AdmissionController, base_dir: Path, name: str, model: str = "openai/gpt-5.2"
+) -> None:
+    teams.add_member(TEAM, _make_teammate(name, model), base_dir=base_dir)
+    controller.refresh_team(TEAM)  # As the server does after a spawn
+
+
+class TestLimits:
+    def test_admits_under_limits(self, controller: AdmissionController) -> None:
+        controller.max_agents_per_team = 2
+        assert controller.admit(TEAM, "openai") is None
+
+    def test_counts_in_flight_spawns(self, controller: AdmissionController) -> None:
+        controller.max_agents_per_team = 1
+        assert controller.admit(TEAM, "openai") is None
+        assert "limit of 1" in controller.admit(TEAM, "openai")
+        controller.release(TEAM, "openai")
+        assert controller.admit(TEAM, "openai") is None
+
+    def test_team_and_host_limits_count_members(
+        self, controller: AdmissionController, tmp_base_dir: Path
+    ) -> None:
+        _add(controller, tmp_base_dir, "w1")
+        controller.max_agents_per_host = 1
+        assert "host" in controller.admit(TEAM, "openai")
+
+    def test_provider_limit(self, controller: AdmissionController, tmp_base_dir: Path) -> None:
+        _add(controller, tmp_base_dir, "w1", "openai/gpt-5.2")
+        controller.provider_limits = {"openai": 1}
+        assert "openai" in controller.admit(TEAM, "openai")
+        assert controller.admit(TEAM, "google") is None
+
+    def test_host_guards_are_opt_in(self, controller: AdmissionController, monkeypatch) -> None:
+        monkeypatch.setattr(admission, "read_host_load", lambda: (3.5, 100.0))
+        assert controller.admit(TEAM, "openai") is None
+        controller.release(TEAM, "openai")
+
+    def test_host_guards(self, controller: AdmissionController, monkeypatch) -> None:
+        controller.max_load_per_cpu = 2.0
+        controller.min_available_memory_mb = 512
+        monkeypatch.setattr(admission, "read_host_load", lambda: (3.5, 4096.0))
+        assert "load" in controller.admit(TEAM, "openai")
+        monkeypatch.setattr(admission, "read_host_load", lambda: (0.1, 100.0))
+        assert "memory" in controller.admit(TEAM, "openai")
+        controller.min_available_memory_mb = None
+        assert controller.admit(TEAM, "openai") is None
+
+    def test_counts_only_tracked_teams(
+        self, controller: AdmissionController, tmp_base_dir: Path
+    ) -> None:
+        teams.create_team("stale", "sess-2", base_dir=tmp_base_dir)
+        teams.add_member("stale", _make_teammate("old").model_copy(update={"agent_id": "old@stale"}),
+                         base_dir=tmp_base_dir)
+        controller.max_agents_per_host = 1
+        controller.refresh_team(TEAM)
+        with patch.object(teams, "read_config", side_effect=AssertionError("config read")):
+            assert controller.admit(TEAM, "openai") is None
+        controller.release(TEAM, "openai")
+        _add(controller, tmp_base_dir, "w1")
+        assert "host" in controller.admit(TEAM, "openai")
+        teams.remove_member(TEAM, "w1", base_dir=tmp_base_dir)
+        controller.refresh_team(TEAM)
+        assert controller.admit(TEAM, "openai") is None
+
+    def test_dead_teammates_are_not_counted(
+        self, controller: AdmissionController, tmp_base_dir: Path
+    ) -> None:
+        _add(controller, tmp_base_dir, "w1")
+        controller.max_agents_per_host = 1
+        assert "host" in controller.admit(TEAM, "openai")
+        dead = AgentHealthStatus(agent_name="w1", pane_id="%1", status="dead")
+        controller.observe(TEAM, [dead])
+        assert controller.wake.is_set()
+        assert controller.admit(TEAM, "openai") is None
+        controller.release(TEAM, "openai")
+        controller.observe(TEAM, [dead.model_copy(update={"status": "alive"})])  # Restarted
+        assert "host" in controller.admit(TEAM, "openai")
+
+    def test_members_use_model_info_provider(self, tmp_base_dir: Path, monkeypatch) -> None:
+        monkeypatch.setattr(admission, "read_host_load", lambda: (None, None))
+        teams.create_team(TEAM, "sess-1", base_dir=tmp_base_dir)
+        models = [ModelInfo(provider="azure", model_id="gpt-5", name="GPT 5", full_model_string="openai-proxy/gpt-5")]
+        controller = AdmissionController(base_dir=tmp_base_dir, models=models)
+        controller.provider_limits = {"azure": 1}
+        _add(controller, tmp_base_dir, "w1", "openai-proxy/gpt-5")
+        assert "azure" in controller.admit(TEAM, "azure")
+        assert controller.admit(TEAM, "openai-proxy") is None
+
+    def test_forget_team_drops_counts(self, controller: AdmissionController, tmp_base_dir: Path) -> None:
+        _add(controller, tmp_base_dir, "w1")
+        teams.create_team("other", "sess-2", base_dir=tmp_base_dir)
+        controller.max_agents_per_host = 1
+        assert "host" in controller.admit("other", "openai")
+        controller.forget_team(TEAM)  # As on team_delete
+        assert controller.admit("other", "openai") is None
+
+
+class TestQueue:
+    def test_dispatch_starts_queued_when_slot_frees(
+        self, controller: AdmissionController, tmp_base_dir: Path
+    ) -> None:
+        _add(controller, tmp_base_dir, "w1")
+        controller.max_agents_per_team = 1
+        started = []
+        entry = controller.enqueue(
+            TEAM, "w2", "openai", lambda: started.append("w2"),
+            reason=controller.admit(TEAM, "openai"),
+        )
+        assert controller.dispatch() == 0
+        assert controller.position(entry.queue_id) == 1
+
+        teams.remove_member(TEAM, "w1", base_dir=tmp_base_dir)
+        controller.refresh_team(TEAM)
+        assert controller.dispatch() == 1
+        assert started == ["w2"]
+        assert controller.position(entry.queue_id) is None
+        assert controller.status()["recent"][0]["status"] == "spawned"
+
+    def test_new_spawn_does_not_overtake_queue(self, controller: AdmissionController) -> None:
+        controller.enqueue(TEAM, "w1", "openai", lambda: None, reason="busy")
+        assert "queued" in controller.admit(TEAM, "openai")
+
+    def test_priority_order(self, controller: AdmissionController, tmp_base_dir: Path) -> None:
+        controller.max_agents_per_team = 1
+        order = []
+
+        def launch(name: str):
+            order.append(name)
+            _add(controller, tmp_base_dir, name)
+
+        controller.enqueue(TEAM, "low", "openai", lambda: launch("low"), "busy")
+        high = controller.enqueue(TEAM, "high", "openai", lambda: launch("high"), "busy", priority=5)
+        assert controller.position(high.queue_id) == 2
+        controller.order = "priority"
+        assert controller.position(high.queue_id) == 1
+        assert controller.dispatch() == 1
+        assert order == ["high"]
+
+    def test_failed_launch_is_recorded(self, controller: AdmissionController) -> None:
+        def boom():
+            raise RuntimeError("tmux crashed")
+
+        controller.enqueue(TEAM, "w1", "openai", boom, "busy")
+        assert controller.dispatch() == 1
+        recent = controller.status()["recent"][0]
+        assert recent["status"] == "failed"
+        assert "tmux crashed" in recent["error"]
+
+    def test_rejects_duplicate_queued_name(self, controller: AdmissionController) -> None:
+        controller.enqueue(TEAM, "w1", "openai", lambda: None, "busy")
+        with pytest.raises(ValueError, match="already queued"):
+            controller.enqueue(TEAM, "w1", "openai", lambda: None, "busy")
+
+    def test_cancel_and_forget_team(self, controller: AdmissionController) -> None:
+        a = controller.enqueue(TEAM, "w1", "openai", lambda: None, "busy")
+        controller.enqueue(TEAM, "w2", "openai", lambda: None, "busy")
+        assert controller.cancel(a.queue_id)
+        assert not controller.cancel(a.queue_id)
+        assert controller.forget_team(TEAM) == 1
+        assert controller.status()["queued"] == []
+
+
+class TestHelpers:
+    def test_provider_of_prefers_model_info(self) -> None:
+        models = [ModelInfo(provider="azure", model_id="gpt-5", name="GPT 5", full_model_string="openai-proxy/gpt-5")]
+        assert provider_of("openai-proxy/gpt-5", models) == "azure"
+        assert provider_of("google/gemini", models) == "google"
+        assert provider_of("sonnet", models) == ""
+
+    def test_read_host_load_from_proc(self) -> None:
+        load, available = read_host_load()
+        if Path("/proc/loadavg").exists():
+            assert load is not None and load >= 0
+            assert available is not None and available > 0
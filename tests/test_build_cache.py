@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import shlex
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from opencode_teams import build_cache, headless, teams
+from opencode_teams.models import TeammateSpec
+from opencode_teams.spawner import build_opencode_run_command, spawn_many, spawn_teammate
+
+TEAM = "cache-team"
+
+
+@pytest.fixture
+def base_dir(tmp_base_dir: Path) -> Path:
+    teams.create_team(TEAM, session_id="s", base_dir=tmp_base_dir)
+    return tmp_base_dir
+
+
+class TestCacheEnv:
+    def test_points_every_tool_into_team_dir(self, base_dir: Path) -> None:
+        env = build_cache.cache_env(TEAM, base_dir)
+        root = base_dir / "teams" / TEAM / "cache"
+        assert set(env) == {*build_cache.CACHE_ENV, "GOFLAGS"}
+        assert env["UV_CACHE_DIR"] == str(root / "uv")
+        assert env["GOMODCACHE"] == str(root / "go" / "mod")
+        assert all(Path(env[var]).is_dir() for var in build_cache.CACHE_ENV)
+
+    def test_go_module_cache_stays_writable(self, base_dir: Path, monkeypatch) -> None:
+        monkeypatch.setenv("GOFLAGS", "-mod=mod")
+        assert build_cache.cache_env(TEAM, base_dir)["GOFLAGS"] == "-mod=mod -modcacherw"
+        monkeypatch.setenv("GOFLAGS", "-modcacherw")
+        assert build_cache.cache_env(TEAM, base_dir)["GOFLAGS"] == "-modcacherw"
+
+    def test_same_directories_for_every_agent(self, base_dir: Path) -> None:
+        assert build_cache.cache_env(TEAM, base_dir) == build_cache.cache_env(TEAM, base_dir)
+
+
+class TestDiskUsage:
+    def test_missing_cache_is_empty(self, base_dir: Path) -> None:
+        usage = build_cache.disk_usage(TEAM, base_dir)
+        assert usage["exists"] is False
+        assert usage["totalBytes"] == 0
+        assert usage["tools"]["pip"] == {"envVar": "PIP_CACHE_DIR", "bytes": 0, "files": 0}
+
+    def test_counts_files_once_and_skips_symlinks(self, base_dir: Path, tmp_path: Path) -> None:
+        env = build_cache.cache_env(TEAM, base_dir)
+        wheel = Path(env["UV_CACHE_DIR"]) / "archive" / "pkg.whl"
+        wheel.parent.mkdir()
+        wheel.write_bytes(b"x" * 100_000)
+        os.link(wheel, Path(env["UV_CACHE_DIR"]) / "pkg-link.whl")
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "big").write_bytes(b"y" * 1_000_000)
+        (Path(env["npm_config_cache"]) / "elsewhere").symlink_to(outside)
+
+        usage = build_cache.disk_usage(TEAM, base_dir)
+        assert usage["tools"]["uv"]["files"] == 1
+        assert 100_000 <= usage["tools"]["uv"]["bytes"] < 200_000
+        assert usage["tools"]["npm"]["files"] == 1  # The symlink itself
+        assert usage["tools"]["npm"]["bytes"] < 1_000_000
+        assert usage["totalBytes"] == sum(t["bytes"] for t in usage["tools"].values())
+
+
+class TestSpawnWithBuildCache:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_tmux_command_sets_cache_env(self, mock_subprocess: MagicMock, base_dir: Path) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        member = spawn_teammate(
+            TEAM, "builder", "Build it", "/usr/local/bin/opencode",
+            base_dir=base_dir, project_dir=base_dir, build_cache=True,
+        )
+        assert member.env == build_cache.cache_env(TEAM, base_dir)
+        stored = teams.read_config(TEAM, base_dir=base_dir).get_teammate("builder")
+        assert stored.env == member.env
+        cmd = mock_subprocess.run.call_args[0][0][-1]
+        assert f"UV_CACHE_DIR={shlex.quote(member.env['UV_CACHE_DIR'])} " in cmd
+        assert f"GOFLAGS={shlex.quote(member.env['GOFLAGS'])} timeout " in cmd
+
+    def test_no_env_without_build_cache(self, base_dir: Path) -> None:
+        member = MagicMock(env={}, cwd="/tmp/project", resources=None, prompt="Hi")
+        member.name = "plain"
+        member.model = "openai/gpt-5.2"
+        assert build_opencode_run_command(member, "opencode").startswith("cd /tmp/project && timeout ")
+
+    def test_cannot_use_warm_agent(self, base_dir: Path) -> None:
+        with pytest.raises(ValueError, match="warm agent"):
+            spawn_teammate(
+                TEAM, "builder", "Build it", "/usr/local/bin/opencode",
+                base_dir=base_dir, project_dir=base_dir, build_cache=True,
+                warm_agent=MagicMock(),
+            )
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_spawn_many_applies_per_spec(self, mock_subprocess: MagicMock, base_dir: Path) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        spawned, failed = spawn_many(
+            TEAM,
+            [
+                TeammateSpec(name="a", prompt="A", model="openai/gpt-5.2", build_cache=True),
+                TeammateSpec(name="b", prompt="B", model="openai/gpt-5.2"),
+            ],
+            "/usr/local/bin/opencode",
+            models=[], base_dir=base_dir, project_dir=base_dir, cwd=str(base_dir),
+        )
+        assert failed == {}
+        a, b = spawned
+        assert a.env["PIP_CACHE_DIR"] == str(build_cache.cache_root(TEAM, base_dir) / "pip")
+        assert b.env == {}
+
+    def test_headless_process_inherits_env(self, base_dir: Path, tmp_path: Path, monkeypatch) -> None:
+        popen = MagicMock()
+        monkeypatch.setattr("opencode_teams.headless.subprocess.Popen", popen)
+        monkeypatch.setattr("opencode_teams.headless.threading.Thread", MagicMock())
+        member = MagicMock(
+            agent_id=f"h@{TEAM}", env=build_cache.cache_env(TEAM, base_dir),
+            cwd=str(tmp_path), resources=None, prompt="Hi", cgroup="",
+        )
+        member.name = "h"
+        member.model = "openai/gpt-5.2"
+        headless.launch(member, "opencode", tmp_path / "h.log", 60)
+        env = popen.call_args.kwargs["env"]
+        assert env["CCACHE_DIR"] == member.env["CCACHE_DIR"]
+        assert env["PATH"] == os.environ["PATH"]
@@ -9,8 +9,13 @@ import yaml
 from opencode_teams.config_gen import (
     cleanup_agent_config,
     generate_agent_config,
+    generate_assignment_message,
+    generate_standby_config,
+    launch_prompt,
+    prompt_file_path,
     write_agent_config,
     ensure_opencode_json,
+    INLINE_PROMPT_MAX_BYTES_ENV_VAR,
 )
 
 
@@ -353,6 +358,22 @@ class TestGenerateAgentConfig:
         return parts[1]
 
 
+class TestGenerateAgentConfigWorktree:
+    def test_no_worktree_section_by_default(self) -> None:
+        result = generate_agent_config("a@t", "a", "t", "blue", "openai/gpt-5.2")
+        assert "# Git Worktree" not in result
+
+    def test_worktree_section_names_branch_and_tool(self) -> None:
+        result = generate_agent_config(
+            "a@t", "a", "t", "blue", "openai/gpt-5.2",
+            worktree_branch="opencode-teams/t/a", worktree_base="main",
+        )
+        section = result.split("# Git Worktree", 1)[1].split("# Workflow", 1)[0]
+        assert "`opencode-teams/t/a`" in section
+        assert "`main`" in section
+        assert 'opencode-teams_report_merge_ready(team_name="t", agent_name="a"' in section
+
+
 class TestGenerateAgentConfigWithTemplate:
     """Tests for generate_agent_config() with role_instructions and custom_instructions."""
 
@@ -775,3 +796,61 @@ class TestCleanupAgentConfig:
     def test_noop_when_agents_dir_missing(self, tmp_path: Path) -> None:
         # Should not raise even if .opencode/agents/ doesn't exist
         cleanup_agent_config(tmp_path, "ghost")
+
+    def test_removes_prompt_file(self, tmp_path: Path) -> None:
+        launch_prompt(tmp_path, "alice", "x" * 10_000)
+        cleanup_agent_config(tmp_path, "alice")
+        assert not prompt_file_path(tmp_path, "alice").exists()
+
+
+class TestLaunchPrompt:
+    """Tests for launch_prompt() - keeps long prompts off the command line"""
+
+    def test_short_prompt_passed_inline(self, tmp_path: Path) -> None:
+        assert launch_prompt(tmp_path, "alice", "Do research") == "Do research"
+        assert not prompt_file_path(tmp_path, "alice").exists()
+
+    def test_long_prompt_written_to_file(self, tmp_path: Path) -> None:
+        prompt = "Spec line with 'quotes' and $VARS\n" * 2000
+        message = launch_prompt(tmp_path, "alice", prompt)
+        path = prompt_file_path(tmp_path, "alice")
+        assert path.read_text(encoding="utf-8") == prompt
+        assert str(path) in message
+        assert len(message) < 300
+
+    def test_limit_counts_utf8_bytes(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setenv(INLINE_PROMPT_MAX_BYTES_ENV_VAR, "10")
+        assert launch_prompt(tmp_path, "alice", "a" * 10) == "a" * 10
+        assert launch_prompt(tmp_path, "alice", "\u00e9" * 6) != "\u00e9" * 6
+
+    def test_zero_limit_always_uses_file(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setenv(INLINE_PROMPT_MAX_BYTES_ENV_VAR, "0")
+        assert launch_prompt(tmp_path, "alice", "hi") != "hi"
+        assert prompt_file_path(tmp_path, "alice").read_text(encoding="utf-8") == "hi"
+
+
+class TestWarmPoolConfigs:
+    """Tests for generate_standby_config() and generate_assignment_message()"""
+
+    def test_standby_polls_pool_inbox(self) -> None:
+        result = generate_standby_config("warm-1", "openai/gpt-5.2", ".warm-pool")
+        frontmatter = yaml.safe_load(result.split("---")[1])
+        assert frontmatter["model"] == "openai/gpt-5.2"
+        assert 'team_name=".warm-pool", agent_name="warm-1"' in result
+        assert "# Team Communication" not in result
+
+    def test_standby_waits_in_one_poll(self) -> None:
+        result = generate_standby_config("warm-1", "openai/gpt-5.2", ".warm-pool", wait_ms=615_000)
+        assert "timeout_ms=615000)` once" in result
+        assert "repeat" not in result
+
+    def test_assignment_carries_identity_and_instructions(self) -> None:
+        result = generate_assignment_message(
+            agent_id="alice@team-x", name="alice", team_name="team-x",
+            color="blue", model="openai/gpt-5.2",
+            custom_instructions="Review the parser.",
+        )
+        assert not result.startswith("---")
+        assert "alice" in result and "team-x" in result
+        assert "Review the parser." in result
+        assert 'read_inbox(team_name="team-x", agent_name="alice")' in result
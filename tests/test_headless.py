@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from opencode_teams import headless, teams
+from opencode_teams.config_gen import launch_prompt
+from opencode_teams.models import TeammateMember
+from opencode_teams.spawner import check_single_agent_health, spawn_teammate
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell script")
+
+TEAM = "headless-team"
+
+FAKE_OPENCODE = """#!/bin/sh
+echo '{"type":"step_start"}'
+echo 'not json'
+echo '{"type":"text","text":"hi"}'
+sleep "${FAKE_OPENCODE_SLEEP:-30}"
+exit "${FAKE_OPENCODE_EXIT:-0}"
+"""
+
+
+@pytest.fixture
+def fake_opencode(tmp_path: Path) -> str:
+    script = tmp_path / "opencode"
+    script.write_text(FAKE_OPENCODE)
+    script.chmod(0o755)
+    return str(script)
+
+
+def _member(name: str = "worker", joined_at: int | None = None) -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{TEAM}",
+        name=name,
+        agent_type="general-purpose",
+        model="openai/gpt-5.2",
+        prompt="Do stuff",
+        color="blue",
+        joined_at=int(time.time() * 1000) if joined_at is None else joined_at,
+        tmux_pane_id="",
+        cwd=os.getcwd(),
+        backend_type="headless",
+    )
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+class TestLaunch:
+    def test_streams_events_to_log(self, fake_opencode: str, tmp_path: Path) -> None:
+        log = tmp_path / "out" / "worker.log"
+        agent = headless.launch(_member(), fake_opencode, log, timeout_seconds=60)
+        try:
+            _wait_for(lambda: agent.events == 2)
+            assert agent.poll() is None
+            assert agent.last_event_type == "text"
+            _wait_for(lambda: "not json" in log.read_text())
+            assert '{"type":"step_start"}' in log.read_text()
+            assert headless.get_agent("worker@headless-team") is agent
+        finally:
+            headless.stop(agent.agent_id)
+
+    def test_rebind_tracks_agent_under_new_id(self, fake_opencode: str, tmp_path: Path) -> None:
+        agent = headless.launch(_member("warm-1"), fake_opencode, tmp_path / "w.log", timeout_seconds=60)
+        try:
+            assert headless.rebind("warm-1@headless-team", "alice@headless-team")
+            assert headless.get_agent("warm-1@headless-team") is None
+            assert headless.get_agent("alice@headless-team") is agent
+            assert not headless.rebind("warm-1@headless-team", "bob@headless-team")
+        finally:
+            headless.stop("alice@headless-team")
+
+    def test_log_is_appended_not_rotated(self, fake_opencode: str, tmp_path: Path, monkeypatch) -> None:
+        # metrics reads the log incrementally; truncate_logs caps its size
+        monkeypatch.setenv("FAKE_OPENCODE_SLEEP", "0")
+        log = tmp_path / "worker.log"
+        log.write_text('{"type":"step_finish"}\n')
+        agent = headless.launch(_member(), fake_opencode, log, timeout_seconds=60)
+        _wait_for(lambda: agent.poll() is not None and agent.events == 2)
+        headless.stop(agent.agent_id)
+        assert log.read_text().splitlines() == [
+            '{"type":"step_finish"}', '{"type":"step_start"}', "not json", '{"type":"text","text":"hi"}',
+        ]
+        assert list(tmp_path.glob("worker.log.*")) == []
+
+    def test_stop_terminates_process(self, fake_opencode: str, tmp_path: Path) -> None:
+        agent = headless.launch(_member(), fake_opencode, tmp_path / "w.log", timeout_seconds=60)
+        assert headless.stop(agent.agent_id) is True
+        assert agent.poll() is not None
+        assert headless.get_agent(agent.agent_id) is None
+        assert headless.stop(agent.agent_id) is False
+
+    def test_command_shape(self) -> None:
+        cmd = headless.build_headless_command(_member(), "/bin/opencode", 300)
+        assert cmd[cmd.index("/bin/opencode"):] == [
+            "/bin/opencode", "run", "--agent", "worker", "--model", "openai/gpt-5.2",
+            "--format", "json", "Do stuff",
+        ]
+
+    def test_large_prompt_passed_through_file(self, tmp_path: Path) -> None:
+        member = _member().model_copy(update={"prompt": "y" * 200_000, "cwd": str(tmp_path)})
+        message = launch_prompt(tmp_path, member.name, member.prompt)
+        cmd = headless.build_headless_command(member, "/bin/opencode", 300, message)
+        assert len(cmd[-1]) < 300
+        assert (tmp_path / ".opencode" / "prompts" / "worker.md").stat().st_size == 200_000
+
+
+class TestHeadlessHealth:
+    def test_alive_then_hung_then_dead(self, fake_opencode: str, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setenv("FAKE_OPENCODE_SLEEP", "1")
+        monkeypatch.setenv("FAKE_OPENCODE_EXIT", "3")
+        old = int(time.time() * 1000) - 600_000
+        agent = headless.launch(_member(), fake_opencode, tmp_path / "w.log", timeout_seconds=60)
+        member = _member(joined_at=old).model_copy(update={"process_id": agent.pid})
+        try:
+            _wait_for(lambda: agent.events == 2)
+            status = check_single_agent_health(member, None, None)
+            assert status.status == "alive"
+            assert status.last_content_hash == "events:2"
+
+            status = check_single_agent_health(
+                member, "events:2", time.time() - 500, hung_timeout=120,
+            )
+            assert status.status == "hung"
+            assert status.detail.startswith("Output unchanged")
+
+            _wait_for(lambda: agent.poll() is not None)
+            status = check_single_agent_health(member, "events:2", time.time())
+            assert status.status == "dead"
+            assert "code 3" in status.detail
+        finally:
+            headless.stop(agent.agent_id)
+
+    def test_untracked_agent_uses_pid(self) -> None:
+        member = _member().model_copy(update={"agent_id": "ghost@t", "process_id": 0})
+        status = check_single_agent_health(member, None, None)
+        assert status.status == "dead"
+
+
+class TestSpawnHeadless:
+    def test_spawn_teammate_headless(
+        self, fake_opencode: str, tmp_base_dir: Path, tmp_path: Path
+    ) -> None:
+        teams.create_team(TEAM, "sess-1", base_dir=tmp_base_dir)
+        member = spawn_teammate(
+            TEAM, "worker", "Do stuff", fake_opencode,
+            model="openai/gpt-5.2", backend_type="headless",
+            base_dir=tmp_base_dir, project_dir=tmp_path,
+        )
+        try:
+            assert member.backend_type == "headless"
+            assert member.process_id > 0
+            assert member.output_log.endswith("output/worker.log")
+            stored = teams.read_config(TEAM, base_dir=tmp_base_dir).get_teammate("worker")
+            assert stored.process_id == member.process_id
+            _wait_for(lambda: Path(member.output_log).exists())
+        finally:
+            headless.stop(member.agent_id)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from opencode_teams import health_monitor, teams
+from opencode_teams.health_monitor import HealthMonitor
+from opencode_teams.models import AgentHealthStatus, TeammateMember
+
+TEAM = "mon-team"
+
+
+def _make_teammate(name: str, pane_id: str) -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{TEAM}",
+        name=name,
+        agent_type="teammate",
+        model="moonshot-ai/kimi-k2.5",
+        prompt="Do stuff",
+        color="blue",
+        joined_at=int(time.time() * 1000),
+        tmux_pane_id=pane_id,
+        cwd="/tmp",
+    )
+
+
+def _status(name: str, status: str = "alive", content_hash: str | None = "h") -> AgentHealthStatus:
+    return AgentHealthStatus(
+        agent_name=name, pane_id="%1", status=status, last_content_hash=content_hash,
+    )
+
+
+@pytest.fixture
+def team(tmp_base_dir: Path) -> Path:
+    teams.create_team(TEAM, "sess-1", base_dir=tmp_base_dir)
+    teams.add_member(TEAM, _make_teammate("w1", "%1"), base_dir=tmp_base_dir)
+    teams.add_member(TEAM, _make_teammate("w2", "%2"), base_dir=tmp_base_dir)
+    return tmp_base_dir
+
+
+def _health_path(base_dir: Path) -> Path:
+    return base_dir / "teams" / TEAM / "health.json"
+
+
+class TestRecord:
+    def test_persists_only_when_hash_changes(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        with patch("opencode_teams.spawner.save_health_state") as mock_save:
+            monitor.record(TEAM, [_status("w1", content_hash="a")])
+            monitor.record(TEAM, [_status("w1", content_hash="a")])
+            monitor.record(TEAM, [_status("w1", content_hash="b")])
+            monitor.record(TEAM, [_status("w1", "dead", content_hash=None)])
+        assert mock_save.call_count == 2
+
+    def test_loads_existing_state_from_disk(self, team: Path) -> None:
+        _health_path(team).write_text(json.dumps({"w1": {"hash": "old", "last_change_time": 5.0}}))
+        monitor = HealthMonitor(base_dir=team)
+        assert monitor.agent_state(TEAM, "w1") == {"hash": "old", "last_change_time": 5.0}
+
+        monitor.record(TEAM, [_status("w1", content_hash="new")])
+        saved = json.loads(_health_path(team).read_text())
+        assert saved["w1"]["hash"] == "new"
+
+    def test_reports_status_changes(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        assert monitor.record(TEAM, [_status("w1")]) is True
+        assert monitor.record(TEAM, [_status("w1")]) is False
+        assert monitor.record(TEAM, [_status("w1", "hung")]) is True
+
+
+class TestCache:
+    def test_cached_respects_max_age(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        monitor.record(TEAM, [_status("w1")])
+        status, age = monitor.cached(TEAM, "w1")
+        assert status.agent_name == "w1"
+        assert age >= 0
+        assert monitor.cached(TEAM, "w1", max_age=-1) is None
+        assert monitor.cached(TEAM, "w2") is None
+
+    def test_cached_team_requires_every_agent(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        monitor.record(TEAM, [_status("w1")])
+        assert monitor.cached_team(TEAM, ["w1", "w2"]) is None
+        monitor.record(TEAM, [_status("w2")])
+        assert [s.agent_name for s, _ in monitor.cached_team(TEAM, ["w1", "w2"])] == ["w1", "w2"]
+
+    def test_forget_clears_team(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        monitor.record(TEAM, [_status("w1")])
+        monitor.forget(TEAM)
+        assert monitor.cached(TEAM, "w1") is None
+
+
+class TestSweep:
+    def test_sweep_checks_teammates_and_drops_departed(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        monitor.record(TEAM, [_status("gone")])
+        with patch(
+            "opencode_teams.spawner.check_agents_health",
+            side_effect=lambda members, state: [_status(m.name) for m in members],
+        ) as mock_check:
+            statuses = monitor.sweep(TEAM)
+        assert [s.agent_name for s in statuses] == ["w1", "w2"]
+        assert [m.name for m in mock_check.call_args.args[0]] == ["w1", "w2"]
+        assert monitor.cached(TEAM, "gone") is None
+
+    def test_missing_team_raises(self, tmp_base_dir: Path) -> None:
+        with pytest.raises(FileNotFoundError):
+            HealthMonitor(base_dir=tmp_base_dir).sweep("nope")
+
+
+class TestAdaptiveInterval:
+    def test_backs_off_when_stable_and_resets_on_change(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        results = iter(["alive", "alive", "alive", "dead"])
+
+        def _check(members, state):
+            status = next(results)
+            return [_status(m.name, status) for m in members]
+
+        with patch("opencode_teams.spawner.check_agents_health", side_effect=_check):
+            monitor.sweep(TEAM)
+            assert monitor.next_interval() == health_monitor.MIN_INTERVAL_SECONDS
+            monitor.sweep(TEAM)
+            monitor.sweep(TEAM)
+            assert monitor.next_interval() == 4 * health_monitor.MIN_INTERVAL_SECONDS
+            monitor.sweep(TEAM)
+            assert monitor.next_interval() == health_monitor.MIN_INTERVAL_SECONDS
+
+    def test_interval_is_capped(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        with patch(
+            "opencode_teams.spawner.check_agents_health",
+            side_effect=lambda members, state: [_status(m.name) for m in members],
+        ):
+            for _ in range(10):
+                monitor.sweep(TEAM)
+        assert monitor.next_interval() == health_monitor.MAX_INTERVAL_SECONDS
+
+    def test_spawn_forces_fast_interval_and_wakes(self, team: Path) -> None:
+        monitor = HealthMonitor(base_dir=team)
+        monitor._interval = health_monitor.MAX_INTERVAL_SECONDS
+        monitor.notify_spawn()
+        assert monitor.wake.is_set()
+        assert monitor.next_interval() == health_monitor.MIN_INTERVAL_SECONDS
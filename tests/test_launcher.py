@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from opencode_teams import launcher
+from opencode_teams.launcher import (
+    CGROUP_ROOT_ENV_VAR,
+    agent_cgroup_path,
+    build_launcher_prefix,
+    launcher_args,
+    remove_cgroup,
+)
+from opencode_teams.models import ResourceLimits
+
+
+def _run_launched(*args: str, script: str, prefix: tuple[str, ...] = ()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [*prefix, sys.executable, "-m", "opencode_teams.launcher", *args, "--", sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        env={**os.environ, "PYTHONPATH": str(Path(launcher.__file__).parents[1])},
+    )
+
+
+class TestLauncherArgs:
+    def test_empty_limits(self) -> None:
+        assert launcher_args(ResourceLimits()) == []
+
+    def test_all_process_limits(self) -> None:
+        limits = ResourceLimits(
+            nice=5,
+            ionice_class="idle",
+            ionice_level=7,
+            memory_limit_mb=1024,
+            max_processes=200,
+            cpu_affinity=[0, 2],
+        )
+        assert launcher_args(limits) == [
+            "--nice", "5",
+            "--ionice-class", "idle",
+            "--ionice-level", "7",
+            "--memory-mb", "1024",
+            "--max-procs", "200",
+            "--cpus", "0,2",
+        ]
+
+    def test_cgroup_settings_need_a_path(self) -> None:
+        limits = ResourceLimits(cgroup_memory_max_mb=512, cgroup_cpu_max=1.5)
+        assert launcher_args(limits) == []
+        assert launcher_args(limits, "/sys/fs/cgroup/x") == [
+            "--cgroup", "/sys/fs/cgroup/x",
+            "--cgroup-memory-mb", "512",
+            "--cgroup-cpus", "1.5",
+        ]
+
+    def test_prefix_ends_with_separator(self) -> None:
+        prefix = build_launcher_prefix(ResourceLimits(nice=1))
+        assert prefix[:3] == [sys.executable, "-m", "opencode_teams.launcher"]
+        assert prefix[-1] == "--"
+
+    def test_aliases_accepted(self) -> None:
+        limits = ResourceLimits.model_validate({"memoryLimitMb": 64, "cgroupCpuMax": 2})
+        assert limits.memory_limit_mb == 64
+        assert limits.wants_cgroup
+
+
+class TestCgroupPath:
+    def test_uses_root_env_var(self, monkeypatch, tmp_path: Path) -> None:
+        monkeypatch.setenv(CGROUP_ROOT_ENV_VAR, str(tmp_path))
+        path = agent_cgroup_path("my team", "worker")
+        assert path == str(tmp_path / "opencode-teams-my_team-worker")
+
+    def test_remove_cgroup_is_best_effort(self, tmp_path: Path) -> None:
+        group = tmp_path / "group"
+        group.mkdir()
+        remove_cgroup(str(group))
+        assert not group.exists()
+        remove_cgroup(str(group))  # Already gone
+        remove_cgroup("")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX process limits")
+class TestLauncherMain:
+    def test_applies_nice_and_rlimits_then_execs(self) -> None:
+        script = (
+            "import os, resource;"
+            "print(os.nice(0), resource.getrlimit(resource.RLIMIT_AS)[0])"
+        )
+        base = os.nice(0)
+        result = _run_launched("--nice", str(base + 3), "--memory-mb", "4096", script=script)
+        assert result.returncode == 0, result.stderr
+        nice, rlimit_as = result.stdout.split()
+        assert int(nice) == min(base + 3, 19)
+        assert int(rlimit_as) == 4096 * 1024 * 1024
+
+    @pytest.mark.skipif(shutil.which("nice") is None, reason="needs nice(1)")
+    def test_nice_is_absolute(self) -> None:
+        base = os.nice(0)
+        if base + 4 > 19:
+            pytest.skip("already at the lowest priority")
+        result = _run_launched(
+            "--nice", str(base + 4), script="import os; print(os.nice(0))",
+            prefix=("nice", "-n", "2"),
+        )
+        assert result.returncode == 0, result.stderr
+        assert int(result.stdout) == base + 4
+
+    def test_unavailable_setting_warns_and_still_runs(self, tmp_path: Path) -> None:
+        result = _run_launched(
+            "--cgroup", str(tmp_path / "missing" / "group"), script="print('ran')"
+        )
+        assert result.returncode == 0
+        assert result.stdout.strip() == "ran"
+        assert "cannot create cgroup" in result.stderr
+
+    def test_requires_command(self) -> None:
+        with pytest.raises(SystemExit):
+            launcher.main(["--nice", "1"])
@@ -18,6 +18,7 @@ from opencode_teams.messaging import (
     append_message,
     ensure_inbox,
     inbox_path,
+    mark_read,
     now_iso,
     read_inbox,
     send_plain_message,
@@ -196,3 +197,17 @@ def test_should_not_lose_message_appended_during_mark_as_read(tmp_base_dir):
 def test_now_iso_format():
     ts = now_iso()
     assert re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z$", ts)
+
+
+def test_mark_read_only_marks_matching_unread(tmp_base_dir):
+    for text in ("keep", "take", "take"):
+        append_message(
+            "test-team", "lead",
+            InboxMessage(from_="w", text=text, timestamp=now_iso(), read=False),
+            base_dir=tmp_base_dir,
+        )
+    assert mark_read("test-team", "lead", lambda m: m.text == "take", base_dir=tmp_base_dir) == 2
+    unread = read_inbox("test-team", "lead", unread_only=True, mark_as_read=False, base_dir=tmp_base_dir)
+    assert [m.text for m in unread] == ["keep"]
+    assert mark_read("test-team", "lead", lambda m: True, base_dir=tmp_base_dir) == 1
+    assert mark_read("test-team", "nobody", lambda m: True, base_dir=tmp_base_dir) == 0
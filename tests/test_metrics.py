@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from opencode_teams import metrics, teams
+from opencode_teams.models import AgentMetrics, TeammateMember
+
+TEAM = "metrics-team"
+
+
+def _event(kind: str, ts: int, **extra) -> str:
+    return json.dumps({"type": kind, "timestamp": ts, "sessionID": "s", **extra}) + "\n"
+
+
+def _step(start: int, first: int, finish: int, tokens_in: int, tokens_out: int, cost: float) -> str:
+    return (
+        _event("step_start", start)
+        + _event("text", first, part={"text": "hi"})
+        + _event("tool_use", first + 5)
+        + _event(
+            "step_finish", finish,
+            part={
+                "cost": cost,
+                "tokens": {
+                    "input": tokens_in, "output": tokens_out, "reasoning": 1,
+                    "cache": {"read": 10, "write": 2},
+                },
+            },
+        )
+    )
+
+
+def _make_teammate(name: str, log: Path, model: str = "openai/gpt-5.2") -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{TEAM}",
+        name=name,
+        agent_type="teammate",
+        model=model,
+        prompt="Do stuff",
+        color="blue",
+        joined_at=int(time.time() * 1000),
+        tmux_pane_id="%1",
+        cwd="/tmp",
+        output_log=str(log),
+    )
+
+
+@pytest.fixture
+def team(tmp_base_dir: Path) -> Path:
+    teams.create_team(TEAM, "sess-1", base_dir=tmp_base_dir)
+    return tmp_base_dir
+
+
+class TestApplyEvent:
+    def test_step_totals_and_latency(self) -> None:
+        m = AgentMetrics(agent_name="w")
+        cursor = metrics._new_cursor()
+        for line in _step(1000, 1300, 2000, 100, 20, 0.5).splitlines():
+            m = metrics.apply_event(m, cursor, json.loads(line))
+        assert (m.requests, m.input_tokens, m.output_tokens) == (1, 100, 20)
+        assert (m.reasoning_tokens, m.cache_read_tokens, m.cache_write_tokens) == (1, 10, 2)
+        assert m.cost == 0.5
+        assert (m.step_latency_ms_total, m.step_latency_ms_max, m.timed_steps) == (1000, 1000, 1)
+        # Only the first output event after step_start counts
+        assert (m.first_token_ms_total, m.first_token_samples) == (300, 1)
+
+    def test_missing_timestamps_skip_latency(self) -> None:
+        m = AgentMetrics(agent_name="w")
+        cursor = metrics._new_cursor()
+        for event in ({"type": "step_start"}, {"type": "step_finish", "part": {"tokens": {"input": 3}}}):
+            m = metrics.apply_event(m, cursor, event)
+        assert (m.requests, m.input_tokens, m.timed_steps) == (1, 3, 0)
+
+    def test_errors_counted(self) -> None:
+        m = metrics.apply_event(AgentMetrics(agent_name="w"), metrics._new_cursor(), {"type": "error"})
+        assert m.errors == 1
+
+
+class TestConsumeLog:
+    def test_reads_only_complete_new_lines(self, tmp_path: Path) -> None:
+        log = tmp_path / "w.log"
+        step = _step(0, 100, 500, 10, 1, 0.1)
+        log.write_text("\x1b[?25lnoise\r\n" + step + step[:20])
+        cursor = metrics._new_cursor()
+        m = metrics.consume_log(log, AgentMetrics(agent_name="w"), cursor)
+        assert m.requests == 1
+        offset = cursor["offset"]
+        assert offset == len(log.read_bytes()) - 20
+
+        with open(log, "a") as f:
+            f.write(step[20:])
+        m = metrics.consume_log(log, m, cursor)
+        assert m.requests == 2
+        assert metrics.consume_log(log, m, cursor) is m
+
+    def test_restarts_after_rotation(self, tmp_path: Path) -> None:
+        log = tmp_path / "w.log"
+        log.write_text(_step(0, 1, 2, 1, 1, 0.0) * 2)
+        cursor = metrics._new_cursor()
+        m = metrics.consume_log(log, AgentMetrics(agent_name="w"), cursor)
+        log.unlink()
+        log.write_text(_step(0, 1, 2, 1, 1, 0.0))
+        m = metrics.consume_log(log, m, cursor)
+        assert m.requests == 3
+
+    def test_truncation_keeps_open_request(self, tmp_path: Path) -> None:
+        log = tmp_path / "w.log"
+        step = _step(1000, 1100, 2000, 10, 1, 0.1)
+        head, _, tail = step.partition(_event("tool_use", 1105))
+        log.write_text("noise\n" * 100 + head)
+        cursor = metrics._new_cursor()
+        m = metrics.consume_log(log, AgentMetrics(agent_name="w"), cursor)
+        log.write_text(tail)  # Truncated in place, then appended to
+        m = metrics.consume_log(log, m, cursor)
+        assert (m.requests, m.timed_steps, m.step_latency_ms_total) == (1, 1, 1000)
+
+    def test_missing_log_is_noop(self, tmp_path: Path) -> None:
+        m = AgentMetrics(agent_name="w")
+        assert metrics.consume_log(tmp_path / "nope.log", m, metrics._new_cursor()) is m
+
+
+class TestCollect:
+    def test_incremental_and_persisted(self, team: Path, tmp_path: Path) -> None:
+        log = tmp_path / "w1.log"
+        log.write_text(_step(0, 100, 1000, 50, 5, 0.25))
+        teams.add_member(TEAM, _make_teammate("w1", log), base_dir=team)
+
+        [m] = metrics.collect(TEAM, base_dir=team)
+        assert (m.agent_name, m.model, m.requests) == ("w1", "openai/gpt-5.2", 1)
+
+        with open(log, "a") as f:
+            f.write(_step(2000, 2050, 2500, 50, 5, 0.25))
+        [m] = metrics.collect(TEAM, base_dir=team)
+        assert (m.requests, m.input_tokens, m.cost) == (2, 100, 0.5)
+
+        saved = json.loads(metrics.metrics_path(TEAM, team).read_text())
+        assert saved["agents"]["w1"]["requests"] == 2
+        assert saved["cursors"]["w1"]["offset"] == log.stat().st_size
+
+    def test_departed_agents_keep_totals(self, team: Path, tmp_path: Path) -> None:
+        log = tmp_path / "w1.log"
+        log.write_text(_step(0, 1, 2, 1, 1, 0.0))
+        teams.add_member(TEAM, _make_teammate("w1", log), base_dir=team)
+        metrics.collect(TEAM, base_dir=team)
+        teams.remove_member(TEAM, "w1", base_dir=team)
+        assert [m.agent_name for m in metrics.collect(TEAM, base_dir=team)] == ["w1"]
+
+    def test_missing_team_raises(self, tmp_base_dir: Path) -> None:
+        with pytest.raises(FileNotFoundError):
+            metrics.collect("nope", base_dir=tmp_base_dir)
+
+
+class TestTruncateLogs:
+    def test_empties_oversized_logs_after_counting(self, team: Path, tmp_path: Path) -> None:
+        big, small = tmp_path / "big.log", tmp_path / "small.log"
+        big.write_text(_step(0, 1, 2, 1, 1, 0.0) * 20)
+        small.write_text(_step(0, 1, 2, 1, 1, 0.0))
+        teams.add_member(TEAM, _make_teammate("big", big), base_dir=team)
+        teams.add_member(TEAM, _make_teammate("small", small), base_dir=team)
+
+        assert metrics.truncate_logs(TEAM, team, max_bytes=small.stat().st_size) == ["big"]
+        assert big.stat().st_size == 0
+        assert small.stat().st_size > 0
+
+        with open(big, "a") as f:
+            f.write(_step(0, 1, 2, 1, 1, 0.0))
+        totals = {m.agent_name: m.requests for m in metrics.collect(TEAM, base_dir=team)}
+        assert totals == {"big": 21, "small": 1}
+
+    def test_headless_logs_are_capped(self, team: Path, tmp_path: Path) -> None:
+        log = tmp_path / "h.log"
+        log.write_text(_step(0, 1, 2, 1, 1, 0.0) * 5)
+        member = _make_teammate("h", log).model_copy(update={"backend_type": "headless"})
+        teams.add_member(TEAM, member, base_dir=team)
+        assert metrics.truncate_logs(TEAM, team, max_bytes=1) == ["h"]
+        assert log.stat().st_size == 0
+        assert [m.requests for m in metrics.collect(TEAM, base_dir=team)] == [5]
+
+    def test_zero_limit_disables(self, team: Path, tmp_path: Path, monkeypatch) -> None:
+        log = tmp_path / "w.log"
+        log.write_text(_step(0, 1, 2, 1, 1, 0.0))
+        teams.add_member(TEAM, _make_teammate("w", log), base_dir=team)
+        monkeypatch.setenv(metrics.OUTPUT_LOG_MAX_BYTES_ENV_VAR, "0")
+        assert metrics.truncate_logs(TEAM, team) == []
+        assert log.stat().st_size > 0
+
+
+class TestSummaries:
+    def test_by_model_and_averages(self) -> None:
+        a = AgentMetrics(agent_name="a", model="m1", requests=2, step_latency_ms_total=300,
+                         step_latency_ms_max=200, timed_steps=2)
+        b = AgentMetrics(agent_name="b", model="m1", requests=1, step_latency_ms_total=600,
+                         step_latency_ms_max=600, timed_steps=1)
+        c = AgentMetrics(agent_name="c", model="m2")
+        totals = metrics.by_model([a, b, c])
+        assert set(totals) == {"m1", "m2"}
+        assert (totals["m1"].requests, totals["m1"].step_latency_ms_max) == (3, 600)
+
+        summary = metrics.summarize(totals["m1"])
+        assert summary["avgStepLatencyMs"] == 300
+        assert summary["avgTimeToFirstTokenMs"] is None
@@ -185,6 +185,53 @@ class TestTeamConfig:
         assert isinstance(config.members[1], TeammateMember)
 
 
+class TestTeamConfigMemberIndex:
+    @staticmethod
+    def _config() -> TeamConfig:
+        lead = LeadMember(
+            agent_id="team-lead@idx", name="team-lead", agent_type="team-lead",
+            model="m", joined_at=1, cwd="/tmp",
+        )
+        mate = TeammateMember(
+            agent_id="worker@idx", name="worker", agent_type="general-purpose",
+            model="m", prompt="p", color="blue", joined_at=2, tmux_pane_id="%1", cwd="/tmp",
+        )
+        return TeamConfig(
+            name="idx", created_at=1, lead_agent_id="team-lead@idx",
+            lead_session_id="sid", members=[lead, mate],
+        )
+
+    def test_lookup_by_name(self):
+        config = self._config()
+        assert config.get_member("team-lead").agent_type == "team-lead"
+        assert config.get_teammate("worker").tmux_pane_id == "%1"
+        assert config.get_teammate("team-lead") is None
+        assert config.get_member("ghost") is None
+
+    def test_teammates_view_excludes_lead(self):
+        config = self._config()
+        assert [m.name for m in config.teammates] == ["worker"]
+
+    def test_index_is_read_only(self):
+        config = self._config()
+        with pytest.raises(TypeError):
+            config.member_index["x"] = config.members[0]
+
+    def test_model_copy_rebuilds_index(self):
+        config = self._config()
+        shrunk = config.model_copy(update={"members": config.members[:1]})
+        assert "worker" not in shrunk.member_index
+        assert shrunk.teammates == ()
+        assert "worker" in config.member_index
+
+    def test_index_not_serialized(self):
+        data = self._config().model_dump(by_alias=True)
+        assert set(data) == {
+            "name", "description", "createdAt", "leadAgentId",
+            "leadSessionId", "projectDir", "members",
+        }
+
+
 class TestTaskFile:
     def test_initial_task_excludes_none_fields(self):
         task = TaskFile(id="1", subject="Do thing", description="Details")
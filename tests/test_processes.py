@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from opencode_teams import processes
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX process groups")
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return True  # No /proc: existence is all we can tell
+
+
+class TestReaping:
+    def test_exit_is_reaped_in_background(self) -> None:
+        pid = processes.track(subprocess.Popen(["sh", "-c", "exit 3"]))
+        assert _wait_for(lambda: processes.lookup(pid).returncode is not None)
+        assert processes.exit_code(pid) == 3
+        assert not _alive(pid)  # No zombie left behind
+
+    def test_running_child(self) -> None:
+        proc = subprocess.Popen(["sleep", "30"])
+        pid = processes.track(proc)
+        try:
+            assert processes.exit_code(pid) is None
+            assert processes.lookup(pid).returncode is None
+        finally:
+            proc.kill()
+            proc.wait()
+
+    def test_untracked_pid(self) -> None:
+        assert processes.lookup(-5) is None
+        assert processes.exit_code(-5) is None
+
+
+class TestTerminate:
+    def test_kills_whole_process_group(self, tmp_path) -> None:
+        pidfile = tmp_path / "grandchild.pid"
+        proc = subprocess.Popen(
+            ["sh", "-c", f"sleep 30 & echo $! > {pidfile}; wait"],
+            start_new_session=True,
+        )
+        pid = processes.track(proc)
+        assert _wait_for(lambda: pidfile.exists() and pidfile.read_text().strip())
+        grandchild = int(pidfile.read_text())
+        processes.terminate(pid, timeout=2)
+        assert processes.exit_code(pid) is not None
+        assert _wait_for(lambda: not _alive(grandchild))
+
+    def test_escalates_to_sigkill(self) -> None:
+        proc = subprocess.Popen(
+            ["sh", "-c", "trap '' TERM; while :; do sleep 0.1; done"],
+            start_new_session=True,
+        )
+        pid = processes.track(proc)
+        time.sleep(0.2)  # Let the trap be installed
+        started = time.monotonic()
+        processes.terminate(pid, timeout=0.5)
+        assert time.monotonic() - started < 5
+        assert processes.exit_code(pid) == -9
+
+    def test_untracked_pid_spares_its_group(self, tmp_path) -> None:
+        pidfile = tmp_path / "grandchild.pid"
+        proc = subprocess.Popen(
+            ["sh", "-c", f"sleep 30 & echo $! > {pidfile}; wait"],
+            start_new_session=True,
+        )
+        try:
+            assert _wait_for(lambda: pidfile.exists() and pidfile.read_text().strip())
+            grandchild = int(pidfile.read_text())
+            processes.terminate(proc.pid, timeout=2)  # Not tracked: could be a reused PID
+            assert proc.wait(timeout=5) is not None
+            assert _alive(grandchild)
+        finally:
+            os.killpg(proc.pid, 9)
+
+    def test_already_dead(self) -> None:
+        proc = subprocess.Popen(["true"])
+        pid = processes.track(proc)
+        proc.wait()
+        processes.terminate(pid)  # Does not raise
+        processes.terminate(0)
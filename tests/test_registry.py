@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from opencode_teams import messaging, registry, tasks, teams
+from opencode_teams.models import TeammateMember
+
+
+def _make_teammate(name: str, team_name: str) -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{team_name}",
+        name=name,
+        agent_type="teammate",
+        model="moonshot-ai/kimi-k2.5",
+        prompt="Do stuff",
+        color="blue",
+        joined_at=int(time.time() * 1000),
+        tmux_pane_id="%1",
+        cwd="/tmp",
+    )
+
+
+def _summary(name: str, base_dir: Path):
+    summary = registry.get_team_summary(name, base_dir=base_dir)
+    assert summary is not None
+    return summary
+
+
+class TestTeamLifecycle:
+    def test_create_team_registers_entry(self, tmp_base_dir: Path) -> None:
+        result = teams.create_team("reg", "sess-1", base_dir=tmp_base_dir)
+        summary = _summary("reg", tmp_base_dir)
+        config = teams.read_config("reg", base_dir=tmp_base_dir)
+
+        assert summary.created_at == config.created_at
+        assert summary.member_count == 1
+        assert summary.unread_count == 0
+        assert result.team_name == "reg"
+
+    def test_member_changes_update_count(self, tmp_base_dir: Path) -> None:
+        teams.create_team("reg-m", "sess-1", base_dir=tmp_base_dir)
+        teams.add_member("reg-m", _make_teammate("worker", "reg-m"), base_dir=tmp_base_dir)
+        assert _summary("reg-m", tmp_base_dir).member_count == 2
+
+        teams.remove_member("reg-m", "worker", base_dir=tmp_base_dir)
+        assert _summary("reg-m", tmp_base_dir).member_count == 1
+
+    def test_delete_team_unregisters(self, tmp_base_dir: Path) -> None:
+        teams.create_team("reg-d", "sess-1", base_dir=tmp_base_dir)
+        teams.delete_team("reg-d", base_dir=tmp_base_dir)
+        assert registry.get_team_summary("reg-d", base_dir=tmp_base_dir) is None
+
+
+class TestTaskCounts:
+    def test_status_transitions_move_counts(self, tmp_base_dir: Path) -> None:
+        teams.create_team("reg-t", "sess-1", base_dir=tmp_base_dir)
+        t1 = tasks.create_task("reg-t", "one", "d", base_dir=tmp_base_dir)
+        tasks.create_task("reg-t", "two", "d", base_dir=tmp_base_dir)
+        assert _summary("reg-t", tmp_base_dir).task_counts["pending"] == 2
+
+        tasks.update_task("reg-t", t1.id, status="in_progress", base_dir=tmp_base_dir)
+        counts = _summary("reg-t", tmp_base_dir).task_counts
+        assert counts["pending"] == 1
+        assert counts["in_progress"] == 1
+
+        tasks.update_task("reg-t", t1.id, status="deleted", base_dir=tmp_base_dir)
+        counts = _summary("reg-t", tmp_base_dir).task_counts
+        assert counts["pending"] == 1
+        assert counts["in_progress"] == 0
+
+    def test_reset_owner_tasks_reopens(self, tmp_base_dir: Path) -> None:
+        teams.create_team("reg-r", "sess-1", base_dir=tmp_base_dir)
+        t1 = tasks.create_task("reg-r", "one", "d", base_dir=tmp_base_dir)
+        tasks.update_task(
+            "reg-r", t1.id, status="in_progress", owner="worker", base_dir=tmp_base_dir
+        )
+        tasks.reset_owner_tasks("reg-r", "worker", base_dir=tmp_base_dir)
+        counts = _summary("reg-r", tmp_base_dir).task_counts
+        assert counts["pending"] == 1
+        assert counts["in_progress"] == 0
+
+
+class TestUnreadCounts:
+    def test_append_and_read_adjust_unread(self, tmp_base_dir: Path) -> None:
+        teams.create_team("reg-u", "sess-1", base_dir=tmp_base_dir)
+        for i in range(3):
+            messaging.send_plain_message(
+                "reg-u", "team-lead", "worker", f"msg {i}", summary="s", base_dir=tmp_base_dir
+            )
+        assert _summary("reg-u", tmp_base_dir).unread_count == 3
+
+        messaging.read_inbox("reg-u", "worker", unread_only=True, base_dir=tmp_base_dir)
+        assert _summary("reg-u", tmp_base_dir).unread_count == 0
+
+    def test_removed_member_unread_is_dropped(self, tmp_base_dir: Path) -> None:
+        teams.create_team("reg-x", "sess-1", base_dir=tmp_base_dir)
+        for name in ("gone", "stays"):
+            teams.add_member("reg-x", _make_teammate(name, "reg-x"), base_dir=tmp_base_dir)
+            messaging.send_plain_message(
+                "reg-x", "team-lead", name, "hi", summary="s", base_dir=tmp_base_dir
+            )
+        assert _summary("reg-x", tmp_base_dir).unread_count == 2
+
+        teams.remove_member("reg-x", "gone", base_dir=tmp_base_dir)
+        assert _summary("reg-x", tmp_base_dir).unread_count == 1
+        teams.remove_members("reg-x", ["gone"], base_dir=tmp_base_dir)  # Already removed
+        assert _summary("reg-x", tmp_base_dir).unread_count == 1
+
+    def test_inbox_without_team_is_not_registered(self, tmp_base_dir: Path) -> None:
+        messaging.send_plain_message(
+            "no-team", "team-lead", "worker", "hi", summary="s", base_dir=tmp_base_dir
+        )
+        assert registry.get_team_summary("no-team", base_dir=tmp_base_dir) is None
+
+
+class TestRebuild:
+    def test_missing_registry_is_rebuilt_from_team_dirs(self, tmp_base_dir: Path) -> None:
+        teams.create_team("legacy", "sess-1", base_dir=tmp_base_dir)
+        tasks.create_task("legacy", "one", "d", base_dir=tmp_base_dir)
+        messaging.send_plain_message(
+            "legacy", "team-lead", "worker", "hi", summary="s", base_dir=tmp_base_dir
+        )
+        registry.registry_path(tmp_base_dir).unlink()
+
+        summaries = registry.list_team_summaries(base_dir=tmp_base_dir)
+        assert [s.name for s in summaries] == ["legacy"]
+        assert summaries[0].task_counts["pending"] == 1
+        assert summaries[0].unread_count == 1
+        assert registry.registry_path(tmp_base_dir).exists()
+
+    def test_list_orders_by_last_activity(self, tmp_base_dir: Path) -> None:
+        teams.create_team("older", "sess-1", base_dir=tmp_base_dir)
+        teams.create_team("newer", "sess-2", base_dir=tmp_base_dir)
+        time.sleep(0.01)
+        tasks.create_task("older", "bump", "d", base_dir=tmp_base_dir)
+
+        names = [s.name for s in registry.list_team_summaries(base_dir=tmp_base_dir)]
+        assert names == ["older", "newer"]
+
+    def test_registry_file_shape(self, tmp_base_dir: Path) -> None:
+        teams.create_team("shape", "sess-1", base_dir=tmp_base_dir)
+        raw = json.loads(registry.registry_path(tmp_base_dir).read_text())
+        assert raw["version"] == registry.REGISTRY_VERSION
+        entry = raw["teams"]["shape"]
+        assert set(entry) == {
+            "name", "createdAt", "memberCount", "taskCounts", "unreadCount", "lastActivity",
+        }
+
+    def test_listing_reads_only_the_registry(self, tmp_base_dir: Path) -> None:
+        teams.create_team("quiet", "sess-1", base_dir=tmp_base_dir)
+        tasks.create_task("quiet", "one", "d", base_dir=tmp_base_dir)
+        registry.registry_path(tmp_base_dir).unlink()
+        with patch("opencode_teams.registry._scan_team", wraps=registry._scan_team) as scan:
+            registry.list_team_summaries(base_dir=tmp_base_dir)
+            registry.list_team_summaries(base_dir=tmp_base_dir)
+            summary = registry.get_team_summary("quiet", base_dir=tmp_base_dir)
+        # The rebuild is stored, so only the first listing scans the team
+        assert scan.call_count == 1
+        assert summary is not None
+        assert summary.task_counts["pending"] == 1
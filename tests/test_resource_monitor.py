@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from opencode_teams import teams
+from opencode_teams.models import TeammateMember
+from opencode_teams.resource_monitor import (
+    ResourceMonitor,
+    agent_root_pid,
+    process_tree_usage,
+)
+from opencode_teams.spawner import PaneState
+
+TEAM = "res-team"
+
+pytestmark = pytest.mark.skipif(
+    not Path("/proc/self/stat").exists(), reason="requires Linux /proc"
+)
+
+
+def _member(name: str, process_id: int = 0, pane_id: str = "") -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{TEAM}",
+        name=name,
+        agent_type="general-purpose",
+        model="openai/gpt-5.2",
+        prompt="work",
+        color="blue",
+        joined_at=0,
+        tmux_pane_id=pane_id,
+        cwd="/tmp",
+        process_id=process_id,
+    )
+
+
+@pytest.fixture
+def tree():
+    """A shell with two sleeping children."""
+    proc = subprocess.Popen(["sh", "-c", "sleep 30 & sleep 30 & wait"])
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        usage = process_tree_usage(proc.pid)
+        if usage is not None and usage.processes == 3:
+            break
+        time.sleep(0.05)
+    yield proc
+    subprocess.run(["pkill", "-P", str(proc.pid)], check=False)
+    proc.kill()
+    proc.wait()
+
+
+@pytest.fixture
+def busy():
+    proc = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+class TestProcessTreeUsage:
+    def test_counts_descendants(self, tree) -> None:
+        usage = process_tree_usage(tree.pid)
+        assert usage is not None
+        assert usage.processes == 3
+        assert usage.rss_kb > 0
+
+    def test_missing_process(self) -> None:
+        proc = subprocess.Popen(["true"])
+        proc.wait()
+        assert process_tree_usage(proc.pid) is None
+
+
+class TestAgentRootPid:
+    def test_prefers_process_id(self) -> None:
+        assert agent_root_pid(_member("a", process_id=42, pane_id="%1"), None) == 42
+
+    def test_uses_pane_pid(self) -> None:
+        panes = {"%1": PaneState("%1", False, 77, None)}
+        assert agent_root_pid(_member("a", pane_id="%1"), panes) == 77
+
+    def test_dead_or_unknown_pane(self) -> None:
+        panes = {"%1": PaneState("%1", True, 77, None)}
+        assert agent_root_pid(_member("a", pane_id="%1"), panes) is None
+        assert agent_root_pid(_member("a", pane_id="%2"), panes) is None
+        assert agent_root_pid(_member("a", pane_id="%1"), None) is None
+
+
+class TestResourceMonitor:
+    @pytest.fixture
+    def monitor(self, tmp_base_dir: Path) -> ResourceMonitor:
+        teams.create_team(TEAM, session_id="s", base_dir=tmp_base_dir)
+        return ResourceMonitor(base_dir=tmp_base_dir, interval=1.0, history_size=3)
+
+    def test_cpu_percent_needs_two_samples(self, monitor: ResourceMonitor, busy, tmp_base_dir: Path) -> None:
+        teams.add_member(TEAM, _member("hog", process_id=busy.pid), base_dir=tmp_base_dir)
+        first = monitor.sample(TEAM)["hog"]
+        assert first is not None and first.cpu_percent is None
+        time.sleep(0.3)
+        second = monitor.sample(TEAM)["hog"]
+        assert second.cpu_percent is not None and second.cpu_percent > 20
+        assert monitor.latest(TEAM, "hog") == second
+
+    def test_history_is_a_ring_buffer(self, monitor: ResourceMonitor, tree, tmp_base_dir: Path) -> None:
+        teams.add_member(TEAM, _member("w", process_id=tree.pid), base_dir=tmp_base_dir)
+        for _ in range(5):
+            monitor.sample(TEAM)
+        history = monitor.history(TEAM, "w")
+        assert len(history) == 3
+        assert history[-1].processes == 3
+        assert history[-1].to_dict()["children"] == 2
+
+    def test_agent_without_process(self, monitor: ResourceMonitor, tmp_base_dir: Path) -> None:
+        teams.add_member(TEAM, _member("gone", pane_id="%9"), base_dir=tmp_base_dir)
+        with patch("opencode_teams.spawner.list_pane_states", return_value={}) as panes:
+            assert monitor.sample(TEAM) == {"gone": None}
+        panes.assert_called_once()
+
+    def test_departed_agents_and_teams_are_forgotten(
+        self, monitor: ResourceMonitor, tree, tmp_base_dir: Path
+    ) -> None:
+        teams.add_member(TEAM, _member("w", process_id=tree.pid), base_dir=tmp_base_dir)
+        monitor.sample(TEAM)
+        teams.remove_member(TEAM, "w", base_dir=tmp_base_dir)
+        monitor.sample(TEAM)
+        assert monitor.history(TEAM, "w") == []
+        teams.add_member(TEAM, _member("w", process_id=tree.pid), base_dir=tmp_base_dir)
+        monitor.sample(TEAM)
+        monitor.forget(TEAM)
+        assert monitor.latest(TEAM, "w") is None
+
+    def test_unknown_team(self, monitor: ResourceMonitor) -> None:
+        with pytest.raises(FileNotFoundError):
+            monitor.sample("nope")
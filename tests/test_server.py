@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import subprocess
+import threading
 import time
 import unittest.mock
 from pathlib import Path
@@ -8,9 +12,10 @@ from pathlib import Path
 import pytest
 from fastmcp import Client
 
-from opencode_teams import messaging, tasks, teams
-from opencode_teams.models import AgentHealthStatus, TeammateMember
-from opencode_teams.server import mcp
+from opencode_teams import build_cache, messaging, tasks, teams, worktrees
+from opencode_teams.models import AgentHealthStatus, ShutdownApproved, TeammateMember
+from opencode_teams.server import _get_lifespan, mcp
+from opencode_teams.spawner import PaneState
 
 
 def _make_teammate(name: str, team_name: str, pane_id: str = "%1") -> TeammateMember:
@@ -34,9 +39,13 @@ async def client(tmp_path: Path, monkeypatch):
     monkeypatch.setattr(teams, "TASKS_DIR", tmp_path / "tasks")
     monkeypatch.setattr(tasks, "TASKS_DIR", tmp_path / "tasks")
     monkeypatch.setattr(messaging, "TEAMS_DIR", tmp_path / "teams")
+    # Teams default their project to the cwd; keep agent configs out of the repo
+    monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(
         "opencode_teams.server.discover_opencode_binary", lambda: "/usr/bin/echo"
     )
+    # Keep spawn admission independent of how busy the test host is
+    monkeypatch.setattr("opencode_teams.admission.read_host_load", lambda: (None, None))
     (tmp_path / "teams").mkdir()
     (tmp_path / "tasks").mkdir()
     async with Client(mcp) as c:
@@ -811,7 +820,7 @@ class TestCheckAgentHealth:
             result2 = _data(
                 await client.call_tool(
                     "check_agent_health",
-                    {"team_name": "th4", "agent_name": "worker"},
+                    {"team_name": "th4", "agent_name": "worker", "fresh": True},
                 )
             )
         assert result2["status"] == "hung"
@@ -857,7 +866,7 @@ class TestCheckAgentHealth:
         ):
             await client.call_tool(
                 "check_agent_health",
-                {"team_name": "th5", "agent_name": "worker"},
+                {"team_name": "th5", "agent_name": "worker", "fresh": True},
             )
 
         assert call_args_list[1]["previous_hash"] == "hash1"
@@ -892,11 +901,12 @@ class TestCheckAllAgentsHealth:
         teams.add_member("ta1", _make_teammate("worker1", "ta1", pane_id="%60"))
         teams.add_member("ta1", _make_teammate("worker2", "ta1", pane_id="%61"))
 
-        def mock_check(member, previous_hash=None, last_change_time=None):
+        def mock_check(member, previous_hash=None, last_change_time=None, **kwargs):
             return _make_alive_status(member.name, member.tmux_pane_id)
 
-        with unittest.mock.patch(
-            "opencode_teams.server.check_single_agent_health",
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value=None), \
+             unittest.mock.patch(
+            "opencode_teams.spawner.check_single_agent_health",
             side_effect=mock_check,
         ):
             result = _data(
@@ -915,11 +925,12 @@ class TestCheckAllAgentsHealth:
         await client.call_tool("team_create", {"team_name": "ta2"})
         teams.add_member("ta2", _make_teammate("worker", "ta2", pane_id="%70"))
 
-        def mock_check(member, previous_hash=None, last_change_time=None):
+        def mock_check(member, previous_hash=None, last_change_time=None, **kwargs):
             return _make_alive_status(member.name, member.tmux_pane_id)
 
-        with unittest.mock.patch(
-            "opencode_teams.server.check_single_agent_health",
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value=None), \
+             unittest.mock.patch(
+            "opencode_teams.spawner.check_single_agent_health",
             side_effect=mock_check,
         ):
             result = _data(
@@ -950,13 +961,14 @@ class TestCheckAllAgentsHealth:
 
         call_count = {"n": 0}
 
-        def mock_check(member, previous_hash=None, last_change_time=None):
+        def mock_check(member, previous_hash=None, last_change_time=None, **kwargs):
             call_count["n"] += 1
             return _make_alive_status(member.name, member.tmux_pane_id, content_hash=f"hash_{member.name}")
 
         # First call
-        with unittest.mock.patch(
-            "opencode_teams.server.check_single_agent_health",
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value=None), \
+             unittest.mock.patch(
+            "opencode_teams.spawner.check_single_agent_health",
             side_effect=mock_check,
         ):
             await client.call_tool(
@@ -969,26 +981,181 @@ class TestCheckAllAgentsHealth:
         # Second call: verify state was passed (previous_hash should be set)
         captured_args = []
 
-        def mock_check_2(member, previous_hash=None, last_change_time=None):
+        def mock_check_2(member, previous_hash=None, last_change_time=None, **kwargs):
             captured_args.append({
                 "name": member.name,
                 "previous_hash": previous_hash,
             })
             return _make_alive_status(member.name, member.tmux_pane_id, content_hash=f"hash2_{member.name}")
 
-        with unittest.mock.patch(
-            "opencode_teams.server.check_single_agent_health",
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value=None), \
+             unittest.mock.patch(
+            "opencode_teams.spawner.check_single_agent_health",
             side_effect=mock_check_2,
         ):
             await client.call_tool(
                 "check_all_agents_health",
-                {"team_name": "ta4"},
+                {"team_name": "ta4", "fresh": True},
             )
 
         # Both agents should have previous hashes from first call
+        assert len(captured_args) == 2
         for arg in captured_args:
             assert arg["previous_hash"] is not None, f"No previous hash for {arg['name']}"
 
+    async def test_uses_batched_pane_liveness(self, client: Client):
+        """One list-panes sweep decides liveness; dead panes are not captured."""
+        await client.call_tool("team_create", {"team_name": "ta5"})
+        teams.add_member("ta5", _make_teammate("up", "ta5", pane_id="%90"))
+        teams.add_member("ta5", _make_teammate("down", "ta5", pane_id="%91"))
+        teams.add_member("ta5", _make_teammate("gone", "ta5", pane_id="%92"))
+        panes = {
+            "%90": PaneState("%90", dead=False, pid=100, activity=0),
+            "%91": PaneState("%91", dead=True, pid=101, activity=0),
+        }
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value=panes) as mock_list, \
+             unittest.mock.patch("opencode_teams.spawner.check_pane_alive") as mock_alive, \
+             unittest.mock.patch(
+                 "opencode_teams.spawner.capture_pane_content_hash", return_value="h"
+             ) as mock_capture:
+            result = _data(
+                await client.call_tool("check_all_agents_health", {"team_name": "ta5"})
+            )
+        by_name = {r["agentName"]: r["status"] for r in result}
+        assert by_name == {"up": "alive", "down": "dead", "gone": "dead"}
+        mock_list.assert_called_once()
+        mock_alive.assert_not_called()
+        mock_capture.assert_called_once_with("%90", control_mode=False)
+
+
+    async def test_returns_cached_snapshot_until_fresh(self, client: Client):
+        """A recent sweep is served from the monitor's table without tmux calls."""
+        await client.call_tool("team_create", {"team_name": "ta6"})
+        teams.add_member("ta6", _make_teammate("w1", "ta6", pane_id="%95"))
+        calls = {"n": 0}
+
+        def mock_check(member, previous_hash=None, last_change_time=None, **kwargs):
+            calls["n"] += 1
+            return _make_alive_status(member.name, member.tmux_pane_id)
+
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value=None), \
+             unittest.mock.patch(
+                 "opencode_teams.spawner.check_single_agent_health", side_effect=mock_check
+             ):
+            first = _data(await client.call_tool("check_all_agents_health", {"team_name": "ta6"}))
+            second = _data(await client.call_tool("check_all_agents_health", {"team_name": "ta6"}))
+            single = _data(await client.call_tool(
+                "check_agent_health", {"team_name": "ta6", "agent_name": "w1"},
+            ))
+            assert calls["n"] == 1
+            await client.call_tool("check_all_agents_health", {"team_name": "ta6", "fresh": True})
+            assert calls["n"] == 2
+
+        assert first[0]["ageSeconds"] == 0.0
+        assert second[0]["status"] == "alive"
+        assert second[0]["ageSeconds"] >= 0.0
+        assert single["agentName"] == "w1"
+
+    async def test_new_teammate_invalidates_cached_snapshot(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "ta7"})
+        teams.add_member("ta7", _make_teammate("w1", "ta7", pane_id="%96"))
+
+        def mock_check(member, previous_hash=None, last_change_time=None, **kwargs):
+            return _make_alive_status(member.name, member.tmux_pane_id)
+
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value=None), \
+             unittest.mock.patch(
+                 "opencode_teams.spawner.check_single_agent_health", side_effect=mock_check
+             ):
+            await client.call_tool("check_all_agents_health", {"team_name": "ta7"})
+            teams.add_member("ta7", _make_teammate("w2", "ta7", pane_id="%97"))
+            result = _data(await client.call_tool("check_all_agents_health", {"team_name": "ta7"}))
+        assert [r["agentName"] for r in result] == ["w1", "w2"]
+
+
+class TestAgentMetricsTool:
+    async def test_reports_agents_and_models(self, client: Client, tmp_path: Path):
+        await client.call_tool("team_create", {"team_name": "am1"})
+        log = tmp_path / "w.log"
+        events = [
+            {"type": "step_start", "timestamp": 1000},
+            {"type": "text", "timestamp": 1200},
+            {"type": "step_finish", "timestamp": 1800,
+             "part": {"cost": 0.01, "tokens": {"input": 40, "output": 8}}},
+        ]
+        log.write_text("".join(json.dumps(e) + "\n" for e in events))
+        teams.add_member(
+            "am1",
+            _make_teammate("worker", "am1").model_copy(update={"output_log": str(log)}),
+        )
+        result = _data(await client.call_tool("agent_metrics", {"team_name": "am1"}))
+        [agent] = result["agents"]
+        assert agent["agentName"] == "worker"
+        assert (agent["requests"], agent["inputTokens"], agent["outputTokens"]) == (1, 40, 8)
+        assert agent["avgStepLatencyMs"] == 800
+        assert agent["avgTimeToFirstTokenMs"] == 200
+        [model] = result["models"]
+        assert model["model"] == "moonshot-ai/kimi-k2.5"
+        assert "agentName" not in model
+
+    async def test_unknown_team_errors(self, client: Client):
+        result = await client.call_tool(
+            "agent_metrics", {"team_name": "nope"}, raise_on_error=False
+        )
+        assert result.is_error is True
+
+
+class TestAgentResourcesTool:
+    async def test_reports_running_and_missing_agents(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "ar1"})
+        teams.add_member(
+            "ar1", _make_teammate("self", "ar1").model_copy(update={"process_id": os.getpid()})
+        )
+        teams.add_member("ar1", _make_teammate("gone", "ar1", pane_id="%99"))
+        with unittest.mock.patch("opencode_teams.spawner.list_pane_states", return_value={}):
+            result = _data(await client.call_tool(
+                "agent_resources", {"team_name": "ar1", "history": True}
+            ))
+        by_name = {a["agentName"]: a for a in result["agents"]}
+        assert by_name["gone"] == {"agentName": "gone", "status": "not running"}
+        running = by_name["self"]
+        assert running["pid"] == os.getpid()
+        assert running["rssMb"] > 0
+        assert running["cpuPercent"] is not None
+        assert len(running["history"]) == 2
+        assert result["totals"]["processes"] == running["processes"]
+
+    async def test_unknown_team_errors(self, client: Client):
+        result = await client.call_tool(
+            "agent_resources", {"team_name": "nope"}, raise_on_error=False
+        )
+        assert result.is_error is True
+        assert "not found" in result.content[0].text
+
+
+class TestAutoBackendFallback:
+    async def test_headless_fallback_is_reported(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tf1"})
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=False), \
+             unittest.mock.patch("opencode_teams.server.is_windows", return_value=False), \
+             unittest.mock.patch(
+                 "opencode_teams.server.discover_desktop_binary", side_effect=FileNotFoundError("none")
+             ), \
+             unittest.mock.patch("opencode_teams.server.spawn_teammate") as mock_spawn:
+            mock_spawn.return_value = _make_teammate("worker", "tf1")
+            result = _data(await client.call_tool("spawn_teammate", {
+                "team_name": "tf1", "name": "worker", "prompt": "do work", "model": "openai/gpt-5.2",
+            }))
+            explicit = _data(await client.call_tool("spawn_teammate", {
+                "team_name": "tf1", "name": "worker", "prompt": "do work", "model": "openai/gpt-5.2",
+                "backend": "headless",
+            }))
+        assert mock_spawn.call_args.kwargs["backend_type"] == "headless"
+        assert result["backend"] == "headless"
+        assert "backend='auto' started the agent headless" in result["warning"]
+        assert explicit["backend"] == "headless"
+        assert explicit["warning"] is None
+
 
 class TestSpawnDesktopBackendTool:
     async def test_spawn_with_desktop_backend(self, client: Client):
@@ -1062,6 +1229,26 @@ class TestForceKillDesktopBackend:
             mock_kill_desktop.assert_called_once_with(5555)
             mock_kill_tmux.assert_not_called()
 
+    async def test_force_kill_windows_terminal_agent(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tk_d3"})
+        member = TeammateMember(
+            agent_id="worker@tk_d3", name="worker", agent_type="general-purpose",
+            model="kimi-k2.5", prompt="work", color="blue",
+            joined_at=int(time.time() * 1000), tmux_pane_id="", cwd="/tmp",
+            backend_type="windows_terminal", process_id=6666,
+        )
+        teams.add_member("tk_d3", member)
+
+        with unittest.mock.patch("opencode_teams.server.kill_desktop_process") as mock_kill_desktop, \
+             unittest.mock.patch("opencode_teams.server.kill_tmux_pane") as mock_kill_tmux:
+            await client.call_tool(
+                "force_kill_teammate",
+                {"team_name": "tk_d3", "agent_name": "worker"},
+            )
+            mock_kill_desktop.assert_called_once_with(6666)
+            mock_kill_tmux.assert_not_called()
+        assert teams.read_config("tk_d3").get_teammate("worker") is None
+
     async def test_force_kill_tmux_agent_unchanged(self, client: Client):
         await client.call_tool("team_create", {"team_name": "tk_d2"})
         member = TeammateMember(
@@ -1080,3 +1267,394 @@ class TestForceKillDesktopBackend:
             )
             mock_kill_tmux.assert_called_once_with("%42")
             mock_kill_desktop.assert_not_called()
+
+
+class TestTeamRegistryTools:
+    async def test_list_teams_includes_created_team(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "reg_t1"})
+        await client.call_tool(
+            "task_create",
+            {"team_name": "reg_t1", "subject": "s", "description": "d"},
+        )
+        listed = _data(await client.call_tool("list_teams", {}))
+        assert [t["name"] for t in listed] == ["reg_t1"]
+        assert listed[0]["memberCount"] == 1
+        assert listed[0]["taskCounts"]["pending"] == 1
+
+    async def test_team_stats_reports_unread(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "reg_t2"})
+        teams.add_member("reg_t2", _make_teammate("worker", "reg_t2"))
+        await client.call_tool(
+            "send_message",
+            {
+                "team_name": "reg_t2",
+                "type": "message",
+                "recipient": "worker",
+                "content": "hi",
+                "summary": "greet",
+            },
+        )
+        stats = _data(await client.call_tool("team_stats", {"team_name": "reg_t2"}))
+        assert stats["memberCount"] == 2
+        assert stats["unreadCount"] == 1
+
+    async def test_team_stats_unknown_team(self, client: Client):
+        result = await client.call_tool(
+            "team_stats", {"team_name": "ghost"}, raise_on_error=False
+        )
+        assert result.is_error is True
+        assert "ghost" in result.content[0].text
+
+
+class TestSpawnTeamTool:
+    async def test_spawn_team_forwards_specs_and_reports(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "st1"})
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True), \
+             unittest.mock.patch("opencode_teams.server.spawn_many") as mock_many:
+            mock_many.return_value = (
+                [_make_teammate("alpha", "st1", "%1")],
+                {"beta": "RuntimeError: tmux crashed"},
+            )
+            result = _data(await client.call_tool("spawn_team", {
+                "team_name": "st1",
+                "members": [
+                    {"name": "alpha", "prompt": "a", "instructions": "be brief"},
+                    {"name": "beta", "prompt": "b", "model": "openai/gpt-5.2"},
+                ],
+            }))
+            specs = mock_many.call_args.args[1]
+            assert [s.name for s in specs] == ["alpha", "beta"]
+            assert specs[0].instructions == "be brief"
+            assert specs[1].model == "openai/gpt-5.2"
+            assert mock_many.call_args.kwargs["backend_type"] == "tmux"
+        assert [r["name"] for r in result["spawned"]] == ["alpha"]
+        assert result["spawned"][0]["agent_id"] == "alpha@st1"
+        assert result["failed"] == {"beta": "RuntimeError: tmux crashed"}
+
+    async def test_spawn_team_validation_error_is_tool_error(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "st2"})
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True):
+            result = await client.call_tool(
+                "spawn_team",
+                {
+                    "team_name": "st2",
+                    "members": [{"name": "dup", "prompt": "a"}, {"name": "dup", "prompt": "b"}],
+                },
+                raise_on_error=False,
+            )
+        assert result.is_error is True
+        assert "Duplicate" in result.content[0].text
+
+
+class TestWarmPoolTool:
+    async def test_configure_reports_pool_status(self, client: Client):
+        with unittest.mock.patch("opencode_teams.server.WarmPool.maintain", return_value=0):
+            status = _data(await client.call_tool("configure_warm_pool", {
+                "model": "openai/gpt-5.2", "size": 2, "backend": "headless",
+                "memory_budget_mb": 1024,
+            }))
+        assert status["pools"][0]["model"] == "openai/gpt-5.2"
+        assert status["pools"][0]["size"] == 2
+        assert status["memoryBudgetMb"] == 1024
+
+    async def test_configure_rejects_negative_size(self, client: Client):
+        result = await client.call_tool("configure_warm_pool", {
+            "model": "openai/gpt-5.2", "size": -1, "backend": "headless",
+        }, raise_on_error=False)
+        assert result.is_error is True
+
+    async def test_spawn_claims_warm_agent(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "warm1"})
+        standby = _make_teammate("warm-1", ".warm-pool", pane_id="%5")
+        with unittest.mock.patch("opencode_teams.server.WarmPool.claim", return_value=standby) as mock_claim, \
+             unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True), \
+             unittest.mock.patch("opencode_teams.server.spawn_teammate") as mock_spawn:
+            mock_spawn.return_value = _make_teammate("worker", "warm1", pane_id="%5")
+            await client.call_tool("spawn_teammate", {
+                "team_name": "warm1", "name": "worker", "prompt": "do work",
+                "model": "openai/gpt-5.2", "backend": "tmux",
+            })
+        assert mock_claim.call_args.args[:2] == ("openai/gpt-5.2", "tmux")
+        assert mock_spawn.call_args.kwargs["warm_agent"] is standby
+
+    async def test_spawn_with_resources_skips_warm_pool(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "warm2"})
+        with unittest.mock.patch("opencode_teams.server.WarmPool.claim") as mock_claim, \
+             unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True), \
+             unittest.mock.patch("opencode_teams.server.spawn_teammate") as mock_spawn:
+            mock_spawn.return_value = _make_teammate("worker", "warm2", pane_id="%5")
+            await client.call_tool("spawn_teammate", {
+                "team_name": "warm2", "name": "worker", "prompt": "do work",
+                "model": "openai/gpt-5.2", "backend": "tmux",
+                "resources": {"nice": 10, "memoryLimitMb": 2048},
+            })
+        mock_claim.assert_not_called()
+        assert mock_spawn.call_args.kwargs["warm_agent"] is None
+        assert mock_spawn.call_args.kwargs["resources"].memory_limit_mb == 2048
+
+
+class TestSupervisorTools:
+    async def test_spawn_passes_restart_policy(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "sup1"})
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True), \
+             unittest.mock.patch("opencode_teams.server.spawn_teammate") as mock_spawn:
+            mock_spawn.return_value = _make_teammate("worker", "sup1")
+            await client.call_tool("spawn_teammate", {
+                "team_name": "sup1", "name": "worker", "prompt": "do work",
+                "model": "openai/gpt-5.2", "backend": "tmux",
+                "restart_policy": {"maxRestarts": 5, "backoffSeconds": 2},
+            })
+        policy = mock_spawn.call_args.kwargs["restart_policy"]
+        assert (policy.max_restarts, policy.backoff_seconds) == (5, 2)
+
+    async def test_supervisor_status_starts_empty(self, client: Client):
+        status = _data(await client.call_tool("supervisor_status", {}))
+        assert status == {"pending": [], "gaveUp": [], "finished": [], "recent": []}
+
+
+class TestTeamShutdown:
+    async def test_graceful_and_forced(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "sd1"})
+        for name in ("polite", "stuck"):
+            teams.add_member("sd1", _make_teammate(name, "sd1"))
+        task = tasks.create_task("sd1", "Work", "do it")
+        tasks.update_task("sd1", task.id, status="in_progress", owner="stuck")
+        messaging.send_plain_message("sd1", "stuck", "team-lead", "status update", "update")
+
+        async def approve() -> None:
+            while True:
+                for msg in messaging.read_inbox("sd1", "polite", mark_as_read=False):
+                    data = json.loads(msg.text) if msg.text.startswith("{") else {}
+                    if data.get("type") == "shutdown_request":
+                        messaging.send_structured_message(
+                            "sd1", "polite", "team-lead",
+                            ShutdownApproved(
+                                request_id=data["requestId"], from_="polite",
+                                timestamp=messaging.now_iso(), pane_id="%1", backend_type="tmux",
+                            ),
+                        )
+                        return
+                await asyncio.sleep(0.05)
+
+        with unittest.mock.patch("opencode_teams.server.stop_agent_processes") as stop:
+            approver = asyncio.create_task(approve())
+            result = _data(await client.call_tool(
+                "team_shutdown", {"team_name": "sd1", "deadline_seconds": 2}
+            ))
+            await approver
+        assert result["graceful"] == ["polite"]
+        assert result["forced"] == ["stuck"]
+        assert result["tasks_released"] == 1
+        assert {m.name for m in stop.call_args.args[0]} == {"polite", "stuck"}
+        assert not teams.read_config("sd1").teammates
+        reopened = tasks.get_task("sd1", task.id)
+        assert (reopened.status, reopened.owner) == ("pending", None)
+        # The approval was consumed; the unrelated message is still unread
+        unread = messaging.read_inbox("sd1", "team-lead", unread_only=True, mark_as_read=False)
+        assert [m.text for m in unread] == ["status update"]
+
+    async def test_returns_early_when_all_approve(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "sd2"})
+        with unittest.mock.patch("opencode_teams.server.stop_agent_processes"):
+            result = _data(await client.call_tool(
+                "team_shutdown", {"team_name": "sd2", "deadline_seconds": 30}
+            ))
+        assert result["graceful"] == [] and result["forced"] == []
+        assert result["elapsed_seconds"] < 5
+
+    async def test_releases_resources_concurrently(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "sd3"})
+        for name in ("a", "b"):
+            teams.add_member("sd3", _make_teammate(name, "sd3"))
+        # Each release waits for the other: a sequential loop would time out
+        barrier = threading.Barrier(2, timeout=5)
+        with unittest.mock.patch("opencode_teams.server.stop_agent_processes"), \
+             unittest.mock.patch(
+                 "opencode_teams.server.release_agent_resources", side_effect=lambda m: barrier.wait()
+             ) as release:
+            result = _data(await client.call_tool(
+                "team_shutdown", {"team_name": "sd3", "deadline_seconds": 0}
+            ))
+        assert result["forced"] == ["a", "b"]
+        assert release.call_count == 2
+        assert not barrier.broken
+
+    async def test_unknown_team_errors(self, client: Client):
+        result = await client.call_tool(
+            "team_shutdown", {"team_name": "nope"}, raise_on_error=False
+        )
+        assert result.is_error is True
+
+
+class TestSpawnAdmission:
+    async def test_spawn_over_team_limit_is_queued(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "adm1"})
+        teams.add_member("adm1", _make_teammate("w1", "adm1"))
+        await client.call_tool("configure_admission", {"max_agents_per_team": 1})
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True), \
+             unittest.mock.patch("opencode_teams.server.spawn_teammate") as mock_spawn:
+            result = _data(await client.call_tool("spawn_teammate", {
+                "team_name": "adm1", "name": "w2", "prompt": "do work",
+                "model": "openai/gpt-5.2",
+            }))
+            mock_spawn.assert_not_called()
+        assert result["status"] == "queued"
+        assert result["queue_position"] == 1
+        assert "adm1" in result["message"]
+        queue = _data(await client.call_tool("spawn_queue", {"team_name": "adm1"}))
+        assert [q["name"] for q in queue["queued"]] == ["w2"]
+        assert queue["limits"]["maxAgentsPerTeam"] == 1
+
+    async def test_queued_name_cannot_be_spawned_twice(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "adm2"})
+        await client.call_tool("configure_admission", {"max_agents_per_host": 1})
+        teams.add_member("adm2", _make_teammate("w1", "adm2"))
+        args = {"team_name": "adm2", "name": "w2", "prompt": "x", "model": "openai/gpt-5.2"}
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True):
+            await client.call_tool("spawn_teammate", args)
+            result = await client.call_tool("spawn_teammate", args, raise_on_error=False)
+        assert result.is_error is True
+        assert "already queued" in result.content[0].text
+
+    async def test_cancel_queued_spawn(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "adm3"})
+        await client.call_tool("configure_admission", {"provider_limits": {"openai": 1}})
+        teams.add_member("adm3", _make_teammate("w1", "adm3").model_copy(update={"model": "openai/gpt-5.2"}))
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True):
+            queued = _data(await client.call_tool("spawn_teammate", {
+                "team_name": "adm3", "name": "w2", "prompt": "x", "model": "openai/gpt-5.2",
+            }))
+        await client.call_tool("cancel_queued_spawn", {"queue_id": queued["queue_id"]})
+        queue = _data(await client.call_tool("spawn_queue", {}))
+        assert queue["queued"] == []
+        result = await client.call_tool(
+            "cancel_queued_spawn", {"queue_id": queued["queue_id"]}, raise_on_error=False
+        )
+        assert result.is_error is True
+
+
+    async def test_launch_value_error_is_tool_error(self, client: Client, monkeypatch):
+        await client.call_tool("team_create", {"team_name": "adm4"})
+        args = {"team_name": "adm4", "name": "w1", "prompt": "x", "model": "openai/gpt-5.2"}
+        with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True), \
+             unittest.mock.patch(
+                 "opencode_teams.server.spawn_teammate", side_effect=ValueError("bad worktree")
+             ):
+            admitted = await client.call_tool("spawn_teammate", args, raise_on_error=False)
+            monkeypatch.setattr("opencode_teams.server._get_lifespan", lambda ctx: {
+                k: v for k, v in _get_lifespan(ctx).items() if k != "admission"
+            })
+            unadmitted = await client.call_tool("spawn_teammate", args, raise_on_error=False)
+        for result in (admitted, unadmitted):
+            assert result.is_error is True
+            assert result.content[0].text == "bad worktree"
+
+
+class TestWorktreeTools:
+    def _worktree_member(self, tmp_path: Path, monkeypatch, team: str) -> TeammateMember:
+        for var in ("AUTHOR", "COMMITTER"):
+            monkeypatch.setenv(f"GIT_{var}_NAME", "Test")
+            monkeypatch.setenv(f"GIT_{var}_EMAIL", "test@example.com")
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        for args in (["init", "-q", "-b", "main"], ["commit", "-q", "--allow-empty", "-m", "init"]):
+            subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+        tree = worktrees.create(repo, team, "impl")
+        member = _make_teammate("impl", team).model_copy(update={
+            "cwd": tree.cwd, "worktree": tree.path, "branch": tree.branch, "base_branch": tree.base,
+        })
+        teams.add_member(team, member)
+        return member
+
+    async def test_report_merge_ready_requires_commits(self, client: Client, tmp_path: Path, monkeypatch):
+        await client.call_tool("team_create", {"team_name": "wt1"})
+        member = self._worktree_member(tmp_path, monkeypatch, "wt1")
+        (Path(member.worktree) / "wip.txt").write_text("wip")
+        result = await client.call_tool(
+            "report_merge_ready", {"team_name": "wt1", "agent_name": "impl"}, raise_on_error=False,
+        )
+        assert result.is_error is True
+        assert "wip.txt" in result.content[0].text
+        assert "no commits beyond main" in result.content[0].text
+        assert messaging.read_inbox("wt1", "team-lead") == []
+
+    async def test_report_merge_ready_notifies_lead(self, client: Client, tmp_path: Path, monkeypatch):
+        await client.call_tool("team_create", {"team_name": "wt2"})
+        member = self._worktree_member(tmp_path, monkeypatch, "wt2")
+        (Path(member.worktree) / "done.txt").write_text("done")
+        for args in (["add", "done.txt"], ["commit", "-q", "-m", "work"]):
+            subprocess.run(["git", "-C", member.worktree, *args], check=True, capture_output=True)
+        status = _data(await client.call_tool("worktree_status", {"team_name": "wt2"}))
+        assert [(s["name"], s["ahead"], s["ready"]) for s in status] == [("impl", 1, True)]
+        result = _data(await client.call_tool(
+            "report_merge_ready", {"team_name": "wt2", "agent_name": "impl", "summary": "Added done.txt"},
+        ))
+        assert result["success"] is True
+        inbox = messaging.read_inbox("wt2", "team-lead")
+        assert len(inbox) == 1
+        assert member.branch in inbox[0].text
+        assert "Added done.txt" in inbox[0].text
+
+    async def test_report_merge_ready_rejects_shared_cwd(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "wt3"})
+        teams.add_member("wt3", _make_teammate("plain", "wt3"))
+        result = await client.call_tool(
+            "report_merge_ready", {"team_name": "wt3", "agent_name": "plain"}, raise_on_error=False,
+        )
+        assert result.is_error is True
+        assert "worktree" in result.content[0].text
+
+
+class TestBuildCacheUsage:
+    async def test_reports_usage_and_agents(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "bc1"})
+        env = build_cache.cache_env("bc1")
+        (Path(env["PIP_CACHE_DIR"]) / "wheel").write_bytes(b"x" * 5000)
+        teams.add_member("bc1", _make_teammate("builder", "bc1").model_copy(update={"env": env}))
+        teams.add_member("bc1", _make_teammate("plain", "bc1"))
+        usage = _data(await client.call_tool("build_cache_usage", {"team_name": "bc1"}))
+        assert usage["exists"] is True
+        assert usage["tools"]["pip"]["files"] == 1
+        assert usage["totalBytes"] >= 5000
+        assert usage["agents"] == ["builder"]
+
+    async def test_unknown_team(self, client: Client):
+        result = await client.call_tool(
+            "build_cache_usage", {"team_name": "nope"}, raise_on_error=False,
+        )
+        assert result.is_error is True
+        assert "not found" in result.content[0].text
+
+
+class TestBinaryCheck:
+    async def test_startup_does_not_wait_for_binary_check(self, tmp_path: Path, monkeypatch):
+        import threading
+        monkeypatch.setattr(teams, "TEAMS_DIR", tmp_path / "teams")
+        release = threading.Event()
+
+        def slow_discover():
+            release.wait(5)
+            return "/usr/bin/echo"
+
+        monkeypatch.setattr("opencode_teams.server.discover_opencode_binary", slow_discover)
+        async with Client(mcp) as c:
+            status = _data(await c.call_tool("server_status", {}))
+            assert status["opencode_binary"] == "checking"
+            assert "spawns" in status["spawn_latency"]
+            # Tools that need the binary fail fast instead of waiting for the check
+            result = await c.call_tool("configure_warm_pool", {
+                "model": "openai/gpt-5.2", "size": 0, "backend": "headless",
+            }, raise_on_error=False)
+            assert result.is_error is True
+            assert "still being validated" in result.content[0].text
+            release.set()
+            for _ in range(100):
+                status = _data(await c.call_tool("server_status", {}))
+                if status["opencode_binary"] != "checking":
+                    break
+                await asyncio.sleep(0.05)
+            assert status["opencode_binary"] == "/usr/bin/echo"
+            status = _data(await c.call_tool("configure_warm_pool", {
+                "model": "openai/gpt-5.2", "size": 0, "backend": "headless",
+            }))
+            assert status["pools"] == []
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import os
-import signal
+import shlex
+import shutil
 import subprocess
 import sys
 import time
@@ -10,13 +11,18 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from opencode_teams import teams, messaging
+from opencode_teams import teams, messaging, registry
 from opencode_teams.models import AgentHealthStatus, COLOR_PALETTE, TeammateMember
+from opencode_teams.config_gen import launch_prompt, prompt_file_path
 from opencode_teams.spawner import (
+    activity_signature,
     assign_color,
+    build_output_pipe_prefix,
     build_opencode_run_command,
     build_windows_terminal_command,
+    cached_opencode_version,
     capture_pane_content_hash,
+    check_agents_health,
     check_pane_alive,
     check_process_alive,
     check_single_agent_health,
@@ -26,11 +32,20 @@ from opencode_teams.spawner import (
     kill_desktop_process,
     kill_tmux_pane,
     launch_desktop_app,
+    list_pane_states,
     load_health_state,
+    output_log_path,
+    place_tmux_pane,
+    restart_teammate,
     save_health_state,
+    spawn_latency_summary,
+    spawn_many,
     spawn_teammate,
+    spawn_timings,
+    start_standby_agent,
     translate_model,
     validate_opencode_version,
+    validate_opencode_version_cached,
     DEFAULT_GRACE_PERIOD_SECONDS,
     DEFAULT_HUNG_TIMEOUT_SECONDS,
     DESKTOP_BINARY_ENV_VAR,
@@ -38,19 +53,39 @@ from opencode_teams.spawner import (
     DESKTOP_PATHS,
     MINIMUM_OPENCODE_VERSION,
     SPAWN_TIMEOUT_SECONDS,
+    PANES_PER_WINDOW_ENV_VAR,
+    TMUX_PLACEMENT_ENV_VAR,
+    WARM_POOL_DIR,
+    PaneState,
 )
 from opencode_teams.model_discovery import (
     discover_models,
     resolve_model_string,
     select_model_by_preference,
 )
-from opencode_teams.models import ModelInfo, ModelPreference
+from opencode_teams.models import ModelInfo, ModelPreference, ResourceLimits, RestartPolicy, TeammateSpec
 
 
 TEAM = "test-team"
 SESSION_ID = "test-session-id"
 
 
+@pytest.fixture(autouse=True)
+def _no_tmux_client(monkeypatch) -> None:
+    # Placement depends on whether the server runs inside tmux; tests assume not
+    monkeypatch.delenv("TMUX", raising=False)
+    monkeypatch.delenv(TMUX_PLACEMENT_ENV_VAR, raising=False)
+    monkeypatch.delenv(PANES_PER_WINDOW_ENV_VAR, raising=False)
+
+
+def _pane_creations(mock_run: MagicMock) -> list:
+    """tmux commands (split-window/new-window/new-session) that created a pane."""
+    return [
+        c for c in mock_run.call_args_list
+        if c.args and c.args[0][1] in ("split-window", "new-window", "new-session")
+    ]
+
+
 @pytest.fixture
 def team_dir(tmp_base_dir: Path) -> Path:
     teams.create_team(TEAM, session_id=SESSION_ID, base_dir=tmp_base_dir)
@@ -147,6 +182,22 @@ class TestBuildOpencodeRunCommand:
         assert "$HOME" in cmd
         assert "backticks" in cmd
 
+    def test_large_prompt_keeps_command_short(self, tmp_path: Path) -> None:
+        prompt = "Implement the spec below.\n" + "x" * 60_000
+        member = _make_opencode_member(prompt=prompt, cwd=str(tmp_path))
+        message = launch_prompt(tmp_path, member.name, prompt)
+        cmd = build_opencode_run_command(member, "/usr/local/bin/opencode", message=message)
+        assert len(cmd) < 1024
+        assert "xxxx" not in cmd
+        prompt_file = tmp_path / ".opencode" / "prompts" / "researcher.md"
+        assert prompt_file.read_text(encoding="utf-8") == prompt
+        assert str(prompt_file) in shlex.split(cmd.split(" && ", 1)[1])[-1]
+
+    def test_builder_writes_no_files(self, tmp_path: Path) -> None:
+        member = _make_opencode_member(prompt="x" * 60_000, cwd=str(tmp_path))
+        build_opencode_run_command(member, "/usr/local/bin/opencode")
+        assert not (tmp_path / ".opencode").exists()
+
     def test_custom_timeout(self) -> None:
         member = _make_opencode_member()
         cmd = build_opencode_run_command(member, "/usr/local/bin/opencode", timeout_seconds=600)
@@ -172,6 +223,22 @@ class TestBuildOpencodeRunCommand:
     def test_default_timeout_constant(self) -> None:
         assert SPAWN_TIMEOUT_SECONDS == 300
 
+    def test_no_launcher_without_resources(self) -> None:
+        cmd = build_opencode_run_command(_make_opencode_member(), "/usr/local/bin/opencode")
+        assert "opencode_teams.launcher" not in cmd
+
+    def test_resources_wrap_opencode_in_launcher(self) -> None:
+        member = _make_opencode_member().model_copy(
+            update={"resources": ResourceLimits(nice=10, memory_limit_mb=2048)}
+        )
+        cmd = build_opencode_run_command(member, "/usr/local/bin/opencode")
+        parts = shlex.split(cmd.split(" && ", 1)[1])
+        assert parts[:2] == ["timeout", "300"]
+        assert parts[3:5] == ["-m", "opencode_teams.launcher"]
+        sep = parts.index("--")
+        assert parts[5:sep] == ["--nice", "10", "--memory-mb", "2048"]
+        assert parts[sep + 1:sep + 3] == ["/usr/local/bin/opencode", "run"]
+
 
 class TestSpawnTeammateNameValidation:
     def test_should_reject_empty_name(self, team_dir: Path) -> None:
@@ -190,8 +257,39 @@ class TestSpawnTeammateNameValidation:
         with pytest.raises(ValueError, match="reserved"):
             spawn_teammate(TEAM, "team-lead", "prompt", "/bin/echo", base_dir=team_dir)
 
+    def test_should_reject_restart_policy_for_desktop_backend(self, team_dir: Path) -> None:
+        with pytest.raises(ValueError, match="restarts are not supported"):
+            spawn_teammate(
+                TEAM, "worker", "prompt", "/bin/echo",
+                backend_type="desktop", restart_policy=RestartPolicy(), base_dir=team_dir,
+            )
+
+    def test_should_reject_resources_for_desktop_backend(self, team_dir: Path) -> None:
+        with pytest.raises(ValueError, match="not supported"):
+            spawn_teammate(
+                TEAM, "worker", "prompt", "/bin/echo",
+                backend_type="desktop", resources=ResourceLimits(nice=5), base_dir=team_dir,
+            )
+        assert teams.read_config(TEAM, base_dir=team_dir).get_teammate("worker") is None
+
 
 class TestSpawnTeammate:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_long_prompt_file_lives_with_agent_config(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path, monkeypatch
+    ) -> None:
+        monkeypatch.setenv("OPENCODE_TEAMS_INLINE_PROMPT_MAX_BYTES", "0")
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        project, elsewhere = tmp_path / "project", tmp_path / "elsewhere"
+        spawn_teammate(
+            TEAM, "researcher", "Do research", "/usr/local/bin/opencode",
+            base_dir=team_dir, project_dir=project, cwd=str(elsewhere),
+        )
+        assert prompt_file_path(project, "researcher").exists()
+        assert not (elsewhere / ".opencode").exists()
+        cleanup_agent_config(project, "researcher")
+        assert not prompt_file_path(project, "researcher").exists()
+
     @patch("opencode_teams.spawner.subprocess")
     def test_registers_member_before_spawn(
         self, mock_subprocess: MagicMock, team_dir: Path
@@ -827,6 +925,160 @@ class TestCheckPaneAlive:
         assert check_pane_alive("%42") is False
 
 
+class TestListPaneStates:
+    @patch("opencode_teams.spawner.subprocess.run")
+    def test_parses_all_panes_in_one_call(self, mock_run: MagicMock) -> None:
+        mock_run.return_value.returncode = 0
+        mock_run.return_value.stdout = "%1 0 100 1700000000 1 1\n%2 1 101 1700000005 3 0\n"
+        panes = list_pane_states()
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][:3] == ["tmux", "list-panes", "-a"]
+        assert panes == {
+            "%1": PaneState("%1", False, 100, 1700000000, window_panes=1, piped=True),
+            "%2": PaneState("%2", True, 101, 1700000005, window_panes=3, piped=False),
+        }
+
+    @patch("opencode_teams.spawner.subprocess.run")
+    def test_no_server_means_no_panes(self, mock_run: MagicMock) -> None:
+        mock_run.return_value.returncode = 1
+        mock_run.return_value.stderr = "no server running on /tmp/tmux-0/default\n"
+        assert list_pane_states() == {}
+
+    @patch("opencode_teams.spawner.subprocess.run")
+    def test_returns_none_on_failure(self, mock_run: MagicMock) -> None:
+        mock_run.side_effect = subprocess.TimeoutExpired(cmd="tmux", timeout=5)
+        assert list_pane_states() is None
+
+
+class TestCheckAgentsHealth:
+    def test_single_liveness_query_and_captures_only_live_panes(self) -> None:
+        members = [
+            _make_member(name).model_copy(update={"tmux_pane_id": pane})
+            for name, pane in [("a", "%1"), ("b", "%2"), ("c", "%3")]
+        ]
+        panes = {"%1": PaneState("%1", False, 1, 0), "%2": PaneState("%2", True, 2, 0)}
+        with patch("opencode_teams.spawner.list_pane_states", return_value=panes) as mock_list, \
+             patch("opencode_teams.spawner.check_pane_alive") as mock_alive, \
+             patch("opencode_teams.spawner.capture_pane_content_hash", return_value="h") as mock_cap:
+            statuses = check_agents_health(members, {"a": {"hash": "h", "last_change_time": 0}})
+        assert [s.status for s in statuses] == ["hung", "dead", "dead"]
+        mock_list.assert_called_once()
+        mock_alive.assert_not_called()
+        # Parallel captures do not queue on the control-mode connection
+        mock_cap.assert_called_once_with("%1", control_mode=False)
+
+    def test_falls_back_to_per_pane_query(self) -> None:
+        members = [_make_member("a").model_copy(update={"tmux_pane_id": "%1"})]
+        with patch("opencode_teams.spawner.list_pane_states", return_value=None), \
+             patch("opencode_teams.spawner.check_pane_alive", return_value=False) as mock_alive:
+            statuses = check_agents_health(members, {})
+        mock_alive.assert_called_once_with("%1")
+        assert statuses[0].status == "dead"
+
+    def test_empty_members_makes_no_calls(self) -> None:
+        with patch("opencode_teams.spawner.list_pane_states") as mock_list:
+            assert check_agents_health([], {}) == []
+        mock_list.assert_not_called()
+
+
+class TestCapturePaneControlMode:
+    def test_parallel_capture_bypasses_control_client(self) -> None:
+        client = MagicMock()
+        with patch("opencode_teams.spawner.tmux_control.get_client", return_value=client), \
+             patch("opencode_teams.spawner.subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = "pane text"
+            assert capture_pane_content_hash("%1", control_mode=False) is not None
+            client.run.assert_not_called()
+            assert mock_run.call_args[0][0] == ["tmux", "capture-pane", "-p", "-t", "%1"]
+
+            client.run.return_value = subprocess.CompletedProcess([], 0, "pane text", "")
+            assert capture_pane_content_hash("%1") is not None
+            client.run.assert_called_once()
+
+
+class TestActivitySignature:
+    def test_output_log_size_is_the_signature(self, tmp_path: Path) -> None:
+        log = tmp_path / "w.log"
+        log.write_text("abc")
+        member = _make_member("w").model_copy(update={"output_log": str(log)})
+        first = activity_signature(member)
+        assert first.startswith("bytes:3:")
+        assert activity_signature(member) == first
+        with log.open("a") as f:
+            f.write("more")
+        assert activity_signature(member).startswith("bytes:7:")
+
+    def test_missing_log_or_dead_pipe_falls_back(self, tmp_path: Path) -> None:
+        log = tmp_path / "w.log"
+        member = _make_member("w").model_copy(update={"output_log": str(log)})
+        assert activity_signature(member) is None
+        log.write_text("abc")
+        pane = PaneState("%1", False, 1, 1700000000, window_panes=2, piped=False)
+        assert activity_signature(member, pane) is None
+
+    def test_window_activity_only_for_solo_panes(self) -> None:
+        member = _make_member("w")
+        solo = PaneState("%1", False, 1, 1700000000, window_panes=1, piped=False)
+        shared = PaneState("%1", False, 1, 1700000000, window_panes=2, piped=False)
+        assert activity_signature(member, solo) == "activity:1700000000"
+        assert activity_signature(member, shared) is None
+
+    def test_health_check_skips_capture_with_output_log(self, tmp_path: Path) -> None:
+        log = tmp_path / "w.log"
+        log.write_text("abc")
+        member = _make_member("w").model_copy(update={"output_log": str(log), "tmux_pane_id": "%1"})
+        signature = activity_signature(member)
+        with patch("opencode_teams.spawner.capture_pane_content_hash") as mock_cap:
+            status = check_single_agent_health(
+                member, previous_hash=signature, last_change_time=time.time() - 500,
+                pane_dead=False,
+            )
+        mock_cap.assert_not_called()
+        assert status.status == "hung"
+        assert status.detail.startswith("Output unchanged")
+
+
+class TestOutputPipe:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_spawn_pipes_pane_output_to_team_log(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        member = spawn_teammate(
+            TEAM, "researcher", "Do research", "/usr/local/bin/opencode",
+            base_dir=team_dir, project_dir=tmp_path,
+        )
+        assert len(_pane_creations(mock_subprocess.run)) == 1
+        tmux_cmd = mock_subprocess.run.call_args[0][0][-1]
+        expected_log = output_log_path(TEAM, "researcher", team_dir)
+        assert tmux_cmd.startswith('tmux pipe-pane -o -t "$TMUX_PANE"')
+        assert str(expected_log) in tmux_cmd
+        assert member.output_log == str(expected_log)
+        assert expected_log.parent.is_dir()
+        stored = teams.read_config(TEAM, base_dir=team_dir).get_teammate("researcher")
+        assert stored.output_log == str(expected_log)
+
+    def test_prefix_pipes_output_in_real_tmux(self, tmp_path: Path) -> None:
+        if shutil.which("tmux") is None:
+            pytest.skip("tmux not installed")
+        socket = f"opencode-teams-pipe-{os.getpid()}"
+        log = tmp_path / "out.log"
+        subprocess.run(["tmux", "-L", socket, "new-session", "-d", "sleep 30"], check=True)
+        try:
+            subprocess.run(
+                ["tmux", "-L", socket, "split-window", "-d",
+                 build_output_pipe_prefix(log) + "sleep 0.3; echo piped-hello; sleep 30"],
+                check=True,
+            )
+            deadline = time.time() + 5
+            while time.time() < deadline and "piped-hello" not in (log.read_text() if log.exists() else ""):
+                time.sleep(0.1)
+            assert "piped-hello" in log.read_text()
+        finally:
+            subprocess.run(["tmux", "-L", socket, "kill-server"], capture_output=True)
+
+
 class TestCapturePaneContentHash:
     @patch("opencode_teams.spawner.subprocess.run")
     def test_returns_hash_for_live_pane(self, mock_run: MagicMock) -> None:
@@ -988,6 +1240,15 @@ class TestHealthStatePersistence:
         assert loaded["worker"]["hash"] == "new"
         assert loaded["worker"]["last_change_time"] == 2.0
 
+    def test_failed_save_keeps_previous_state(self, team_dir: Path) -> None:
+        save_health_state(TEAM, {"worker": {"hash": "old"}}, base_dir=team_dir)
+        with patch("opencode_teams.spawner.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                save_health_state(TEAM, {"worker": {"hash": "new"}}, base_dir=team_dir)
+
+        assert load_health_state(TEAM, base_dir=team_dir)["worker"]["hash"] == "old"
+        assert not list((team_dir / "teams" / TEAM).glob("*.tmp"))
+
 
 # Desktop app lifecycle tests
 
@@ -1043,6 +1304,7 @@ class TestDesktopLaunch:
         mock_popen.pid = 12345
         mock_popen_cls = MagicMock(return_value=mock_popen)
         monkeypatch.setattr("opencode_teams.spawner.subprocess.Popen", mock_popen_cls)
+        monkeypatch.setattr("opencode_teams.processes.track", lambda proc: proc.pid)
         monkeypatch.setattr(sys, "platform", "linux")
 
         result = launch_desktop_app("/usr/bin/opencode-desktop", "/tmp/project")
@@ -1058,6 +1320,7 @@ class TestDesktopLaunch:
         mock_popen.pid = 99999
         mock_popen_cls = MagicMock(return_value=mock_popen)
         monkeypatch.setattr("opencode_teams.spawner.subprocess.Popen", mock_popen_cls)
+        monkeypatch.setattr("opencode_teams.processes.track", lambda proc: proc.pid)
         monkeypatch.setattr(sys, "platform", "win32")
 
         result = launch_desktop_app("/usr/bin/opencode-desktop", "/tmp/project")
@@ -1085,25 +1348,40 @@ class TestProcessLifecycle:
     def test_check_alive_with_negative_pid(self) -> None:
         assert check_process_alive(-1) is False
 
-    def test_kill_desktop_process(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        mock_kill = MagicMock()
-        monkeypatch.setattr("opencode_teams.spawner.os.kill", mock_kill)
+    def test_kill_desktop_process_terminates_tree(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        mock_terminate = MagicMock()
+        monkeypatch.setattr("opencode_teams.processes.terminate", mock_terminate)
         kill_desktop_process(5678)
-        mock_kill.assert_called_once_with(5678, signal.SIGTERM)
+        mock_terminate.assert_called_once_with(5678)
 
     def test_kill_desktop_process_already_dead(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        def raise_os_error(pid: int, sig: int) -> None:
+        def raise_os_error(*args) -> None:
             raise OSError("No such process")
-        monkeypatch.setattr("opencode_teams.spawner.os.kill", raise_os_error)
+        monkeypatch.setattr("opencode_teams.processes.os.killpg", raise_os_error)
+        monkeypatch.setattr("opencode_teams.processes.os.kill", raise_os_error)
         # Should not raise
         kill_desktop_process(5678)
 
     def test_kill_desktop_process_zero_pid(self, monkeypatch: pytest.MonkeyPatch) -> None:
         mock_kill = MagicMock()
-        monkeypatch.setattr("opencode_teams.spawner.os.kill", mock_kill)
+        monkeypatch.setattr("opencode_teams.processes.os.kill", mock_kill)
         kill_desktop_process(0)
         mock_kill.assert_not_called()
 
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX process groups")
+    def test_exited_desktop_child_reported_dead(self) -> None:
+        pid = launch_desktop_app(shutil.which("true"), "/tmp")
+        deadline = time.time() + 5
+        while check_process_alive(pid) and time.time() < deadline:
+            time.sleep(0.05)
+        assert check_process_alive(pid) is False
+        member = _make_member("desk").model_copy(
+            update={"backend_type": "desktop", "process_id": pid}
+        )
+        result = check_single_agent_health(member, None, None)
+        assert result.status == "dead"
+        assert "exit code 0" in result.detail
+
 
 class TestSpawnDesktopBackend:
     @patch("opencode_teams.spawner.launch_desktop_app", return_value=9999)
@@ -1182,7 +1460,7 @@ class TestSpawnDesktopBackend:
             base_dir=tmp_base_dir,
             project_dir=project_dir,
         )
-        mock_subprocess.run.assert_called_once()
+        assert len(_pane_creations(mock_subprocess.run)) == 1
         call_args = mock_subprocess.run.call_args[0][0]
         assert "tmux" in call_args[0]
         assert member.tmux_pane_id == "%42"
@@ -1258,6 +1536,431 @@ class TestSpawnRollbackCleansConfig:
         names = [m.name for m in config.members]
         assert "fail-agent" not in names
 
+    @patch("opencode_teams.spawner.subprocess")
+    def test_rollback_removes_inbox_and_unread_count(
+        self, mock_subprocess: MagicMock, tmp_base_dir: Path, tmp_path: Path,
+    ) -> None:
+        teams.create_team(TEAM, session_id=SESSION_ID, base_dir=tmp_base_dir)
+        mock_subprocess.run.side_effect = RuntimeError("tmux crashed")
+
+        with pytest.raises(RuntimeError, match="tmux crashed"):
+            spawn_teammate(
+                TEAM, "fail-agent", "Do work",
+                "/usr/local/bin/opencode",
+                base_dir=tmp_base_dir,
+                project_dir=tmp_path / "missing" / "project",
+            )
+
+        assert not messaging.inbox_path(TEAM, "fail-agent", tmp_base_dir).exists()
+        assert registry.get_team_summary(TEAM, tmp_base_dir).unread_count == 0
+
+
+class TestSpawnPipeline:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_records_step_timings(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        spawn_teammate(
+            TEAM, "timed", "Do work", "/usr/local/bin/opencode",
+            base_dir=team_dir, project_dir=tmp_path,
+        )
+        timings = spawn_timings(TEAM, "timed")
+        assert timings is not None
+        assert timings["warm"] is False
+        assert set(timings["steps"]) == {
+            "validate", "inbox", "agentConfig", "opencodeJson", "prepare", "launch", "register",
+        }
+        assert timings["totalMs"] >= timings["steps"]["launch"]
+        summary = spawn_latency_summary()
+        assert summary["spawns"] >= 1
+        assert "total" in summary["steps"]
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_writes_team_config_once(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        with patch("opencode_teams.teams.write_config", wraps=teams.write_config) as write:
+            spawn_teammate(
+                TEAM, "once", "Do work", "/usr/local/bin/opencode",
+                base_dir=team_dir, project_dir=tmp_path,
+            )
+        assert write.call_count == 1
+        member = teams.read_config(TEAM, base_dir=team_dir).get_teammate("once")
+        assert member.tmux_pane_id == "%42"
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_duplicate_name_rejected_before_any_write(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        spawn_teammate(
+            TEAM, "dup", "First", "/usr/local/bin/opencode",
+            base_dir=team_dir, project_dir=tmp_path,
+        )
+        mock_subprocess.run.reset_mock()
+        with pytest.raises(ValueError, match="already exists"):
+            spawn_teammate(
+                TEAM, "dup", "Second", "/usr/local/bin/opencode",
+                base_dir=team_dir, project_dir=tmp_path,
+            )
+        mock_subprocess.run.assert_not_called()
+        msgs = messaging.read_inbox(TEAM, "dup", base_dir=team_dir)
+        assert [m.text for m in msgs] == ["First"]
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_concurrent_spawns_of_one_name_rejected(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        def _launch(*args, **kwargs):
+            with pytest.raises(ValueError, match="already being spawned"):
+                spawn_teammate(
+                    TEAM, "racer", "Second", "/usr/local/bin/opencode",
+                    base_dir=team_dir, project_dir=tmp_path,
+                )
+            result = MagicMock()
+            result.stdout = "%42\n"
+            return result
+
+        mock_subprocess.run.side_effect = _launch
+        spawn_teammate(
+            TEAM, "racer", "First", "/usr/local/bin/opencode",
+            base_dir=team_dir, project_dir=tmp_path,
+        )
+        names = [m.name for m in teams.read_config(TEAM, base_dir=team_dir).teammates]
+        assert names == ["racer"]
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_failed_registration_stops_launched_process(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        with patch("opencode_teams.spawner.teams.add_member", side_effect=OSError("disk full")), \
+                patch("opencode_teams.spawner.kill_tmux_pane") as kill:
+            with pytest.raises(OSError, match="disk full"):
+                spawn_teammate(
+                    TEAM, "orphan", "Do work", "/usr/local/bin/opencode",
+                    base_dir=team_dir, project_dir=tmp_path,
+                )
+        kill.assert_called_once_with("%42")
+        assert not (tmp_path / ".opencode" / "agents" / "orphan.md").exists()
+        assert spawn_timings(TEAM, "orphan") is None
+        # The name is free again
+        spawn_teammate(
+            TEAM, "orphan", "Do work", "/usr/local/bin/opencode",
+            base_dir=team_dir, project_dir=tmp_path,
+        )
+
+
+class TestWarmStandby:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_start_standby_writes_config_and_pool_inbox(
+        self, mock_subprocess: MagicMock, tmp_base_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%7\n"
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        standby = start_standby_agent(
+            "warm-1", "openai/gpt-5.2", "/usr/local/bin/opencode",
+            project_dir=project_dir, base_dir=tmp_base_dir,
+        )
+        assert standby.tmux_pane_id == "%7"
+        assert standby.agent_id == f"warm-1@{WARM_POOL_DIR}"
+        assert (project_dir / ".opencode" / "agents" / "warm-1.md").exists()
+        assert messaging.inbox_path(WARM_POOL_DIR, "warm-1", tmp_base_dir).exists()
+
+    def test_start_standby_rejects_desktop_backend(self, tmp_base_dir: Path) -> None:
+        with pytest.raises(ValueError, match="warm agents"):
+            start_standby_agent(
+                "warm-1", "openai/gpt-5.2", "/usr/local/bin/opencode",
+                backend_type="desktop", base_dir=tmp_base_dir,
+            )
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_spawn_with_warm_agent_reuses_pane(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        mock_subprocess.run.return_value.stdout = "%7\n"
+        standby = start_standby_agent(
+            "warm-1", "sonnet", "/usr/local/bin/opencode",
+            project_dir=project_dir, base_dir=team_dir,
+        )
+        mock_subprocess.run.reset_mock()
+
+        member = spawn_teammate(
+            TEAM, "researcher", "Do research", "/usr/local/bin/opencode",
+            base_dir=team_dir, project_dir=project_dir, warm_agent=standby,
+        )
+
+        mock_subprocess.run.assert_not_called()
+        assert member.tmux_pane_id == "%7"
+        assert member.agent_id == f"researcher@{TEAM}"
+        assignment = messaging.read_inbox(WARM_POOL_DIR, "warm-1", base_dir=team_dir)
+        assert "researcher" in assignment[0].text
+        prompt = messaging.read_inbox(TEAM, "researcher", base_dir=team_dir)
+        assert prompt[0].text == "Do research"
+        assert not (project_dir / ".opencode" / "agents" / "warm-1.md").exists()
+        assert (project_dir / ".opencode" / "agents" / "researcher.md").exists()
+
+
+class FakeTmux:
+    """Records tmux commands and answers list-windows/display-message from a pane count table."""
+
+    def __init__(self, current_panes: int | None = None, windows: list[int] | None = None) -> None:
+        self.current_panes = current_panes
+        self.windows = windows
+        self.commands: list[list[str]] = []
+
+    def __call__(self, args: list[str], **kwargs) -> subprocess.CompletedProcess:
+        self.commands.append(args)
+        verb = args[0]
+        if verb == "display-message":
+            if self.current_panes is None:
+                return subprocess.CompletedProcess(args, 1, "", "no current client")
+            return subprocess.CompletedProcess(args, 0, f"{self.current_panes}\n", "")
+        if verb == "list-windows":
+            if self.windows is None:
+                return subprocess.CompletedProcess(args, 1, "", "can't find session")
+            out = "".join(f"{i} {n}\n" for i, n in enumerate(self.windows))
+            return subprocess.CompletedProcess(args, 0, out, "")
+        if verb in ("split-window", "new-window", "new-session"):
+            return subprocess.CompletedProcess(args, 0, "%9 3 opencode-teams-t\n", "")
+        return subprocess.CompletedProcess(args, 0, "", "")
+
+    def verbs(self) -> list[str]:
+        return [c[0] for c in self.commands]
+
+
+class TestTmuxPlacement:
+    def test_creates_team_session_when_missing(self) -> None:
+        fake = FakeTmux()
+        with patch("opencode_teams.spawner._run_tmux", side_effect=fake):
+            placed = place_tmux_pane("t", "run-agent")
+        assert placed == ("%9", "opencode-teams-t", "3")
+        assert fake.verbs() == ["list-windows", "new-session"]
+        assert "-s" in fake.commands[-1] and "opencode-teams-t" in fake.commands[-1]
+        assert fake.commands[-1][-1] == "run-agent"
+
+    def test_splits_window_with_room_and_tiles_it(self) -> None:
+        fake = FakeTmux(windows=[6, 2])
+        with patch("opencode_teams.spawner._run_tmux", side_effect=fake):
+            place_tmux_pane("t", "run-agent")
+        assert fake.verbs() == ["list-windows", "split-window", "select-layout"]
+        assert fake.commands[1][fake.commands[1].index("-t") + 1] == "=opencode-teams-t:1"
+
+    def test_opens_new_window_when_all_full(self, monkeypatch) -> None:
+        monkeypatch.setenv(PANES_PER_WINDOW_ENV_VAR, "4")
+        fake = FakeTmux(windows=[4, 4])
+        with patch("opencode_teams.spawner._run_tmux", side_effect=fake):
+            place_tmux_pane("t", "run-agent")
+        assert fake.verbs() == ["list-windows", "new-window"]
+        assert "t-2" in fake.commands[-1]
+
+    def test_current_mode_splits_current_window_until_full(self, monkeypatch) -> None:
+        monkeypatch.setenv(TMUX_PLACEMENT_ENV_VAR, "current")
+        fake = FakeTmux(current_panes=3)
+        with patch("opencode_teams.spawner._run_tmux", side_effect=fake):
+            place_tmux_pane("t", "run-agent")
+        assert fake.verbs() == ["display-message", "split-window"]
+        assert "-t" not in fake.commands[-1]
+
+        fake = FakeTmux(current_panes=6)
+        with patch("opencode_teams.spawner._run_tmux", side_effect=fake):
+            place_tmux_pane("t", "run-agent")
+        assert fake.verbs() == ["display-message", "list-windows", "new-session"]
+
+    def test_current_mode_overflows_when_split_fails(self, monkeypatch) -> None:
+        monkeypatch.setenv(TMUX_PLACEMENT_ENV_VAR, "current")
+        fake = FakeTmux(current_panes=1)
+
+        def no_space(args, **kwargs):
+            if args[0] == "split-window" and "-t" not in args:
+                fake.commands.append(args)
+                raise subprocess.CalledProcessError(1, ["tmux", *args], stderr="no space for new pane")
+            return fake(args, **kwargs)
+
+        with patch("opencode_teams.spawner._run_tmux", side_effect=no_space):
+            pane_id, _, _ = place_tmux_pane("t", "run-agent")
+        assert pane_id == "%9"
+        assert fake.verbs()[-1] == "new-session"
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_spawn_records_placement(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        with patch("opencode_teams.spawner._run_tmux", side_effect=FakeTmux()):
+            member = spawn_teammate(
+                TEAM, "researcher", "Do research", "/usr/local/bin/opencode",
+                base_dir=team_dir, project_dir=tmp_path,
+            )
+        stored = teams.read_config(TEAM, base_dir=team_dir).get_teammate("researcher")
+        assert (member.tmux_session, member.tmux_window) == ("opencode-teams-t", "3")
+        assert stored.tmux_session == "opencode-teams-t"
+
+
+_BATCH_MODELS = [
+    ModelInfo(
+        provider="openai",
+        model_id="gpt-5.2",
+        name="GPT 5.2",
+        full_model_string="openai/gpt-5.2",
+    ),
+]
+
+
+def _pane_for(args, **kwargs) -> MagicMock:
+    """Fake tmux split-window returning a pane ID derived from the agent name."""
+    cmd = args[-1]
+    result = MagicMock()
+    result.stdout = "%" + str(sum(map(ord, cmd)) % 1000) + "\n"
+    if "--agent bad" in cmd:
+        raise RuntimeError("tmux crashed")
+    return result
+
+
+class TestRestartTeammate:
+    def test_relaunches_with_same_identity(self, team_dir: Path) -> None:
+        member = _make_opencode_member(name="worker").model_copy(
+            update={"tmux_pane_id": "%3", "restart_policy": RestartPolicy()}
+        )
+        teams.add_member(TEAM, member, base_dir=team_dir)
+        with patch("opencode_teams.spawner.kill_tmux_pane") as kill, \
+             patch("opencode_teams.spawner.place_tmux_pane", return_value=("%9", "s", "1")) as place:
+            restarted = restart_teammate(TEAM, member, "/usr/local/bin/opencode", "resume now", team_dir)
+        kill.assert_called_once_with("%3")
+        assert "'resume now'" in place.call_args.args[1]
+        assert restarted.tmux_pane_id == "%9"
+        assert restarted.prompt == member.prompt
+        assert restarted.restart_count == 1
+        stored = teams.read_config(TEAM, base_dir=team_dir).get_teammate("worker")
+        assert (stored.tmux_pane_id, stored.restart_count, stored.color) == ("%9", 1, member.color)
+
+    def test_rejects_desktop_backend(self, team_dir: Path) -> None:
+        member = _make_opencode_member().model_copy(update={"backend_type": "desktop"})
+        with pytest.raises(ValueError, match="Cannot restart"):
+            restart_teammate(TEAM, member, "/usr/local/bin/opencode", "resume")
+
+
+class TestSpawnMany:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_spawns_all_members(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.side_effect = _pane_for
+        specs = [TeammateSpec(name=f"w{i}", prompt=f"Job {i}") for i in range(4)]
+        spawned, failed = spawn_many(
+            TEAM, specs, "/usr/local/bin/opencode",
+            models=_BATCH_MODELS, base_dir=team_dir, project_dir=tmp_path,
+        )
+
+        assert failed == {}
+        assert [m.name for m in spawned] == ["w0", "w1", "w2", "w3"]
+        assert len(_pane_creations(mock_subprocess.run)) == 4
+        config = teams.read_config(TEAM, base_dir=team_dir)
+        by_name = config.member_index
+        for member in spawned:
+            assert member.tmux_pane_id.startswith("%")
+            assert by_name[member.name].tmux_pane_id == member.tmux_pane_id
+            assert member.model == "openai/gpt-5.2"
+        assert len({m.color for m in spawned}) == 4
+        for i in range(4):
+            msgs = messaging.read_inbox(TEAM, f"w{i}", base_dir=team_dir)
+            assert [m.text for m in msgs] == [f"Job {i}"]
+            assert (tmp_path / ".opencode" / "agents" / f"w{i}.md").exists()
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_partial_failure_drops_failed_member(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.side_effect = _pane_for
+        specs = [
+            TeammateSpec(name="good", prompt="ok"),
+            TeammateSpec(name="bad", prompt="ok"),
+        ]
+        spawned, failed = spawn_many(
+            TEAM, specs, "/usr/local/bin/opencode",
+            models=_BATCH_MODELS, base_dir=team_dir, project_dir=tmp_path,
+        )
+
+        assert [m.name for m in spawned] == ["good"]
+        assert "tmux crashed" in failed["bad"]
+        names = [m.name for m in teams.read_config(TEAM, base_dir=team_dir).members]
+        assert "good" in names
+        assert "bad" not in names
+        assert not (tmp_path / ".opencode" / "agents" / "bad.md").exists()
+        assert not messaging.inbox_path(TEAM, "bad", team_dir).exists()
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_members_are_registered_after_launch(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        registered_at_launch = []
+
+        def _pane_then_check(args, **kwargs):
+            registered_at_launch.append(set(teams.read_config(TEAM, base_dir=team_dir).member_index))
+            return _pane_for(args, **kwargs)
+
+        mock_subprocess.run.side_effect = _pane_then_check
+        specs = [TeammateSpec(name="w1", prompt="p"), TeammateSpec(name="w2", prompt="p")]
+        spawned, _ = spawn_many(
+            TEAM, specs, "/usr/local/bin/opencode",
+            models=_BATCH_MODELS, base_dir=team_dir, project_dir=tmp_path,
+        )
+        assert all(not {"w1", "w2"} & names for names in registered_at_launch)
+        assert {"w1", "w2"} <= set(teams.read_config(TEAM, base_dir=team_dir).member_index)
+        assert [m.name for m in spawned] == ["w1", "w2"]
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_models_resolve_before_anything_is_written(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        specs = [TeammateSpec(name="w1", prompt="p"), TeammateSpec(name="w2", prompt="p")]
+        with patch(
+            "opencode_teams.spawner.resolve_spec_model",
+            side_effect=["openai/gpt-5.2", ValueError("no such model")],
+        ), patch("opencode_teams.spawner.teams.update_config") as update:
+            with pytest.raises(ValueError, match="no such model"):
+                spawn_many(
+                    TEAM, specs, "/usr/local/bin/opencode",
+                    models=_BATCH_MODELS, base_dir=team_dir, project_dir=tmp_path,
+                )
+        update.assert_not_called()
+        mock_subprocess.run.assert_not_called()
+        assert not messaging.inbox_path(TEAM, "w1", team_dir).exists()
+
+    @pytest.mark.parametrize(
+        "names, match",
+        [
+            (["ok", "ok"], "Duplicate"),
+            (["ok", "bad name"], "Invalid agent name"),
+            (["team-lead"], "reserved"),
+        ],
+    )
+    @patch("opencode_teams.spawner.subprocess")
+    def test_rejects_invalid_batches_before_spawning(
+        self, mock_subprocess: MagicMock, team_dir: Path, names: list[str], match: str
+    ) -> None:
+        specs = [TeammateSpec(name=n, prompt="p") for n in names]
+        with pytest.raises(ValueError, match=match):
+            spawn_many(TEAM, specs, "/usr/local/bin/opencode", models=_BATCH_MODELS, base_dir=team_dir)
+        mock_subprocess.run.assert_not_called()
+        assert len(teams.read_config(TEAM, base_dir=team_dir).members) == 1
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_rejects_existing_member(
+        self, mock_subprocess: MagicMock, team_dir: Path, tmp_path: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%1\n"
+        spawn_teammate(TEAM, "taken", "p", "/usr/local/bin/opencode", base_dir=team_dir, project_dir=tmp_path)
+        specs = [TeammateSpec(name="new", prompt="p"), TeammateSpec(name="taken", prompt="p")]
+        with pytest.raises(ValueError, match="already exist"):
+            spawn_many(TEAM, specs, "/usr/local/bin/opencode", models=_BATCH_MODELS, base_dir=team_dir)
+        names = [m.name for m in teams.read_config(TEAM, base_dir=team_dir).members]
+        assert "new" not in names
+
 
 class TestCleanupAgentConfigReExport:
     """Verify cleanup_agent_config is importable from spawner (backward compat)."""
@@ -1353,3 +2056,43 @@ class TestBuildWindowsTerminalCommand:
         script = base64.b64decode(cmd[encoded_idx]).decode("utf-16-le")
 
         assert "C:\\Users\\John Doe\\Projects" in script
+
+
+class TestOpencodeVersionCache:
+    @pytest.fixture
+    def binary(self, tmp_path: Path, monkeypatch) -> str:
+        monkeypatch.setattr(teams, "TEAMS_DIR", tmp_path / "teams")
+        path = tmp_path / "opencode"
+        path.write_text("#!/bin/sh\n")
+        return str(path)
+
+    @patch("opencode_teams.spawner.subprocess.run")
+    def test_second_validation_skips_subprocess(self, mock_run: MagicMock, binary: str) -> None:
+        mock_run.return_value.stdout = "1.1.60\n"
+        mock_run.return_value.stderr = ""
+        assert validate_opencode_version_cached(binary) == "1.1.60"
+        assert validate_opencode_version_cached(binary) == "1.1.60"
+        assert mock_run.call_count == 1
+        assert cached_opencode_version(binary) == "1.1.60"
+
+    @patch("opencode_teams.spawner.subprocess.run")
+    def test_changed_binary_is_revalidated(self, mock_run: MagicMock, binary: str) -> None:
+        mock_run.return_value.stdout = "1.1.60\n"
+        mock_run.return_value.stderr = ""
+        validate_opencode_version_cached(binary)
+        Path(binary).write_text("#!/bin/sh\n# upgraded\n")
+        assert cached_opencode_version(binary) is None
+        mock_run.return_value.stdout = "1.2.0\n"
+        assert validate_opencode_version_cached(binary) == "1.2.0"
+        assert mock_run.call_count == 2
+
+    @patch("opencode_teams.spawner.subprocess.run")
+    def test_failures_are_not_cached(self, mock_run: MagicMock, binary: str) -> None:
+        mock_run.return_value.stdout = "1.1.40\n"
+        mock_run.return_value.stderr = ""
+        with pytest.raises(RuntimeError, match="too old"):
+            validate_opencode_version_cached(binary)
+        assert cached_opencode_version(binary) is None
+
+    def test_missing_binary_has_no_cached_version(self, binary: str) -> None:
+        assert cached_opencode_version(binary + "-missing") is None
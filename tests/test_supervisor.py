@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from opencode_teams import messaging, tasks, teams
+from opencode_teams.models import AgentHealthStatus, RestartPolicy, ShutdownApproved, TeammateMember
+from opencode_teams.supervisor import Supervisor, backoff_delay, build_resume_prompt
+
+TEAM = "sup-team"
+
+
+def _member(
+    name: str = "worker",
+    policy: RestartPolicy | None = RestartPolicy(),
+    joined_at: int = 0,
+    restart_count: int = 0,
+) -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{TEAM}",
+        name=name,
+        agent_type="general-purpose",
+        model="openai/gpt-5.2",
+        prompt="Build the parser",
+        color="blue",
+        joined_at=joined_at,
+        tmux_pane_id="%1",
+        cwd="/tmp",
+        restart_policy=policy,
+        restart_count=restart_count,
+    )
+
+
+def _dead(name: str = "worker", exit_code: int | None = None) -> AgentHealthStatus:
+    return AgentHealthStatus(
+        agent_name=name, pane_id="%1", status="dead", detail="pane exited", exit_code=exit_code,
+    )
+
+
+@pytest.fixture
+def team(tmp_base_dir: Path) -> Path:
+    teams.create_team(TEAM, session_id="s", base_dir=tmp_base_dir)
+    return tmp_base_dir
+
+
+@pytest.fixture
+def supervisor(team: Path) -> Supervisor:
+    return Supervisor("/usr/local/bin/opencode", base_dir=team)
+
+
+def _lead_messages(base_dir: Path) -> list[str]:
+    return [m.text for m in messaging.read_inbox(TEAM, "team-lead", base_dir=base_dir)]
+
+
+class TestBackoff:
+    def test_doubles_per_quick_death_up_to_cap(self) -> None:
+        policy = RestartPolicy(backoff_seconds=5, max_backoff_seconds=30)
+        assert [backoff_delay(policy, n) for n in range(5)] == [5, 10, 20, 30, 30]
+
+
+class TestObserve:
+    def test_schedules_restart_for_supervised_agent(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        [pending] = supervisor.status(TEAM)["pending"]
+        assert pending["name"] == "worker"
+        assert pending["reason"] == "pane exited"
+        assert 0 < pending["inSeconds"] <= 5
+        assert supervisor.seconds_until_due() is not None
+
+    def test_ignores_unsupervised_and_alive_agents(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member("plain", policy=None), base_dir=team)
+        teams.add_member(TEAM, _member("fine"), base_dir=team)
+        alive = AgentHealthStatus(agent_name="fine", pane_id="%1", status="alive")
+        supervisor.observe(TEAM, [_dead("plain"), alive])
+        assert supervisor.status(TEAM)["pending"] == []
+
+    def test_quick_death_doubles_backoff(self, supervisor: Supervisor, team: Path) -> None:
+        now_ms = int(time.time() * 1000)
+        teams.add_member(TEAM, _member(joined_at=now_ms), base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        [pending] = supervisor.status(TEAM)["pending"]
+        assert pending["streak"] == 1
+        assert 5 < pending["inSeconds"] <= 10
+
+    def test_crash_loop_gives_up(self, supervisor: Supervisor, team: Path) -> None:
+        now_ms = int(time.time() * 1000)
+        policy = RestartPolicy(crash_loop_limit=1)
+        teams.add_member(TEAM, _member(policy=policy, joined_at=now_ms), base_dir=team)
+        task = tasks.create_task(TEAM, "Parser", "write it", base_dir=team)
+        tasks.update_task(TEAM, task.id, status="in_progress", owner="worker", base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        status = supervisor.status(TEAM)
+        assert status["pending"] == []
+        assert "crash loop" in status["gaveUp"][0]["reason"]
+        reopened = tasks.get_task(TEAM, task.id, base_dir=team)
+        assert (reopened.status, reopened.owner) == ("pending", None)
+        assert "Stopped restarting worker" in _lead_messages(team)[-1]
+        supervisor.observe(TEAM, [_dead()])  # Not scheduled again
+        assert supervisor.status(TEAM)["pending"] == []
+
+    def test_restart_budget(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(
+            TEAM, _member(policy=RestartPolicy(max_restarts=2), restart_count=2), base_dir=team
+        )
+        supervisor.observe(TEAM, [_dead()])
+        assert "budget" in supervisor.status(TEAM)["gaveUp"][0]["reason"]
+
+    def test_draining_team_is_not_restarted(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        supervisor.drain(TEAM)
+        assert supervisor.status(TEAM)["pending"] == []
+        supervisor.observe(TEAM, [_dead()])
+        assert supervisor.status(TEAM)["pending"] == []
+        supervisor.forget(TEAM)
+        supervisor.observe(TEAM, [_dead()])
+        assert len(supervisor.status(TEAM)["pending"]) == 1
+
+    def test_forget_agent(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        supervisor.forget_agent(TEAM, "worker")
+        assert supervisor.status(TEAM)["pending"] == []
+
+    def test_clean_exit_is_not_restarted(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead(exit_code=0)])
+        status = supervisor.status(TEAM)
+        assert status["pending"] == []
+        assert status["finished"] == [
+            {"teamName": TEAM, "name": "worker", "reason": "exited normally (code 0)"}
+        ]
+        assert status["recent"][-1]["event"] == "finished"
+
+    def test_timeout_exit_is_restarted(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead(exit_code=124)])
+        assert len(supervisor.status(TEAM)["pending"]) == 1
+
+    def test_approved_shutdown_is_not_restarted(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        approval = ShutdownApproved(
+            request_id="shutdown-1@worker", from_="worker", timestamp=messaging.now_iso(),
+            pane_id="%1", backend_type="tmux",
+        )
+        messaging.send_structured_message(TEAM, "worker", "team-lead", approval, base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        status = supervisor.status(TEAM)
+        assert status["pending"] == []
+        assert status["finished"][0]["reason"] == "approved a shutdown request"
+
+    def test_old_approval_does_not_block_restart(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        approval = ShutdownApproved(
+            request_id="shutdown-1@worker", from_="worker", timestamp=messaging.now_iso(),
+            pane_id="%1", backend_type="tmux",
+        )
+        messaging.send_structured_message(TEAM, "worker", "team-lead", approval, base_dir=team)
+        supervisor._started[(TEAM, "worker")] = time.time() + 1  # Restarted after approving
+        supervisor.observe(TEAM, [_dead()])
+        assert len(supervisor.status(TEAM)["pending"]) == 1
+
+    def test_agent_without_tasks_is_restarted(self, supervisor: Supervisor, team: Path) -> None:
+        # Owning no in_progress task does not mean the agent's work is done
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead(exit_code=1)])
+        status = supervisor.status(TEAM)
+        assert len(status["pending"]) == 1
+        assert status["finished"] == []
+
+    def test_forget_agent_clears_finished(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead(exit_code=0)])
+        supervisor.forget_agent(TEAM, "worker")
+        assert supervisor.status(TEAM)["finished"] == []
+
+
+class TestRunDue:
+    def _schedule_now(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        supervisor._pending = {k: p._replace(due=0) for k, p in supervisor._pending.items()}
+
+    def test_restarts_with_resume_prompt(self, supervisor: Supervisor, team: Path) -> None:
+        self._schedule_now(supervisor, team)
+        restarted = _member(restart_count=1)
+        with patch("opencode_teams.spawner.restart_teammate", return_value=restarted) as restart:
+            assert supervisor.run_due() == 1
+        team_name, member, binary, prompt, _ = restart.call_args.args
+        assert (team_name, member.name, binary) == (TEAM, "worker", "/usr/local/bin/opencode")
+        assert "restarted by the team supervisor" in prompt
+        assert supervisor.status(TEAM)["recent"][-1]["event"] == "restarted"
+        assert "Restarted worker" in _lead_messages(team)[-1]
+
+    def test_waits_for_backoff_and_binary(self, supervisor: Supervisor, team: Path) -> None:
+        teams.add_member(TEAM, _member(), base_dir=team)
+        supervisor.observe(TEAM, [_dead()])
+        with patch("opencode_teams.spawner.restart_teammate") as restart:
+            assert supervisor.run_due() == 0
+            supervisor._pending = {k: p._replace(due=0) for k, p in supervisor._pending.items()}
+            supervisor.opencode_binary = None
+            assert supervisor.run_due() == 0
+        restart.assert_not_called()
+
+    def test_failed_restart_is_recorded(self, supervisor: Supervisor, team: Path) -> None:
+        self._schedule_now(supervisor, team)
+        with patch("opencode_teams.spawner.restart_teammate", side_effect=OSError("no tmux")):
+            assert supervisor.run_due() == 0
+        assert supervisor.status(TEAM)["recent"][-1]["event"] == "failed"
+
+    def test_skips_agents_removed_meanwhile(self, supervisor: Supervisor, team: Path) -> None:
+        self._schedule_now(supervisor, team)
+        teams.remove_member(TEAM, "worker", base_dir=team)
+        with patch("opencode_teams.spawner.restart_teammate") as restart:
+            assert supervisor.run_due() == 0
+        restart.assert_not_called()
+
+
+class TestResumePrompt:
+    def test_includes_tasks_and_unread_messages(self, team: Path) -> None:
+        member = _member()
+        teams.add_member(TEAM, member, base_dir=team)
+        task = tasks.create_task(TEAM, "Parser", "write the tokenizer", base_dir=team)
+        tasks.update_task(TEAM, task.id, status="in_progress", owner="worker", base_dir=team)
+        done = tasks.create_task(TEAM, "Docs", "done already", base_dir=team)
+        tasks.update_task(TEAM, done.id, status="completed", owner="worker", base_dir=team)
+        messaging.send_plain_message(TEAM, "team-lead", "worker", "Also handle unicode", "unicode", base_dir=team)
+        prompt = build_resume_prompt(TEAM, member, "timed out", base_dir=team)
+        assert prompt.startswith("Build the parser")
+        assert "timed out" in prompt and "restart 1 of 3" in prompt
+        assert f"#{task.id} Parser: write the tokenizer" in prompt
+        assert "Docs" not in prompt
+        assert "- from team-lead: unicode" in prompt
+        # The inbox is left unread for the agent itself
+        assert messaging.read_inbox(TEAM, "worker", unread_only=True, mark_as_read=False, base_dir=team)
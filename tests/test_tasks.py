@@ -11,6 +11,7 @@ from opencode_teams.tasks import (
     list_tasks,
     next_task_id,
     reset_owner_tasks,
+    reset_owners_tasks,
     update_task,
 )
 
@@ -429,3 +430,17 @@ def test_reset_owner_tasks_preserves_completed_status(tmp_base_dir, team_tasks_d
     after = get_task("test-team", task.id, base_dir=tmp_base_dir)
     assert after.status == "completed"
     assert after.owner is None
+
+
+def test_reset_owners_tasks_releases_all_in_one_pass(tmp_base_dir, team_tasks_dir):
+    t1 = create_task("test-team", "A", "d1", base_dir=tmp_base_dir)
+    t2 = create_task("test-team", "B", "d2", base_dir=tmp_base_dir)
+    t3 = create_task("test-team", "C", "d3", base_dir=tmp_base_dir)
+    update_task("test-team", t1.id, owner="w1", status="in_progress", base_dir=tmp_base_dir)
+    update_task("test-team", t2.id, owner="w2", status="completed", base_dir=tmp_base_dir)
+    update_task("test-team", t3.id, owner="w3", status="in_progress", base_dir=tmp_base_dir)
+    assert reset_owners_tasks("test-team", ["w1", "w2"], base_dir=tmp_base_dir) == 2
+    after = {t.id: get_task("test-team", t.id, base_dir=tmp_base_dir) for t in (t1, t2, t3)}
+    assert (after[t1.id].status, after[t1.id].owner) == ("pending", None)
+    assert (after[t2.id].status, after[t2.id].owner) == ("completed", None)
+    assert (after[t3.id].status, after[t3.id].owner) == ("in_progress", "w3")
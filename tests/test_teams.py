@@ -10,11 +10,16 @@ import pytest
 from opencode_teams.models import LeadMember, TeamConfig, TeammateMember
 from opencode_teams.teams import (
     add_member,
+    config_cache_stats,
     create_team,
     delete_team,
     get_project_dir,
+    purge_trash,
     read_config,
     remove_member,
+    remove_members,
+    replace_member,
+    update_config,
     write_config,
 )
 
@@ -93,6 +98,20 @@ class TestDeleteTeam:
         assert not (tmp_base_dir / "teams" / "doomed").exists()
         assert not (tmp_base_dir / "tasks" / "doomed").exists()
 
+    def test_delete_team_moves_directories_to_trash(self, tmp_base_dir: Path) -> None:
+        create_team("trashed", "sess-1", base_dir=tmp_base_dir)
+        (tmp_base_dir / "tasks" / "trashed" / "1.json").write_text("{}")
+        delete_team("trashed", base_dir=tmp_base_dir)
+
+        trashed = [p.name for p in (tmp_base_dir / ".trash").iterdir()]
+        assert sorted(n.rsplit("-", 1)[-1] for n in trashed) == ["tasks", "teams"]
+
+    def test_team_name_reusable_before_purge(self, tmp_base_dir: Path) -> None:
+        create_team("again", "sess-1", base_dir=tmp_base_dir)
+        delete_team("again", base_dir=tmp_base_dir)
+        create_team("again", "sess-2", base_dir=tmp_base_dir)
+        assert read_config("again", base_dir=tmp_base_dir).lead_session_id == "sess-2"
+
     def test_delete_team_fails_with_active_members(self, tmp_base_dir: Path) -> None:
         create_team("busy", "sess-1", base_dir=tmp_base_dir)
         mate = _make_teammate("worker", "busy")
@@ -123,6 +142,22 @@ class TestMembers:
         assert cfg.members[0].name == "team-lead"
 
 
+    def test_remove_members_in_one_update(self, tmp_base_dir: Path) -> None:
+        create_team("squad3", "sess-1", base_dir=tmp_base_dir)
+        for name in ("a", "b", "c"):
+            add_member("squad3", _make_teammate(name, "squad3"), base_dir=tmp_base_dir)
+        remove_members("squad3", ["a", "c", "missing"], base_dir=tmp_base_dir)
+        cfg = read_config("squad3", base_dir=tmp_base_dir)
+        assert [m.name for m in cfg.members] == ["team-lead", "b"]
+
+    def test_remove_members_rejects_team_lead(self, tmp_base_dir: Path) -> None:
+        create_team("squad4", "sess-1", base_dir=tmp_base_dir)
+        add_member("squad4", _make_teammate("a", "squad4"), base_dir=tmp_base_dir)
+        with pytest.raises(ValueError, match="Cannot remove team-lead"):
+            remove_members("squad4", ["a", "team-lead"], base_dir=tmp_base_dir)
+        assert len(read_config("squad4", base_dir=tmp_base_dir).members) == 2
+
+
 class TestDuplicateMember:
     def test_should_reject_duplicate_member_name(self, tmp_base_dir: Path) -> None:
         create_team("dup", "sess-1", base_dir=tmp_base_dir)
@@ -147,7 +182,7 @@ class TestWriteConfig:
     def test_should_cleanup_temp_file_when_replace_fails(self, tmp_base_dir: Path) -> None:
         create_team("atomic", "sess-1", base_dir=tmp_base_dir)
         config = read_config("atomic", base_dir=tmp_base_dir)
-        config.description = "updated"
+        config = config.model_copy(update={"description": "updated"})
 
         config_dir = tmp_base_dir / "teams" / "atomic"
 
@@ -279,3 +314,159 @@ class TestRemoveMemberCleansUpConfig:
         remove_member("cleanup-nofile", "worker", base_dir=tmp_base_dir)
         cfg = read_config("cleanup-nofile", base_dir=tmp_base_dir)
         assert len(cfg.members) == 1
+
+
+class TestConfigCache:
+    def test_repeated_reads_hit_cache(self, tmp_base_dir: Path) -> None:
+        create_team("cached", "sess-1", base_dir=tmp_base_dir)
+        before = config_cache_stats()
+        first = read_config("cached", base_dir=tmp_base_dir)
+        second = read_config("cached", base_dir=tmp_base_dir)
+        after = config_cache_stats()
+
+        assert first is second
+        assert after["hits"] - before["hits"] == 2
+        assert after["misses"] == before["misses"]
+
+    def test_write_config_updates_cache(self, tmp_base_dir: Path) -> None:
+        create_team("cached-w", "sess-1", base_dir=tmp_base_dir)
+        config = read_config("cached-w", base_dir=tmp_base_dir)
+        updated = config.model_copy(update={"description": "changed"})
+        write_config("cached-w", updated, base_dir=tmp_base_dir)
+
+        assert read_config("cached-w", base_dir=tmp_base_dir) is updated
+
+    def test_external_write_invalidates_cache(self, tmp_base_dir: Path) -> None:
+        create_team("cached-ext", "sess-1", base_dir=tmp_base_dir)
+        read_config("cached-ext", base_dir=tmp_base_dir)
+
+        config_path = tmp_base_dir / "teams" / "cached-ext" / "config.json"
+        raw = json.loads(config_path.read_text())
+        raw["description"] = "edited by another process"
+        config_path.write_text(json.dumps(raw))
+
+        before = config_cache_stats()
+        cfg = read_config("cached-ext", base_dir=tmp_base_dir)
+        assert cfg.description == "edited by another process"
+        assert config_cache_stats()["misses"] == before["misses"] + 1
+
+    def test_cached_config_is_immutable(self, tmp_base_dir: Path) -> None:
+        create_team("cached-frozen", "sess-1", base_dir=tmp_base_dir)
+        cfg = read_config("cached-frozen", base_dir=tmp_base_dir)
+        with pytest.raises(Exception):
+            cfg.description = "mutated"
+        assert isinstance(cfg.members, tuple)
+
+
+class TestUpdateConfig:
+    def test_update_config_applies_and_persists(self, tmp_base_dir: Path) -> None:
+        create_team("txn", "sess-1", base_dir=tmp_base_dir)
+        result = update_config(
+            "txn",
+            lambda c: c.model_copy(update={"description": "via txn"}),
+            base_dir=tmp_base_dir,
+        )
+        assert result.description == "via txn"
+        raw = json.loads((tmp_base_dir / "teams" / "txn" / "config.json").read_text())
+        assert raw["description"] == "via txn"
+
+    def test_update_config_aborts_when_fn_raises(self, tmp_base_dir: Path) -> None:
+        create_team("txn-abort", "sess-1", base_dir=tmp_base_dir)
+
+        def _fail(config: TeamConfig) -> TeamConfig:
+            raise ValueError("nope")
+
+        with pytest.raises(ValueError, match="nope"):
+            update_config("txn-abort", _fail, base_dir=tmp_base_dir)
+        assert read_config("txn-abort", base_dir=tmp_base_dir).description == ""
+
+    def test_parallel_add_member_loses_no_members(self, tmp_base_dir: Path) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        create_team("race", "sess-1", base_dir=tmp_base_dir)
+        names = [f"worker-{i}" for i in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(
+                lambda n: add_member("race", _make_teammate(n, "race"), base_dir=tmp_base_dir),
+                names,
+            ))
+
+        raw = json.loads((tmp_base_dir / "teams" / "race" / "config.json").read_text())
+        stored = {m["name"] for m in raw["members"]}
+        assert stored == {"team-lead", *names}
+
+    def test_replace_member_updates_pane_id(self, tmp_base_dir: Path) -> None:
+        create_team("swap", "sess-1", base_dir=tmp_base_dir)
+        mate = _make_teammate("worker", "swap")
+        add_member("swap", mate, base_dir=tmp_base_dir)
+        replace_member("swap", mate.model_copy(update={"tmux_pane_id": "%99"}), base_dir=tmp_base_dir)
+        cfg = read_config("swap", base_dir=tmp_base_dir)
+        assert cfg.members[1].tmux_pane_id == "%99"
+
+
+class TestPurgeTrash:
+    def test_purge_removes_trash_contents(self, tmp_base_dir: Path) -> None:
+        create_team("purged", "sess-1", base_dir=tmp_base_dir)
+        delete_team("purged", base_dir=tmp_base_dir)
+
+        removed = purge_trash(base_dir=tmp_base_dir)
+        assert removed > 0
+        assert list((tmp_base_dir / ".trash").iterdir()) == []
+
+    def test_purge_without_trash_is_noop(self, tmp_base_dir: Path) -> None:
+        assert purge_trash(base_dir=tmp_base_dir) == 0
+
+    def test_purge_stops_when_requested(self, tmp_base_dir: Path) -> None:
+        import threading
+
+        leftover = tmp_base_dir / ".trash" / "crashed-teams"
+        leftover.mkdir(parents=True)
+        for i in range(5):
+            (leftover / f"{i}.json").write_text("{}")
+        stop = threading.Event()
+        stop.set()
+
+        assert purge_trash(base_dir=tmp_base_dir, stop=stop) == 0
+        assert len(list(leftover.iterdir())) == 5
+
+    def test_purge_handles_read_only_directories(self, tmp_base_dir: Path, monkeypatch) -> None:
+        import os
+        import stat
+
+        leftover = tmp_base_dir / ".trash" / "cache-teams"
+        readonly = leftover / "cache" / "go" / "mod" / "pkg@v1"
+        readonly.mkdir(parents=True)
+        (readonly / "go.mod").write_text("module pkg")
+        readonly.chmod(0o555)
+        stuck = leftover / "stuck"
+        stuck.mkdir()
+        (stuck / "file").write_text("x")
+        stuck.chmod(0o555)
+
+        real_unlink = os.unlink
+
+        def unlink(path, *args, **kwargs):
+            # Root ignores directory permissions; fail as for any other user
+            parent = os.path.dirname(path)
+            if not os.stat(parent).st_mode & stat.S_IWUSR or parent.endswith("stuck"):
+                raise PermissionError(13, "Permission denied", path)
+            return real_unlink(path, *args, **kwargs)
+
+        monkeypatch.setattr("opencode_teams.teams.os.unlink", unlink)
+        purge_trash(base_dir=tmp_base_dir)
+        assert not readonly.exists()
+        assert (stuck / "file").exists()  # Skipped, not fatal
+        monkeypatch.undo()
+        assert purge_trash(base_dir=tmp_base_dir) > 0
+        assert list((tmp_base_dir / ".trash").iterdir()) == []
+
+    def test_purge_respects_rate_limit(self, tmp_base_dir: Path) -> None:
+        leftover = tmp_base_dir / ".trash" / "big-tasks"
+        leftover.mkdir(parents=True)
+        for i in range(10):
+            (leftover / f"{i}.json").write_text("{}")
+
+        start = time.monotonic()
+        removed = purge_trash(base_dir=tmp_base_dir, max_files_per_second=100)
+        assert removed == 11
+        assert time.monotonic() - start >= 0.1
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import io
+import queue
+import shutil
+import subprocess
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from opencode_teams import spawner, tmux_control
+from opencode_teams.tmux_control import (
+    ControlModeUnavailable,
+    TmuxControlClient,
+    quote_arg,
+    read_replies,
+)
+
+
+def _parse(text: str) -> list:
+    replies: queue.Queue = queue.Queue()
+    read_replies(io.StringIO(text), replies)
+    out = []
+    while not replies.empty():
+        out.append(replies.get_nowait())
+    return out
+
+
+class TestReadReplies:
+    def test_parses_blocks_and_skips_notifications(self) -> None:
+        text = (
+            "%begin 1 10 0\n%end 1 10 0\n"
+            "%session-changed $0 s1\n"
+            "%begin 2 11 1\n%3 0\n%4 1\n%end 2 11 1\n"
+            "%output %3 hello\n"
+            "%begin 3 12 1\ncan't find pane: %9\n%error 3 12 1\n"
+        )
+        assert _parse(text) == [
+            (True, []),
+            (True, ["%3 0", "%4 1"]),
+            (False, ["can't find pane: %9"]),
+            None,
+        ]
+
+    def test_end_with_other_command_number_is_output(self) -> None:
+        text = "%begin 1 5 1\n%end 1 6 1\n%end 1 5 1\n"
+        assert _parse(text) == [(True, ["%end 1 6 1"]), None]
+
+    def test_eof_mid_block_queues_sentinel(self) -> None:
+        assert _parse("%begin 1 5 1\npartial\n") == [None]
+
+
+class TestQuoteArg:
+    def test_escapes_parser_metacharacters(self) -> None:
+        assert quote_arg('a "b" $HOME \\x') == '"a \\"b\\" \\$HOME \\\\x"'
+
+
+@pytest.fixture
+def tmux_socket():
+    if shutil.which("tmux") is None:
+        pytest.skip("tmux not installed")
+    name = f"opencode-teams-test-{uuid.uuid4().hex[:8]}"
+    subprocess.run(["tmux", "-L", name, "new-session", "-d", "-s", "s1", "sleep 300"], check=True)
+    yield name
+    subprocess.run(["tmux", "-L", name, "kill-server"], capture_output=True)
+
+
+class TestTmuxControlClient:
+    def test_round_trip_and_errors(self, tmux_socket: str) -> None:
+        client = TmuxControlClient(socket_name=tmux_socket)
+        client.connect()
+        try:
+            result = client.run(["display-message", "-p", '#{session_name} $HOME "q"'])
+            assert result.returncode == 0
+            assert result.stdout == 's1 $HOME "q"\n'
+
+            result = client.run(["kill-pane", "-t", "%999"])
+            assert result.returncode == 1
+            assert "can't find pane" in result.stderr
+            with pytest.raises(subprocess.CalledProcessError):
+                client.run(["kill-pane", "-t", "%999"], check=True)
+        finally:
+            client.close()
+        assert not client.connected
+
+    def test_split_window_defaults_to_given_pane(self, tmux_socket: str) -> None:
+        pane = subprocess.run(
+            ["tmux", "-L", tmux_socket, "display-message", "-p", "#{pane_id}"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        client = TmuxControlClient(default_pane=pane, socket_name=tmux_socket)
+        client.connect()
+        try:
+            new_pane = client.run(["split-window", "-dP", "-F", "#{pane_id}", "sleep 30"]).stdout.strip()
+            window = client.run(["display-message", "-p", "-t", new_pane, "#{window_id}"]).stdout
+            assert window == client.run(["display-message", "-p", "-t", pane, "#{window_id}"]).stdout
+        finally:
+            client.close()
+
+    def test_newlines_are_rejected_before_sending(self, tmux_socket: str) -> None:
+        client = TmuxControlClient(socket_name=tmux_socket)
+        client.connect()
+        try:
+            with pytest.raises(ControlModeUnavailable):
+                client.run(["display-message", "-p", "a\nb"])
+            assert client.connected
+        finally:
+            client.close()
+
+    def test_connect_without_server_is_unavailable(self) -> None:
+        if shutil.which("tmux") is None:
+            pytest.skip("tmux not installed")
+        client = TmuxControlClient(socket_name=f"opencode-teams-none-{uuid.uuid4().hex[:8]}")
+        with pytest.raises(ControlModeUnavailable):
+            client.connect()
+
+
+class TestManager:
+    def test_reconnects_after_connection_drop(self, tmux_socket: str, monkeypatch) -> None:
+        monkeypatch.setattr(tmux_control, "RECONNECT_BACKOFF_SECONDS", 0.0)
+        tmux_control.enable(socket_name=tmux_socket)
+        try:
+            first = tmux_control.get_client()
+            assert first is not None
+            first._proc.kill()
+            first._proc.wait()
+
+            second = tmux_control.get_client()
+            assert second is not None and second is not first
+            assert second.run(["display-message", "-p", "#{session_name}"]).stdout == "s1\n"
+            assert tmux_control.status()["connects"] >= 2
+        finally:
+            tmux_control.shutdown()
+        assert tmux_control.get_client() is None
+
+    def test_disabled_by_env_var(self, monkeypatch) -> None:
+        monkeypatch.setenv(tmux_control.CONTROL_MODE_ENV_VAR, "0")
+        tmux_control.enable()
+        assert tmux_control.get_client() is None
+        assert tmux_control.status()["enabled"] is False
+
+
+class TestSpawnerRouting:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_uses_control_client_when_connected(self, mock_subprocess: MagicMock) -> None:
+        client = MagicMock()
+        client.run.return_value = subprocess.CompletedProcess(["tmux"], 0, "0\n", "")
+        with patch.object(tmux_control, "get_client", return_value=client):
+            assert spawner.check_pane_alive("%5") is True
+        client.run.assert_called_once_with(
+            ["display-message", "-p", "-t", "%5", "#{pane_dead}"], timeout=5, check=False
+        )
+        mock_subprocess.run.assert_not_called()
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_falls_back_to_subprocess_when_unsent(self, mock_subprocess: MagicMock) -> None:
+        client = MagicMock()
+        client.run.side_effect = ControlModeUnavailable("gone")
+        with patch.object(tmux_control, "get_client", return_value=client):
+            spawner.kill_tmux_pane("%7")
+        mock_subprocess.run.assert_called_once_with(["tmux", "kill-pane", "-t", "%7"], check=False)
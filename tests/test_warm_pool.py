@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from opencode_teams import warm_pool
+from opencode_teams.models import TeammateMember
+from opencode_teams.spawner import WARM_POOL_DIR
+from opencode_teams.warm_pool import WarmAgent, WarmPool
+
+MODEL = "openai/gpt-5.2"
+
+
+def _standby(slot: str, *args, **kwargs) -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{slot}@{WARM_POOL_DIR}",
+        name=slot,
+        agent_type="general-purpose",
+        model=MODEL,
+        prompt="standby",
+        color="",
+        joined_at=0,
+        tmux_pane_id="%" + slot,
+        cwd="/tmp",
+    )
+
+
+@pytest.fixture
+def pool(tmp_base_dir: Path) -> WarmPool:
+    return WarmPool("/usr/local/bin/opencode", base_dir=tmp_base_dir, memory_budget_mb=10_000)
+
+
+@pytest.fixture
+def fake_spawner():
+    with patch("opencode_teams.spawner.start_standby_agent", side_effect=_standby) as start, \
+         patch("opencode_teams.spawner.stop_agent_process") as stop, \
+         patch("opencode_teams.spawner.cleanup_standby_agent"), \
+         patch("opencode_teams.spawner.check_pane_alive", return_value=True), \
+         patch("opencode_teams.spawner.list_pane_states", return_value={}):
+        yield start, stop
+
+
+class TestMaintain:
+    def test_fills_pool_to_size(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        start, _ = fake_spawner
+        pool.configure(MODEL, "tmux", 2, tmp_path)
+        assert pool.maintain() == 2
+        assert pool.maintain() == 0
+        assert start.call_count == 2
+        assert pool.status()["pools"][0]["idle"] == 2
+
+    def test_respects_memory_budget(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        pool.memory_budget_mb = warm_pool.ASSUMED_AGENT_MEMORY_MB * 1.5
+        pool.configure(MODEL, "tmux", 3, tmp_path)
+        assert pool.maintain() == 1
+
+    def test_expires_idle_standbys(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        start, stop = fake_spawner
+        pool.configure(MODEL, "tmux", 1, tmp_path)
+        pool.maintain()
+        pool.idle_timeout = 0.0
+        time.sleep(0.01)
+        pool.maintain()
+        assert stop.call_count == 1
+        assert start.call_count == 2
+        assert pool.status()["expired"] == 1
+
+    def test_size_zero_retires_standbys(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        _, stop = fake_spawner
+        pool.configure(MODEL, "tmux", 2, tmp_path)
+        pool.maintain()
+        pool.configure(MODEL, "tmux", 0)
+        pool.maintain()
+        assert stop.call_count == 2
+        assert pool.status()["pools"] == []
+
+    def test_rejects_unsupported_backend(self, pool: WarmPool) -> None:
+        with pytest.raises(ValueError):
+            pool.configure(MODEL, "desktop", 1)
+
+
+class TestClaim:
+    def test_claims_standby_in_same_project(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        pool.configure(MODEL, "tmux", 1, tmp_path)
+        pool.maintain()
+        assert pool.claim(MODEL, "tmux", tmp_path / "other") is None
+        claimed = pool.claim(MODEL, "tmux", tmp_path)
+        assert claimed is not None and claimed.name.startswith("warm-")
+        assert pool.claim(MODEL, "tmux", tmp_path) is None
+        stats = pool.status()
+        assert stats["claims"] == 1
+        assert stats["misses"] == 2
+
+    def test_unconfigured_model_is_not_a_miss(self, pool: WarmPool) -> None:
+        assert pool.claim("other/model", "tmux") is None
+        assert pool.status()["misses"] == 0
+
+    def test_skips_dead_standby(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        pool.configure(MODEL, "tmux", 1, tmp_path)
+        pool.maintain()
+        with patch("opencode_teams.spawner.check_pane_alive", return_value=False):
+            assert pool.claim(MODEL, "tmux", tmp_path) is None
+
+    def test_probes_liveness_without_holding_lock(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        pool.configure(MODEL, "tmux", 1, tmp_path)
+        pool.maintain()
+
+        def alive(pane_id: str) -> bool:
+            assert not pool._lock.locked()
+            return True
+
+        with patch("opencode_teams.spawner.check_pane_alive", side_effect=alive):
+            assert pool.claim(MODEL, "tmux", tmp_path) is not None
+            pool.maintain()
+
+    def test_standby_waits_out_its_idle_timeout(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        start, _ = fake_spawner
+        pool.idle_timeout = 900
+        pool.configure(MODEL, "tmux", 1, tmp_path)
+        pool.maintain()
+        assert start.call_args.kwargs["wait_seconds"] > pool.idle_timeout
+
+
+class TestShutdown:
+    def test_stops_idle_standbys(self, pool: WarmPool, fake_spawner, tmp_path: Path) -> None:
+        _, stop = fake_spawner
+        pool.configure(MODEL, "tmux", 2, tmp_path)
+        pool.maintain()
+        pool.shutdown()
+        assert stop.call_count == 2
+        assert pool.status()["pools"] == []
+
+
+class TestMemoryMeasurement:
+    def test_falls_back_to_assumed_size(self, pool: WarmPool) -> None:
+        member = _standby("x").model_copy(update={"process_id": 999_999_999, "tmux_pane_id": ""})
+        warm = WarmAgent(member, Path("/tmp"), time.time())
+        assert pool._memory_mb(warm) == warm_pool.ASSUMED_AGENT_MEMORY_MB
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from opencode_teams import teams, worktrees
+from opencode_teams.models import TeammateMember, TeammateSpec
+from opencode_teams.spawner import release_agent_resources, spawn_many, spawn_teammate
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+TEAM = "wt-team"
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(cwd), *args], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch) -> Path:
+    for var in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{var}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{var}_EMAIL", "test@example.com")
+    path = tmp_path / "project"
+    path.mkdir()
+    _git(path, "init", "--quiet", "--initial-branch=main")
+    (path / "app.py").write_text("print('hi')\n")
+    (path / "pkg").mkdir()
+    (path / "pkg" / "mod.py").write_text("X = 1\n")
+    _git(path, "add", "--all")
+    _git(path, "commit", "--quiet", "-m", "init")
+    return path
+
+
+@pytest.fixture
+def base_dir(tmp_base_dir: Path) -> Path:
+    teams.create_team(TEAM, session_id="s", base_dir=tmp_base_dir)
+    return tmp_base_dir
+
+
+def _member(tree: worktrees.Worktree, name: str = "impl") -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@{TEAM}",
+        name=name,
+        agent_type="general-purpose",
+        model="openai/gpt-5.2",
+        prompt="Implement it",
+        color="blue",
+        joined_at=0,
+        tmux_pane_id="",
+        cwd=tree.cwd,
+        worktree=tree.path,
+        branch=tree.branch,
+        base_branch=tree.base,
+    )
+
+
+def _commit(cwd: Path, filename: str, text: str) -> None:
+    (cwd / filename).write_text(text)
+    _git(cwd, "add", filename)
+    _git(cwd, "commit", "--quiet", "-m", f"edit {filename}")
+
+
+class TestCreate:
+    def test_adds_worktree_on_agent_branch(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo, TEAM, "impl", base_dir)
+        assert tree.path == str(worktrees.worktree_path(TEAM, "impl", base_dir))
+        assert tree.cwd == tree.path
+        assert tree.branch == f"opencode-teams/{TEAM}/impl"
+        assert tree.base == "main"
+        assert _git(Path(tree.path), "branch", "--show-current") == tree.branch
+        assert (Path(tree.path) / "app.py").exists()
+
+    def test_subdirectory_project_maps_into_worktree(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo / "pkg", TEAM, "impl", base_dir)
+        assert tree.cwd == str(Path(tree.path) / "pkg")
+        assert (Path(tree.cwd) / "mod.py").exists()
+
+    def test_existing_branch_is_continued(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo, TEAM, "impl", base_dir)
+        _commit(Path(tree.path), "app.py", "print('v2')\n")
+        assert worktrees.remove(_member(tree)) is True
+        again = worktrees.create(repo, TEAM, "impl", base_dir)
+        assert (Path(again.path) / "app.py").read_text() == "print('v2')\n"
+
+    def test_rejects_non_repository(self, tmp_path: Path, base_dir: Path) -> None:
+        plain = tmp_path / "plain"
+        plain.mkdir()
+        with pytest.raises(ValueError, match="not in a git repository"):
+            worktrees.create(plain, TEAM, "impl", base_dir)
+
+
+class TestMergeStatus:
+    def test_fresh_worktree_is_not_ready(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo, TEAM, "impl", base_dir)
+        status = worktrees.merge_status(_member(tree))
+        assert (status["ahead"], status["behind"]) == (0, 0)
+        assert status["ready"] is False
+
+    def test_committed_work_is_ready(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo, TEAM, "impl", base_dir)
+        # Files the spawn writes into the worktree are not the agent's changes
+        (Path(tree.path) / "opencode.json").write_text("{}")
+        (Path(tree.path) / ".opencode" / "agents").mkdir(parents=True)
+        (Path(tree.path) / ".opencode" / "agents" / "impl.md").write_text("cfg")
+        _commit(Path(tree.path), "new.py", "Y = 2\n")
+        status = worktrees.merge_status(_member(tree))
+        assert status["uncommittedFiles"] == []
+        assert status["ahead"] == 1
+        assert status["conflicts"] in ([], None)
+        assert status["ready"] is (status["conflicts"] == [])
+
+    def test_uncommitted_and_conflicting_changes(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo, TEAM, "impl", base_dir)
+        _commit(Path(tree.path), "app.py", "print('agent')\n")
+        _commit(repo, "app.py", "print('main')\n")
+        (Path(tree.path) / "scratch.txt").write_text("wip")
+        status = worktrees.merge_status(_member(tree))
+        assert status["uncommittedFiles"] == ["scratch.txt"]
+        assert status["behind"] == 1
+        if status["conflicts"] is not None:
+            assert status["conflicts"] == ["app.py"]
+        assert status["ready"] is False
+
+
+class TestRemove:
+    def test_clean_worktree_and_branch_removed(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo, TEAM, "impl", base_dir)
+        (Path(tree.path) / "opencode.json").write_text("{}")
+        assert worktrees.remove(_member(tree)) is False
+        assert not Path(tree.path).exists()
+        assert _git(repo, "branch", "--list", tree.branch) == ""
+
+    def test_uncommitted_work_saved_to_branch(self, repo: Path, base_dir: Path) -> None:
+        tree = worktrees.create(repo, TEAM, "impl", base_dir)
+        (Path(tree.path) / "app.py").write_text("print('unsaved')\n")
+        (Path(tree.path) / "opencode.json").write_text("{}")
+        assert worktrees.remove(_member(tree)) is True
+        assert not Path(tree.path).exists()
+        assert _git(repo, "show", f"{tree.branch}:app.py") == "print('unsaved')"
+        files = _git(repo, "show", "--name-only", "--format=", tree.branch)
+        assert files == "app.py"
+
+
+class TestSpawnInWorktree:
+    @patch("opencode_teams.spawner.subprocess")
+    def test_spawn_runs_agent_in_worktree(
+        self, mock_subprocess: MagicMock, repo: Path, base_dir: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        member = spawn_teammate(
+            TEAM, "impl", "Implement it", "/usr/local/bin/opencode",
+            base_dir=base_dir, project_dir=repo, worktree=True,
+        )
+        assert member.worktree == str(worktrees.worktree_path(TEAM, "impl", base_dir))
+        assert member.cwd == member.worktree
+        assert member.branch == f"opencode-teams/{TEAM}/impl"
+        config = Path(member.worktree) / ".opencode" / "agents" / "impl.md"
+        assert member.branch in config.read_text()
+        assert (Path(member.worktree) / "opencode.json").exists()
+        assert not (repo / ".opencode" / "agents" / "impl.md").exists()
+        assert "cd " + member.worktree in mock_subprocess.run.call_args[0][0][-1]
+
+        release_agent_resources(member)
+        assert not Path(member.worktree).exists()
+
+    def test_worktree_cannot_use_warm_agent(self, repo: Path, base_dir: Path) -> None:
+        with pytest.raises(ValueError, match="warm agent"):
+            spawn_teammate(
+                TEAM, "impl", "Implement it", "/usr/local/bin/opencode",
+                base_dir=base_dir, project_dir=repo, worktree=True,
+                warm_agent=MagicMock(),
+            )
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_failed_spawn_removes_worktree(
+        self, mock_subprocess: MagicMock, repo: Path, base_dir: Path
+    ) -> None:
+        mock_subprocess.run.side_effect = RuntimeError("tmux crashed")
+        with pytest.raises(RuntimeError, match="tmux crashed"):
+            spawn_teammate(
+                TEAM, "impl", "Implement it", "/usr/local/bin/opencode",
+                base_dir=base_dir, project_dir=repo, worktree=True,
+            )
+        assert not worktrees.worktree_path(TEAM, "impl", base_dir).exists()
+        assert _git(repo, "branch", "--list", f"opencode-teams/{TEAM}/*") == ""
+
+    @patch("opencode_teams.spawner.subprocess")
+    def test_spawn_many_mixes_worktree_and_shared(
+        self, mock_subprocess: MagicMock, repo: Path, base_dir: Path
+    ) -> None:
+        mock_subprocess.run.return_value.stdout = "%42\n"
+        spawned, failed = spawn_many(
+            TEAM,
+            [
+                TeammateSpec(name="a", prompt="A", model="openai/gpt-5.2", worktree=True),
+                TeammateSpec(name="b", prompt="B", model="openai/gpt-5.2"),
+            ],
+            "/usr/local/bin/opencode",
+            models=[], base_dir=base_dir, project_dir=repo, cwd=str(repo),
+        )
+        assert failed == {}
+        a, b = spawned
+        assert a.worktree and a.cwd == a.worktree
+        assert (Path(a.worktree) / ".opencode" / "agents" / "a.md").exists()
+        assert b.worktree == "" and b.cwd == str(repo)
+        assert (repo / ".opencode" / "agents" / "b.md").exists()
+        stored = teams.read_config(TEAM, base_dir=base_dir).get_teammate("a")
+        assert stored.branch == a.branch